@@ -15,9 +15,10 @@ from PyQt5.QtWidgets import (
     QGroupBox,
 )
 from PyQt5.QtCore import Qt, QDate
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 from Application.Components.DayClose.modal import DayCloseManager
 from Application.Components.Inventory.Expenses.model import ExpenseManager
+from Helper.print_devices import print_router
 
 
 class AuditWidget(QWidget):
@@ -111,6 +112,7 @@ class AuditWidget(QWidget):
         )
 
         if success:
+            self.print_day_close(next_working_date)
             QMessageBox.information(self, "Success", "Day close saved successfully.")
             self.day_close_view.populate_table()
             self.day_close_view.show_summary()
@@ -118,6 +120,26 @@ class AuditWidget(QWidget):
             QMessageBox.critical(self, "Error", "Failed to save day close data.")
 
 
+    def print_day_close(self, next_working_date):
+        """Queue the day close slip on the printer routed for day_close."""
+        report = {
+            "store": self.store_name,
+            "working_date": self.working_date.strftime("%Y-%m-%d"),
+            "next_working_date": next_working_date.strftime("%Y-%m-%d"),
+            "rows": [
+                ["Running Orders", int(self.running_orders_label.text())],
+                ["Total Amount", float(self.total_amount_label.text().replace("TZS ", ""))],
+                ["Voided Orders", int(self.voided_orders_label.text())],
+                ["Total Expenses", float(self.total_expenses_label.text().replace("TZS ", ""))],
+            ],
+            "printed_at": datetime.now().strftime("%Y-%m-%d %H:%M"),
+        }
+        try:
+            print_router.submit("day_close", report)
+        except Exception as e:
+            print(f"Failed to queue day close slip: {e}")
+
+
 class DayCloseView(QWidget):
     def __init__(self, db_helper=None):
         super().__init__()
@@ -4,9 +4,6 @@ import sqlite3
 from datetime import date, timedelta
 from Helper.db_conn import DatabaseManager
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
@@ -16,7 +13,7 @@ class DayCloseManager:
 
     def _get_connection(self):
         with self.db_manager.lock:
-            conn = sqlite3.connect(self.db_manager.db_path, timeout=30)
+            conn = self.db_manager.connect()
             conn.execute("PRAGMA foreign_keys = ON")
         return conn
 
@@ -24,7 +21,7 @@ class DayCloseManager:
         try:
             conn.commit()
         except sqlite3.Error as e:
-            logger.error(f"Error committing changes: {str(e)}")
+            logger.error("Error committing changes: %s", e)
         finally:
             conn.close()
 
@@ -62,10 +59,10 @@ class DayCloseManager:
                 cursor.execute("SELECT id, name FROM stores")
                 stores = [{"id": row[0], "name": row[1]} for row in cursor.fetchall()]
 
-            logger.info(f"Retrieved {len(stores)} stores: {stores}")
+            logger.info("Retrieved %s stores: %s", len(stores), stores)
             return stores
         except sqlite3.Error as e:
-            logger.error(f"Error retrieving stores data: {str(e)}")
+            logger.error("Error retrieving stores data: %s", e)
             return []
         finally:
             self._commit_and_close(conn)
@@ -104,7 +101,7 @@ class DayCloseManager:
 
             return completed_orders_count, total_amount, voided_orders_count
         except sqlite3.Error as e:
-            logger.error(f"Error getting orders status: {str(e)}")
+            logger.error("Error getting orders status: %s", e)
             return 0, 0.0, 0
         finally:
             self._commit_and_close(conn)
@@ -123,7 +120,7 @@ class DayCloseManager:
             count = cursor.fetchone()[0]
             return count > 0
         except sqlite3.Error as e:
-            logger.error(f"Error checking day close: {str(e)}")
+            logger.error("Error checking day close: %s", e)
             return False
         finally:
             self._commit_and_close(conn)
@@ -151,11 +148,12 @@ class DayCloseManager:
                     voided_orders,
                 ),
             )
-            logger.info(f"Day close performed for store {store_id} on {working_date}")
+            logger.info("Day close performed for store %s on %s", store_id, working_date)
             self._commit_and_close(conn)
+            self.db_manager.write_stock_snapshot(working_date.strftime("%Y-%m-%d"), store_id)
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error performing day close: {str(e)}")
+            logger.error("Error performing day close: %s", e)
             self._commit_and_close(conn)
             return False
 
@@ -187,8 +185,10 @@ class DayCloseManager:
             )
             logger.info("Day close data saved successfully.")
             self._commit_and_close(conn)
+            # Closing stock of the day, for stock-at-date reports
+            self.db_manager.write_stock_snapshot(working_date, store_id)
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error saving day close data: {str(e)}")
+            logger.error("Error saving day close data: %s", e)
             self._commit_and_close(conn)
             return False
@@ -20,9 +20,6 @@ from PyQt5.QtCore import Qt
 from Application.Components.Inventory.Category.model import CategoryManager
 
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
@@ -3,10 +3,6 @@ import logging
 import sqlite3
 from Helper.db_conn import DatabaseManager
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
@@ -16,14 +12,14 @@ class CategoryManager:
 
     def _get_connection(self):
         with self.db_manager.lock:
-            conn = sqlite3.connect(self.db_manager.db_path, timeout=30)
+            conn = self.db_manager.connect()
         return conn
 
     def _commit_and_close(self, conn):
         try:
             conn.commit()
         except sqlite3.Error as e:
-            logger.error(f"Error committing changes: {str(e)}")
+            logger.error("Error committing changes: %s", e)
         finally:
             conn.close()
 
@@ -35,7 +31,7 @@ class CategoryManager:
             item_groups = [{"id": row[0], "name": row[1]} for row in cursor.fetchall()]
             return item_groups
         except sqlite3.Error as e:
-            logger.error(f"Failed to retrieve item_groups: {str(e)}")
+            logger.error("Failed to retrieve item_groups: %s", e)
             return []
         finally:
             self._commit_and_close(conn)
@@ -51,10 +47,10 @@ class CategoryManager:
                 """,
                 (name, item_group_id),
             )
-            logger.info(f"Category '{name}' saved successfully.")
+            logger.info("Category '%s' saved successfully.", name)
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error saving category '{name}': {str(e)}")
+            logger.error("Error saving category '%s': %s", name, e)
             return False
         finally:
             self._commit_and_close(conn)
@@ -85,10 +81,10 @@ class CategoryManager:
                 }
                 for row in cursor.fetchall()
             ]
-            logger.info(f"Retrieved {len(categories)} categories.")
+            logger.info("Retrieved %s categories.", len(categories))
             return categories
         except sqlite3.Error as e:
-            logger.error(f"Error retrieving categories data: {str(e)}")
+            logger.error("Error retrieving categories data: %s", e)
             return []
         finally:
             self._commit_and_close(conn)
@@ -105,10 +101,10 @@ class CategoryManager:
                 """,
                 (name, item_group_id, category_id),
             )
-            logger.info(f"Category with ID {category_id} updated successfully.")
+            logger.info("Category with ID %s updated successfully.", category_id)
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error updating category with ID {category_id}: {str(e)}")
+            logger.error("Error updating category with ID %s: %s", category_id, e)
             return False
         finally:
             self._commit_and_close(conn)
@@ -118,10 +114,10 @@ class CategoryManager:
         cursor = conn.cursor()
         try:
             cursor.execute("DELETE FROM categories WHERE id = ?", (category_id,))
-            logger.info(f"Category with ID {category_id} deleted successfully.")
+            logger.info("Category with ID %s deleted successfully.", category_id)
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error deleting category with ID {category_id}: {str(e)}")
+            logger.error("Error deleting category with ID %s: %s", category_id, e)
             return False
         finally:
             self._commit_and_close(conn)
\ No newline at end of file
@@ -0,0 +1,328 @@
+# model.py
+import logging
+import sqlite3
+import time
+
+from Application.Components.Inventory.Items.model import iter_import_rows
+from Helper.change_bus import change_bus
+from Helper.db_conn import STORE_ID, DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# New price for each adjustment mode; :value is the percentage, the amount
+# added, or the new price. Prices never go below zero.
+PRICE_MODES = {
+    "percent": "MAX(0, ROUND(ip.amount * (1 + :value / 100.0), 2))",
+    "amount": "MAX(0, ROUND(ip.amount + :value, 2))",
+    "set": "MAX(0, ROUND(:value, 2))",
+}
+
+# On-hand quantity of temp.stock_counts.item_id in :store_id
+CURRENT_STOCK_SQL = """COALESCE((
+    SELECT SUM(s.stock_quantity) FROM item_stocks s
+    JOIN stocks sk ON sk.id = s.stock_id
+    WHERE s.item_id = c.item_id AND sk.store_id = :store_id
+), 0)"""
+
+
+def read_stock_counts(path):
+    """Reads a counted list (CSV/XLSX) into [(item_id, barcode, counted)].
+
+    Rows need an item_id or barcode column and a counted/quantity column.
+    """
+    counts = []
+    for number, row in iter_import_rows(path):
+        fields = {str(k or "").strip().lower().replace(" ", "_"): v for k, v in row.items()}
+        item_id = fields.get("item_id") or fields.get("id")
+        barcode = fields.get("barcode") or fields.get("sku")
+        counted = next(
+            (fields[k] for k in ("counted", "stock_quantity", "quantity", "qty") if fields.get(k) not in (None, "")),
+            None,
+        )
+        try:
+            counts.append(
+                (
+                    int(float(item_id)) if item_id not in (None, "") else None,
+                    str(barcode).strip() if barcode not in (None, "") else None,
+                    float(str(counted).replace(",", "")),
+                )
+            )
+        except (TypeError, ValueError):
+            raise ValueError(f"Row {number}: item and a numeric count are required")
+    return counts
+
+
+class BulkAdjustmentManager:
+    """Set-based price and stock adjustments.
+
+    Every adjustment runs as a handful of statements over a temporary table
+    of affected items inside one transaction, however many items it
+    touches. With preview=True the same statements compute the affected
+    rows and the transaction is rolled back, so a preview shows exactly
+    what applying would do.
+    """
+
+    def __init__(self, store_id=None):
+        self.db_manager = DatabaseManager()
+        self.store_id = store_id or STORE_ID
+
+    def adjust_prices(
+        self,
+        mode,
+        value,
+        category_ids=(),
+        group_ids=(),
+        item_ids=(),
+        preview=False,
+    ):
+        """Reprices the items in the given categories, groups and item list.
+
+        Returns {"rows": [(item_id, name, old_price, new_price)], "changed": n,
+        "duration_ms": ...}; rows whose price would not change are left out.
+        """
+        if mode not in PRICE_MODES:
+            raise ValueError(f"Unknown price mode {mode!r}")
+        if not (category_ids or group_ids or item_ids):
+            raise ValueError("Select at least one category, group or item")
+
+        started = time.perf_counter()
+        params = {"value": float(value), "store_id": self.store_id}
+        new_price = PRICE_MODES[mode]
+        conn = self.db_manager.open_connection()
+        try:
+            cursor = conn.cursor()
+            self._fill_scope(cursor, category_ids, group_ids, item_ids)
+            cursor.execute(
+                f"""
+                SELECT ip.item_id, i.name, ip.amount, {new_price}
+                FROM item_prices ip
+                JOIN items i ON i.id = ip.item_id
+                WHERE ip.store_id = :store_id
+                  AND ip.item_id IN (SELECT item_id FROM temp.adjust_scope)
+                  AND ip.amount IS NOT {new_price}
+                ORDER BY i.name
+                """,
+                params,
+            )
+            rows = cursor.fetchall()
+            if not preview:
+                cursor.execute(
+                    f"""
+                    UPDATE item_prices AS ip
+                    SET amount = {new_price}, updated_at = CURRENT_TIMESTAMP
+                    WHERE ip.store_id = :store_id
+                      AND ip.item_id IN (SELECT item_id FROM temp.adjust_scope)
+                      AND ip.amount IS NOT {new_price}
+                    """,
+                    params,
+                )
+                conn.commit()
+                self._publish(row[0] for row in rows)
+            else:
+                conn.rollback()
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error("Bulk price adjustment failed: %s", e)
+            raise
+        finally:
+            conn.close()
+
+        result = {
+            "rows": rows,
+            "changed": len(rows),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+        logger.info(
+            "Price adjustment %s %s (%s): %d rows in %s ms",
+            mode,
+            value,
+            "preview" if preview else "applied",
+            result["changed"],
+            result["duration_ms"],
+        )
+        return result
+
+    def apply_stock_counts(self, counts, preview=False):
+        """Sets on-hand stock to counted quantities.
+
+        `counts` is an iterable of (item_id, barcode, counted); either id or
+        barcode identifies the item. Differences are written to
+        stock_movements as 'count' movements. Returns {"rows": [(item_id,
+        name, current, counted, difference)], "unknown": [(item_id,
+        barcode)], "changed": n, "duration_ms": ...}.
+        """
+        started = time.perf_counter()
+        params = {"store_id": self.store_id}
+        conn = self.db_manager.open_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                CREATE TEMP TABLE IF NOT EXISTS counted_input (
+                    item_id INTEGER, barcode TEXT, counted REAL NOT NULL
+                )
+                """
+            )
+            cursor.execute(
+                """
+                CREATE TEMP TABLE IF NOT EXISTS stock_counts (
+                    item_id INTEGER PRIMARY KEY, counted REAL NOT NULL
+                )
+                """
+            )
+            cursor.execute("DELETE FROM temp.counted_input")
+            cursor.execute("DELETE FROM temp.stock_counts")
+            cursor.executemany(
+                "INSERT INTO temp.counted_input (item_id, barcode, counted) VALUES (?, ?, ?)",
+                counts,
+            )
+            # Resolve barcodes; the last count of an item wins
+            cursor.execute(
+                """
+                INSERT OR REPLACE INTO temp.stock_counts (item_id, counted)
+                SELECT i.id, ci.counted
+                FROM temp.counted_input ci
+                JOIN items i ON i.id = COALESCE(ci.item_id, (
+                    SELECT ib.item_id FROM barcodes b
+                    JOIN item_barcodes ib ON ib.barcode_id = b.id
+                    WHERE b.code = ci.barcode
+                ))
+                ORDER BY ci.rowid
+                """
+            )
+            cursor.execute(
+                """
+                SELECT ci.item_id, ci.barcode FROM temp.counted_input ci
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM items i WHERE i.id = COALESCE(ci.item_id, (
+                        SELECT ib.item_id FROM barcodes b
+                        JOIN item_barcodes ib ON ib.barcode_id = b.id
+                        WHERE b.code = ci.barcode
+                    ))
+                )
+                """
+            )
+            unknown = cursor.fetchall()
+            cursor.execute(
+                f"""
+                SELECT c.item_id, i.name, {CURRENT_STOCK_SQL}, c.counted,
+                       c.counted - {CURRENT_STOCK_SQL}
+                FROM temp.stock_counts c
+                JOIN items i ON i.id = c.item_id
+                WHERE c.counted IS NOT {CURRENT_STOCK_SQL}
+                ORDER BY i.name
+                """,
+                params,
+            )
+            rows = cursor.fetchall()
+            if not preview:
+                cursor.execute(
+                    """
+                    INSERT OR IGNORE INTO stocks (item_id, store_id, min_quantity, max_quantity, created_at, updated_at)
+                    SELECT item_id, :store_id, 0, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+                    FROM temp.stock_counts
+                    """,
+                    params,
+                )
+                cursor.execute(
+                    """
+                    INSERT INTO item_stocks (item_id, stock_id, stock_quantity, created_at, updated_at)
+                    SELECT c.item_id, sk.id, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+                    FROM temp.stock_counts c
+                    JOIN stocks sk ON sk.item_id = c.item_id AND sk.store_id = :store_id
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM item_stocks s
+                        WHERE s.item_id = c.item_id AND s.stock_id = sk.id
+                    )
+                    """,
+                    params,
+                )
+                # The ledger applies the differences to item_stocks
+                cursor.execute(
+                    f"""
+                    INSERT INTO stock_movements (item_id, store_id, movement_type, quantity, movement_date)
+                    SELECT c.item_id, :store_id, 'count', c.counted - {CURRENT_STOCK_SQL}, datetime('now', 'localtime')
+                    FROM temp.stock_counts c
+                    WHERE c.counted IS NOT {CURRENT_STOCK_SQL}
+                    """,
+                    params,
+                )
+                conn.commit()
+                self._publish(row[0] for row in rows)
+            else:
+                conn.rollback()
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error("Stock count adjustment failed: %s", e)
+            raise
+        finally:
+            conn.close()
+
+        result = {
+            "rows": rows,
+            "unknown": unknown,
+            "changed": len(rows),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+        }
+        logger.info(
+            "Stock count (%s): %d changed, %d unknown in %s ms",
+            "preview" if preview else "applied",
+            result["changed"],
+            len(unknown),
+            result["duration_ms"],
+        )
+        return result
+
+    def _fill_scope(self, cursor, category_ids, group_ids, item_ids):
+        """Collects the ids of the items to adjust in temp.adjust_scope."""
+        cursor.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS adjust_scope (item_id INTEGER PRIMARY KEY)"
+        )
+        cursor.execute("DELETE FROM temp.adjust_scope")
+        cursor.executemany(
+            "INSERT OR IGNORE INTO temp.adjust_scope (item_id) VALUES (?)",
+            [(int(item_id),) for item_id in item_ids],
+        )
+        if category_ids:
+            marks = ", ".join("?" * len(category_ids))
+            cursor.execute(
+                f"""
+                INSERT OR IGNORE INTO temp.adjust_scope (item_id)
+                SELECT id FROM items WHERE category_id IN ({marks})
+                """,
+                [int(c) for c in category_ids],
+            )
+        if group_ids:
+            marks = ", ".join("?" * len(group_ids))
+            cursor.execute(
+                f"""
+                INSERT OR IGNORE INTO temp.adjust_scope (item_id)
+                SELECT id FROM items
+                WHERE item_group_id IN ({marks})
+                   OR category_id IN (
+                       SELECT id FROM categories WHERE item_group_id IN ({marks})
+                   )
+                """,
+                [int(g) for g in group_ids] * 2,
+            )
+
+    def _publish(self, item_ids):
+        item_ids = list(dict.fromkeys(item_ids))
+        if item_ids:
+            change_bus.publish("items", item_ids, "update")
+
+    def get_categories(self):
+        conn = self.db_manager.open_connection()
+        try:
+            return conn.execute(
+                "SELECT id, name FROM categories WHERE deleted_at IS NULL ORDER BY name"
+            ).fetchall()
+        finally:
+            conn.close()
+
+    def get_item_groups(self):
+        conn = self.db_manager.open_connection()
+        try:
+            return conn.execute("SELECT id, name FROM item_groups ORDER BY name").fetchall()
+        finally:
+            conn.close()
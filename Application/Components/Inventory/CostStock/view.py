@@ -0,0 +1,206 @@
+import logging
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+
+from Application.Components.Inventory.CostStock.model import (
+    BulkAdjustmentManager,
+    read_stock_counts,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class CostStockView(QWidget):
+    """Bulk repricing and stock counts, always previewed before applying."""
+
+    def __init__(self):
+        super().__init__()
+        self.manager = BulkAdjustmentManager()
+        self.stock_counts = []
+
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        title_label = QLabel("Cost & Stock")
+        title_label.setStyleSheet("font-size: 20px; font-weight: bold;")
+        layout.addWidget(title_label)
+
+        tabs = QTabWidget()
+        tabs.addTab(self._build_price_tab(), "Bulk Price Change")
+        tabs.addTab(self._build_stock_tab(), "Stock Count")
+        layout.addWidget(tabs, 1)
+
+    def _build_price_tab(self):
+        tab = QWidget()
+        layout = QVBoxLayout(tab)
+
+        form = QHBoxLayout()
+        self.scope_type = QComboBox()
+        self.scope_type.addItems(["Category", "Item Group"])
+        self.scope_value = QComboBox()
+        self.price_mode = QComboBox()
+        self.price_mode.addItem("Change by %", "percent")
+        self.price_mode.addItem("Change by amount", "amount")
+        self.price_mode.addItem("Set price to", "set")
+        self.price_value = QDoubleSpinBox()
+        self.price_value.setRange(-1000000, 1000000)
+        self.price_value.setDecimals(2)
+        for widget in (
+            QLabel("Apply to:"),
+            self.scope_type,
+            self.scope_value,
+            self.price_mode,
+            self.price_value,
+        ):
+            form.addWidget(widget)
+        form.addStretch(1)
+        layout.addLayout(form)
+
+        self.price_table = self._preview_table(["Item ID", "Name", "Current Price", "New Price"])
+        layout.addWidget(self.price_table, 1)
+
+        buttons = QHBoxLayout()
+        self.price_summary = QLabel("")
+        buttons.addWidget(self.price_summary, 1)
+        self.preview_price_button = QPushButton("Preview")
+        self.apply_price_button = QPushButton("Apply")
+        self.apply_price_button.setEnabled(False)
+        buttons.addWidget(self.preview_price_button)
+        buttons.addWidget(self.apply_price_button)
+        layout.addLayout(buttons)
+
+        self.scope_type.currentIndexChanged.connect(self.load_scope_values)
+        for signal in (
+            self.scope_type.currentIndexChanged,
+            self.scope_value.currentIndexChanged,
+            self.price_mode.currentIndexChanged,
+            self.price_value.valueChanged,
+        ):
+            # A preview is only valid for the settings it was made with
+            signal.connect(lambda *args: self.apply_price_button.setEnabled(False))
+        self.preview_price_button.clicked.connect(self.preview_prices)
+        self.apply_price_button.clicked.connect(self.apply_prices)
+        self.load_scope_values()
+        return tab
+
+    def _build_stock_tab(self):
+        tab = QWidget()
+        layout = QVBoxLayout(tab)
+
+        top = QHBoxLayout()
+        self.load_counts_button = QPushButton("Load Counted List (CSV/XLSX)")
+        top.addWidget(self.load_counts_button)
+        top.addWidget(
+            QLabel("Columns: item_id or barcode, and counted (or quantity)")
+        )
+        top.addStretch(1)
+        layout.addLayout(top)
+
+        self.stock_table = self._preview_table(
+            ["Item ID", "Name", "On Hand", "Counted", "Difference"]
+        )
+        layout.addWidget(self.stock_table, 1)
+
+        buttons = QHBoxLayout()
+        self.stock_summary = QLabel("")
+        buttons.addWidget(self.stock_summary, 1)
+        self.apply_stock_button = QPushButton("Apply Count")
+        self.apply_stock_button.setEnabled(False)
+        buttons.addWidget(self.apply_stock_button)
+        layout.addLayout(buttons)
+
+        self.load_counts_button.clicked.connect(self.load_stock_counts)
+        self.apply_stock_button.clicked.connect(self.apply_stock_counts)
+        return tab
+
+    def _preview_table(self, headers):
+        table = QTableWidget()
+        table.setColumnCount(len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        return table
+
+    def _fill_table(self, table, rows):
+        table.setRowCount(len(rows))
+        for row_index, row in enumerate(rows):
+            for column, value in enumerate(row):
+                text = f"{value:.2f}" if isinstance(value, float) else str(value)
+                table.setItem(row_index, column, QTableWidgetItem(text))
+
+    def load_scope_values(self):
+        self.scope_value.clear()
+        if self.scope_type.currentText() == "Category":
+            values = self.manager.get_categories()
+        else:
+            values = self.manager.get_item_groups()
+        for value_id, name in values:
+            self.scope_value.addItem(name, value_id)
+
+    def _price_args(self):
+        scope_id = self.scope_value.currentData()
+        if scope_id is None:
+            return None
+        scope = "category_ids" if self.scope_type.currentText() == "Category" else "group_ids"
+        return {
+            "mode": self.price_mode.currentData(),
+            "value": self.price_value.value(),
+            scope: [scope_id],
+        }
+
+    def preview_prices(self):
+        args = self._price_args()
+        if args is None:
+            return
+        try:
+            result = self.manager.adjust_prices(preview=True, **args)
+        except Exception as e:
+            QMessageBox.critical(self, "Preview Failed", str(e))
+            return
+        self._fill_table(self.price_table, result["rows"])
+        self.price_summary.setText(f"{result['changed']} prices will change.")
+        self.apply_price_button.setEnabled(result["changed"] > 0)
+
+    def apply_prices(self):
+        args = self._price_args()
+        if args is None:
+            return
+        try:
+            result = self.manager.adjust_prices(**args)
+        except Exception as e:
+            QMessageBox.critical(self, "Price Change Failed", str(e))
+            return
+        self.apply_price_button.setEnabled(False)
+        self.price_summary.setText(
+            f"Updated {result['changed']} prices in {result['duration_ms']} ms."
+        )
+
+    def load_stock_counts(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Load Counted List", "", "Count files (*.csv *.xlsx)"
+        )
+        if not path:
+            return
+        try:
+            self.stock_counts = read_stock_counts(path)
+            result = self.manager.apply_stock_counts(self.stock_counts, preview=True)
+        except Exception as e:
+            QMessageBox.critical(self, "Stock Count Failed", str(e))
+            return
+        self._fill_table(self.stock_table, result["rows"])
+        summary = f"{result['changed']} items will change."
+        if result["unknown"]:
+            summary += f" {len(result['unknown'])} rows match no item and are skipped."
+        self.stock_summary.setText(summary)
+        self.apply_stock_button.setEnabled(result["changed"] > 0)
+
+    def apply_stock_counts(self):
+        try:
+            result = self.manager.apply_stock_counts(self.stock_counts)
+        except Exception as e:
+            QMessageBox.critical(self, "Stock Count Failed", str(e))
+            return
+        self.apply_stock_button.setEnabled(False)
+        self.stock_summary.setText(
+            f"Adjusted stock of {result['changed']} items in {result['duration_ms']} ms."
+        )
@@ -3,10 +3,6 @@ import logging
 import sqlite3
 from Helper.db_conn import DatabaseManager
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
@@ -18,7 +14,7 @@ class ExpenseManager:
     def _get_connection(self):
         """Get a new database connection."""
         with self.db_manager.lock:
-            conn = sqlite3.connect(self.db_manager.db_path, timeout=30)
+            conn = self.db_manager.connect()
         return conn
 
     def _commit_and_close(self, conn):
@@ -26,7 +22,7 @@ class ExpenseManager:
         try:
             conn.commit()
         except sqlite3.Error as e:
-            logger.error(f"Error committing changes: {str(e)}")
+            logger.error("Error committing changes: %s", e)
         finally:
             conn.close()
 
@@ -44,10 +40,10 @@ class ExpenseManager:
             if not users:
                 logger.warning("No users found in the database.")
             else:
-                logger.info(f"Successfully retrieved {len(users)} users for expenses.")
+                logger.info("Successfully retrieved %s users for expenses.", len(users))
             return users
         except sqlite3.Error as e:
-            logger.error(f"Failed to retrieve users for expenses: {str(e)}")
+            logger.error("Failed to retrieve users for expenses: %s", e)
             return []
         finally:
             self._commit_and_close(conn)
@@ -63,10 +59,10 @@ class ExpenseManager:
                 """
             )
             items = [{"id": row[0], "name": row[1]} for row in cursor.fetchall()]
-            logger.info(f"Successfully retrieved {len(items)} items for expenses.")
+            logger.info("Successfully retrieved %s items for expenses.", len(items))
             return items
         except sqlite3.Error as e:
-            logger.error(f"Failed to retrieve items for expenses: {str(e)}")
+            logger.error("Failed to retrieve items for expenses: %s", e)
             return []
         finally:
             self._commit_and_close(conn)
@@ -89,7 +85,7 @@ class ExpenseManager:
                 return result[0]
             return 0.0
         except sqlite3.Error as e:
-            logger.error(f"Error getting price for item ID {item_id}: {e}")
+            logger.error("Error getting price for item ID %s: %s", item_id, e)
             return 0.0
         finally:
             self._commit_and_close(conn)
@@ -142,7 +138,7 @@ class ExpenseManager:
             )
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error saving expense of type '{expense_type}': {str(e)}")
+            logger.error("Error saving expense of type '%s': %s", expense_type, e)
             return False
         finally:
             self._commit_and_close(conn)
@@ -194,10 +190,10 @@ class ExpenseManager:
                 linked_items = [row[0] for row in cursor.fetchall()]
                 expense["linked_item_names"] = ", ".join(linked_items)  # Join names
 
-            logger.info(f"Retrieved {len(expenses)} expenses.")
+            logger.info("Retrieved %s expenses.", len(expenses))
             return expenses
         except sqlite3.Error as e:
-            logger.error(f"Error retrieving expenses data: {str(e)}")
+            logger.error("Error retrieving expenses data: %s", e)
             return []
         finally:
             self._commit_and_close(conn)
@@ -257,10 +253,10 @@ class ExpenseManager:
                         (expense_id, item_id),
                     )
 
-            logger.info(f"Expense with ID {expense_id} updated successfully.")
+            logger.info("Expense with ID %s updated successfully.", expense_id)
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error updating expense with ID {expense_id}: {str(e)}")
+            logger.error("Error updating expense with ID %s: %s", expense_id, e)
             return False
         finally:
             self._commit_and_close(conn)
@@ -270,10 +266,10 @@ class ExpenseManager:
         cursor = conn.cursor()
         try:
             cursor.execute("DELETE FROM expenses WHERE id = ?", (expense_id,))
-            logger.info(f"Expense with ID {expense_id} deleted successfully.")
+            logger.info("Expense with ID %s deleted successfully.", expense_id)
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error deleting expense with ID {expense_id}: {str(e)}")
+            logger.error("Error deleting expense with ID %s: %s", expense_id, e)
             return False
         finally:
             self._commit_and_close(conn)
@@ -26,10 +26,6 @@ from PyQt5.QtCore import Qt, QDate
 from Application.Components.Inventory.Expenses.model import ExpenseManager
 
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
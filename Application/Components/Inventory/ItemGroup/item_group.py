@@ -20,9 +20,6 @@ from PyQt5.QtCore import Qt
 from Application.Components.Inventory.ItemGroup.model import ItemGroupManager
 
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
@@ -3,10 +3,6 @@ import logging
 import sqlite3
 from Helper.db_conn import DatabaseManager
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
@@ -16,14 +12,14 @@ class ItemGroupManager:
 
     def _get_connection(self):
         with self.db_manager.lock:
-            conn = sqlite3.connect(self.db_manager.db_path, timeout=30)
+            conn = self.db_manager.connect()
         return conn
 
     def _commit_and_close(self, conn):
         try:
             conn.commit()
         except sqlite3.Error as e:
-            logger.error(f"Error committing changes: {str(e)}")
+            logger.error("Error committing changes: %s", e)
         finally:
             conn.close()
 
@@ -38,7 +34,7 @@ class ItemGroupManager:
             ]
             return item_groups
         except sqlite3.Error as e:
-            logger.error(f"Failed to retrieve item_groups: {str(e)}")
+            logger.error("Failed to retrieve item_groups: %s", e)
             return []
         finally:
             self._commit_and_close(conn)
@@ -54,10 +50,10 @@ class ItemGroupManager:
                 """,
                 (name,),
             )
-            logger.info(f"Item group '{name}' saved successfully.")
+            logger.info("Item group '%s' saved successfully.", name)
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error saving item group '{name}': {str(e)}")
+            logger.error("Error saving item group '%s': %s", name, e)
             return False
         finally:
             self._commit_and_close(conn)
@@ -74,10 +70,10 @@ class ItemGroupManager:
                 """,
                 (name, item_group_id),
             )
-            logger.info(f"Item group with ID {item_group_id} updated successfully.")
+            logger.info("Item group with ID %s updated successfully.", item_group_id)
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error updating item group with ID {item_group_id}: {str(e)}")
+            logger.error("Error updating item group with ID %s: %s", item_group_id, e)
             return False
         finally:
             self._commit_and_close(conn)
@@ -87,10 +83,10 @@ class ItemGroupManager:
         cursor = conn.cursor()
         try:
             cursor.execute("DELETE FROM item_groups WHERE id = ?", (item_group_id,))
-            logger.info(f"Item group with ID {item_group_id} deleted successfully.")
+            logger.info("Item group with ID %s deleted successfully.", item_group_id)
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error deleting item group with ID {item_group_id}: {str(e)}")
+            logger.error("Error deleting item group with ID %s: %s", item_group_id, e)
             return False
         finally:
             self._commit_and_close(conn)
@@ -3,10 +3,6 @@ import logging
 import sqlite3
 from Helper.db_conn import DatabaseManager
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
@@ -16,14 +12,14 @@ class ItemTypeManager:
 
     def _get_connection(self):
         with self.db_manager.lock:
-            conn = sqlite3.connect(self.db_manager.db_path, timeout=30)
+            conn = self.db_manager.connect()
         return conn
 
     def _commit_and_close(self, conn):
         try:
             conn.commit()
         except sqlite3.Error as e:
-            logger.error(f"Error committing changes: {str(e)}")
+            logger.error("Error committing changes: %s", e)
         finally:
             conn.close()
 
@@ -35,7 +31,7 @@ class ItemTypeManager:
             item_types = [{"id": row[0], "name": row[1], "created_at": row[2]} for row in cursor.fetchall()]
             return item_types
         except sqlite3.Error as e:
-            logger.error(f"Failed to retrieve item types: {str(e)}")
+            logger.error("Failed to retrieve item types: %s", e)
             return []
         finally:
             self._commit_and_close(conn)
@@ -51,10 +47,10 @@ class ItemTypeManager:
                 """,
                 (name,),
             )
-            logger.info(f"Item type '{name}' saved successfully.")
+            logger.info("Item type '%s' saved successfully.", name)
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error saving item type '{name}': {str(e)}")
+            logger.error("Error saving item type '%s': %s", name, e)
             return False
         finally:
             self._commit_and_close(conn)
@@ -71,10 +67,10 @@ class ItemTypeManager:
                 """,
                 (name, item_type_id),
             )
-            logger.info(f"Item type with ID {item_type_id} updated successfully.")
+            logger.info("Item type with ID %s updated successfully.", item_type_id)
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error updating item type with ID {item_type_id}: {str(e)}")
+            logger.error("Error updating item type with ID %s: %s", item_type_id, e)
             return False
         finally:
             self._commit_and_close(conn)
@@ -84,10 +80,10 @@ class ItemTypeManager:
         cursor = conn.cursor()
         try:
             cursor.execute("DELETE FROM item_types WHERE id = ?", (item_type_id,))
-            logger.info(f"Item type with ID {item_type_id} deleted successfully.")
+            logger.info("Item type with ID %s deleted successfully.", item_type_id)
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error deleting item type with ID {item_type_id}: {str(e)}")
+            logger.error("Error deleting item type with ID %s: %s", item_type_id, e)
             return False
         finally:
             self._commit_and_close(conn)
\ No newline at end of file
@@ -0,0 +1,409 @@
+# model.py
+import csv
+import logging
+import time
+from pathlib import Path
+
+from Helper.change_bus import change_bus
+from Helper.db_conn import ON_HAND_SQL, STORE_ID, DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# Accepted header names for each import field (compared case-insensitively,
+# with spaces treated as underscores)
+IMPORT_COLUMNS = {
+    "item_id": ("item_id", "id"),
+    "name": ("name", "item_name"),
+    "barcode": ("barcode", "sku"),
+    "unit": ("unit", "item_unit", "selling_unit"),
+    "price": ("price", "item_price", "selling_price"),
+    "stock_quantity": ("stock_quantity", "stock", "quantity", "qty"),
+    "category": ("category", "category_name", "category_id"),
+}
+DEFAULT_UNIT = "Unit"
+
+
+class ImportRejected(ValueError):
+    """A row that cannot be imported; the message goes to the rejects file."""
+
+
+def _normalize_header(header):
+    return str(header or "").strip().lower().replace(" ", "_")
+
+
+def iter_import_rows(path):
+    """Yields (row number, {header: value}) from a CSV or XLSX file.
+
+    Rows are read one at a time, so large files are never held in memory.
+    XLSX needs openpyxl.
+    """
+    path = Path(path)
+    if path.suffix.lower() in (".xlsx", ".xlsm"):
+        try:
+            import openpyxl
+        except ImportError as e:
+            raise ImportError("openpyxl is required to import XLSX files") from e
+
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            headers = [str(h) if h is not None else "" for h in next(rows, ())]
+            for number, values in enumerate(rows, start=2):
+                if any(v not in (None, "") for v in values):
+                    yield number, dict(zip(headers, values))
+        finally:
+            workbook.close()
+        return
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for number, row in enumerate(csv.DictReader(f), start=2):
+            if any((v or "").strip() for v in row.values() if isinstance(v, str)):
+                yield number, row
+
+
+def count_import_rows(path):
+    """Number of data rows, for progress reporting (None if unknown)."""
+    path = Path(path)
+    if path.suffix.lower() in (".xlsx", ".xlsm"):
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(path, read_only=True)
+        try:
+            max_row = workbook.active.max_row
+        finally:
+            workbook.close()
+        return max_row - 1 if max_row else None
+    with open(path, "rb") as f:
+        return max(sum(1 for _ in f) - 1, 0)
+
+
+class ItemImportManager:
+    """Bulk-loads items from CSV/XLSX catalog files.
+
+    Rows are validated against in-memory lookups of units, categories,
+    barcodes and item ids loaded once up front, then written with
+    executemany in transactions of `chunk_size` rows. Rows that fail
+    validation go to a rejects CSV together with the reason. Existing items
+    (matched by id or barcode) are updated; blank price, unit or stock cells
+    leave the current values alone.
+    """
+
+    def __init__(self, store_id=None, chunk_size=1000, create_units=True):
+        self.db_manager = DatabaseManager()
+        self.store_id = store_id or STORE_ID
+        self.chunk_size = chunk_size
+        self.create_units = create_units
+
+    def import_file(self, path, rejects_path=None, progress=None, cancelled=None):
+        """Imports `path` and returns a summary dict.
+
+        `progress(done, total)` is called after every committed chunk and
+        `cancelled()` is checked before each one; chunks committed before a
+        cancel stay imported. The rejects file defaults to
+        `<name>.rejects.csv` next to the source and is only written if a row
+        was rejected.
+        """
+        path = Path(path)
+        rejects_path = Path(rejects_path or path.with_suffix(".rejects.csv"))
+        started = time.perf_counter()
+        total = count_import_rows(path)
+        summary = {
+            "rows": 0,
+            "created": 0,
+            "updated": 0,
+            "rejected": 0,
+            "rejects_path": None,
+            "cancelled": False,
+        }
+
+        conn = self.db_manager.open_connection()
+        rejects_file = rejects_writer = None
+        try:
+            self._load_lookups(conn.cursor())
+            chunk = []
+            for number, row in iter_import_rows(path):
+                summary["rows"] += 1
+                try:
+                    chunk.append(self._validate(conn.cursor(), row))
+                except ImportRejected as e:
+                    if rejects_writer is None:
+                        rejects_file = open(rejects_path, "w", newline="", encoding="utf-8")
+                        rejects_writer = csv.writer(rejects_file)
+                        rejects_writer.writerow(["row", *row.keys(), "error"])
+                        summary["rejects_path"] = str(rejects_path)
+                    rejects_writer.writerow([number, *row.values(), str(e)])
+                    summary["rejected"] += 1
+
+                if len(chunk) >= self.chunk_size:
+                    if cancelled and cancelled():
+                        summary["cancelled"] = True
+                        chunk = []
+                        break
+                    self._write_chunk(conn, chunk, summary)
+                    chunk = []
+                    if progress:
+                        progress(summary["rows"], total)
+            if chunk:
+                self._write_chunk(conn, chunk, summary)
+            if progress:
+                progress(summary["rows"], total)
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+            if rejects_file is not None:
+                rejects_file.close()
+
+        summary["duration_s"] = round(time.perf_counter() - started, 3)
+        logger.info("Imported %s: %s", path, summary)
+        return summary
+
+    def _load_lookups(self, cursor):
+        cursor.execute("SELECT id, name FROM units")
+        self.units = {name.strip().lower(): unit_id for unit_id, name in cursor.fetchall()}
+        cursor.execute("SELECT id, name FROM categories WHERE deleted_at IS NULL")
+        self.category_ids = set()
+        self.category_names = {}
+        for category_id, name in cursor.fetchall():
+            self.category_ids.add(category_id)
+            self.category_names[name.strip().lower()] = category_id
+        cursor.execute(
+            """
+            SELECT b.code, ib.item_id FROM barcodes b
+            JOIN item_barcodes ib ON ib.barcode_id = b.id
+            """
+        )
+        self.barcodes = dict(cursor.fetchall())
+        cursor.execute("SELECT id FROM items")
+        self.item_ids = {row[0] for row in cursor.fetchall()}
+        self.next_item_id = max(self.item_ids, default=0) + 1
+        cursor.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM barcodes")
+        self.next_barcode_id = cursor.fetchone()[0]
+
+    def _field(self, row, field):
+        for header, value in row.items():
+            if _normalize_header(header) in IMPORT_COLUMNS[field]:
+                value = "" if value is None else str(value).strip()
+                return value or None
+        return None
+
+    def _number(self, row, field):
+        value = self._field(row, field)
+        if value is None:
+            return None
+        try:
+            number = float(value.replace(",", ""))
+        except ValueError:
+            raise ImportRejected(f"{field} is not a number: {value!r}")
+        if number < 0:
+            raise ImportRejected(f"{field} cannot be negative")
+        return number
+
+    def _validate(self, cursor, row):
+        """Maps a file row to an import record or raises ImportRejected."""
+        name = self._field(row, "name")
+        barcode = self._field(row, "barcode")
+        price = self._number(row, "price")
+        stock_quantity = self._number(row, "stock_quantity")
+
+        item_id = self._field(row, "item_id")
+        if item_id is not None:
+            try:
+                item_id = int(float(item_id))
+            except ValueError:
+                raise ImportRejected(f"item_id is not a number: {item_id!r}")
+            if barcode and self.barcodes.get(barcode, item_id) != item_id:
+                raise ImportRejected(
+                    f"barcode {barcode} belongs to item {self.barcodes[barcode]}"
+                )
+        elif barcode in self.barcodes:
+            item_id = self.barcodes[barcode]
+        exists = item_id in self.item_ids
+
+        category = self._field(row, "category")
+        category_id = None
+        if category is not None:
+            category_id = self.category_names.get(category.lower())
+            if category_id is None and category.isdigit():
+                if int(category) in self.category_ids:
+                    category_id = int(category)
+            if category_id is None:
+                raise ImportRejected(f"unknown category {category!r}")
+
+        if not exists:
+            if not name:
+                raise ImportRejected("name is required for new items")
+            if category_id is None:
+                raise ImportRejected("category is required for new items")
+            if price is None:
+                raise ImportRejected("price is required for new items")
+
+        unit = self._field(row, "unit") or (None if exists else DEFAULT_UNIT)
+        unit_id = None
+        if unit is not None:
+            unit_id = self.units.get(unit.lower())
+            if unit_id is None:
+                if not self.create_units:
+                    raise ImportRejected(f"unknown unit {unit!r}")
+                cursor.execute(
+                    "INSERT INTO units (name, created_at) VALUES (?, CURRENT_TIMESTAMP)",
+                    (unit,),
+                )
+                unit_id = self.units[unit.lower()] = cursor.lastrowid
+
+        if item_id is None:
+            item_id = self.next_item_id
+        self.next_item_id = max(self.next_item_id, item_id + 1)
+        self.item_ids.add(item_id)
+        new_barcode_id = None
+        if barcode and barcode not in self.barcodes:
+            self.barcodes[barcode] = item_id
+            new_barcode_id = self.next_barcode_id
+            self.next_barcode_id += 1
+
+        return {
+            "item_id": item_id,
+            "new": not exists,
+            "name": name,
+            "category_id": category_id,
+            "unit_id": unit_id,
+            "price": price,
+            "stock_quantity": 0.0 if stock_quantity is None and not exists else stock_quantity,
+            "barcode": barcode,
+            "barcode_id": new_barcode_id,
+            "store_id": self.store_id,
+        }
+
+    def _write_chunk(self, conn, records, summary):
+        """Writes one chunk of validated records in a single transaction."""
+        barcoded = [r for r in records if r["barcode_id"] is not None]
+        # Later rows for the same item win; the statements below assume one
+        # record per item, as a repeat of a new item would otherwise be
+        # updated before it is inserted
+        merged = {}
+        for record in records:
+            current = merged.get(record["item_id"])
+            if current is None:
+                merged[record["item_id"]] = dict(record)
+                continue
+            current.update(
+                (key, value)
+                for key, value in record.items()
+                if value is not None and key not in ("new", "barcode_id")
+            )
+        records = list(merged.values())
+
+        created = [r for r in records if r["new"]]
+        updated = [r for r in records if not r["new"]]
+        with_unit = [r for r in records if r["unit_id"] is not None]
+        priced = [r for r in records if r["price"] is not None]
+        stocked = [r for r in records if r["stock_quantity"] is not None]
+
+        cursor = conn.cursor()
+        cursor.executemany(
+            """
+            INSERT INTO items (id, name, category_id, item_type_id, status, created_at, updated_at)
+            VALUES (:item_id, :name, :category_id, 1, 'active', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+            """,
+            created,
+        )
+        cursor.executemany(
+            """
+            UPDATE items
+            SET name = COALESCE(:name, name),
+                category_id = COALESCE(:category_id, category_id),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = :item_id
+            """,
+            updated,
+        )
+        cursor.executemany(
+            """
+            UPDATE item_units
+            SET buying_unit_id = :unit_id, selling_unit_id = :unit_id,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE item_id = :item_id
+            """,
+            with_unit,
+        )
+        cursor.executemany(
+            """
+            INSERT INTO item_units (item_id, buying_unit_id, selling_unit_id, created_at, updated_at)
+            SELECT :item_id, :unit_id, :unit_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+            WHERE NOT EXISTS (SELECT 1 FROM item_units WHERE item_id = :item_id)
+            """,
+            with_unit,
+        )
+        cursor.executemany(
+            """
+            UPDATE item_prices
+            SET amount = :price, unit_id = COALESCE(:unit_id, unit_id),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE item_id = :item_id AND store_id = :store_id
+            """,
+            priced,
+        )
+        cursor.executemany(
+            """
+            INSERT INTO item_prices (item_id, store_id, unit_id, amount, created_at, updated_at)
+            SELECT :item_id, :store_id,
+                   COALESCE(:unit_id, (SELECT selling_unit_id FROM item_units WHERE item_id = :item_id)),
+                   :price, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+            WHERE NOT EXISTS (
+                SELECT 1 FROM item_prices WHERE item_id = :item_id AND store_id = :store_id
+            )
+            """,
+            priced,
+        )
+        cursor.executemany(
+            """
+            INSERT OR IGNORE INTO stocks (item_id, store_id, min_quantity, max_quantity, created_at, updated_at)
+            VALUES (:item_id, :store_id, 0, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+            """,
+            stocked,
+        )
+        cursor.executemany(
+            """
+            INSERT INTO item_stocks (item_id, stock_id, stock_quantity, created_at, updated_at)
+            SELECT :item_id, sk.id, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+            FROM stocks sk
+            WHERE sk.item_id = :item_id AND sk.store_id = :store_id
+              AND NOT EXISTS (
+                  SELECT 1 FROM item_stocks WHERE item_id = :item_id AND stock_id = sk.id
+              )
+            """,
+            stocked,
+        )
+        # The difference to the current count goes into the movement ledger,
+        # which applies it to item_stocks
+        cursor.executemany(
+            f"""
+            INSERT INTO stock_movements (item_id, store_id, movement_type, quantity, movement_date)
+            SELECT :item_id, :store_id, 'import', :stock_quantity - {ON_HAND_SQL}, datetime('now', 'localtime')
+            WHERE :stock_quantity IS NOT {ON_HAND_SQL}
+            """,
+            stocked,
+        )
+        cursor.executemany(
+            """
+            INSERT INTO barcodes (id, code, created_at, updated_at)
+            VALUES (:barcode_id, :barcode, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+            """,
+            barcoded,
+        )
+        cursor.executemany(
+            """
+            INSERT INTO item_barcodes (item_id, barcode_id, created_at, updated_at)
+            VALUES (:item_id, :barcode_id, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+            """,
+            barcoded,
+        )
+        conn.commit()
+
+        summary["created"] += len(created)
+        summary["updated"] += len(updated)
+        if created:
+            change_bus.publish("items", [r["item_id"] for r in created], "insert")
+        if updated:
+            change_bus.publish("items", [r["item_id"] for r in updated], "update")
@@ -0,0 +1,141 @@
+import logging
+from PyQt5.QtWidgets import *
+from PyQt5.QtCore import *
+
+from Application.Components.Inventory.Items.model import ItemImportManager
+
+
+logger = logging.getLogger(__name__)
+
+
+class ItemImportWorker(QThread):
+    """Runs ItemImportManager.import_file off the GUI thread."""
+
+    progress = pyqtSignal(int, int)  # rows read, total rows (0 if unknown)
+    import_finished = pyqtSignal(dict)
+    import_failed = pyqtSignal(str)
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            summary = ItemImportManager().import_file(
+                self.path,
+                progress=lambda done, total: self.progress.emit(done, total or 0),
+                cancelled=lambda: self._cancelled,
+            )
+        except Exception as e:
+            logger.exception("Item import from %s failed: %s", self.path, e)
+            self.import_failed.emit(str(e))
+            return
+        self.import_finished.emit(summary)
+
+
+class ItemsView(QWidget):
+    def __init__(self):
+        super().__init__()
+        self.worker = None
+
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        header_layout = QHBoxLayout()
+        title_label = QLabel("Items")
+        title_label.setStyleSheet("font-size: 20px; font-weight: bold;")
+        header_layout.addWidget(title_label)
+        header_layout.addStretch(1)
+        self.import_button = QPushButton("Import CSV/XLSX")
+        header_layout.addWidget(self.import_button)
+        layout.addLayout(header_layout)
+
+        help_label = QLabel(
+            "Columns: name, barcode, unit, price, stock, category (name or id), "
+            "and optionally item_id. Existing items are matched by item_id or "
+            "barcode and updated; blank cells keep the current value."
+        )
+        help_label.setWordWrap(True)
+        help_label.setStyleSheet("color: #7f8c8d;")
+        layout.addWidget(help_label)
+
+        progress_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        progress_layout.addWidget(self.progress_bar, 1)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setVisible(False)
+        progress_layout.addWidget(self.cancel_button)
+        layout.addLayout(progress_layout)
+
+        self.status_label = QLabel("")
+        self.status_label.setWordWrap(True)
+        self.status_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        layout.addWidget(self.status_label)
+        layout.addStretch(1)
+
+        self.import_button.clicked.connect(self.choose_import_file)
+        self.cancel_button.clicked.connect(self.cancel_import)
+
+    def choose_import_file(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Import Items",
+            "",
+            "Catalog files (*.csv *.xlsx);;CSV files (*.csv);;Excel files (*.xlsx)",
+        )
+        if path:
+            self.start_import(path)
+
+    def start_import(self, path):
+        if self.worker is not None and self.worker.isRunning():
+            return
+        self.import_button.setEnabled(False)
+        self.progress_bar.setRange(0, 0)  # busy until the first chunk lands
+        self.progress_bar.setVisible(True)
+        self.cancel_button.setVisible(True)
+        self.cancel_button.setEnabled(True)
+        self.status_label.setText(f"Importing {path}...")
+
+        self.worker = ItemImportWorker(path, self)
+        self.worker.progress.connect(self.on_import_progress)
+        self.worker.import_finished.connect(self.on_import_finished)
+        self.worker.import_failed.connect(self.on_import_failed)
+        self.worker.start()
+
+    def cancel_import(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.cancel_button.setEnabled(False)
+            self.status_label.setText("Cancelling after the current batch...")
+
+    def on_import_progress(self, done, total):
+        if total:
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(min(done, total))
+        self.status_label.setText(f"Processed {done} of {total or '?'} rows...")
+
+    def on_import_finished(self, summary):
+        self._reset_controls()
+        message = (
+            f"{'Cancelled' if summary['cancelled'] else 'Finished'}: "
+            f"{summary['created']} items created, {summary['updated']} updated, "
+            f"{summary['rejected']} rejected in {summary['duration_s']} s."
+        )
+        if summary["rejects_path"]:
+            message += f"\nRejected rows were written to {summary['rejects_path']}"
+        self.status_label.setText(message)
+
+    def on_import_failed(self, error):
+        self._reset_controls()
+        self.status_label.setText(f"Import failed: {error}")
+        QMessageBox.critical(self, "Import Failed", error)
+
+    def _reset_controls(self):
+        self.import_button.setEnabled(True)
+        self.progress_bar.setVisible(False)
+        self.cancel_button.setVisible(False)
@@ -13,8 +13,10 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt
 
 from Application.Components.Inventory.Category.category import CategoriesView
+from Application.Components.Inventory.CostStock.view import CostStockView
 from Application.Components.Inventory.Expenses.view import ExpensesView
 from Application.Components.Inventory.ItemGroup.item_group import ItemGroupView
+from Application.Components.Inventory.Items.view import ItemsView
 from Application.Components.Inventory.ItemType.view import ItemTypeView
 from Application.Components.Inventory.Stores.store import StoresView
 from Application.Components.Inventory.Units.view import UnitView
@@ -29,22 +31,6 @@ class InventoryView(QWidget):
         self.setLayout(layout)
 
 
-class ItemsView(QWidget):
-    def __init__(self):
-        super().__init__()
-        layout = QVBoxLayout()
-        layout.addWidget(QLabel("This is the Items View"))
-        self.setLayout(layout)
-
-
-class CostStockView(QWidget):
-    def __init__(self):
-        super().__init__()
-        layout = QVBoxLayout()
-        layout.addWidget(QLabel("This is the Cost & Stock View"))
-        self.setLayout(layout)
-
-
 class MainInventoryWindow(QMainWindow):
     def __init__(self):
         super().__init__()
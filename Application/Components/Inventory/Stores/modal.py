@@ -3,10 +3,6 @@ import logging
 import sqlite3
 from Helper.db_conn import DatabaseManager
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
@@ -18,7 +14,7 @@ class StoreManager:
         """Get a new database connection."""
         # Use the lock directly from DatabaseManager to ensure thread safety
         with self.db_manager.lock:
-            conn = sqlite3.connect(self.db_manager.db_path, timeout=30)
+            conn = self.db_manager.connect()
         return conn
 
     def _commit_and_close(self, conn):
@@ -26,7 +22,7 @@ class StoreManager:
         try:
             conn.commit()
         except sqlite3.Error as e:
-            logger.error(f"Error committing changes: {str(e)}")
+            logger.error("Error committing changes: %s", e)
         finally:
             conn.close()
 
@@ -44,10 +40,10 @@ class StoreManager:
             if not users:
                 logger.warning("No users found in the database.")
             else:
-                logger.info(f"Successfully retrieved {len(users)} users.")
+                logger.info("Successfully retrieved %s users.", len(users))
             return users
         except sqlite3.Error as e:
-            logger.error(f"Failed to retrieve users: {str(e)}")
+            logger.error("Failed to retrieve users: %s", e)
             return []
         finally:
             self._commit_and_close(conn)
@@ -63,10 +59,10 @@ class StoreManager:
                 """,
                 (name, location, manager_id),
             )
-            logger.info(f"Store '{name}' saved successfully.")
+            logger.info("Store '%s' saved successfully.", name)
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error saving store '{name}': {str(e)}")
+            logger.error("Error saving store '%s': %s", name, e)
             return False
         finally:
             self._commit_and_close(conn)
@@ -92,10 +88,10 @@ class StoreManager:
                 }
                 for row in cursor.fetchall()
             ]
-            logger.info(f"Retrieved {len(stores)} stores.")
+            logger.info("Retrieved %s stores.", len(stores))
             return stores
         except sqlite3.Error as e:
-            logger.error(f"Error retrieving stores data: {str(e)}")
+            logger.error("Error retrieving stores data: %s", e)
             return []
         finally:
             self._commit_and_close(conn)
@@ -110,7 +106,7 @@ class StoreManager:
             )
             current = cursor.fetchone()
             if not current:
-                logger.warning(f"Store with ID {store_id} not found for update.")
+                logger.warning("Store with ID %s not found for update.", store_id)
                 raise Exception("Store not found")
             new_name = name if name is not None else current[0]
             new_location = location if location is not None else current[1]
@@ -123,10 +119,10 @@ class StoreManager:
                 """,
                 (new_name, new_location, new_manager_id, store_id),
             )
-            logger.info(f"Store with ID {store_id} updated successfully.")
+            logger.info("Store with ID %s updated successfully.", store_id)
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error updating store with ID {store_id}: {str(e)}")
+            logger.error("Error updating store with ID %s: %s", store_id, e)
             return False
         finally:
             self._commit_and_close(conn)
@@ -137,13 +133,13 @@ class StoreManager:
         try:
             cursor.execute("SELECT id FROM stores WHERE id = ?", (store_id,))
             if not cursor.fetchone():
-                logger.warning(f"Store with ID {store_id} not found for deletion.")
+                logger.warning("Store with ID %s not found for deletion.", store_id)
                 raise Exception("Store not found")
             cursor.execute("DELETE FROM stores WHERE id = ?", (store_id,))
-            logger.info(f"Store with ID {store_id} deleted successfully.")
+            logger.info("Store with ID %s deleted successfully.", store_id)
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error deleting store with ID {store_id}: {str(e)}")
+            logger.error("Error deleting store with ID %s: %s", store_id, e)
             return False
         finally:
             self._commit_and_close(conn)
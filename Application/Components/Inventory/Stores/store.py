@@ -19,10 +19,6 @@ from PyQt5.QtCore import Qt
 
 from Application.Components.Inventory.Stores.modal import StoreManager
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
@@ -3,10 +3,6 @@ import logging
 import sqlite3
 from Helper.db_conn import DatabaseManager
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 class UnitManager:
@@ -15,14 +11,14 @@ class UnitManager:
 
     def _get_connection(self):
         with self.db_manager.lock:
-            conn = sqlite3.connect(self.db_manager.db_path, timeout=30)
+            conn = self.db_manager.connect()
         return conn
 
     def _commit_and_close(self, conn):
         try:
             conn.commit()
         except sqlite3.Error as e:
-            logger.error(f"Error committing changes: {str(e)}")
+            logger.error("Error committing changes: %s", e)
         finally:
             conn.close()
 
@@ -34,7 +30,7 @@ class UnitManager:
             units = [{"id": row[0], "name": row[1], "created_at": row[2]} for row in cursor.fetchall()]
             return units
         except sqlite3.Error as e:
-            logger.error(f"Failed to retrieve units: {str(e)}")
+            logger.error("Failed to retrieve units: %s", e)
             return []
         finally:
             self._commit_and_close(conn)
@@ -50,10 +46,10 @@ class UnitManager:
                 """,
                 (name,),
             )
-            logger.info(f"Unit '{name}' saved successfully.")
+            logger.info("Unit '%s' saved successfully.", name)
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error saving unit '{name}': {str(e)}")
+            logger.error("Error saving unit '%s': %s", name, e)
             return False
         finally:
             self._commit_and_close(conn)
@@ -70,10 +66,10 @@ class UnitManager:
                 """,
                 (name, unit_id),
             )
-            logger.info(f"Unit with ID {unit_id} updated successfully.")
+            logger.info("Unit with ID %s updated successfully.", unit_id)
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error updating unit with ID {unit_id}: {str(e)}")
+            logger.error("Error updating unit with ID %s: %s", unit_id, e)
             return False
         finally:
             self._commit_and_close(conn)
@@ -83,10 +79,10 @@ class UnitManager:
         cursor = conn.cursor()
         try:
             cursor.execute("DELETE FROM units WHERE id = ?", (unit_id,))
-            logger.info(f"Unit with ID {unit_id} deleted successfully.")
+            logger.info("Unit with ID %s deleted successfully.", unit_id)
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error deleting unit with ID {unit_id}: {str(e)}")
+            logger.error("Error deleting unit with ID %s: %s", unit_id, e)
             return False
         finally:
             self._commit_and_close(conn)
\ No newline at end of file
@@ -6,9 +6,6 @@ from PyQt5.QtCore import *
 from Application.Components.Inventory.Units.model import UnitManager
 
 
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
@@ -1,10 +1,7 @@
+import json
 import logging
 from Helper.db_conn import DatabaseManager
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 class CartModel:
@@ -119,7 +116,7 @@ class CartModel:
                     )
 
                 conn.commit()
-                logger.debug(f"Cart created with ID: {cart_id}")
+                logger.debug("Cart created with ID: %s", cart_id)
                 return {
                     "success": True,
                     "message": "Cart created successfully",
@@ -129,18 +126,49 @@ class CartModel:
         except ValueError as e:
             if "conn" in locals():
                 conn.rollback()
-            logger.error(f"Validation error: {str(e)}")
+            logger.error("Validation error: %s", e)
             return {"success": False, "message": str(e)}
         except Exception as e:
             if "conn" in locals():
                 conn.rollback()
-            logger.error(f"Database error creating cart: {str(e)}")
+            logger.error("Database error creating cart: %s", e)
             return {"success": False, "message": f"Database error: {str(e)}"}
 
     # READ
+    # Header, lines and extra charges of a cart in one statement; the lines
+    # and charges come back as JSON arrays read through the cart_id indexes.
+    CART_QUERY = """
+        SELECT c.id, c.order_number, c.customer_type_id, c.customer_id,
+               c.total_amount, c.status, c.date,
+               (SELECT json_group_array(json_object(
+                        'item_id', ci.item_id, 'name', ci.name, 'unit', ci.unit,
+                        'quantity', ci.quantity, 'amount', ci.amount))
+                FROM (SELECT * FROM cart_items WHERE cart_id = c.id ORDER BY id) ci),
+               (SELECT json_group_array(json_object('name', ch.name, 'amount', ch.amount))
+                FROM (SELECT * FROM cart_extra_charges WHERE cart_id = c.id ORDER BY id) ch)
+        FROM carts c
+        """
+
+    @staticmethod
+    def _cart_from_row(row):
+        items = json.loads(row[7])
+        for item in items:
+            item["amount"] = float(item["amount"])
+        return {
+            "cart_id": row[0],
+            "order_number": row[1],
+            "customer_type_id": row[2],
+            "customer_id": row[3],
+            "total_amount": float(row[4]),
+            "status": row[5],
+            "date": row[6],
+            "items": items,
+            "extra_charges": json.loads(row[8]),
+        }
+
     def get_cart(self, cart_id):
         """
-        Retrieve a cart and its items by cart ID.
+        Retrieve a cart with its items and extra charges by cart ID.
 
         Args:
             cart_id (int): The ID of the cart to retrieve.
@@ -149,52 +177,49 @@ class CartModel:
             dict: Cart details including items, or None if not found.
         """
         try:
-            with self.db_manager.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    """
-                    SELECT order_number, customer_type_id, customer_id, total_amount, status, date
-                    FROM carts WHERE id = ?
-                    """,
-                    (cart_id,),
-                )
-                cart_row = cursor.fetchone()
-                if not cart_row:
-                    return None
+            with self.db_manager.read_connection() as conn:
+                # fetchall, not fetchone: it finishes the statement, which
+                # would otherwise keep a read lock on the shared connection
+                rows = conn.execute(
+                    self.CART_QUERY + " WHERE c.id = ?", (cart_id,)
+                ).fetchall()
+            if not rows:
+                return None
+            cart = self._cart_from_row(rows[0])
+            logger.debug("Retrieved cart: %s", cart)
+            return cart
 
-                cursor.execute(
-                    """
-                    SELECT item_id, name, unit, quantity, amount
-                    FROM cart_items WHERE cart_id = ?
-                    """,
-                    (cart_id,),
-                )
-                items = [
-                    {
-                        "item_id": row[0],
-                        "name": row[1],
-                        "unit": row[2],
-                        "quantity": row[3],
-                        "amount": float(row[4]),
-                    }
-                    for row in cursor.fetchall()
-                ]
+        except Exception as e:
+            logger.error("Database error retrieving cart %s: %s", cart_id, e)
+            return None
 
-                cart = {
-                    "cart_id": cart_id,
-                    "order_number": cart_row[0],
-                    "customer_type_id": cart_row[1],
-                    "customer_id": cart_row[2],
-                    "total_amount": float(cart_row[3]),
-                    "status": cart_row[4],
-                    "date": cart_row[5],
-                    "items": items,
-                }
-                logger.debug(f"Retrieved cart: {cart}")
-                return cart
+    def get_cart_by_order_number(self, order_number, status=None):
+        """
+        Retrieve a cart with its items and extra charges by order number.
+
+        Args:
+            order_number (str): Order number of the cart (unique, indexed).
+            status (str, optional): Only return the cart if it has this status.
+
+        Returns:
+            dict: Cart details as get_cart(), or None if not found.
+        """
+        query = self.CART_QUERY + " WHERE c.order_number = ?"
+        params = [order_number]
+        if status:
+            query += " AND c.status = ?"
+            params.append(status)
+        try:
+            with self.db_manager.read_connection() as conn:
+                rows = conn.execute(query, params).fetchall()
+            if not rows:
+                return None
+            cart = self._cart_from_row(rows[0])
+            logger.debug("Retrieved cart %s (ID: %s)", order_number, cart["cart_id"])
+            return cart
 
         except Exception as e:
-            logger.error(f"Database error retrieving cart {cart_id}: {str(e)}")
+            logger.error("Database error retrieving cart %s: %s", order_number, e)
             return None
 
     def get_carts_by_status(self, status=None, date=None):
@@ -222,11 +247,13 @@ class CartModel:
                     conditions.append("status = ?")
                     params.append(status)
                 if date:
-                    conditions.append("DATE(date) = ?")
-                    params.append(date)
+                    # A range on the raw column (not DATE(date)) uses idx_carts_date
+                    conditions.append("date >= ? AND date < date(?, '+1 day')")
+                    params += [date, date]
 
                 if conditions:
                     query += " WHERE " + " AND ".join(conditions)
+                query += " ORDER BY date, id"
 
                 cursor.execute(query, params)
                 rows = cursor.fetchall()
@@ -242,13 +269,36 @@ class CartModel:
                     }
                     for row in rows
                 ]
-                logger.debug(f"Retrieved {len(carts)} carts with status {status} and date {date}")
+                logger.debug("Retrieved %s carts with status %s and date %s", len(carts), status, date)
                 return carts
 
         except Exception as e:
-            logger.error(f"Database error retrieving carts: {str(e)}")
+            logger.error("Database error retrieving carts: %s", e)
             return []
 
+    def get_status_counts(self, date=None):
+        """
+        Count carts per status with a single GROUP BY.
+
+        Args:
+            date (str, optional): Only count carts of this 'yyyy-MM-dd' date.
+
+        Returns:
+            dict: {status: count} for the statuses present.
+        """
+        query = "SELECT status, COUNT(*) FROM carts"
+        params = []
+        if date:
+            query += " WHERE date >= ? AND date < date(?, '+1 day')"
+            params += [date, date]
+        query += " GROUP BY status"
+        try:
+            with self.db_manager.get_connection() as conn:
+                return dict(conn.execute(query, params).fetchall())
+        except Exception as e:
+            logger.error("Database error counting carts: %s", e)
+            return {}
+
     # UPDATE
     def update_cart(self, cart_id, cart_data):
         """
@@ -308,54 +358,154 @@ class CartModel:
                     query = f"UPDATE carts SET {', '.join(update_fields)} WHERE id = ?"
                     cursor.execute(query, params)
 
-                # Update cart items if provided
+                # Update cart items and extra charges if provided
                 if "items" in cart_data and cart_data["items"]:
-                    # Delete existing items
-                    cursor.execute("DELETE FROM cart_items WHERE cart_id = ?", (cart_id,))
-                    # Insert new items
-                    for item in cart_data["items"]:
-                        required_item_fields = ["item_id", "name", "unit", "quantity", "amount"]
-                        for field in required_item_fields:
-                            if field not in item or item[field] is None:
-                                raise ValueError(f"Missing or None required item field: {field}")
-
-                        cursor.execute(
-                            "SELECT id FROM items WHERE id = ?",
-                            (item["item_id"],),
-                        )
-                        if not cursor.fetchone():
-                            raise ValueError(f"Item ID {item['item_id']} does not exist")
-
-                        cursor.execute(
-                            """
-                            INSERT INTO cart_items (cart_id, item_id, name, unit, quantity, amount)
-                            VALUES (?, ?, ?, ?, ?, ?)
-                            """,
-                            (
-                                cart_id,
-                                item["item_id"],
-                                item["name"],
-                                item["unit"],
-                                int(item["quantity"]),
-                                float(item["amount"]),
-                            ),
-                        )
+                    self._save_items(cursor, cart_id, cart_data["items"])
+                if "extra_charges" in cart_data:
+                    self._save_extra_charges(cursor, cart_id, cart_data["extra_charges"] or [])
 
                 conn.commit()
-                logger.debug(f"Cart {cart_id} updated successfully")
+                logger.debug("Cart %s updated successfully", cart_id)
                 return {"success": True, "message": "Cart updated successfully"}
 
         except ValueError as e:
             if "conn" in locals():
                 conn.rollback()
-            logger.error(f"Validation error updating cart {cart_id}: {str(e)}")
+            logger.error("Validation error updating cart %s: %s", cart_id, e)
             return {"success": False, "message": str(e)}
         except Exception as e:
             if "conn" in locals():
                 conn.rollback()
-            logger.error(f"Database error updating cart {cart_id}: {str(e)}")
+            logger.error("Database error updating cart %s: %s", cart_id, e)
             return {"success": False, "message": f"Database error: {str(e)}"}
 
+    @staticmethod
+    def _diff_lines(existing, wanted, key):
+        """
+        Match wanted lines to stored ones by `key`, in order.
+
+        Args:
+            existing (list): Stored rows as (id, *values) tuples, ordered by id.
+            wanted (list): Tuples of values in the same column order.
+            key (callable): Key of a values tuple; lines with equal keys are
+                matched first to first, second to second.
+
+        Returns:
+            tuple: (inserts, updates, deletes) as lists of values tuples,
+            (id, values) pairs and ids.
+        """
+        stored = {}
+        for row in existing:
+            stored.setdefault(key(row[1:]), []).append(row)
+        inserts, updates = [], []
+        for values in wanted:
+            rows = stored.get(key(values))
+            if not rows:
+                inserts.append(values)
+                continue
+            row = rows.pop(0)
+            if tuple(row[1:]) != values:
+                updates.append((row[0], values))
+        deletes = [row[0] for rows in stored.values() for row in rows]
+        return inserts, updates, deletes
+
+    def _save_items(self, cursor, cart_id, items):
+        """Write only the lines of a cart that were added, changed or removed."""
+        wanted = []
+        for item in items:
+            required_item_fields = ["item_id", "name", "unit", "quantity", "amount"]
+            for field in required_item_fields:
+                if field not in item or item[field] is None:
+                    raise ValueError(f"Missing or None required item field: {field}")
+            wanted.append(
+                (
+                    int(item["item_id"]),
+                    item["name"],
+                    item["unit"],
+                    int(item["quantity"]),
+                    float(item["amount"]),
+                )
+            )
+
+        cursor.execute(
+            """
+            SELECT id, item_id, name, unit, quantity, amount
+            FROM cart_items WHERE cart_id = ? ORDER BY id
+            """,
+            (cart_id,),
+        )
+        inserts, updates, deletes = self._diff_lines(
+            cursor.fetchall(), wanted, key=lambda values: values[0]
+        )
+
+        # Only items new to the cart need checking
+        new_ids = {values[0] for values in inserts}
+        if new_ids:
+            marks = ", ".join("?" * len(new_ids))
+            cursor.execute(f"SELECT id FROM items WHERE id IN ({marks})", list(new_ids))
+            missing = new_ids - {row[0] for row in cursor.fetchall()}
+            if missing:
+                raise ValueError(f"Item ID {min(missing)} does not exist")
+
+        cursor.executemany(
+            "DELETE FROM cart_items WHERE id = ?", [(line_id,) for line_id in deletes]
+        )
+        cursor.executemany(
+            """
+            UPDATE cart_items
+            SET item_id = ?, name = ?, unit = ?, quantity = ?, amount = ?,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            [(*values, line_id) for line_id, values in updates],
+        )
+        cursor.executemany(
+            """
+            INSERT INTO cart_items (cart_id, item_id, name, unit, quantity, amount)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [(cart_id, *values) for values in inserts],
+        )
+        logger.debug(
+            "Cart %s lines: %s added, %s changed, %s removed",
+            cart_id,
+            len(inserts),
+            len(updates),
+            len(deletes),
+        )
+
+    def _save_extra_charges(self, cursor, cart_id, charges):
+        """Write only the extra charges of a cart that changed, matched by name."""
+        wanted = []
+        for charge in charges:
+            if not all(key in charge for key in ["name", "amount"]):
+                raise ValueError("Extra charges must have name and amount")
+            wanted.append((charge["name"], float(charge["amount"])))
+
+        cursor.execute(
+            "SELECT id, name, amount FROM cart_extra_charges WHERE cart_id = ? ORDER BY id",
+            (cart_id,),
+        )
+        inserts, updates, deletes = self._diff_lines(
+            cursor.fetchall(), wanted, key=lambda values: values[0]
+        )
+        cursor.executemany(
+            "DELETE FROM cart_extra_charges WHERE id = ?",
+            [(charge_id,) for charge_id in deletes],
+        )
+        cursor.executemany(
+            """
+            UPDATE cart_extra_charges
+            SET name = ?, amount = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            [(*values, charge_id) for charge_id, values in updates],
+        )
+        cursor.executemany(
+            "INSERT INTO cart_extra_charges (cart_id, name, amount) VALUES (?, ?, ?)",
+            [(cart_id, *values) for values in inserts],
+        )
+
     # DELETE
     def delete_cart(self, cart_id):
         """
@@ -377,22 +527,23 @@ class CartModel:
                 if not cursor.fetchone():
                     raise ValueError(f"Cart ID {cart_id} does not exist")
 
-                # Delete cart items
+                # Delete cart items and extra charges
                 cursor.execute("DELETE FROM cart_items WHERE cart_id = ?", (cart_id,))
+                cursor.execute("DELETE FROM cart_extra_charges WHERE cart_id = ?", (cart_id,))
                 # Delete cart
                 cursor.execute("DELETE FROM carts WHERE id = ?", (cart_id,))
 
                 conn.commit()
-                logger.debug(f"Cart {cart_id} deleted successfully")
+                logger.debug("Cart %s deleted successfully", cart_id)
                 return {"success": True, "message": "Cart deleted successfully"}
 
         except ValueError as e:
             if "conn" in locals():
                 conn.rollback()
-            logger.error(f"Validation error deleting cart {cart_id}: {str(e)}")
+            logger.error("Validation error deleting cart %s: %s", cart_id, e)
             return {"success": False, "message": str(e)}
         except Exception as e:
             if "conn" in locals():
                 conn.rollback()
-            logger.error(f"Database error deleting cart {cart_id}: {str(e)}")
+            logger.error("Database error deleting cart %s: %s", cart_id, e)
             return {"success": False, "message": f"Database error: {str(e)}"}
@@ -18,11 +18,6 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon, QPixmap
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - [%(funcName)s] %(message)s",
-)
 logger = logging.getLogger(__name__)
 
 
@@ -30,20 +25,20 @@ logger = logging.getLogger(__name__)
 def get_resource_path(relative_path):
     try:
         base_path = sys._MEIPASS
-        logger.debug(f"Running in PyInstaller bundle, base path: {base_path}")
+        logger.debug("Running in PyInstaller bundle, base path: %s", base_path)
     except AttributeError:
         base_path = os.path.abspath(os.path.dirname(__file__))
-        logger.debug(f"Running in dev mode, base path: {base_path}")
+        logger.debug("Running in dev mode, base path: %s", base_path)
     full_path = os.path.join(base_path, relative_path)
-    logger.debug(f"Resolved path: '{full_path}', Exists: {os.path.exists(full_path)}")
+    logger.debug("Resolved path: '%s', Exists: %s", full_path, os.path.exists(full_path))
     return full_path
 
 
 def load_icon(icon_path):
-    logger.debug(f"Attempting to load icon from: {icon_path}")
+    logger.debug("Attempting to load icon from: %s", icon_path)
     pixmap = QPixmap(icon_path)
     if pixmap.isNull():
-        logger.warning(f"Failed to load icon: {icon_path}")
+        logger.warning("Failed to load icon: %s", icon_path)
         return QIcon()
     return QIcon(pixmap)
 
@@ -66,7 +61,7 @@ class RecallView(QWidget):
         self.items = []  # List to hold current items
         self.total_amount = 0.0  # Track total amount for updates
 
-        logger.debug(f"Initializing RecallView for order_number: {order_number}")
+        logger.debug("Initializing RecallView for order_number: %s", order_number)
         self.init_ui()
         self.load_cart_details()
 
@@ -207,9 +202,8 @@ class RecallView(QWidget):
     def load_cart_details(self):
         """Load the cart details into the table."""
         try:
-            carts = self.cart_model.get_carts_by_status(status="in-cart")
-            cart = next(
-                (c for c in carts if c["order_number"] == self.order_number), None
+            cart = self.cart_model.get_cart_by_order_number(
+                self.order_number, status="in-cart"
             )
             if not cart:
                 raise ValueError(
@@ -218,18 +212,13 @@ class RecallView(QWidget):
 
             self.cart_id = cart["cart_id"]
             self.total_amount = cart["total_amount"]
-
-            cart_data = self.cart_model.get_cart(self.cart_id)
-            if not cart_data:
-                raise ValueError(f"Cart ID {self.cart_id} not found")
-
-            self.items = cart_data["items"]
+            self.items = cart["items"]
             logger.debug(
                 f"Loaded cart {self.order_number} (ID: {self.cart_id}) with items: {self.items}"
             )
             self.populate_table()
         except Exception as e:
-            logger.error(f"Error loading cart details for {self.order_number}: {e}")
+            logger.error("Error loading cart details for %s: %s", self.order_number, e)
             QMessageBox.critical(self, "Error", f"Failed to load cart details: {e}")
             self.close()
 
@@ -251,16 +240,16 @@ class RecallView(QWidget):
 
     def on_item_changed(self, row, column):
         """Handle changes in the table (e.g., quantity updates)."""
-        logger.debug(f"Cell changed at row {row}, column {column}")
+        logger.debug("Cell changed at row %s, column %s", row, column)
         if column == 3:  # Quantity column
             qty_item = self.items_table.item(row, 3)
             amount_item = self.items_table.item(row, 4)
             if not qty_item:
-                logger.warning(f"Row {row} has no quantity item.")
+                logger.warning("Row %s has no quantity item.", row)
                 return
 
             if not amount_item:
-                logger.warning(f"Row {row} has no amount item.")
+                logger.warning("Row %s has no amount item.", row)
                 return
 
             try:
@@ -268,19 +257,19 @@ class RecallView(QWidget):
                 amount = float(amount_item.text())
                 self.items[row]["quantity"] = qty
                 self.recalculate_total()
-                logger.debug(f"Updated item at row {row}: {self.items[row]}")
+                logger.debug("Updated item at row %s: %s", row, self.items[row])
             except ValueError as e:
-                logger.warning(f"Invalid input at row {row}, column {column}: {e}")
+                logger.warning("Invalid input at row %s, column %s: %s", row, column, e)
                 QMessageBox.warning(
                     self, "Invalid Input", "Please enter a valid integer for quantity."
                 )
             except Exception as e:
-                logger.error(f"Error processing item change at row {row}: {e}")
+                logger.error("Error processing item change at row %s: %s", row, e)
 
     def recalculate_total(self):
         """Recalculate the total_amount based on current items."""
         self.total_amount = sum(item["amount"] for item in self.items)
-        logger.debug(f"Recalculated total_amount: {self.total_amount}")
+        logger.debug("Recalculated total_amount: %s", self.total_amount)
 
     def add_item(self):
         """Add a new item to the cart."""
@@ -305,9 +294,9 @@ class RecallView(QWidget):
             self.recalculate_total()
             self.populate_table()
             self.clear_inputs()
-            logger.debug(f"Added new item: {new_item}")
+            logger.debug("Added new item: %s", new_item)
         except ValueError as e:
-            logger.warning(f"Error adding item: {e}")
+            logger.warning("Error adding item: %s", e)
             QMessageBox.warning(self, "Invalid Input", f"Failed to add item: {e}")
 
     def clear_inputs(self):
@@ -335,7 +324,7 @@ class RecallView(QWidget):
             else:
                 raise Exception(result["message"])
         except Exception as e:
-            logger.error(f"Error saving cart changes: {e}")
+            logger.error("Error saving cart changes: %s", e)
             QMessageBox.critical(self, "Error", f"Failed to save changes: {e}")
 
     def settle_now(self):
@@ -352,7 +341,7 @@ class RecallView(QWidget):
         try:
             result = self.cart_model.update_cart(self.cart_id, cart_data)
             if result["success"]:
-                logger.info(f"Cart {self.order_number} saved and marked as settled")
+                logger.info("Cart %s saved and marked as settled", self.order_number)
                 QMessageBox.information(
                     self, "Success", "Cart saved and settlement initiated."
                 )
@@ -362,7 +351,7 @@ class RecallView(QWidget):
             else:
                 raise Exception(result["message"])
         except Exception as e:
-            logger.error(f"Error during settle now: {e}")
+            logger.error("Error during settle now: %s", e)
             QMessageBox.critical(self, "Error", f"Failed to settle cart: {e}")
 
 
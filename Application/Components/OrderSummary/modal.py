@@ -1,10 +1,6 @@
 import logging
 from Helper.db_conn import DatabaseManager
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 class OrderSummaryModel:
@@ -18,58 +14,76 @@ class OrderSummaryModel:
         Fetch orders from the database based on status and/or date.
 
         Args:
-            status (str, optional): Filter orders by status ('completed', 'settled', 'voided', 'in-cart').
+            status (str or tuple, optional): Status, or statuses, to include
+                ('completed', 'settled', 'voided').
             date (str, optional): Filter orders by date in 'yyyy-MM-dd' format.
 
         Returns:
             list: List of order dictionaries with order details.
         """
-        logger.debug(f"Fetching orders with status: {status}, date: {date}")
+        logger.debug("Fetching orders with status: %s, date: %s", status, date)
         try:
             with self.db_manager.get_connection() as conn:
                 cursor = conn.cursor()
-                # Base query for orders
                 query = """
                 SELECT order_number, date, receipt_number, status, total_amount
                 FROM orders
                 WHERE is_active = 1
                 """
                 params = []
-                
-                # Apply date filter if provided
+
+                # A range on the raw column (not DATE(date)) uses idx_orders_date
                 if date:
-                    query += " AND DATE(date) = ?"
-                    params.append(date)
-                    logger.debug(f"Added date filter: {date}")
-                
-                # Apply status filter if provided
+                    query += " AND date >= ? AND date < date(?, '+1 day')"
+                    params += [date, date]
+
                 if status:
-                    query += " AND status = ?"
-                    params.append(status)
-                    logger.debug(f"Added status filter: {status}")
-                
-                logger.debug(f"Executing query: {query} with params: {params}")
+                    statuses = (status,) if isinstance(status, str) else tuple(status)
+                    query += f" AND status IN ({', '.join('?' * len(statuses))})"
+                    params += statuses
+
+                query += " ORDER BY date, id"
                 cursor.execute(query, params)
                 rows = cursor.fetchall()
-                logger.debug(f"Retrieved {len(rows)} rows from database")
-                
-                # Process rows into a list of dictionaries
-                orders = []
-                for row in rows:
-                    logger.debug(f"Raw row data: {row}")
-                    orders.append({
+                logger.debug("Retrieved %s rows from database", len(rows))
+
+                return [
+                    {
                         "order_no": row[0],
                         "time": row[1],
                         "receipt_no": row[2],
                         "status": row[3],
                         "total_amount": float(row[4]) if row[4] else 0.0,
-                    })
-                logger.debug(f"Processed orders: {orders}")
-                return orders
+                    }
+                    for row in rows
+                ]
         except Exception as e:
-            logger.error(f"Database error getting orders: {e}")
+            logger.error("Database error getting orders: %s", e)
             return []
 
+    def get_status_counts(self, date=None):
+        """
+        Count orders per status with a single GROUP BY.
+
+        Args:
+            date (str, optional): Only count orders of this 'yyyy-MM-dd' date.
+
+        Returns:
+            dict: {status: count} for the statuses present.
+        """
+        query = "SELECT status, COUNT(*) FROM orders WHERE is_active = 1"
+        params = []
+        if date:
+            query += " AND date >= ? AND date < date(?, '+1 day')"
+            params += [date, date]
+        query += " GROUP BY status"
+        try:
+            with self.db_manager.get_connection() as conn:
+                return dict(conn.execute(query, params).fetchall())
+        except Exception as e:
+            logger.error("Database error counting orders: %s", e)
+            return {}
+
     def get_order_details(self, order_id):
         """
         Fetch detailed information for a specific order.
@@ -137,7 +151,61 @@ class OrderSummaryModel:
                     "items": items,
                 }
         except Exception as e:
-            logger.error(f"Database error getting order details for order_id {order_id}: {e}")
+            logger.error("Database error getting order details for order_id %s: %s", order_id, e)
+            return None
+
+    def get_receipt_data(self, order_number):
+        """
+        Fetch what is needed to print the receipt of an order again.
+
+        Args:
+            order_number (str): The order number shown in the summary.
+
+        Returns:
+            tuple: (order_data, items, payment_method) or None if not found.
+        """
+        try:
+            with self.db_manager.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT o.id, o.order_number, o.receipt_number, o.date, o.total_amount,
+                           o.tip, o.discount, o.ground_total,
+                           (SELECT p.payment_method
+                            FROM order_payments op JOIN payments p ON p.id = op.payment_id
+                            WHERE op.order_id = o.id ORDER BY op.id LIMIT 1)
+                    FROM orders o WHERE o.order_number = ?
+                    """,
+                    (order_number,),
+                )
+                row = cursor.fetchone()
+                if not row:
+                    return None
+                cursor.execute(
+                    """
+                    SELECT oi.item_id, i.name, oi.quantity, oi.price
+                    FROM order_items oi LEFT JOIN items i ON i.id = oi.item_id
+                    WHERE oi.order_id = ?
+                    ORDER BY oi.id
+                    """,
+                    (row[0],),
+                )
+                items = [
+                    {"item_id": r[0], "name": r[1], "quantity": r[2], "price": r[3]}
+                    for r in cursor.fetchall()
+                ]
+                order_data = {
+                    "order_number": row[1],
+                    "receipt_number": row[2],
+                    "date": row[3],
+                    "total_amount": row[4],
+                    "tip": row[5],
+                    "discount": row[6],
+                    "ground_total": row[7],
+                }
+                return order_data, items, row[8] or ""
+        except Exception as e:
+            logger.error("Database error getting receipt for order %s: %s", order_number, e)
             return None
 
     def get_order_counts(self):
@@ -174,7 +242,7 @@ class OrderSummaryModel:
                         counts["in_cart"] = count
                 return counts
         except Exception as e:
-            logger.error(f"Database error getting order counts: {e}")
+            logger.error("Database error getting order counts: %s", e)
             return {
                 "completed": 0,
                 "in_cart": 0,
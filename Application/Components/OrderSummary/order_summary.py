@@ -17,10 +17,14 @@ from PyQt5.QtWidgets import (
     QSizePolicy,
     QMessageBox,
 )
-from PyQt5.QtCore import QDate, Qt, QTimer
+from PyQt5.QtCore import QDate, Qt
 from PyQt5.QtGui import QIcon, QPixmap
 
 from Application.Components.OrderSummary.Recall.view import RecallView
+from Helper.db_conn import db
+from Helper.print_devices import print_router
+from Helper.receipts import build_receipt
+from Helper.scheduler import scheduler
 
 
 # --- Mock Models for Standalone Running (Replace with your actual imports) ---
@@ -78,6 +82,12 @@ class MockCartModel:
         )
         return filtered_data
 
+    def get_status_counts(self, date=None):
+        counts = {}
+        for cart in self.get_carts_by_status(date=date):
+            counts[cart["status"]] = counts.get(cart["status"], 0) + 1
+        return counts
+
 
 class MockOrderSummaryModel:
     def get_orders_by_status(self, status=None, date=None):
@@ -131,6 +141,14 @@ class MockOrderSummaryModel:
         )
         return filtered_data
 
+    def get_status_counts(self, date=None):
+        counts = {}
+        for status in ("completed", "voided"):
+            for order in self.get_orders_by_status(status, date):
+                if order["status"] == status:
+                    counts[status] = counts.get(status, 0) + 1
+        return counts
+
 
 # Use mocks if original imports fail (e.g., running standalone)
 try:
@@ -145,23 +163,18 @@ except ImportError:
 # --- End of Mock Models ---
 
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - [%(funcName)s] %(message)s",  # Added funcName
-)
 logger = logging.getLogger(__name__)
 
 
 def load_icon(icon_path):
     """Loads an icon from the given path."""
-    logger.debug(f"Attempting to load icon from: {icon_path}")
+    logger.debug("Attempting to load icon from: %s", icon_path)
     pixmap = QPixmap(icon_path)
     if pixmap.isNull():
-        logger.warning(f"Failed to load icon: {icon_path}. Pixmap is null.")
+        logger.warning("Failed to load icon: %s. Pixmap is null.", icon_path)
         # Return an empty icon or handle the error as appropriate
         return QIcon()
-    logger.debug(f"Icon loaded successfully: {icon_path}")
+    logger.debug("Icon loaded successfully: %s", icon_path)
     return QIcon(pixmap)
 
 
@@ -170,20 +183,20 @@ def get_resource_path(relative_path):
     try:
         # PyInstaller creates a temp folder and stores path in _MEIPASS
         base_path = sys._MEIPASS
-        logger.debug(f"Running in PyInstaller bundle, base path: {base_path}")
+        logger.debug("Running in PyInstaller bundle, base path: %s", base_path)
     except AttributeError:
         # Not running in a bundle, use the script's directory
         base_path = os.path.abspath(
             os.path.dirname(__file__)
         )  # More robust for finding relative paths
-        logger.debug(f"Running in dev mode, base path: {base_path}")
+        logger.debug("Running in dev mode, base path: %s", base_path)
 
     full_path = os.path.join(base_path, relative_path)
     logger.debug(
         f"Resolved path for '{relative_path}': '{full_path}', Exists: {os.path.exists(full_path)}"
     )
     if not os.path.exists(full_path):
-        logger.error(f"Resource path does not exist: {full_path}")
+        logger.error("Resource path does not exist: %s", full_path)
         # Fallback or error handling might be needed here depending on the resource
         # For icons, load_icon handles the null pixmap.
     return full_path
@@ -210,7 +223,9 @@ class OrderSummaryView(QWidget):
         self.settle_btn = None
         self.void_btn = None
         self.reprint_btn = None
-        self.timer = None  # Initialize timer attribute
+        self.refresh_interval = 2 * 60  # seconds between auto-refreshes
+        # (source, order number) -> order number cell of each table row
+        self._row_cells = {}
 
         logger.debug("OrderSummaryView initializing...")
         self.init_ui()
@@ -221,17 +236,17 @@ class OrderSummaryView(QWidget):
         logger.debug("OrderSummaryView initialization complete.")
 
     def start_auto_refresh(self):
-        """Starts the auto-refresh timer."""
-        if self.timer is None:
-            self.timer = QTimer(self)  # Parent it to self
-            self.timer.timeout.connect(self.auto_refresh_orders)
-            self.refresh_interval = 2 * 60 * 1000  # 2 minutes in milliseconds
-            self.timer.start(self.refresh_interval)
-            logger.debug(
-                f"Auto-refresh timer started with interval: {self.refresh_interval} ms"
-            )
-        else:
-            logger.debug("Auto-refresh timer already running.")
+        """Registers the auto-refresh as a heavy job with the shared scheduler."""
+        scheduler.register(
+            "order_summary_refresh",
+            self.auto_refresh_orders,
+            self.refresh_interval,
+            heavy=True,
+            max_defer=10 * 60,
+        )
+        logger.debug(
+            "Auto-refresh scheduled with interval: %s s", self.refresh_interval
+        )
 
     def auto_refresh_orders(self):
         """Automatically reloads data based on the current filter and date."""
@@ -334,7 +349,7 @@ class OrderSummaryView(QWidget):
         )
         self.search_bar.setFixedWidth(220)
         self.search_bar.setFixedHeight(35)
-        # self.search_bar.textChanged.connect(self.filter_table_by_search) # Add search functionality later if needed
+        self.search_bar.returnPressed.connect(self.search_orders)
         filter_layout.addWidget(self.search_bar)
 
         main_layout.addWidget(filter_widget)
@@ -476,7 +491,7 @@ class OrderSummaryView(QWidget):
         if use_filter:
             qdate = self.date_picker.date()
             date = qdate.toString("yyyy-MM-dd")  # Match database date format
-            logger.debug(f"Using date filter: {date}")
+            logger.debug("Using date filter: %s", date)
         else:
             logger.debug("Not using date filter (showing all dates).")
 
@@ -485,13 +500,11 @@ class OrderSummaryView(QWidget):
             # Determine data source based on filter
             if self.current_filter == "completed":
                 # 'completed' view now shows both 'completed' and 'voided' from Orders table
-                completed_orders = self.order_model.get_orders_by_status(
-                    "completed", date
+                data = self.order_model.get_orders_by_status(
+                    ("completed", "voided"), date
                 )
-                voided_orders = self.order_model.get_orders_by_status("voided", date)
-                data = completed_orders + voided_orders
                 logger.debug(
-                    f"Fetched {len(completed_orders)} completed and {len(voided_orders)} voided orders for date {date}."
+                    f"Fetched {len(data)} completed and voided orders for date {date}."
                 )
             elif self.current_filter in ["in-cart", "settled"]:
                 # 'in-cart', 'settled' come from Carts table
@@ -509,7 +522,7 @@ class OrderSummaryView(QWidget):
                 )
 
             else:
-                logger.warning(f"Unknown filter '{self.current_filter}' requested.")
+                logger.warning("Unknown filter '%s' requested.", self.current_filter)
 
             self.set_orders(data)
             self.update_button_counts()  # Update counts after loading data
@@ -520,9 +533,30 @@ class OrderSummaryView(QWidget):
             logger.error(f"Error loading data: {e}", exc_info=True)
             QMessageBox.critical(self, "Error", f"Failed to load data: {e}")
 
+    def search_orders(self):
+        """Show orders of any date whose order or receipt number starts with the search text."""
+        text = self.search_bar.text().strip()
+        if not text:
+            self.load_orders(use_filter=True)
+            return
+        results = db.search_orders(number=text, limit=200)
+        logger.debug("Search for %r found %s orders.", text, len(results))
+        self.set_orders(
+            [
+                {
+                    "order_no": order["order_number"],
+                    "time": order["date"],
+                    "receipt_no": order["receipt_number"],
+                    "status": order["status"],
+                    "total_amount": order["total_amount"],
+                }
+                for order in results
+            ]
+        )
+
     def filter_orders(self, status):
         """Handle filter button clicks and update display."""
-        logger.debug(f"Filter button clicked. Changing filter to: {status}")
+        logger.debug("Filter button clicked. Changing filter to: %s", status)
         self.current_filter = status
         self._update_filter_button_styles()  # Update style immediately for responsiveness
         self.load_orders(use_filter=True)  # Reload data with the new filter
@@ -568,36 +602,21 @@ class OrderSummaryView(QWidget):
         """Update the counts displayed on filter buttons for the selected date."""
         qdate = self.date_picker.date()
         date = qdate.toString("yyyy-MM-dd")
-        logger.debug(f"Updating button counts for date: {date}")
+        logger.debug("Updating button counts for date: %s", date)
 
         try:
-            # Get all relevant data for the date to count statuses
-            all_carts_today = self.cart_model.get_carts_by_status(date=date)
-            all_orders_today = self.order_model.get_orders_by_status(
-                date=date
-            )  # Get all orders, filter locally
-
-            cart_counts = {"in-cart": 0, "settled": 0, "voided": 0}
-            for cart in all_carts_today:
-                status = cart.get("status")
-                if status in cart_counts:
-                    cart_counts[status] += 1
-
-            order_counts = {"completed": 0, "voided": 0}
-            for order in all_orders_today:
-                status = order.get("status")
-                if status == "completed":
-                    order_counts["completed"] += 1
-                elif status == "voided":
-                    order_counts["voided"] += 1
+            # One GROUP BY per table instead of loading the day's rows
+            cart_counts = self.cart_model.get_status_counts(date)
+            order_counts = self.order_model.get_status_counts(date)
 
             # The 'Completed' button shows count of 'completed' AND 'voided' orders.
             # The 'Voided' button shows count of 'voided' carts. (Adjust if needed)
             counts = {
-                "completed": order_counts["completed"] + order_counts["voided"],
-                "in-cart": cart_counts["in-cart"],
-                "settled": cart_counts["settled"],
-                "voided": cart_counts["voided"],  # Count from carts
+                "completed": order_counts.get("completed", 0)
+                + order_counts.get("voided", 0),
+                "in-cart": cart_counts.get("in-cart", 0),
+                "settled": cart_counts.get("settled", 0),
+                "voided": cart_counts.get("voided", 0),  # Count from carts
             }
 
             for filter_name, btn in self.filter_buttons.items():
@@ -605,7 +624,7 @@ class OrderSummaryView(QWidget):
                     title = filter_name.replace("-", " ").title()
                     count = counts.get(filter_name, 0)
                     btn.setText(f"{title} ({count})")
-            logger.debug(f"Button counts updated: {counts}")
+            logger.debug("Button counts updated: %s", counts)
 
         except Exception as e:
             logger.error(f"Error updating button counts: {e}", exc_info=True)
@@ -671,7 +690,7 @@ class OrderSummaryView(QWidget):
     def get_selected_rows(self):
         """Get the indices and data identifiers of rows with selected checkboxes."""
         selected_items = []  # Store tuples of (row_index, order_number, source)
-        logger.debug(f"Checking {self.table.rowCount()} rows for selection.")
+        logger.debug("Checking %s rows for selection.", self.table.rowCount())
         for row in range(self.table.rowCount()):
             checkbox_widget = self.table.cellWidget(row, 0)
             order_num_item = self.table.item(row, 1)  # Get order number item
@@ -710,12 +729,12 @@ class OrderSummaryView(QWidget):
                 f"Row {row}: Checkbox found. Order='{order_number}', Source='{source}', isChecked={checkbox.isChecked()}"
             )
             if checkbox.isChecked():
-                logger.debug(f"Row {row} added to selected items.")
+                logger.debug("Row %s added to selected items.", row)
                 selected_items.append(
                     {"index": row, "order_number": order_number, "source": source}
                 )
 
-        logger.debug(f"Selected items identified: {selected_items}")
+        logger.debug("Selected items identified: %s", selected_items)
         return selected_items
 
     def on_recall_clicked(self):
@@ -745,7 +764,7 @@ class OrderSummaryView(QWidget):
         source = item["source"]
 
         if source == "Carts" and self.current_filter == "in-cart":
-            logger.info(f"Opening RecallView for cart: {order_number}")
+            logger.info("Opening RecallView for cart: %s", order_number)
             try:
                 recall_view = RecallView(self.main_window, order_number)
                 recall_view.show()
@@ -786,7 +805,7 @@ class OrderSummaryView(QWidget):
             source = item["source"]
             # Ensure settle only applies to items from 'Carts' with 'in-cart' status
             if source == "Carts" and self.current_filter == "in-cart":
-                logger.info(f"Attempting settlement for cart: {order_number}")
+                logger.info("Attempting settlement for cart: %s", order_number)
                 try:
                     # --- Add your actual settle logic here ---
                     # This might involve:
@@ -853,7 +872,7 @@ class OrderSummaryView(QWidget):
         for item in selected_items:
             order_number = item["order_number"]
             source = item["source"]  # 'Carts' or 'Orders'
-            logger.info(f"Attempting to void item: {order_number} (Source: {source})")
+            logger.info("Attempting to void item: %s (Source: %s)", order_number, source)
 
             try:
                 # --- Add your actual void logic here ---
@@ -865,11 +884,9 @@ class OrderSummaryView(QWidget):
                     )
                     voided_count += 1
                 elif source == "Orders":
-                    # Voiding an item from the Orders table (e.g., 'completed')
-                    # Example: self.order_model.update_order_status(order_number, 'voided')
-                    logger.info(
-                        f"Placeholder: Void logic executed for order {order_number}"
-                    )
+                    # Voiding a completed order returns its items to stock
+                    if not db.void_order(order_number):
+                        raise ValueError("only completed orders can be voided")
                     voided_count += 1
                 else:
                     logger.warning(
@@ -911,16 +928,23 @@ class OrderSummaryView(QWidget):
             # Ensure reprint only applies to items from 'Orders' (completed or already voided)
             # Or potentially 'Settled' carts if they generate a receipt immediately. Adjust logic as needed.
             if source == "Orders":
-                logger.info(f"Attempting reprint for order: {order_number}")
+                logger.info("Attempting reprint for order: %s", order_number)
                 try:
-                    # --- Add your actual reprint logic here ---
-                    # Example: receipt_data = self.order_model.get_receipt_details(order_number)
-                    # Example: self.printer_service.print_receipt(receipt_data)
-                    logger.info(
-                        f"Placeholder: Reprint logic executed for order {order_number}"
+                    receipt_data = self.order_model.get_receipt_data(order_number)
+                    if receipt_data is None:
+                        raise ValueError("order not found")
+                    order_data, items, payment_method = receipt_data
+                    company_details = db.get_company_details()
+                    receipt = build_receipt(
+                        order_data,
+                        items,
+                        payment_method,
+                        company_details[0] if company_details else None,
+                        copy=True,
                     )
+                    job_id = print_router.submit("reprint", receipt)
+                    logger.info("Queued reprint of %s as print job %s", order_number, job_id)
                     reprinted_count += 1
-                    # ------------------------------------------
                 except Exception as e:
                     logger.error(
                         f"Error reprinting receipt for order {order_number}: {e}",
@@ -938,69 +962,105 @@ class OrderSummaryView(QWidget):
 
         if reprinted_count > 0:
             # No message needed usually, the print job is the confirmation.
-            logger.info(f"Processed reprint request for {reprinted_count} item(s).")
+            logger.info("Processed reprint request for %s item(s).", reprinted_count)
             # No need to refresh list for reprint typically
 
-    def set_orders(self, data):
-        """Populate the table with comprehensive data from either carts or orders."""
-        logger.debug(f"Populating table with {len(data)} items.")
-        self.table.setSortingEnabled(False)  # Disable sorting during population
-        self.table.setRowCount(0)  # Clear existing rows
-
-        for item in data:
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            # logger.debug(f"Adding row {row} with item: {item}") # Can be verbose
-
-            # Checkbox
-            checkbox = QCheckBox()
-            checkbox_widget = QWidget()
-            checkbox_layout = QHBoxLayout(checkbox_widget)
-            checkbox_layout.addWidget(checkbox)
-            checkbox_layout.setAlignment(Qt.AlignCenter)
-            checkbox_layout.setContentsMargins(0, 0, 0, 0)
-            self.table.setCellWidget(row, 0, checkbox_widget)
-
-            # Extract data safely using .get()
-            is_order = (
-                "receipt_no" in item
-            )  # Heuristic to determine source if not explicit
-            order_number = item.get("order_number") or item.get("order_no", "N/A")
-            date_time = item.get("date") or item.get("time", "N/A")
-            customer_id = str(item.get("customer_id", "N/A"))
-            receipt_no = item.get("receipt_no", "N/A")  # Will be N/A for carts
-            status = item.get("status", "Unknown")
-            total_amount = item.get("total_amount", 0.0)
-            source = "Orders" if is_order else "Carts"
-
-            # Ensure amount is float for formatting
-            try:
-                total_amount_float = float(total_amount)
-            except (ValueError, TypeError):
-                total_amount_float = 0.0
-                logger.warning(
-                    f"Could not convert total_amount '{total_amount}' to float for order {order_number}"
-                )
+    def _row_values(self, item):
+        """(key, texts of columns 1-7) of a cart or order for the table."""
+        is_order = "receipt_no" in item  # Heuristic to determine source if not explicit
+        order_number = item.get("order_number") or item.get("order_no", "N/A")
+        date_time = item.get("date") or item.get("time", "N/A")
+        customer_id = str(item.get("customer_id", "N/A"))
+        receipt_no = item.get("receipt_no", "N/A")  # Will be N/A for carts
+        status = item.get("status", "Unknown")
+        total_amount = item.get("total_amount", 0.0)
+        source = "Orders" if is_order else "Carts"
+
+        # Ensure amount is float for formatting
+        try:
+            total_amount_float = float(total_amount)
+        except (ValueError, TypeError):
+            total_amount_float = 0.0
+            logger.warning(
+                f"Could not convert total_amount '{total_amount}' to float for order {order_number}"
+            )
+        values = [
+            str(order_number),
+            str(date_time),
+            customer_id,
+            str(receipt_no),
+            status.title(),  # Capitalize status
+            f"{total_amount_float:.2f}",
+            source,
+        ]
+        return (source, str(order_number)), values
+
+    def _fill_row(self, row, values):
+        checkbox = QCheckBox()
+        checkbox_widget = QWidget()
+        checkbox_layout = QHBoxLayout(checkbox_widget)
+        checkbox_layout.addWidget(checkbox)
+        checkbox_layout.setAlignment(Qt.AlignCenter)
+        checkbox_layout.setContentsMargins(0, 0, 0, 0)
+        self.table.setCellWidget(row, 0, checkbox_widget)
+
+        for column, text in enumerate(values, start=1):
+            cell = QTableWidgetItem(text)
+            if column == 6:
+                cell.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            self.table.setItem(row, column, cell)
+        # The order number cell identifies the row, wherever sorting moves it
+        return self.table.item(row, 1)
 
-            # Populate cells
-            self.table.setItem(row, 1, QTableWidgetItem(str(order_number)))
-            self.table.setItem(row, 2, QTableWidgetItem(str(date_time)))
-            self.table.setItem(row, 3, QTableWidgetItem(customer_id))
-            self.table.setItem(row, 4, QTableWidgetItem(receipt_no))
-            self.table.setItem(
-                row, 5, QTableWidgetItem(status.title())
-            )  # Capitalize status
-            # Format amount as currency (adjust locale/format as needed)
-            amount_item = QTableWidgetItem(f"{total_amount_float:.2f}")
-            amount_item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
-            self.table.setItem(row, 6, amount_item)
-            self.table.setItem(row, 7, QTableWidgetItem(source))
-
-        self.table.setSortingEnabled(True)  # Re-enable sorting
-        # self.table.resizeColumnsToContents() # Resize columns after populating
-        logger.debug(f"Table update complete. Row count: {self.table.rowCount()}")
-        # self.table.viewport().update() # Usually not necessary
-        # if self.main_window: self.main_window.repaint() # Repainting parent might not be needed
+    def set_orders(self, data):
+        """Show carts or orders, changing only the rows that differ.
+
+        Rows are keyed by source and order number. Rows still present keep
+        their cells and checkbox, so selection survives a refresh, and the
+        scroll position is kept; only new, changed and vanished rows are
+        touched.
+        """
+        logger.debug("Populating table with %s items.", len(data))
+        rows = dict(self._row_values(item) for item in data)
+        scroll = self.table.verticalScrollBar().value()
+        self.table.setSortingEnabled(False)  # Rows must not move while patching
+        self.table.setUpdatesEnabled(False)
+        try:
+            if rows.keys().isdisjoint(self._row_cells):
+                # Another day or filter: nothing to keep
+                self.table.setRowCount(0)
+                self._row_cells = {}
+            removed = [key for key in self._row_cells if key not in rows]
+            for key in removed:
+                self.table.removeRow(self._row_cells.pop(key).row())
+
+            updated = 0
+            added = [key for key in rows if key not in self._row_cells]
+            for key, cell in self._row_cells.items():
+                row = cell.row()
+                changed = False
+                for column, text in enumerate(rows[key], start=1):
+                    current = self.table.item(row, column)
+                    if current.text() != text:
+                        current.setText(text)
+                        changed = True
+                updated += changed
+
+            first = self.table.rowCount()
+            self.table.setRowCount(first + len(added))
+            for row, key in enumerate(added, start=first):
+                self._row_cells[key] = self._fill_row(row, rows[key])
+        finally:
+            self.table.setSortingEnabled(True)  # Re-enable sorting
+            self.table.setUpdatesEnabled(True)
+        self.table.verticalScrollBar().setValue(scroll)
+        logger.debug(
+            "Table updated: %s added, %s changed, %s removed, %s rows.",
+            len(added),
+            updated,
+            len(removed),
+            self.table.rowCount(),
+        )
 
     def go_back(self):
         """Switch back to the dashboard view (if applicable)."""
@@ -1014,11 +1074,10 @@ class OrderSummaryView(QWidget):
             )
 
     def closeEvent(self, event):
-        """Ensure timer stops when the widget is closed."""
+        """Ensure the auto-refresh job stops when the widget is closed."""
         logger.debug("Close event triggered for OrderSummaryView.")
-        if self.timer and self.timer.isActive():
-            self.timer.stop()
-            logger.info("Auto-refresh timer stopped.")
+        scheduler.unregister("order_summary_refresh")
+        logger.info("Auto-refresh job removed.")
         super().closeEvent(event)
 
 
@@ -16,11 +16,22 @@ from PyQt5.QtWidgets import (
     QFileDialog,
     QMessageBox,
     QComboBox,
+    QProgressBar,
+    QInputDialog,
 )
 from PyQt5.QtCore import QDate, Qt, QModelIndex
 from PyQt5.QtGui import QStandardItemModel, QStandardItem
 import csv
-
+from datetime import date
+
+from Application.Components.Reports.cube_view import SalesAnalysisView
+from Application.Components.Reports.engine import ReportEngine
+from Helper.export import DataExporter
+from Application.Components.Reports.item_sales_view import (
+    StockReportView,
+    TopSellingItemsView,
+)
+from Application.Components.Reports.latency_view import CheckoutLatencyView
 from Application.Components.Reports.modal import ReportManager
 
 try:
@@ -42,6 +53,129 @@ else:
     REPORTLAB_INSTALLED = True
 
 
+SALES_SUMMARY_HEADERS = [
+    "Date",
+    "Sub Total",
+    "Tax Total",
+    "Discount",
+    "Others",
+    "Tip",
+    "Final Total",
+    "Payment Total",
+    "Amount Due",
+]
+SALES_SUMMARY_FIELDS = [
+    "sub_total",
+    "tax_total",
+    "discount",
+    "others",
+    "tip",
+    "ground_total",
+    "payment_total",
+    "amount_due",
+]
+
+
+def run_sales_summary(job, report_manager, start_date, end_date, store_id):
+    """Report job: streams the daily summary, with progress measured in days."""
+    first_day = date.fromisoformat(start_date)
+    total_days = max((date.fromisoformat(end_date) - first_day).days + 1, 1)
+    for chunk in report_manager.iter_sales_summary(
+        start_date, end_date, store_id, cancelled=job.is_cancelled
+    ):
+        job.emit_chunk(chunk)
+        done = (date.fromisoformat(chunk[-1]["date"]) - first_day).days + 1
+        job.report_progress(done, total_days)
+    job.report_progress(total_days, total_days)
+
+
+# Label in the export dialog -> (format, compression)
+EXPORT_CHOICES = {
+    "CSV": ("csv", None),
+    "CSV (gzip)": ("csv", "gzip"),
+    "Excel (XLSX)": ("xlsx", None),
+    "Parquet": ("parquet", None),
+}
+
+
+def run_data_export(job, directory, start_date, end_date, fmt, compression):
+    """Report job: streams the export tables; progress counts rows written."""
+    written = {}
+
+    def progress(table, rows):
+        written[table] = rows
+        job.report_progress(sum(written.values()), 0)
+
+    return DataExporter().export(
+        directory,
+        start_date,
+        end_date,
+        fmt=fmt,
+        compression=compression,
+        progress=progress,
+        cancelled=job.is_cancelled,
+    )
+
+
+def render_sales_summary_pdf(job, report_manager, file_path, table_data):
+    """Report job: builds the sales summary PDF from already formatted rows."""
+    doc = SimpleDocTemplate(file_path, pagesize=letter)
+    styles = getSampleStyleSheet()
+    centered_style = styles["Normal"]
+    centered_style.alignment = TA_CENTER
+
+    company_details = report_manager.get_company_details()
+    company_name = ""
+    address_lines = []
+    if company_details:
+        company_info = company_details[0]
+        company_name = Paragraph(
+            f"<b>{company_info['company_name']}</b>", centered_style
+        )
+        address_lines.append(Paragraph(company_info["address"], centered_style))
+        if company_info["state"]:
+            address_lines.append(Paragraph(company_info["state"], centered_style))
+        if company_info["phone"]:
+            address_lines.append(
+                Paragraph(f"Phone: {company_info['phone']}", centered_style)
+            )
+
+    report_title = Paragraph("<b>Sales Summary</b>", centered_style)
+
+    story = []
+    if company_name:
+        story.append(company_name)
+        for line in address_lines:
+            story.append(line)
+        story.append(Spacer(1, 0.2 * inch))
+    story.append(report_title)
+    story.append(Spacer(1, 0.2 * inch))
+
+    table = Table(table_data)
+    table.setStyle(
+        TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+                ("BACKGROUND", (0, 1), (-1, -2), colors.beige),
+                ("BACKGROUND", (0, -1), (-1, -1), colors.lightgrey),
+                ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
+                ("GRID", (0, 0), (-1, -1), 1, colors.black),
+                ("SPAN", (0, -1), (1, -1)),
+            ]
+        )
+    )
+
+    story.append(table)
+    if job.is_cancelled():
+        return None
+    doc.build(story)
+    return file_path
+
+
 class ReportView(QWidget):
     def __init__(self):
         super().__init__()
@@ -52,6 +186,19 @@ class ReportView(QWidget):
         self.stores_data = self.report_manager.get_stores_data()
         self.stores = ["All Stores"] + [store["name"] for store in self.stores_data]
 
+        # Queries and PDF rendering run on the engine's thread pool
+        self.report_engine = ReportEngine(self)
+        self.report_engine.signals.chunk.connect(self.on_report_chunk)
+        self.report_engine.signals.progress.connect(self.on_report_progress)
+        self.report_engine.signals.finished.connect(self.on_report_finished)
+        self.report_engine.signals.failed.connect(self.on_report_failed)
+        self.report_engine.signals.cancelled.connect(self.on_report_cancelled)
+        self.summary_job = None
+        self.pdf_job = None
+        self.export_job = None
+        self.summary_model = None
+        self.summary_totals = {}
+
         self.init_ui()
 
     def init_ui(self):
@@ -63,6 +210,8 @@ class ReportView(QWidget):
         self.sidebar.addItem("Sale Detailed Report")
         self.sidebar.addItem("Stocks Reports")
         self.sidebar.addItem("Top Selling Items Reports")
+        self.sidebar.addItem("Checkout Latency")
+        self.sidebar.addItem("Sales Analysis")
         self.sidebar.currentRowChanged.connect(self.switch_report_view)
         main_layout.addWidget(self.sidebar)
 
@@ -78,12 +227,18 @@ class ReportView(QWidget):
         self.sale_detailed_report_view = QLabel("Sale Detailed Report View")
         self.report_area.addWidget(self.sale_detailed_report_view)
 
-        self.stocks_reports_view = QLabel("Stocks Reports View")
+        self.stocks_reports_view = StockReportView()
         self.report_area.addWidget(self.stocks_reports_view)
 
-        self.top_selling_items_view = QLabel("Top Selling Items Reports View")
+        self.top_selling_items_view = TopSellingItemsView()
         self.report_area.addWidget(self.top_selling_items_view)
 
+        self.checkout_latency_view = CheckoutLatencyView()
+        self.report_area.addWidget(self.checkout_latency_view)
+
+        self.sales_analysis_view = SalesAnalysisView(self.report_engine)
+        self.report_area.addWidget(self.sales_analysis_view)
+
         main_layout.addWidget(self.report_area)
 
         main_layout.setStretch(0, 2)  # Sidebar 20%
@@ -137,6 +292,21 @@ class ReportView(QWidget):
 
         layout.addLayout(date_filter_layout)
 
+        progress_layout = QHBoxLayout()
+        self.report_progress = QProgressBar()
+        self.report_progress.setVisible(False)
+        progress_layout.addWidget(self.report_progress, 1)
+        self.cancel_report_button = QPushButton("Cancel")
+        self.cancel_report_button.setVisible(False)
+        self.cancel_report_button.clicked.connect(self.cancel_running_reports)
+        progress_layout.addWidget(self.cancel_report_button)
+        layout.addLayout(progress_layout)
+
+        # A running report no longer matches the filters once they change
+        self.start_date_edit.dateChanged.connect(self.cancel_sales_summary)
+        self.end_date_edit.dateChanged.connect(self.cancel_sales_summary)
+        self.store_combo.currentIndexChanged.connect(self.cancel_sales_summary)
+
         # Report Table
         self.summary_table_view = QTableView()
         self.summary_table_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
@@ -145,6 +315,13 @@ class ReportView(QWidget):
         # Download Option
         download_layout = QHBoxLayout()
         download_layout.addStretch(1)
+        self.export_button = QPushButton("Export Data")
+        self.export_button.setToolTip(
+            "Orders, order items, payments, stock movements and expenses "
+            "for the selected dates"
+        )
+        self.export_button.clicked.connect(self.export_data)
+        download_layout.addWidget(self.export_button)
         self.download_button = QPushButton("Download as PDF")
         self.download_button.clicked.connect(self.download_sales_summary_pdf)
         download_layout.addWidget(self.download_button)
@@ -162,6 +339,10 @@ class ReportView(QWidget):
             self.display_stocks_reports()
         elif index == 3:
             self.display_top_selling_items()
+        elif index == 4:
+            self.checkout_latency_view.refresh()
+        elif index == 5:
+            self.sales_analysis_view.refresh()
 
     def display_sale_detailed_report(self):
         self.sale_detailed_report_view.setText(
@@ -169,16 +350,13 @@ class ReportView(QWidget):
         )
 
     def display_stocks_reports(self):
-        self.stocks_reports_view.setText(
-            "Implementation for Stocks Reports will go here."
-        )
+        self.stocks_reports_view.refresh()
 
     def display_top_selling_items(self):
-        self.top_selling_items_view.setText(
-            "Implementation for Top Selling Items Reports will go here."
-        )
+        self.top_selling_items_view.refresh()
 
     def generate_sales_summary(self):
+        self.cancel_sales_summary()
         start_date = self.start_date_edit.date().toString("yyyy-MM-dd")
         end_date = self.end_date_edit.date().toString("yyyy-MM-dd")
         selected_store_name = self.store_combo.currentText()
@@ -189,84 +367,93 @@ class ReportView(QWidget):
                     selected_store_id = store["id"]
                     break
 
-        sales_data = self.report_manager.get_sales_summary_data(
-            start_date, end_date, selected_store_id
+        self.summary_model = QStandardItemModel()
+        self.summary_model.setHorizontalHeaderLabels(SALES_SUMMARY_HEADERS)
+        self.summary_table_view.clearSpans()
+        self.summary_table_view.setModel(self.summary_model)
+        self.summary_totals = dict.fromkeys(SALES_SUMMARY_FIELDS, 0.0)
+
+        self.report_progress.setRange(0, 0)
+        self.report_progress.setVisible(True)
+        self.cancel_report_button.setVisible(True)
+        self.download_button.setEnabled(False)
+        self.summary_job = self.report_engine.submit(
+            run_sales_summary,
+            self.report_manager,
+            start_date,
+            end_date,
+            selected_store_id,
         )
 
-        model = QStandardItemModel()
-        model.setHorizontalHeaderLabels(
-            [
-                "Date",
-                "Sub Total",
-                "Tax Total",
-                "Discount",
-                "Others",
-                "Tip",
-                "Final Total",
-                "Payment Total",
-                "Amount Due",
+    def cancel_running_reports(self):
+        self.cancel_sales_summary()
+        if self.export_job is not None:
+            self.report_engine.cancel(self.export_job)
+
+    def cancel_sales_summary(self):
+        if self.summary_job is not None:
+            self.report_engine.cancel(self.summary_job)
+            self.summary_job = None
+            self._sales_summary_done()
+
+    def on_report_chunk(self, job_id, sales):
+        if job_id != self.summary_job:
+            return  # Rows of a report that was cancelled or replaced
+        for sale in sales:
+            row = [QStandardItem(sale["date"])]
+            for field in SALES_SUMMARY_FIELDS:
+                value = sale.get(field, 0.00)
+                row.append(QStandardItem(f"{value:.2f}"))
+                self.summary_totals[field] += value
+            self.summary_model.appendRow(row)
+
+    def on_report_progress(self, job_id, done, total):
+        if job_id == self.export_job:
+            self.report_progress.setRange(0, 0)
+            self.report_progress.setFormat(f"{done} rows exported")
+            self.report_progress.setTextVisible(True)
+        elif job_id == self.summary_job:
+            self.report_progress.setRange(0, total)
+            self.report_progress.setValue(done)
+
+    def on_report_finished(self, job_id, result):
+        if job_id == self.export_job:
+            self.export_job = None
+            self._export_done()
+            lines = [
+                f"{table}: {info['rows']} rows"
+                for table, info in result.items()
+                if table != "duration_s"
             ]
-        )
+            QMessageBox.information(
+                self,
+                "Export Complete",
+                "\n".join(lines) + f"\n\nFinished in {result['duration_s']} s.",
+            )
+            return
+        if job_id == self.pdf_job:
+            self.pdf_job = None
+            self.download_button.setEnabled(True)
+            if result:
+                QMessageBox.information(
+                    self, "Success", f"Sales summary downloaded to: {result}"
+                )
+            return
+        if job_id != self.summary_job:
+            return
+        self.summary_job = None
+        self._sales_summary_done()
 
-        total_sub_total = 0
-        total_tax_total = 0
-        total_discount = 0
-        total_others = 0
-        total_tip = 0
-        total_final_total = 0
-        total_payment_total = 0
-        total_amount_due = 0
-
-        for sale in sales_data:
-            date = sale["date"]
-            sub_total = sale.get("sub_total", 0.00)
-            tax_total = sale.get("tax_total", 0.00)
-            discount = sale.get("discount", 0.00)
-            others = sale.get("others", 0.00)
-            tip = sale.get("tip", 0.00)
-            final_total = sale.get("ground_total", 0.00)
-            payment_total = sale.get("payment_total", 0.00)
-            amount_due = sale.get("amount_due", 0.00)
-
-            row = [
-                QStandardItem(date),
-                QStandardItem(f"{sub_total:.2f}"),
-                QStandardItem(f"{tax_total:.2f}"),
-                QStandardItem(f"{discount:.2f}"),
-                QStandardItem(f"{others:.2f}"),
-                QStandardItem(f"{tip:.2f}"),
-                QStandardItem(f"{final_total:.2f}"),
-                QStandardItem(f"{payment_total:.2f}"),
-                QStandardItem(f"{amount_due:.2f}"),
-            ]
-            model.appendRow(row)
-
-            total_sub_total += sub_total
-            total_tax_total += tax_total
-            total_discount += discount
-            total_others += others
-            total_tip += tip
-            total_final_total += final_total
-            total_payment_total += payment_total
-            total_amount_due += amount_due
-
-        grand_total_row = [
-            QStandardItem(""),
-            QStandardItem("Grand Total"),
-            QStandardItem(f"{total_tax_total:.2f}"),
-            QStandardItem(f"{total_discount:.2f}"),
-            QStandardItem(f"{total_others:.2f}"),
-            QStandardItem(f"{total_tip:.2f}"),
-            QStandardItem(f"{total_final_total:.2f}"),
-            QStandardItem(f"{total_payment_total:.2f}"),
-            QStandardItem(f"{total_amount_due:.2f}"),
+        model = self.summary_model
+        totals = self.summary_totals
+        grand_total_row = [QStandardItem(""), QStandardItem("Grand Total")] + [
+            QStandardItem(f"{totals[field]:.2f}") for field in SALES_SUMMARY_FIELDS[1:]
         ]
         model.appendRow(grand_total_row)
 
         grand_total_row_index = model.rowCount() - 1
         self.summary_table_view.setSpan(grand_total_row_index, 0, 1, 2)
 
-        self.summary_table_view.setModel(model)
         self.summary_table_view.horizontalHeader().setStretchLastSection(True)
         self.summary_table_view.resizeColumnsToContents()
         self.summary_table_view.horizontalHeader().setSectionResizeMode(
@@ -277,6 +464,66 @@ class ReportView(QWidget):
                 i, QHeaderView.Stretch
             )
 
+    def on_report_failed(self, job_id, error):
+        if job_id == self.export_job:
+            self.export_job = None
+            self._export_done()
+            QMessageBox.critical(self, "Export Failed", error)
+        elif job_id == self.pdf_job:
+            self.pdf_job = None
+            self.download_button.setEnabled(True)
+            QMessageBox.critical(self, "Error", f"Error saving PDF: {error}")
+        elif job_id == self.summary_job:
+            self.summary_job = None
+            self._sales_summary_done()
+            QMessageBox.critical(self, "Error", f"Error generating report: {error}")
+
+    def on_report_cancelled(self, job_id):
+        if job_id == self.export_job:
+            self.export_job = None
+            self._export_done()
+        elif job_id == self.pdf_job:
+            self.pdf_job = None
+            self.download_button.setEnabled(True)
+
+    def export_data(self):
+        if self.export_job is not None:
+            return
+        choice, ok = QInputDialog.getItem(
+            self, "Export Data", "Format:", list(EXPORT_CHOICES), 0, False
+        )
+        if not ok:
+            return
+        directory = QFileDialog.getExistingDirectory(self, "Export To Folder")
+        if not directory:
+            return
+        fmt, compression = EXPORT_CHOICES[choice]
+        self.export_button.setEnabled(False)
+        self.report_progress.setRange(0, 0)
+        self.report_progress.setVisible(True)
+        self.cancel_report_button.setVisible(True)
+        self.export_job = self.report_engine.submit(
+            run_data_export,
+            directory,
+            self.start_date_edit.date().toString("yyyy-MM-dd"),
+            self.end_date_edit.date().toString("yyyy-MM-dd"),
+            fmt,
+            compression,
+        )
+
+    def _export_done(self):
+        self.export_button.setEnabled(True)
+        self.report_progress.resetFormat()
+        if self.summary_job is None:
+            self.report_progress.setVisible(False)
+            self.cancel_report_button.setVisible(False)
+
+    def _sales_summary_done(self):
+        if self.export_job is None:
+            self.report_progress.setVisible(False)
+            self.cancel_report_button.setVisible(False)
+        self.download_button.setEnabled(self.pdf_job is None)
+
     def download_sales_summary_pdf(self):
         if not REPORTLAB_INSTALLED:
             QMessageBox.critical(
@@ -287,7 +534,7 @@ class ReportView(QWidget):
             return
 
         model = self.summary_table_view.model()
-        if model is None:
+        if model is None or self.summary_job is not None:
             QMessageBox.warning(self, "No Data", "No sales summary data to download.")
             return
 
@@ -299,87 +546,27 @@ class ReportView(QWidget):
             if not file_path.lower().endswith(".pdf"):
                 file_path += ".pdf"
 
-            try:
-                doc = SimpleDocTemplate(file_path, pagesize=letter)
-                styles = getSampleStyleSheet()
-                centered_style = styles["Normal"]
-                centered_style.alignment = TA_CENTER
-
-                company_details = self.report_manager.get_company_details()
-                company_name = ""
-                address_lines = []
-                if company_details:
-                    company_info = company_details[0]
-                    company_name = Paragraph(
-                        f"<b>{company_info['company_name']}</b>", centered_style
-                    )
-                    address_lines.append(
-                        Paragraph(company_info["address"], centered_style)
-                    )
-                    if company_info["state"]:
-                        address_lines.append(
-                            Paragraph(company_info["state"], centered_style)
-                        )
-                    if company_info["phone"]:
-                        address_lines.append(
-                            Paragraph(f"Phone: {company_info['phone']}", centered_style)
-                        )
-
-                report_title = Paragraph("<b>Sales Summary</b>", centered_style)
-
-                story = []
-                if company_name:
-                    story.append(company_name)
-                    for line in address_lines:
-                        story.append(line)
-                    story.append(Spacer(1, 0.2 * inch))
-                story.append(report_title)
-                story.append(Spacer(1, 0.2 * inch))
-
-                table_data = []
-                header = [
-                    model.horizontalHeaderItem(i).text()
-                    for i in range(model.columnCount())
+            # Only the cell texts are read here; the document is built on
+            # the report pool.
+            table_data = []
+            header = [
+                model.horizontalHeaderItem(i).text() for i in range(model.columnCount())
+            ]
+            table_data.append(header)
+            for row in range(model.rowCount()):
+                row_data = [
+                    model.item(row, col).text() for col in range(model.columnCount())
                 ]
-                table_data.append(header)
-                for row in range(model.rowCount()):
-                    row_data = [
-                        model.item(row, col).text()
-                        for col in range(model.columnCount())
-                    ]
-                    table_data.append(row_data)
-                if table_data and table_data[-1][1] == "Grand Total":
-                    last_row = table_data[-1]
-                    grand_total_label = last_row[1]
-                    totals = last_row[2:]
-                    table_data[-1] = ["", grand_total_label] + totals
-
-                table = Table(table_data)
-                table.setStyle(
-                    TableStyle(
-                        [
-                            ("BACKGROUND", (0, 0), (-1, 0), colors.grey),
-                            ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
-                            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                            ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                            ("BACKGROUND", (0, 1), (-1, -2), colors.beige),
-                            ("BACKGROUND", (0, -1), (-1, -1), colors.lightgrey),
-                            ("FONTNAME", (0, -1), (-1, -1), "Helvetica-Bold"),
-                            ("GRID", (0, 0), (-1, -1), 1, colors.black),
-                            ("SPAN", (0, -1), (1, -1)),
-                        ]
-                    )
-                )
+                table_data.append(row_data)
 
-                story.append(table)
-                doc.build(story)
-                QMessageBox.information(
-                    self, "Success", f"Sales summary downloaded to: {file_path}"
-                )
+            self.download_button.setEnabled(False)
+            self.pdf_job = self.report_engine.submit(
+                render_sales_summary_pdf, self.report_manager, file_path, table_data
+            )
 
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Error saving PDF: {e}")
+    def closeEvent(self, event):
+        self.report_engine.cancel_all()
+        super().closeEvent(event)
 
 
 if __name__ == "__main__":
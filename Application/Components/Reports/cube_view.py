@@ -0,0 +1,196 @@
+from PyQt5.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QComboBox,
+    QDateEdit,
+    QTableView,
+    QAbstractItemView,
+    QHeaderView,
+)
+from PyQt5.QtCore import QDate, Qt
+from PyQt5.QtGui import QFont, QStandardItemModel, QStandardItem
+
+from Helper.sales_cube import NUMPY_INSTALLED, SalesCube
+
+DIMENSION_LABELS = {
+    "hour": "Hour of Day",
+    "weekday": "Weekday",
+    "date": "Date",
+    "month": "Month",
+    "payment_method": "Payment Method",
+    "customer_type": "Customer Type",
+    "category": "Category",
+    "item": "Item",
+    "store": "Store",
+}
+MEASURE_LABELS = {
+    "revenue": "Revenue",
+    "quantity": "Quantity",
+    "orders": "Orders",
+    "lines": "Order Lines",
+}
+
+
+def refresh_cube(job, cube):
+    """Report job: loads the orders added since the cube's last refresh."""
+    return cube.refresh()
+
+
+class SalesAnalysisView(QWidget):
+    """Pivot of sales by any two dimensions, sliced in memory by SalesCube.
+
+    The cube is loaded (and later topped up) on the report engine; every
+    filter change after that is answered from memory.
+    """
+
+    def __init__(self, report_engine):
+        super().__init__()
+        self.report_engine = report_engine
+        self.cube = None
+        self.load_job = None
+        layout = QVBoxLayout()
+
+        title_label = QLabel("Sales Analysis")
+        title_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(title_label)
+        self.setLayout(layout)
+
+        if not NUMPY_INSTALLED:
+            layout.addWidget(
+                QLabel("Sales analysis needs NumPy. Install it with 'pip install numpy'.")
+            )
+            layout.addStretch(1)
+            return
+        self.cube = SalesCube()
+
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Rows:"))
+        self.rows_combo = QComboBox()
+        filter_layout.addWidget(self.rows_combo)
+        filter_layout.addWidget(QLabel("Columns:"))
+        self.columns_combo = QComboBox()
+        self.columns_combo.addItem("(none)", None)
+        filter_layout.addWidget(self.columns_combo)
+        for dim, label in DIMENSION_LABELS.items():
+            self.rows_combo.addItem(label, dim)
+            self.columns_combo.addItem(label, dim)
+        self.rows_combo.setCurrentIndex(self.rows_combo.findData("category"))
+        filter_layout.addWidget(QLabel("Measure:"))
+        self.measure_combo = QComboBox()
+        for measure, label in MEASURE_LABELS.items():
+            self.measure_combo.addItem(label, measure)
+        filter_layout.addWidget(self.measure_combo)
+        filter_layout.addStretch(1)
+        layout.addLayout(filter_layout)
+
+        date_layout = QHBoxLayout()
+        date_layout.addWidget(QLabel("From:"))
+        self.start_date_edit = QDateEdit()
+        self.start_date_edit.setDate(QDate.currentDate().addMonths(-1))
+        self.start_date_edit.setCalendarPopup(True)
+        self.start_date_edit.setDisplayFormat("yyyy-MM-dd")
+        date_layout.addWidget(self.start_date_edit)
+        date_layout.addWidget(QLabel("To:"))
+        self.end_date_edit = QDateEdit()
+        self.end_date_edit.setDate(QDate.currentDate())
+        self.end_date_edit.setCalendarPopup(True)
+        self.end_date_edit.setDisplayFormat("yyyy-MM-dd")
+        date_layout.addWidget(self.end_date_edit)
+        self.reload_button = QPushButton("Reload")
+        self.reload_button.clicked.connect(lambda: self.refresh(full=True))
+        date_layout.addWidget(self.reload_button)
+        date_layout.addStretch(1)
+        self.status_label = QLabel("")
+        date_layout.addWidget(self.status_label)
+        layout.addLayout(date_layout)
+
+        self.table_view = QTableView()
+        self.table_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        layout.addWidget(self.table_view)
+
+        for signal in (
+            self.rows_combo.currentIndexChanged,
+            self.columns_combo.currentIndexChanged,
+            self.measure_combo.currentIndexChanged,
+            self.start_date_edit.dateChanged,
+            self.end_date_edit.dateChanged,
+        ):
+            signal.connect(self.render)
+        self.report_engine.signals.finished.connect(self.on_load_finished)
+        self.report_engine.signals.failed.connect(self.on_load_failed)
+
+    def refresh(self, full=False):
+        """Tops the cube up with new orders (all of them with full=True)."""
+        if self.cube is None or self.load_job is not None:
+            return
+        if full:
+            self.cube.fingerprint = None
+        self.status_label.setText("Loading sales...")
+        self.reload_button.setEnabled(False)
+        self.load_job = self.report_engine.submit(refresh_cube, self.cube)
+
+    def on_load_finished(self, job_id, added):
+        if job_id != self.load_job:
+            return
+        self.load_job = None
+        self.reload_button.setEnabled(True)
+        self.render()
+
+    def on_load_failed(self, job_id, error):
+        if job_id != self.load_job:
+            return
+        self.load_job = None
+        self.reload_button.setEnabled(True)
+        self.status_label.setText(f"Loading failed: {error}")
+
+    def render(self):
+        # While loading the cube is locked; the load renders when it ends
+        if self.cube is None or self.load_job is not None:
+            return
+        measure = self.measure_combo.currentData()
+        columns = self.columns_combo.currentData()
+        row_labels, column_labels, matrix = self.cube.pivot(
+            self.rows_combo.currentData(),
+            columns,
+            measure,
+            start_date=self.start_date_edit.date().toString("yyyy-MM-dd"),
+            end_date=self.end_date_edit.date().toString("yyyy-MM-dd"),
+        )
+
+        def cell(value):
+            text = f"{value:,.2f}" if measure == "revenue" else f"{value:,.0f}"
+            item = QStandardItem(text)
+            item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            return item
+
+        # Distinct orders do not add up across cells, so no totals for them
+        totals = measure != "orders"
+        model = QStandardItemModel()
+        headers = [self.rows_combo.currentText()] + column_labels
+        if columns and totals:
+            headers.append("Total")
+        model.setHorizontalHeaderLabels(headers)
+        for label, values in zip(row_labels, matrix):
+            row = [QStandardItem(label)] + [cell(value) for value in values]
+            if columns and totals:
+                row.append(cell(values.sum()))
+            model.appendRow(row)
+        if totals and row_labels:
+            bold = QFont()
+            bold.setBold(True)
+            column_totals = matrix.sum(axis=0)
+            row = [QStandardItem("Total")] + [cell(value) for value in column_totals]
+            if columns:
+                row.append(cell(column_totals.sum()))
+            for item in row:
+                item.setFont(bold)
+            model.appendRow(row)
+
+        self.table_view.setModel(model)
+        header = self.table_view.horizontalHeader()
+        for i in range(model.columnCount()):
+            header.setSectionResizeMode(i, QHeaderView.Stretch)
+        self.status_label.setText(f"{len(self.cube)} order lines in memory")
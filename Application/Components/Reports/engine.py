@@ -0,0 +1,107 @@
+import itertools
+import logging
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+
+class ReportCancelled(Exception):
+    """Raised inside a job to stop it early; reported as cancelled, not failed."""
+
+
+class ReportSignals(QObject):
+    # Every signal carries the id of the job that emitted it, so a view can
+    # ignore late results from a job it has already replaced.
+    chunk = pyqtSignal(int, object)
+    progress = pyqtSignal(int, int, int)  # job id, done, total
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+    cancelled = pyqtSignal(int)
+
+
+class ReportJob(QRunnable):
+    """One report run on the pool.
+
+    `func(job, *args)` does the work: it calls `job.emit_chunk(rows)` to
+    stream partial results, `job.report_progress(done, total)` as it goes,
+    and checks `job.is_cancelled()` (or passes it on, e.g. to
+    ReportManager.iter_sales_summary) to stop early. Its return value is
+    delivered with `finished`.
+    """
+
+    def __init__(self, job_id, signals, func, args):
+        super().__init__()
+        self.job_id = job_id
+        self.signals = signals
+        self.func = func
+        self.args = args
+        self._cancel_event = threading.Event()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def emit_chunk(self, rows):
+        if self.is_cancelled():
+            raise ReportCancelled()
+        self.signals.chunk.emit(self.job_id, rows)
+
+    def report_progress(self, done, total):
+        self.signals.progress.emit(self.job_id, done, total)
+
+    def run(self):
+        try:
+            result = self.func(self, *self.args)
+        except Exception as e:
+            if self.is_cancelled():
+                self.signals.cancelled.emit(self.job_id)
+            else:
+                logger.exception("Report job %s failed: %s", self.job_id, e)
+                self.signals.failed.emit(self.job_id, str(e))
+            return
+        if self.is_cancelled():
+            self.signals.cancelled.emit(self.job_id)
+        else:
+            self.signals.finished.emit(self.job_id, result)
+
+
+class ReportEngine(QObject):
+    """Runs report queries and rendering on a QThreadPool.
+
+    SQLite releases the GIL while it executes a statement, so a year-long
+    query on a worker thread leaves the GUI responsive. Connect to
+    `signals` once; `submit` returns the job id the signals refer to.
+    """
+
+    def __init__(self, parent=None, max_threads=2):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.signals = ReportSignals(self)
+        self._ids = itertools.count(1)
+        self._jobs = {}
+        self.signals.finished.connect(self._forget)
+        self.signals.failed.connect(self._forget)
+        self.signals.cancelled.connect(self._forget)
+
+    def submit(self, func, *args):
+        job = ReportJob(next(self._ids), self.signals, func, args)
+        self._jobs[job.job_id] = job
+        self.pool.start(job)
+        return job.job_id
+
+    def cancel(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job.cancel()
+
+    def cancel_all(self):
+        for job in list(self._jobs.values()):
+            job.cancel()
+
+    def _forget(self, job_id, *args):
+        self._jobs.pop(job_id, None)
@@ -0,0 +1,182 @@
+from PyQt5.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QComboBox,
+    QSpinBox,
+    QDateEdit,
+    QTableView,
+    QAbstractItemView,
+    QHeaderView,
+)
+from PyQt5.QtCore import QDate, Qt
+from PyQt5.QtGui import QStandardItemModel, QStandardItem
+
+from Helper.db_conn import db
+
+METRICS = [("Quantity", "quantity"), ("Revenue", "revenue"), ("Margin", "margin")]
+VELOCITY_PERIODS = [("Last 7 days", 7), ("Last 30 days", 30), ("Last 90 days", 90)]
+
+
+def _show(table_view, model):
+    table_view.setModel(model)
+    header = table_view.horizontalHeader()
+    for i in range(model.columnCount()):
+        header.setSectionResizeMode(i, QHeaderView.Stretch)
+
+
+class TopSellingItemsView(QWidget):
+    """Best sellers by quantity, revenue or margin, read from item_daily_sales."""
+
+    def __init__(self):
+        super().__init__()
+        layout = QVBoxLayout()
+
+        title_label = QLabel("Top Selling Items")
+        title_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(title_label)
+
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("From:"))
+        self.start_date_edit = QDateEdit()
+        self.start_date_edit.setDate(QDate.currentDate().addMonths(-1))
+        self.start_date_edit.setCalendarPopup(True)
+        self.start_date_edit.setDisplayFormat("yyyy-MM-dd")
+        filter_layout.addWidget(self.start_date_edit)
+        filter_layout.addWidget(QLabel("To:"))
+        self.end_date_edit = QDateEdit()
+        self.end_date_edit.setDate(QDate.currentDate())
+        self.end_date_edit.setCalendarPopup(True)
+        self.end_date_edit.setDisplayFormat("yyyy-MM-dd")
+        filter_layout.addWidget(self.end_date_edit)
+        filter_layout.addWidget(QLabel("Rank by:"))
+        self.metric_combo = QComboBox()
+        for label, metric in METRICS:
+            self.metric_combo.addItem(label, metric)
+        filter_layout.addWidget(self.metric_combo)
+        filter_layout.addWidget(QLabel("Show:"))
+        self.limit_spin = QSpinBox()
+        self.limit_spin.setRange(5, 500)
+        self.limit_spin.setValue(20)
+        filter_layout.addWidget(self.limit_spin)
+        filter_layout.addStretch(1)
+        layout.addLayout(filter_layout)
+
+        self.table_view = QTableView()
+        self.table_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        layout.addWidget(self.table_view)
+
+        self.setLayout(layout)
+
+        # Queries are cheap enough to follow every filter change
+        self.start_date_edit.dateChanged.connect(self.refresh)
+        self.end_date_edit.dateChanged.connect(self.refresh)
+        self.metric_combo.currentIndexChanged.connect(self.refresh)
+        self.limit_spin.valueChanged.connect(self.refresh)
+
+    def refresh(self):
+        items = db.get_top_selling_items(
+            self.start_date_edit.date().toString("yyyy-MM-dd"),
+            self.end_date_edit.date().toString("yyyy-MM-dd"),
+            metric=self.metric_combo.currentData(),
+            limit=self.limit_spin.value(),
+        )
+        model = QStandardItemModel()
+        model.setHorizontalHeaderLabels(
+            [
+                "Rank",
+                "Item",
+                "Quantity",
+                "Revenue",
+                "Margin",
+                "Orders",
+                "Share %",
+                "Cumulative %",
+            ]
+        )
+        for item in items:
+            model.appendRow(
+                [
+                    QStandardItem(str(item["rank"])),
+                    QStandardItem(item["name"]),
+                    QStandardItem(f"{item['quantity']:g}"),
+                    QStandardItem(f"{item['revenue']:.2f}"),
+                    QStandardItem(f"{item['margin']:.2f}"),
+                    QStandardItem(str(item["orders"])),
+                    QStandardItem(f"{item['share']:.1f}"),
+                    QStandardItem(f"{item['cumulative_share']:.1f}"),
+                ]
+            )
+        _show(self.table_view, model)
+
+
+class StockReportView(QWidget):
+    """On-hand stock (today or at a past close) next to sales velocity,
+    items running out first."""
+
+    def __init__(self):
+        super().__init__()
+        layout = QVBoxLayout()
+
+        title_label = QLabel("Stock Report")
+        title_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(title_label)
+
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Velocity over:"))
+        self.period_combo = QComboBox()
+        for label, days in VELOCITY_PERIODS:
+            self.period_combo.addItem(label, days)
+        self.period_combo.setCurrentIndex(1)
+        self.period_combo.currentIndexChanged.connect(self.refresh)
+        filter_layout.addWidget(self.period_combo)
+        filter_layout.addWidget(QLabel("As of:"))
+        self.as_of_edit = QDateEdit()
+        self.as_of_edit.setDate(QDate.currentDate())
+        self.as_of_edit.setMaximumDate(QDate.currentDate())
+        self.as_of_edit.setCalendarPopup(True)
+        self.as_of_edit.setDisplayFormat("yyyy-MM-dd")
+        self.as_of_edit.dateChanged.connect(self.refresh)
+        filter_layout.addWidget(self.as_of_edit)
+        self.refresh_button = QPushButton("Refresh")
+        self.refresh_button.clicked.connect(self.refresh)
+        filter_layout.addWidget(self.refresh_button)
+        filter_layout.addStretch(1)
+        layout.addLayout(filter_layout)
+
+        self.table_view = QTableView()
+        self.table_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        layout.addWidget(self.table_view)
+
+        self.setLayout(layout)
+
+    def refresh(self):
+        days = self.period_combo.currentData() or 30
+        # Past dates show the stock at that day's close, from the ledger
+        items = db.get_stock_velocity(days, as_of=self.as_of_edit.date().toPyDate())
+        model = QStandardItemModel()
+        model.setHorizontalHeaderLabels(
+            [
+                "Item",
+                "On Hand",
+                f"Sold ({days} days)",
+                "Per Day",
+                "Days of Cover",
+                "Last Sold",
+            ]
+        )
+        for item in items:
+            cover = item["days_of_cover"]
+            model.appendRow(
+                [
+                    QStandardItem(item["name"]),
+                    QStandardItem(f"{item['stock_quantity']:g}"),
+                    QStandardItem(f"{item['sold']:g}"),
+                    QStandardItem(f"{item['velocity']:.2f}"),
+                    QStandardItem("-" if cover is None else f"{cover:.1f}"),
+                    QStandardItem(item["last_sold"] or "-"),
+                ]
+            )
+        _show(self.table_view, model)
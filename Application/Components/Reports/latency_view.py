@@ -0,0 +1,111 @@
+from datetime import date, datetime, timedelta
+
+from PyQt5.QtWidgets import (
+    QWidget,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QComboBox,
+    QTableView,
+    QAbstractItemView,
+    QHeaderView,
+)
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QStandardItemModel, QStandardItem
+
+from Helper.db_conn import db
+from Helper.tracing import CHECKOUT_STAGES, percentile, tracer
+
+PERIODS = [("Today", 0), ("Last 7 days", 6), ("Last 30 days", 29)]
+
+
+class CheckoutLatencyView(QWidget):
+    """Per-stage checkout latency (p50/p95/p99) and the most recent spans.
+
+    Answers "the till is slow" by showing which stage of a sale is slow.
+    """
+
+    def __init__(self):
+        super().__init__()
+        layout = QVBoxLayout()
+
+        title_label = QLabel("Checkout Latency")
+        title_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(title_label)
+
+        filter_layout = QHBoxLayout()
+        filter_layout.addWidget(QLabel("Period:"))
+        self.period_combo = QComboBox()
+        for label, days in PERIODS:
+            self.period_combo.addItem(label, days)
+        self.period_combo.currentIndexChanged.connect(self.refresh)
+        filter_layout.addWidget(self.period_combo)
+        self.refresh_button = QPushButton("Refresh")
+        self.refresh_button.clicked.connect(self.refresh)
+        filter_layout.addWidget(self.refresh_button)
+        filter_layout.addStretch(1)
+        layout.addLayout(filter_layout)
+
+        self.stages_table_view = QTableView()
+        self.stages_table_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        layout.addWidget(self.stages_table_view)
+
+        layout.addWidget(QLabel("Recent spans"))
+        self.spans_table_view = QTableView()
+        self.spans_table_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        layout.addWidget(self.spans_table_view)
+
+        self.setLayout(layout)
+
+    def refresh(self):
+        # Persist what this session has recorded so the query includes it
+        tracer.flush()
+        days = self.period_combo.currentData() or 0
+        since = (date.today() - timedelta(days=days)).isoformat()
+        histograms = db.get_latency_histograms(since)
+        for stage, counts in tracer.pending_histograms().items():
+            merged = histograms.setdefault(stage, [])
+            merged.extend([0] * (len(counts) - len(merged)))
+            for index, count in enumerate(counts):
+                merged[index] += count
+
+        model = QStandardItemModel()
+        model.setHorizontalHeaderLabels(
+            ["Stage", "Samples", "p50 (ms)", "p95 (ms)", "p99 (ms)"]
+        )
+        stages = list(CHECKOUT_STAGES) + sorted(
+            set(histograms) - set(CHECKOUT_STAGES)
+        )
+        for stage in stages:
+            counts = histograms.get(stage, [])
+            row = [QStandardItem(stage), QStandardItem(str(sum(counts)))]
+            for q in (50, 95, 99):
+                value = percentile(counts, q)
+                row.append(QStandardItem("-" if value is None else f"{value:.1f}"))
+            model.appendRow(row)
+        self._show(self.stages_table_view, model)
+
+        model = QStandardItemModel()
+        model.setHorizontalHeaderLabels(
+            ["Time", "Trace", "Stage", "Duration (ms)", "Status"]
+        )
+        for span in tracer.recent_spans(200):
+            model.appendRow(
+                [
+                    QStandardItem(
+                        datetime.fromtimestamp(span.start).strftime("%H:%M:%S")
+                    ),
+                    QStandardItem(span.trace_id or ""),
+                    QStandardItem(span.stage),
+                    QStandardItem(f"{span.duration_ms:.1f}"),
+                    QStandardItem("ok" if span.ok else "failed"),
+                ]
+            )
+        self._show(self.spans_table_view, model)
+
+    def _show(self, table_view, model):
+        table_view.setModel(model)
+        header = table_view.horizontalHeader()
+        for i in range(model.columnCount()):
+            header.setSectionResizeMode(i, QHeaderView.Stretch)
@@ -2,10 +2,6 @@ import logging
 import sqlite3
 from Helper.db_conn import DatabaseManager
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
@@ -16,7 +12,7 @@ class ReportManager:
     def _get_connection(self):
         """Get a new database connection."""
         with self.db_manager.lock:
-            conn = sqlite3.connect(self.db_manager.db_path, timeout=30)
+            conn = self.db_manager.connect()
         return conn
 
     def _commit_and_close(self, conn):
@@ -24,7 +20,7 @@ class ReportManager:
         try:
             conn.commit()
         except sqlite3.Error as e:
-            logger.error(f"Error committing changes: {str(e)}")
+            logger.error("Error committing changes: %s", e)
         finally:
             conn.close()
 
@@ -45,10 +41,10 @@ class ReportManager:
                 }
                 for row in cursor.fetchall()
             ]
-            logger.info(f"Retrieved {len(stores)} stores.")
+            logger.info("Retrieved %s stores.", len(stores))
             return stores
         except sqlite3.Error as e:
-            logger.error(f"Error retrieving stores data: {str(e)}")
+            logger.error("Error retrieving stores data: %s", e)
             return []
         finally:
             self._commit_and_close(conn)
@@ -80,38 +76,62 @@ class ReportManager:
 
     def get_sales_summary_data(self, start_date, end_date, store_id=None):
         """Fetch sales summary data from the orders table, grouped by date."""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        sales_data = []
         try:
-            query = """
-            SELECT DATE(date),
-                   SUM(total_amount),
-                   SUM(discount),
-                   SUM(tip),
-                   SUM(ground_total)
-            FROM orders
-            WHERE DATE(date) BETWEEN ? AND ?
-            AND status = 'completed'
-            """
-            params = (start_date, end_date)
-
-            logger.info(f"Store ID type: {type(store_id)}, value: {store_id}")
-            if store_id is not None:
-                query += " AND store_id = ?"
-                params += (store_id,)
+            sales_data = [
+                sale
+                for chunk in self.iter_sales_summary(start_date, end_date, store_id)
+                for sale in chunk
+            ]
+        except sqlite3.Error as e:
+            logger.error("Error retrieving sales summary data: %s", e)
+            return []
+        logger.info(
+            "Processed %d daily sales summaries between %s and %s.",
+            len(sales_data),
+            start_date,
+            end_date,
+        )
+        return sales_data
 
-            query += " GROUP BY DATE(date)"
-            query += " ORDER BY DATE(date)"  # Optional: Order the results by date
+    def iter_sales_summary(
+        self, start_date, end_date, store_id=None, chunk_size=100, cancelled=None
+    ):
+        """Yields the daily sales summary in lists of up to `chunk_size` days.
 
-            logger.info(f"Executing sales summary query: {query} with params: {params}")
+        Rows are pulled from the cursor with fetchmany, so a year-long range
+        is converted and shown a chunk at a time. When `cancelled()` turns
+        true the running statement is interrupted (sqlite3.OperationalError)
+        and iteration stops.
+        """
+        query = """
+        SELECT DATE(date),
+               SUM(total_amount),
+               SUM(discount),
+               SUM(tip),
+               SUM(ground_total)
+        FROM orders
+        WHERE DATE(date) BETWEEN ? AND ?
+        AND status = 'completed'
+        """
+        params = (start_date, end_date)
+        if store_id is not None:
+            query += " AND store_id = ?"
+            params += (store_id,)
+        query += " GROUP BY DATE(date) ORDER BY DATE(date)"
+        logger.debug("Executing sales summary query: %s with params: %s", query, params)
 
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            logger.info(f"Retrieved {len(rows)} rows from the database.")
-            for row in rows:
-                logger.info(f"Raw row data: {row}")
-                sales_data.append(
+        conn = self._get_connection()
+        if cancelled is not None:
+            # The GROUP BY runs to completion before the first row arrives;
+            # let a cancel abort it instead of waiting for it.
+            conn.set_progress_handler(lambda: 1 if cancelled() else 0, 10000)
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows or (cancelled is not None and cancelled()):
+                    return
+                yield [
                     {
                         "date": row[0],  # Date from the grouped result
                         "sub_total": float(row[1]) if row[1] is not None else 0.00,
@@ -123,17 +143,10 @@ class ReportManager:
                         "payment_total": float(row[4]) if row[4] is not None else 0.00,
                         "amount_due": 0.00,  # Assuming completed orders have no amount due
                     }
-                )
-            logger.info(
-                f"Processed {len(sales_data)} daily sales summaries "
-                f"between {start_date} and {end_date}."
-            )
-            return sales_data
-        except sqlite3.Error as e:
-            logger.error(f"Error retrieving sales summary data: {str(e)}")
-            return []
+                    for row in rows
+                ]
         finally:
-            self._commit_and_close(conn)
+            conn.close()
 
     def get_reports_data(self, report_date):
         conn = self._get_connection()
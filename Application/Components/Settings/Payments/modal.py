@@ -3,10 +3,6 @@ import logging
 import sqlite3
 from Helper.db_conn import DatabaseManager
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
@@ -18,7 +14,7 @@ class PaymentsManager:
         """Get a new database connection."""
         # Use the lock directly from DatabaseManager to ensure thread safety
         with self.db_manager.lock:
-            conn = sqlite3.connect(self.db_manager.db_path, timeout=30)
+            conn = self.db_manager.connect()
         return conn
 
     def _commit_and_close(self, conn):
@@ -26,7 +22,7 @@ class PaymentsManager:
         try:
             conn.commit()
         except sqlite3.Error as e:
-            logger.error(f"Error committing changes: {str(e)}")
+            logger.error("Error committing changes: %s", e)
         finally:
             conn.close()
 
@@ -41,10 +37,10 @@ class PaymentsManager:
                 """
             )
             payment_types = [{"id": row[0], "name": row[1]} for row in cursor.fetchall()]
-            logger.info(f"Retrieved {len(payment_types)} payment types.")
+            logger.info("Retrieved %s payment types.", len(payment_types))
             return payment_types
         except sqlite3.Error as e:
-            logger.error(f"Failed to retrieve payment types: {str(e)}")
+            logger.error("Failed to retrieve payment types: %s", e)
             return []
         finally:
             self._commit_and_close(conn)
@@ -66,7 +62,7 @@ class PaymentsManager:
                 return {"id": row[0], "name": row[1]}
             return None
         except sqlite3.Error as e:
-            logger.error(f"Failed to retrieve payment type with ID {payment_type_id}: {str(e)}")
+            logger.error("Failed to retrieve payment type with ID %s: %s", payment_type_id, e)
             return None
         finally:
             self._commit_and_close(conn)
@@ -82,10 +78,10 @@ class PaymentsManager:
                 """,
                 (short_code, payment_method, payment_type_id),
             )
-            logger.info(f"Payment with short code '{short_code}' saved successfully.")
+            logger.info("Payment with short code '%s' saved successfully.", short_code)
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error saving payment with short code '{short_code}': {str(e)}")
+            logger.error("Error saving payment with short code '%s': %s", short_code, e)
             return False
         finally:
             self._commit_and_close(conn)
@@ -110,10 +106,10 @@ class PaymentsManager:
                 }
                 for row in cursor.fetchall()
             ]
-            logger.info(f"Retrieved {len(payments)} payments.")
+            logger.info("Retrieved %s payments.", len(payments))
             return payments
         except sqlite3.Error as e:
-            logger.error(f"Error retrieving payments data: {str(e)}")
+            logger.error("Error retrieving payments data: %s", e)
             return []
         finally:
             self._commit_and_close(conn)
@@ -128,7 +124,7 @@ class PaymentsManager:
             )
             current = cursor.fetchone()
             if not current:
-                logger.warning(f"Payment with ID {payment_id} not found for update.")
+                logger.warning("Payment with ID %s not found for update.", payment_id)
                 raise Exception("Payment not found")
 
             new_short_code = short_code if short_code is not None else current[0]
@@ -143,10 +139,10 @@ class PaymentsManager:
                 """,
                 (new_short_code, new_payment_method, new_payment_type_id, payment_id),
             )
-            logger.info(f"Payment with ID {payment_id} updated successfully.")
+            logger.info("Payment with ID %s updated successfully.", payment_id)
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error updating payment with ID {payment_id}: {str(e)}")
+            logger.error("Error updating payment with ID %s: %s", payment_id, e)
             return False
         finally:
             self._commit_and_close(conn)
@@ -157,13 +153,13 @@ class PaymentsManager:
         try:
             cursor.execute("SELECT id FROM payments WHERE id = ?", (payment_id,))
             if not cursor.fetchone():
-                logger.warning(f"Payment with ID {payment_id} not found for deletion.")
+                logger.warning("Payment with ID %s not found for deletion.", payment_id)
                 raise Exception("Payment not found")
             cursor.execute("DELETE FROM payments WHERE id = ?", (payment_id,))
-            logger.info(f"Payment with ID {payment_id} deleted successfully.")
+            logger.info("Payment with ID %s deleted successfully.", payment_id)
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error deleting payment with ID {payment_id}: {str(e)}")
+            logger.error("Error deleting payment with ID %s: %s", payment_id, e)
             return False
         finally:
             self._commit_and_close(conn)
\ No newline at end of file
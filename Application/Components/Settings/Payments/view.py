@@ -20,10 +20,6 @@ from PyQt5.QtCore import Qt
 
 from Application.Components.Settings.Payments.modal import PaymentsManager
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-)
 logger = logging.getLogger(__name__)
 
 
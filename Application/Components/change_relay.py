@@ -0,0 +1,23 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from Helper.change_bus import change_bus
+
+
+class ChangeEventRelay(QObject):
+    """Forwards change bus events to the GUI thread.
+
+    The bus calls subscribers on the publishing thread (often the sync
+    worker); emitting a signal from there lets Qt queue the delivery to
+    slots of widgets living on the GUI thread. Publishes made on the GUI
+    thread itself are only queued when the slot is connected with
+    Qt.QueuedConnection; otherwise it runs inside the publisher's call.
+    """
+
+    changed = pyqtSignal(object)
+
+    def __init__(self, entities=None, parent=None):
+        super().__init__(parent)
+        self._token = change_bus.subscribe(self.changed.emit, entities)
+
+    def close(self):
+        change_bus.unsubscribe(self._token)
@@ -1,4 +1,3 @@
-import random
 import sqlite3
 import os
 import logging
@@ -7,19 +6,13 @@ from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import *
 from PyQt5.QtPrintSupport import QPrinter, QPrintPreviewDialog
-import usb
-from Helper.api import get_payments_from_api
 from Helper.db_conn import db
+from Helper.print_devices import print_router
+from Helper.receipts import build_receipt, receipt_template
+from Helper.tracing import tracer
 import json
 from datetime import datetime
-from escpos.printer import Usb
-
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler()],
-)
+
 logger = logging.getLogger(__name__)
 
 
@@ -27,14 +20,10 @@ def get_resource_path(relative_path):
     """Get the absolute path to a resource, works for dev and PyInstaller."""
     if hasattr(sys, "_MEIPASS"):
         base_path = sys._MEIPASS
-        print(f"Running in PyInstaller bundle, base path: {base_path}")
     else:
         base_path = os.path.abspath(".")
-        print(f"Running in dev mode, base path: {base_path}")
     full_path = os.path.join(base_path, relative_path)
-    print(
-        f"Resolved path for {relative_path}: {full_path}, exists: {os.path.exists(full_path)}"
-    )
+    logger.debug("Resolved resource %s -> %s", relative_path, full_path)
     return full_path
 
 
@@ -324,6 +313,20 @@ class ProductCard(HoverFrame):
             f"<b>Price:</b> {self.item['item_price']}<br>Qty: {self.item['stock_quantity']:.2f} {self.item['item_unit']}"
         )
 
+    def update_item(self, item):
+        """Patches the card in place; labels are only touched when data changed."""
+        item = dict(item, stock_quantity=float(item["stock_quantity"]))
+        changed = {
+            key for key in ("item_name", "item_price", "stock_quantity", "item_unit")
+            if self.item.get(key) != item.get(key)
+        }
+        if not changed:
+            return
+        self.item.update(item)
+        if "item_name" in changed:
+            self.name_label.setText(self.item["item_name"].upper())
+        self.update_stock_display(self.item["stock_quantity"])
+
 
 # Sidebar class remains unchanged
 class Sidebar(QWidget):
@@ -431,6 +434,9 @@ class PaymentConfirmationDialog(QDialog):
         self.payment_id = payment_id
         self.customer_id = customer_id
         self.parent_widget = parent
+        # Numbers are allocated when the order is saved; until then the
+        # ones it is going to get are shown
+        self.next_numbers = db.peek_order_numbers()
 
         # Initialize attributes from order_data
         self.total_amount = order_data.get("total_amount", 0.0)
@@ -446,7 +452,7 @@ class PaymentConfirmationDialog(QDialog):
 
         details_widget = QWidget()
         details_layout = QVBoxLayout(details_widget)
-        details_layout.addWidget(QLabel(f"Order No: {order_data['order_number']}"))
+        details_layout.addWidget(QLabel(f"Order No: {self.next_numbers[0]}"))
         details_layout.addWidget(QLabel(f"Date: {order_data['date']}"))
         details_layout.addWidget(
             QLabel(f"Total Amount: {order_data['total_amount']:.2f}")
@@ -527,24 +533,9 @@ class PaymentConfirmationDialog(QDialog):
 
         layout = QVBoxLayout(preview_dialog)
 
-        company_details = db.get_company_details()
-        company = (
-            company_details[0]
-            if company_details
-            else {
-                "company_name": "Unknown Company",
-                "address": "N/A",
-                "state": "N/A",
-                "phone": "N/A",
-                "tin_no": "N/A",
-                "vrn_no": "N/A",
-            }
-        )
-
-        receipt_text = self.generate_receipt_text(company)
         text_edit = QTextEdit()
         text_edit.setReadOnly(True)
-        text_edit.setText(receipt_text)
+        text_edit.setText(receipt_template().text(self.build_receipt()))
         text_edit.setFont(QFont("Courier", 10))
         layout.addWidget(text_edit)
 
@@ -554,96 +545,38 @@ class PaymentConfirmationDialog(QDialog):
 
         preview_dialog.exec_()
 
-    def generate_receipt_text(self, company):
-        """Generate receipt text for preview with dynamic company details"""
-        receipt = []
-        company_name = company["company_name"].replace("22", "").strip()
-        receipt.append(f"{company_name}".center(32))
-        receipt.append(f"{company['address']}".center(32))
-        if company["state"]:
-            receipt.append(f"{company['state']}".center(32))
-        receipt.append(f"Tel: {company['phone']}".center(32))
-        receipt.append(f"TIN: {company['tin_no']}  VRN: {company['vrn_no']}".center(32))
-        receipt.append("")
-
-        receipt.append("RECEIPT".center(32))
-        receipt.append("")
-
-        receipt.append(f"Order: {self.order_data['order_number']}")
-        receipt.append(f"Date: {self.order_data['date']}")
-        receipt.append(f"Payment: {self.parent_widget.payment_method.currentText()}")
-        receipt.append("")
-
-        receipt.append("-" * 32)
-        receipt.append("Item               Qty   Price  Total")
-        receipt.append("-" * 32)
-
-        table = self.parent_widget.dashboard_view.table
-        for row in range(table.rowCount()):
-            item = table.item(row, 0).text()[:18].ljust(18)
-            qty = table.item(row, 2).text().rjust(3)
-            price = f"{float(table.item(row, 3).text()):.2f}".rjust(6)
-            total = f"{float(qty) * float(price):.2f}".rjust(6)
-            receipt.append(f"{item} {qty} {price} {total}")
-
-        receipt.append("")
-        receipt.append("-" * 32)
-        receipt.append(f"Subtotal: {self.order_data['total_amount']:.2f}".rjust(32))
-        receipt.append(f"Tip:      {self.order_data['tip']:.2f}".rjust(32))
-        receipt.append(f"Discount: {self.order_data['discount']:.2f}".rjust(32))
-        receipt.append("-" * 32)
-        receipt.append(f"TOTAL:    {self.order_data['ground_total']:.2f}".rjust(32))
-        receipt.append("")
-
-        receipt.append("Thank you for your purchase!".center(32))
-        receipt.append("Visit us again!".center(32))
-
-        return "\n".join(receipt)
+    def build_receipt(self):
+        """Receipt record of this order, as it will be printed"""
+        company_details = db.get_company_details()
+        order_data = dict(self.order_data)
+        order_data["order_number"] = order_data["order_number"] or self.next_numbers[0]
+        order_data["receipt_number"] = order_data["receipt_number"] or self.next_numbers[1]
+        return build_receipt(
+            order_data,
+            self.items,
+            self.parent_widget.payment_method.currentText(),
+            company_details[0] if company_details else None,
+        )
 
     def confirm_payment(self):
-        print("Starting confirm_payment...")
         try:
-            success = db.save_order(
-                self.order_data, self.items, self.payment_id, self.customer_id
-            )
+            # The span stops before the success box so it does not include
+            # the time the cashier takes to dismiss it.
+            with tracer.span("payment_dialog"):
+                with tracer.span("db_commit"):
+                    success = db.save_order(
+                        self.order_data, self.items, self.payment_id, self.customer_id
+                    )
+                if success:
+                    self.order_data["order_number"] = success["order_number"]
+                    self.order_data["receipt_number"] = success["receipt_number"]
+                    # save_order has taken the stock off and published the
+                    # change; the product cards are patched from that event
+                    self.parent_widget.order_no_label.setText(
+                        f"Order No: {self.order_data['order_number']}"
+                    )
+                    self.parent_widget.print_receipt(self.build_receipt())
             if success:
-                print("Save order succeeded, updating stock and UI...")
-                item_quantities = {}
-                for item in self.items:
-                    item_id = item["item_id"]
-                    quantity_purchased = item["quantity"]
-                    if item_id in item_quantities:
-                        item_quantities[item_id] += quantity_purchased
-                    else:
-                        item_quantities[item_id] = quantity_purchased
-
-                processed_items = set()
-                for item_id, total_quantity in item_quantities.items():
-                    for (
-                        card_name,
-                        card,
-                    ) in self.parent_widget.dashboard_view.product_cards.items():
-                        if (
-                            card.item["item_id"] == item_id
-                            and item_id not in processed_items
-                        ):
-                            current_quantity = float(card.item["stock_quantity"])
-                            new_quantity = current_quantity - total_quantity
-                            if new_quantity < 0:
-                                print(
-                                    f"Warning: Stock for item {item_id} would go negative ({new_quantity})"
-                                )
-                                new_quantity = 0
-                            card.update_stock_display(new_quantity)
-                            db.update_item_stock(item_id, new_quantity)
-                            print(f"Updated stock for item {item_id}: {new_quantity}")
-                            processed_items.add(item_id)
-                            break
-
-                self.parent_widget.order_no_label.setText(
-                    f"Order No: {self.order_data['order_number']}"
-                )
-                self.parent_widget.print_receipt()
                 QMessageBox.information(
                     self,
                     "Success",
@@ -651,24 +584,23 @@ class PaymentConfirmationDialog(QDialog):
                 )
                 self.parent_widget.dashboard_view.clear_checkout()
                 self.parent_widget.hide_payment()
-                print("Closing dialog after success...")
                 self.accept()
             else:
-                print("Save order failed, keeping dialog open...")
+                logger.warning("Save order failed, keeping dialog open")
                 QMessageBox.warning(
                     self,
                     "Warning",
                     "Failed to save order to database. Please try again.",
                 )
         except sqlite3.OperationalError as se:
-            print(f"Database error: {se}")
+            logger.error("Database error confirming payment: %s", se)
             QMessageBox.critical(
                 self,
                 "Database Error",
                 f"Failed to save order due to database lock: {str(se)}. Please wait a moment and try again.",
             )
         except Exception as e:
-            print(f"Unexpected error: {e}")
+            logger.exception("Unexpected error confirming payment: %s", e)
             QMessageBox.critical(
                 self,
                 "Error",
@@ -705,6 +637,8 @@ class PaymentCard(QWidget):
         self.payment_method_data = db.get_payments()  # Local DB payments
         if not self.payment_method_data:  # Fallback to API if DB is empty
             logger.warning("No payment methods found in local DB, fetching from API")
+            from Helper.api import get_payments_from_api
+
             self.payment_method_data = get_payments_from_api()
 
         if not self.payment_method_data:
@@ -734,8 +668,7 @@ class PaymentCard(QWidget):
 
         # Order info
         order_info_layout = QHBoxLayout()
-        order_number = f"ORD-{random.randint(1000, 9999)}"
-        self.order_no_label = QLabel(f"Order No: {order_number}")
+        self.order_no_label = QLabel(f"Order No: {db.peek_order_numbers()[0]}")
         self.date_label = QLabel(f"Date: {datetime.now().strftime('%d/%m/%Y')}")
         self.order_no_label.setStyleSheet("color: #333;")
         self.date_label.setStyleSheet("color: #333;")
@@ -987,7 +920,7 @@ class PaymentCard(QWidget):
         self.ground_total_label.setText(f"GROUND TOTAL AMOUNT: {ground_total:.2f}")
 
     def update_payment_method(self, method):
-        logger.debug(f"Payment method changed to: {method}")
+        logger.debug("Payment method changed to: %s", method)
 
     def show_more_options(self):
         QMessageBox.information(
@@ -999,105 +932,27 @@ class PaymentCard(QWidget):
             self, "Split Bill", "Split bill functionality to be implemented."
         )
 
-    def print_receipt(self):
-        """Print receipt to an 80mm USB printer using python-escpos and open cash drawer."""
-        logger.debug("Starting print_receipt using python-escpos")
-        company_details = db.get_company_details()
-        logger.debug(f"Raw company details from DB: {company_details}")
-        company = (
-            company_details[0]
-            if company_details
-            else {
-                "company_name": "Unknown Company",
-                "address": "N/A",
-                "state": "N/A",
-                "phone": "N/A",
-                "tin_no": "N/A",
-                "vrn_no": "N/A",
-            }
-        )
-
-        company["company_name"] = company["company_name"].replace("22", "").strip()
-        logger.debug(f"Company name after cleanup: '{company['company_name']}'")
+    @tracer.traced("print_receipt")
+    def print_receipt(self, receipt):
+        """Queue a receipt record and the cash drawer kick.
 
+        The printer's spooler talks to it on its own thread, so a slow
+        or unplugged printer never holds up the checkout; failures are shown
+        in the dashboard's status bar and retried.
+        """
         try:
-            VENDOR_ID = 0x1D90
-            PRODUCT_ID = 0x2060
-            printer = Usb(VENDOR_ID, PRODUCT_ID, in_ep=0x81, out_ep=0x2)
-            logger.info(
-                f"Connected to USB printer with VID: {VENDOR_ID:04x}, PID: {PRODUCT_ID:04x}"
-            )
-
-            printer.cashdraw([0, 25, 25])
-            logger.debug("Sent cash drawer open command (pin 2)")
-
-            printer.set(align="center")
-            printer.text(f"{company['company_name']}\n")
-            printer.text(f"{company['address']}\n")
-            if company["state"]:
-                printer.text(f"{company['state']}\n")
-            printer.text(f"Tel: {company['phone']}\n")
-            printer.text(f"TIN: {company['tin_no']} VRN: {company['vrn_no']}\n")
-            printer.text("\n")
-            printer.text("RECEIPT\n")
-            printer.text("\n")
-            printer.set(align="left")
-            printer.text(
-                f"Order: {self.order_no_label.text().replace('Order No: ', '')}\n"
-            )
-            printer.text(f"Date: {self.date_label.text().replace('Date: ', '')}\n")
-            printer.text(f"Payment: {self.payment_method.currentText()}\n")
-            printer.text("-" * 42 + "\n")
-            printer.text("Item                Qty  Price Total\n")
-            printer.text("-" * 42 + "\n")
-
-            table = self.dashboard_view.table
-            for row in range(table.rowCount()):
-                item = table.item(row, 0).text()[:18].ljust(18)
-                qty = table.item(row, 2).text().rjust(3)
-                price = f"{float(table.item(row, 3).text()):.2f}".rjust(6)
-                total = f"{float(qty) * float(price):.2f}".rjust(6)
-                printer.text(f"{item} {qty} {price} {total}\n")
-
-            printer.text("-" * 42 + "\n")
-            printer.set(align="right")
-            printer.text(f"Subtotal: {self.total_amount:.2f}\n")
-            printer.text(f"Tip:      {self.tip:.2f}\n")
-            printer.text(f"Discount: {self.discount:.2f}\n")
-            printer.text("-" * 32 + "\n")
-            printer.text(
-                f"TOTAL:    {self.total_amount + self.tip - self.discount:.2f}\n"
-            )
-            printer.set(align="center")
-            printer.text("\nThank you for your purchase!\n")
-            printer.text("Visit us again!\n")
-            printer.text("\n\n\n")
-
-            printer.cut()
-            printer.close()
-            logger.info("Receipt printed successfully and cash drawer opened")
-
-        except usb.core.USBError as e:
-            logger.error(f"USB error: {str(e)}")
-            QMessageBox.critical(
-                self,
-                "Print Error",
-                f"USB error: {str(e)}\nCheck printer connection or permissions.",
-            )
+            job_id = print_router.submit("receipt", receipt, open_drawer=True)
+            logger.info("Queued receipt %s as print job %s", receipt["order_number"], job_id)
         except Exception as e:
-            logger.error(f"Failed to print receipt or open cash drawer: {str(e)}")
-            QMessageBox.critical(
+            logger.error("Failed to queue receipt: %s", e)
+            QMessageBox.warning(
                 self,
                 "Print Error",
-                f"Failed to print or open cash drawer:\n{str(e)}\nCheck printer and cash drawer setup.",
+                f"The order was saved but its receipt could not be queued:\n{str(e)}",
             )
 
-    def render_receipt(self, printer, company):
-        """Render the receipt content to the 80mm printer with debugging."""
-        logger.debug("Starting render_receipt")
-        company["company_name"] = company["company_name"].replace("22", "").strip()
-        logger.debug(f"Company name after cleanup: '{company['company_name']}'")
-
+    def render_receipt(self, printer, receipt):
+        """Paint a receipt record on a QPrinter using the receipt template."""
         painter = QPainter()
         if not painter.begin(printer):
             logger.error("Failed to initialize painter for printing")
@@ -1106,137 +961,89 @@ class PaymentCard(QWidget):
         try:
             font = QFont("Courier", 8)
             painter.setFont(font)
-            metrics = QFontMetrics(font)
-
+            line_height = QFontMetrics(font).height()
+            template = receipt_template()
+            lines = template.text(receipt).split("\n")
             x, y = 5, 5
-            line_height = metrics.height()
-
-            receipt_lines = [
-                f"{company['company_name'][:32]:^32}",
-                f"{company['address'][:32]:^32}",
-            ]
-            if company["state"]:
-                receipt_lines.append(f"{company['state'][:32]:^32}")
-            receipt_lines.extend(
-                [
-                    f"Tel: {company['phone'][:28]:^32}",
-                    f"TIN: {company['tin_no']} VRN: {company['vrn_no'][:20]:^32}",
-                    "",
-                    "RECEIPT".center(32),
-                    "",
-                    f"Order: {self.order_no_label.text().replace('Order No: ', '')[:26]}",
-                    f"Date: {self.date_label.text().replace('Date: ', '')}",
-                    f"Payment: {self.payment_method.currentText()[:24]}",
-                    "",
-                    "-" * 32,
-                    "Item          Qty  Price Total",
-                    "-" * 32,
-                ]
-            )
-
-            table = self.dashboard_view.table
-            for row in range(table.rowCount()):
-                item = table.item(row, 0).text()[:13].ljust(13)
-                qty = table.item(row, 2).text().rjust(3)
-                price = f"{float(table.item(row, 3).text()):.2f}".rjust(6)
-                total = f"{float(qty) * float(price):.2f}".rjust(6)
-                receipt_lines.append(f"{item} {qty} {price} {total}")
-
-            receipt_lines.extend(
-                [
-                    "",
-                    "-" * 32,
-                    f"Subtotal: {self.total_amount:.2f}".rjust(32),
-                    f"Tip:      {self.tip:.2f}".rjust(32),
-                    f"Discount: {self.discount:.2f}".rjust(32),
-                    "-" * 32,
-                    f"TOTAL:    {self.total_amount + self.tip - self.discount:.2f}".rjust(
-                        32
-                    ),
-                    "",
-                    "Thank you for your purchase!".center(32),
-                    "Visit us again!".center(32),
-                    "",
-                ]
-            )
-
-            for line in receipt_lines:
+            for line in lines:
                 painter.drawText(x, y, line)
                 y += line_height
-
-            logger.debug(f"Rendered {len(receipt_lines)} lines on receipt")
-            painter.end()
-            logger.debug("Painter ended successfully")
-
-        except Exception as e:
+            logger.debug("Rendered %d lines on receipt", len(lines))
+        finally:
             painter.end()
-            logger.error(f"Rendering error: {str(e)}")
-            raise Exception(f"Rendering error: {str(e)}")
 
     def confirm_payment(self):
         logger.debug("Starting confirm_payment")
         try:
-            ground_total = self.total_amount + self.tip - self.discount
-
-            table = self.dashboard_view.table
-            items = []
-            for row in range(table.rowCount()):
-                item_name_widget = table.item(row, 0)
-                if not item_name_widget:
-                    raise ValueError(f"No item name found at row {row}")
-                item_name = item_name_widget.text()
-                item_id = item_name_widget.data(Qt.UserRole)
-                if not item_id:
-                    raise ValueError(f"Item ID not found for {item_name} at row {row}")
-
-                qty = int(table.item(row, 2).text())
-                price = float(table.item(row, 3).text())
-                items.append({"item_id": item_id, "quantity": qty, "price": price})
-
-            customer_type_name = self.dashboard_view.customer_type.currentText()
-            customer_type_id = next(
-                (
-                    ct["id"]
-                    for ct in self.dashboard_view.customer_types_data
-                    if ct["name"] == customer_type_name
-                ),
-                None,
-            )
-            if not customer_type_id:
-                raise ValueError(f"Customer type ID not found for {customer_type_name}")
-
-            customer_id = (
-                self.dashboard_view.customer_select.currentData()
-                if customer_type_name.lower() == "registered"
-                else None
-            )
+            # Stops before the dialog opens: time spent in it is the cashier's.
+            with tracer.span("payment_card"):
+                ground_total = self.total_amount + self.tip - self.discount
+
+                table = self.dashboard_view.table
+                items = []
+                for row in range(table.rowCount()):
+                    item_name_widget = table.item(row, 0)
+                    if not item_name_widget:
+                        raise ValueError(f"No item name found at row {row}")
+                    item_name = item_name_widget.text()
+                    item_id = item_name_widget.data(Qt.UserRole)
+                    if not item_id:
+                        raise ValueError(f"Item ID not found for {item_name} at row {row}")
+
+                    qty = int(table.item(row, 2).text())
+                    price = float(table.item(row, 3).text())
+                    items.append(
+                        {
+                            "item_id": item_id,
+                            "name": item_name,
+                            "quantity": qty,
+                            "price": price,
+                        }
+                    )
+
+                customer_type_name = self.dashboard_view.customer_type.currentText()
+                customer_type_id = next(
+                    (
+                        ct["id"]
+                        for ct in self.dashboard_view.customer_types_data
+                        if ct["name"] == customer_type_name
+                    ),
+                    None,
+                )
+                if not customer_type_id:
+                    raise ValueError(f"Customer type ID not found for {customer_type_name}")
 
-            payment_index = self.payment_method.currentIndex()
-            payment_data = self.payment_method.itemData(payment_index)
-            if not payment_data:
-                raise ValueError(
-                    f"No payment data found for selected method: {self.payment_method.currentText()}"
+                customer_id = (
+                    self.dashboard_view.customer_select.currentData()
+                    if customer_type_name.lower() == "registered"
+                    else None
                 )
 
-            payment_id = payment_data["id"]
-            payment_method = payment_data["short_code"]
-            logger.debug(f"Selected payment: {payment_method} (ID: {payment_id})")
-
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            order_number = f"ORD-{random.randint(1000, 9999)}"
-            receipt_number = f"REC-{datetime.now().strftime('%H%M%S')}"
-            order_data = {
-                "order_number": order_number,
-                "receipt_number": receipt_number,
-                "date": timestamp,
-                "customer_type_id": customer_type_id,
-                "total_amount": self.total_amount,
-                "tip": self.tip,
-                "discount": self.discount,
-                "ground_total": ground_total,
-                "status": "all",
-                "is_active": 1,
-            }
+                payment_index = self.payment_method.currentIndex()
+                payment_data = self.payment_method.itemData(payment_index)
+                if not payment_data:
+                    raise ValueError(
+                        f"No payment data found for selected method: {self.payment_method.currentText()}"
+                    )
+
+                payment_id = payment_data["id"]
+                payment_method = payment_data["short_code"]
+                logger.debug("Selected payment: %s (ID: %s)", payment_method, payment_id)
+
+                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                # db.save_order allocates both numbers
+                order_data = {
+                    "order_number": None,
+                    "receipt_number": None,
+                    "date": timestamp,
+                    "customer_type_id": customer_type_id,
+                    "total_amount": self.total_amount,
+                    "tip": self.tip,
+                    "discount": self.discount,
+                    "ground_total": ground_total,
+                    "status": "all",
+                    "is_active": 1,
+                }
 
             dialog = PaymentConfirmationDialog(
                 self, order_data, items, payment_id, customer_id
@@ -1244,7 +1051,7 @@ class PaymentCard(QWidget):
             dialog.exec_()
 
         except ValueError as ve:
-            logger.error(f"Validation error: {ve}")
+            logger.error("Validation error: %s", ve)
             QMessageBox.critical(self, "Error", str(ve))
         except Exception as e:
             logger.error(f"Unexpected error: {e}", exc_info=True)
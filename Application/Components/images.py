@@ -0,0 +1,33 @@
+from PyQt5.QtGui import QIcon, QPixmap, QImage
+
+
+def load_icon(icon_path):
+    """Loads an icon from the given path."""
+    return QIcon(QPixmap(icon_path))
+
+
+def load_image(image_url):
+    """Loads a QPixmap image from a file path or URL."""
+    pixmap = QPixmap()
+    if image_url.startswith(("http://", "https://")):
+        import requests
+
+        try:
+            response = requests.get(image_url, stream=True, timeout=10)
+            response.raise_for_status()
+            image = QImage()
+            image.loadFromData(response.content)
+            if not image.isNull():
+                pixmap = QPixmap.fromImage(image)
+            else:
+                print(
+                    f"Failed to load image from URL: {image_url} - Invalid image data"
+                )
+        except requests.exceptions.RequestException as e:
+            print(f"Error loading image from URL {image_url}: {e}")
+            return QPixmap()
+    else:
+        if not pixmap.load(image_url):
+            print(f"Failed to load image from local path: {image_url}")
+            return QPixmap()
+    return pixmap
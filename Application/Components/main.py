@@ -1,5 +1,5 @@
+import logging
 import os
-import socket
 import sqlite3
 import sys
 from datetime import datetime, date, timedelta
@@ -8,32 +8,35 @@ from PyQt5.QtCore import *
 from PyQt5.QtGui import QIcon, QPixmap
 from Application.Components.DayClose.day_close import DayCloseManager
 from Application.Components.Inventory.Expenses.model import ExpenseManager
-from Application.Components.Inventory.Main import InventoryView, MainInventoryWindow
 from Application.Components.OrderSummary.Carts.modal import CartModel
-from Application.Components.Reports.View import ReportView
 from Application.Components.components import Sidebar, ProductCard, PaymentCard
-from Application.Components.OrderSummary.order_summary import OrderSummaryView
+from Application.Components.change_relay import ChangeEventRelay
+from Application.Components.images import load_icon
+from Application.Components.print_relay import PrintStatusRelay
+from Application.Components.scheduler_driver import SchedulerDriver
+from Helper.change_bus import change_bus
 from Helper.db_conn import db
-from Helper.api import sync_data_with_server, load_icon
+from Helper.connectivity import ConnectivityMonitor
+from Helper.network import API_BASE_URL, host_and_port
+from Helper.print_devices import CASH_DRAWER, DOCUMENTS, print_router
+from Helper.scheduler import scheduler
+from Helper.startup_profile import startup_profiler
+from Helper.tracing import tracer
 
+# The order summary, report and inventory pages, and Helper.api (which pulls
+# in requests), are imported when first needed to keep startup short.
 
-def load_icon(icon_path):
-    """Loads an icon from the given path."""
-    return QIcon(QPixmap(icon_path))
+logger = logging.getLogger(__name__)
 
 
 def get_resource_path(relative_path):
     """Get the absolute path to a resource, works for dev and PyInstaller."""
     if hasattr(sys, "_MEIPASS"):
         base_path = sys._MEIPASS
-        print(f"Running in PyInstaller bundle, base path: {base_path}")
     else:
         base_path = os.path.abspath(".")
-        print(f"Running in dev mode, base path: {base_path}")
     full_path = os.path.join(base_path, relative_path)
-    print(
-        f"Resolved path for {relative_path}: {full_path}, exists: {os.path.exists(full_path)}"
-    )
+    logger.debug("Resolved resource %s -> %s", relative_path, full_path)
     return full_path
 
 
@@ -311,6 +314,10 @@ class DayCloseView(QWidget):
             traceback.print_exc()
 
 
+# Sidebar entry of PrinterSettingsWindow for the print_routes table
+PRINT_ROUTING = "Print Routing"
+
+
 class PrinterSettingsWindow(QDialog):
     def __init__(self, parent=None, db=None):
         super().__init__(parent)
@@ -334,7 +341,7 @@ class PrinterSettingsWindow(QDialog):
             "background-color: #f8f9fa; border-radius: 8px; padding: 10px;"
         )
 
-        printer_options = self.db.get_virtual_device_data()
+        printer_options = self.db.get_virtual_device_data() + [PRINT_ROUTING]
         for text in printer_options:
             btn = QPushButton(text)
             btn.setStyleSheet(
@@ -455,6 +462,58 @@ class PrinterSettingsWindow(QDialog):
         self.input_fields["drawer_code"].setPlaceholderText("e.g., 27,112,0,25,250")
         self.form_layout.addWidget(self.input_fields["drawer_code"], 1, 1)
 
+    def create_routing_form(self):
+        self.input_fields = {}
+        printers = [
+            device["printer_name"]
+            for device in self.db.get_print_devices()
+            if device["printer_type"] != CASH_DRAWER
+        ]
+        routes = self.db.get_print_routes()
+        hint = QLabel(
+            "Each document prints on the least busy checked printer; "
+            "with none checked it goes to the first printer."
+            if printers
+            else "Add a printer first; documents go to the receipt printer."
+        )
+        hint.setWordWrap(True)
+        self.form_layout.addWidget(hint, 0, 0, 1, 2)
+        for row, document in enumerate(DOCUMENTS, start=1):
+            self.form_layout.addWidget(QLabel(document.replace("_", " ").title()), row, 0)
+            printer_list = QListWidget()
+            printer_list.setMaximumHeight(80)
+            for name in printers:
+                entry = QListWidgetItem(name)
+                entry.setFlags(entry.flags() | Qt.ItemIsUserCheckable)
+                entry.setCheckState(
+                    Qt.Checked if name in routes.get(document, []) else Qt.Unchecked
+                )
+                printer_list.addItem(entry)
+            self.input_fields[document] = printer_list
+            self.form_layout.addWidget(printer_list, row, 1)
+
+    def save_routes(self):
+        try:
+            for document in DOCUMENTS:
+                printer_list = self.input_fields[document]
+                entries = [printer_list.item(i) for i in range(printer_list.count())]
+                self.db.set_print_route(
+                    document,
+                    [entry.text() for entry in entries if entry.checkState() == Qt.Checked],
+                )
+        except sqlite3.Error as e:
+            QMessageBox.critical(
+                self,
+                "Database Error",
+                f"Failed to save print routing: {str(e)}",
+                QMessageBox.Ok,
+            )
+            return
+        QMessageBox.information(
+            self, "Success", "Print routing saved successfully.", QMessageBox.Ok
+        )
+        self.accept()
+
     def select_printer_type(self, printer_type):
         self.selected_printer = printer_type
         self.error_label.setVisible(False)
@@ -466,7 +525,9 @@ class PrinterSettingsWindow(QDialog):
         self.sender().setChecked(True)
 
         self.clear_form()
-        if "Network Printer" in printer_type:
+        if printer_type == PRINT_ROUTING:
+            self.create_routing_form()
+        elif "Network Printer" in printer_type:
             self.create_network_printer_form()
         elif "Bluetooth Printer" in printer_type:
             self.create_bluetooth_printer_form()
@@ -492,6 +553,9 @@ class PrinterSettingsWindow(QDialog):
         if not self.selected_printer:
             self.error_label.setVisible(True)
             return
+        if self.selected_printer == PRINT_ROUTING:
+            self.save_routes()
+            return
 
         virtual_device_id = self.get_virtual_device_id(self.selected_printer)
         if not virtual_device_id:
@@ -566,11 +630,18 @@ class SyncWorker(QThread):
     sync_finished = pyqtSignal(bool)
 
     def run(self):
-        success = sync_data_with_server()
+        from Helper.sync.jobs import run_job
+
+        success = run_job("pull").get("success", False)
+        if success:
+            run_job("push")
         self.sync_finished.emit(success)
 
 
 class DashboardView(QMainWindow):
+    # update_product_grid shows at most 4 rows of 5 cards
+    GRID_CAPACITY = 20
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("AMALI v.1.0")
@@ -848,7 +919,8 @@ class DashboardView(QMainWindow):
 
         self.customer_label = QLabel("Select Customer:")
         self.customer_select = QComboBox()
-        self.customers_data = db.get_customers()
+        # Loaded after the window is shown; the selector starts hidden
+        self.customers_data = []
         self.populate_customers_combobox()
         self.customer_select.setStyleSheet(
             """
@@ -904,26 +976,8 @@ class DashboardView(QMainWindow):
         self.checkout_layout.addLayout(btn_layout)
         content_layout.addWidget(self.checkout_widget, 3)
 
-        # Order Summary View
-        self.order_summary_view = OrderSummaryView(self)
-        self.stacked_widget.addWidget(self.order_summary_view)
-        self.order_summary_index = 1
-
-        # Day Close View
-        self.day_close_view = DayCloseView(db_helper=self.db_helper)
-        self.stacked_widget.addWidget(self.day_close_view)
-        self.day_close_index = 2
-        self.day_close_view.day_close_saved.connect(self.enable_header)
-
-        # Report View
-        self.report_view = ReportView()
-        self.stacked_widget.addWidget(self.report_view)
-        self.report_index = 3
-
-        # Inventory View
-        self.inventory_view = MainInventoryWindow()
-        self.stacked_widget.addWidget(self.inventory_view)
-        self.inventory_index = 4
+        # The other pages of the stack are built on first navigation
+        self._pages = {}
 
         # Connections
         self.sidebar.group_selected.connect(self.update_category_cards)
@@ -937,22 +991,132 @@ class DashboardView(QMainWindow):
 
         self.current_items = []
         self.current_category_id = None
+        self.current_group_name = None
         self.product_cards = {}
         self.pending_barcode = ""
 
+        # Sync and local writes publish what they changed; only the affected
+        # widgets are patched instead of redrawing everything after a sync.
+        self.change_relay = ChangeEventRelay(
+            ["items", "item_groups", "categories", "customers", "customer_types"],
+            self,
+        )
+        # Queued even for publishes on the GUI thread, so widgets are never
+        # patched from inside the call stack of the write that published
+        self.change_relay.changed.connect(self.on_data_changed, Qt.QueuedConnection)
+
+        # Checkout stage timings roll up into per-day histograms in the DB
+        tracer.sink = db.record_latency_histograms
+
         item_groups = db.get_local_item_groups()
         if item_groups:
             self.update_category_cards(item_groups[0])
 
-        self.sync_timer = QTimer(self)
-        self.sync_timer.timeout.connect(self.start_sync_thread)
-        self.sync_timer.start(10000)
         self.sync_thread = None
-        self.check_internet_on_startup()
+        self.sync_done = None
+        self.offline_notified = False
+        self.connectivity_monitor = None
+        self.print_relay = None
+
+        # Periodic work goes through the shared scheduler. Heavy jobs wait
+        # while a sale is in progress and run once the till is idle.
+        scheduler.is_busy = self.is_checkout_busy
+        scheduler.register(
+            "sync",
+            self.start_sync_thread,
+            10,
+            group="network",
+            heavy=True,
+            max_backoff=300,
+            max_defer=120,
+            asynchronous=True,
+        )
+        scheduler.pause("sync")  # until the API host is reported online
+        self.scheduler_driver = SchedulerDriver(scheduler, self)
+
+        # Everything the sales grid does not need waits until the window
+        # has been shown.
+        QTimer.singleShot(0, self.finish_startup)
+
+    def finish_startup(self):
+        startup_profiler.mark("first paint")
+        self.customers_data = db.get_customers()
+        self.populate_customers_combobox()
+
+        # Reachability of the API host is probed off the GUI thread; syncing
+        # only runs while the monitor reports the host as online.
+        self.connectivity_monitor = ConnectivityMonitor(*host_and_port(API_BASE_URL))
+        self.connectivity_monitor.online.connect(self.on_connection_online)
+        self.connectivity_monitor.offline.connect(self.on_connection_offline)
+        self.connectivity_monitor.start()
+
+        # A sync daemon (python -m Helper.sync --daemon) records the changes
+        # it makes; replay them here so the views are patched as usual.
+        self.last_change_event_id = db.get_last_change_event_id()
+        scheduler.register("replay_daemon_changes", self.replay_daemon_changes, 2)
+        self.scheduler_driver.start()
+
+        # Receipts are printed by a background spooler; receipts left in
+        # its queue by the last session are printed now.
+        self.print_relay = PrintStatusRelay(print_router, self)
+        self.print_relay.job_status.connect(self.on_print_job_status)
+        print_router.start()
+        startup_profiler.mark("deferred startup")
+        startup_profiler.report()
 
         # Check and perform day close on startup
         self.check_and_perform_day_close()
 
+    def _page(self, name):
+        """Returns the stacked page `name`, building it on first use."""
+        page = self._pages.get(name)
+        if page is None:
+            page = getattr(self, f"_create_{name}_view")()
+            self.stacked_widget.addWidget(page)
+            self._pages[name] = page
+        return page
+
+    def show_page(self, name):
+        self.stacked_widget.setCurrentWidget(self._page(name))
+
+    def _create_order_summary_view(self):
+        from Application.Components.OrderSummary.order_summary import (
+            OrderSummaryView,
+        )
+
+        return OrderSummaryView(self)
+
+    def _create_day_close_view(self):
+        view = DayCloseView(db_helper=self.db_helper)
+        view.day_close_saved.connect(self.enable_header)
+        return view
+
+    def _create_report_view(self):
+        from Application.Components.Reports.View import ReportView
+
+        return ReportView()
+
+    def _create_inventory_view(self):
+        from Application.Components.Inventory.Main import MainInventoryWindow
+
+        return MainInventoryWindow()
+
+    @property
+    def order_summary_view(self):
+        return self._page("order_summary")
+
+    @property
+    def day_close_view(self):
+        return self._page("day_close")
+
+    @property
+    def report_view(self):
+        return self._page("report")
+
+    @property
+    def inventory_view(self):
+        return self._page("inventory")
+
     def disable_header(self):
         self.header.setEnabled(False)
 
@@ -970,7 +1134,7 @@ class DashboardView(QMainWindow):
         for store in stores:
             if not self.db_helper.check_day_close_exists(store["id"], current_date):
                 print("DashboardView: No day close found, switching to DayCloseView")
-                self.stacked_widget.setCurrentIndex(self.day_close_index)
+                self.show_page("day_close")
                 self.disable_header()
                 reply = QMessageBox.question(
                     self,
@@ -994,17 +1158,17 @@ class DashboardView(QMainWindow):
             not self.db_helper.check_day_close_exists(store["id"], current_date)
             for store in stores
         )
-        self.stacked_widget.setCurrentIndex(self.day_close_index)
+        self.show_page("day_close")
         if day_close_pending:
             self.disable_header()
 
     def open_inventory_view(self):
         print("Opening Inventory View")
-        self.stacked_widget.setCurrentIndex(self.inventory_index)
+        self.show_page("inventory")
 
     def open_report_view(self):
         print("Opening Report View")
-        self.stacked_widget.setCurrentIndex(self.report_index)
+        self.show_page("report")
 
     def dashboard_view(self):
         self.stacked_widget.setCurrentIndex(0)
@@ -1114,7 +1278,7 @@ class DashboardView(QMainWindow):
                 }
             )
         self.order_summary_view.set_orders(orders)
-        self.stacked_widget.setCurrentIndex(self.order_summary_index)
+        self.show_page("order_summary")
 
     def open_delivery_view(self):
         print("Switching to Delivery View")
@@ -1132,7 +1296,7 @@ class DashboardView(QMainWindow):
                 }
             )
         self.order_summary_view.set_orders(orders)
-        self.stacked_widget.setCurrentIndex(self.order_summary_index)
+        self.show_page("order_summary")
 
     def toggle_search_mode(self):
         self.is_barcode_mode = not self.is_barcode_mode
@@ -1149,26 +1313,60 @@ class DashboardView(QMainWindow):
             self.product_search.setFocus()
             self.product_barcode_search.clear()
 
-    def start_sync_thread(self):
-        if self.sync_thread is None or not self.sync_thread.isRunning():
-            if self.is_internet_available():
-                print("Internet available, starting sync in background...")
-                self.sync_thread = SyncWorker()
-                self.sync_thread.sync_finished.connect(self.on_sync_finished)
-                self.sync_thread.start()
-            else:
-                print("No internet connection, skipping sync")
+    def start_sync_thread(self, done):
+        """The scheduler's "sync" job; calls `done(success)` when finished."""
+        if db.sync_daemon_alive():
+            # A separate sync process owns syncing; only read its results
+            done(True)
+            return
+        if self.sync_thread is not None and self.sync_thread.isRunning():
+            done(True)
+            return
+        if not self.is_internet_available():
+            print("No internet connection, skipping sync")
+            done(False)
+            return
+        print("Internet available, starting sync in background...")
+        self.sync_done = done
+        self.sync_thread = SyncWorker()
+        self.sync_thread.sync_finished.connect(self.on_sync_finished)
+        self.sync_thread.start()
+
+    def is_checkout_busy(self):
+        """True while a basket is open or the payment card is showing."""
+        return self.table.rowCount() > 0 or self.payment_card.isVisible()
+
+    def replay_daemon_changes(self):
+        events = db.get_change_events(self.last_change_event_id)
+        if not events:
+            return
+        with change_bus.batch():
+            for event_id, entity, op, ids in events:
+                change_bus.publish(entity, ids, op)
+        self.last_change_event_id = events[-1][0]
 
     def on_sync_finished(self, success):
         if success:
-            print("Sync successful, updating UI...")
-            self.update_ui_after_sync()
+            print("Sync successful")
         else:
             print("Sync failed")
+            # A failed sync usually means the host went away; re-probe now
+            # instead of waiting for the next monitor cycle.
+            self.connectivity_monitor.check_now()
         self.sync_thread = None
-
-    def check_internet_on_startup(self):
-        if not self.is_internet_available():
+        if self.sync_done is not None:
+            self.sync_done, done = None, self.sync_done
+            done(success)
+
+    def on_connection_online(self):
+        print("API host reachable, resuming background sync")
+        scheduler.resume("sync", run_now=True)
+
+    def on_connection_offline(self):
+        print("API host unreachable, pausing background sync")
+        scheduler.pause("sync")
+        if not self.offline_notified:
+            self.offline_notified = True
             QMessageBox.warning(
                 self,
                 "Offline Mode",
@@ -1177,34 +1375,85 @@ class DashboardView(QMainWindow):
             )
 
     def is_internet_available(self):
-        try:
-            socket.create_connection(("www.google.com", 80), timeout=2)
-            return True
-        except OSError:
-            return False
+        monitor = self.connectivity_monitor
+        return monitor is not None and monitor.is_online
+
+    def closeEvent(self, event):
+        tracer.flush()
+        self.scheduler_driver.stop()
+        logger.info("Scheduled job stats: %s", scheduler.stats())
+        if self.connectivity_monitor is not None:
+            self.connectivity_monitor.stop()
+        self.change_relay.close()
+        if self.print_relay is not None:
+            self.print_relay.close()
+        print_router.stop()
+        super().closeEvent(event)
+
+    def on_print_job_status(self, device, job_id, status, error):
+        if status == "failed":
+            self.statusBar().showMessage(
+                f"Printing on {device} failed: {error}. Check the printer and paper."
+            )
+        elif status == "pending" and error:
+            self.statusBar().showMessage(
+                f"Printer {device} error, retrying: {error}", 10000
+            )
+        elif status == "done":
+            self.statusBar().clearMessage()
+
+    def on_data_changed(self, event):
+        if event.entity == "items":
+            self.patch_product_cards(event)
+        elif event.entity == "item_groups":
+            self.sidebar.item_groups_data = db.get_local_item_groups()
+            self.sidebar.filter_groups(self.sidebar.search.text())
+        elif event.entity == "categories":
+            if self.current_group_name:
+                self.update_category_cards(self.current_group_name, select_first=False)
+        elif event.entity == "customer_types":
+            self.customer_types_data = db.get_customer_types()
+            current = self.customer_type.currentText()
+            self.customer_type.blockSignals(True)
+            self.customer_type.clear()
+            self.customer_type.addItems([ct["name"] for ct in self.customer_types_data])
+            index = self.customer_type.findText(current)
+            self.customer_type.setCurrentIndex(max(index, 0))
+            self.customer_type.blockSignals(False)
+            self.on_customer_type_changed(self.customer_type.currentText())
+        elif event.entity == "customers":
+            self.customers_data = db.get_customers()
+            self.populate_customers_combobox()
+
+    def patch_product_cards(self, event):
+        """Applies an item change event to the visible product grid."""
+        if self.current_category_id is None:
+            # Search results are left alone until the search changes
+            return
+        if event.op == "update" and not event.ids & self.product_cards.keys():
+            return
 
-    def update_ui_after_sync(self):
-        self.sidebar.update_group_buttons(db.get_local_item_groups())
-        if self.current_category_id:
-            self.update_product_grid(self.current_category_id)
-        self.customer_types_data = db.get_customer_types()
-        self.customers_data = db.get_customers()
-        self.customer_type.clear()
-        self.customer_type.addItems([ct["name"] for ct in self.customer_types_data])
-        self.populate_customers_combobox()
-        self.refresh_product_cards()
+        items = db.get_local_items_for_category(self.current_category_id)
+        self.current_items = items
+        visible_ids = [item["item_id"] for item in items]
+        if visible_ids[: self.GRID_CAPACITY] != list(self.product_cards):
+            # Cards were added or removed; the layout itself has to change
+            self.update_product_grid(self.current_category_id, items)
+            return
 
-    def refresh_product_cards(self):
-        if self.current_category_id:
-            items = db.get_local_items_for_category(self.current_category_id)
-            self.current_items = items
-            self.update_product_grid(self.current_category_id)
+        for item in items:
+            card = self.product_cards.get(item["item_id"])
+            if card is not None and item["item_id"] in event.ids:
+                card.update_item(item)
 
     def populate_customers_combobox(self):
+        selected = self.customer_select.currentData()
         self.customer_select.clear()
         self.customer_select.addItem("Walk-in Customer", None)
         for customer in self.customers_data:
             self.customer_select.addItem(customer["name"], customer["id"])
+        index = self.customer_select.findData(selected)
+        self.customer_select.setCurrentIndex(max(index, 0))
 
     def on_customer_type_changed(self, text):
         is_registered = text.lower() == "registered"
@@ -1213,7 +1462,8 @@ class DashboardView(QMainWindow):
         if not is_registered:
             self.customer_select.setCurrentIndex(0)
 
-    def update_category_cards(self, group_name):
+    def update_category_cards(self, group_name, select_first=True):
+        self.current_group_name = group_name
         for i in reversed(range(self.category_layout.count())):
             widget = self.category_layout.itemAt(i).widget()
             if widget:
@@ -1235,7 +1485,7 @@ class DashboardView(QMainWindow):
                     lambda checked, cid=category["id"]: self.update_product_grid(cid)
                 )
                 self.category_layout.addWidget(btn)
-                if idx == 0:
+                if idx == 0 and select_first:
                     self.update_product_grid(category["id"])
         else:
             no_data_label = QLabel("No categories available")
@@ -1256,34 +1506,23 @@ class DashboardView(QMainWindow):
         else:
             items = filtered_items
 
-        print(f"Updating grid with {len(items)} items for category {category_id}")
+        logger.debug("Updating grid with %d items for category %s", len(items), category_id)
 
         self.product_cards.clear()
         if items:
             row, col = 0, 0
-            added_item_ids = set()
             for item in items:
-                item_id = item["item_id"]
-                if item_id in added_item_ids:
-                    print(
-                        f"Skipping duplicate item: {item['item_name']} (ID: {item_id})"
-                    )
-                    continue
-
-                print(f"Adding item: {item['item_name']}")
                 card = ProductCard(item)
                 card.clicked.connect(self.add_item_to_checkout)
                 self.product_grid.addWidget(card, row, col, alignment=Qt.AlignTop)
-                self.product_cards[item_id] = card
-                added_item_ids.add(item_id)
+                self.product_cards[item["item_id"]] = card
                 col += 1
                 if col > 4:
                     col = 0
                     row += 1
-                if row > 3 and col == 0:
+                if len(self.product_cards) >= self.GRID_CAPACITY:
                     break
         else:
-            print("No items to display")
             no_items_label = QLabel("No items available")
             no_items_label.setStyleSheet("color: #7f8c8d; padding: 10px;")
             self.product_grid.addWidget(no_items_label, 0, 0, alignment=Qt.AlignTop)
@@ -1297,39 +1536,13 @@ class DashboardView(QMainWindow):
                 self.update_product_grid(self.current_category_id)
             return
 
-        # Fetch all items from the database
-        all_items = db.get_all_local_items()
-        if not all_items:
-            print("No items found in database for global search")
-            self.update_product_grid(self.current_category_id, [])
-            return
-
-        # Filter items based on 'name' (case-insensitive)
-        filtered_items = [
-            item for item in all_items if text.lower() in item.get("name", "Unnamed Item").lower()
-        ]
-
-        # Deduplicate items by 'id' and adapt to expected UI structure
-        seen_item_ids = set()
-        deduplicated_filtered_items = []
-        for item in filtered_items:
-            item_id = item.get("id")
-            if item_id and item_id not in seen_item_ids:
-                # Transform to match UI expected structure
-                ui_item = {
-                    "item_id": item_id,
-                    "item_name": item.get("name", "Unnamed Item"),
-                    "item_unit": item.get("selling_unit_name", ""),
-                    "item_price": list(item.get("prices", {}).values())[0] if item.get("prices") else 0.0,
-                    "stock_quantity": list(item.get("stocks", {}).values())[0].get("stock_quantity", 0.0) if item.get("stocks") else 0.0,
-                }
-                deduplicated_filtered_items.append(ui_item)
-                seen_item_ids.add(item_id)
-
-        self.update_product_grid(None, deduplicated_filtered_items)
-        print(f"Filtered {len(deduplicated_filtered_items)} items globally with query: '{text}'")
+        items = db.search_catalog(text.strip(), limit=self.GRID_CAPACITY)
+        self.update_product_grid(None, items)
+        logger.debug("Filtered %d items globally with query %r", len(items), text)
 
+    @tracer.traced("cart_insert")
     def add_item_to_checkout(self, item):
+        scheduler.note_activity()
         try:
             item_id = item["item_id"]
             if not item_id:
@@ -1364,9 +1577,6 @@ class DashboardView(QMainWindow):
                     if not name_item.data(Qt.UserRole):
                         name_item.setData(Qt.UserRole, item_id)
                     self.update_totals()
-                    print(
-                        f"Updated quantity for {item['item_name']} in checkout, Item ID: {name_item.data(Qt.UserRole)}"
-                    )
                     return
 
             # Add new item to the table
@@ -1402,9 +1612,7 @@ class DashboardView(QMainWindow):
             remove_btn.clicked.connect(lambda _, r=row_count: self.remove_item(r))
             self.table.setCellWidget(row_count, 4, remove_btn)
 
-            print(
-                f"Added {item['item_name']} to checkout at row {row_count}, Item ID: {self.table.item(row_count, 0).data(Qt.UserRole)}"
-            )
+            logger.debug("Added item %s to checkout at row %d", item_id, row_count)
             self.update_totals()
 
             # Connect itemChanged signal to handle quantity edits
@@ -1483,7 +1691,6 @@ class DashboardView(QMainWindow):
                 return
 
             self.update_totals()
-            print(f"Quantity updated for {item_data['item_name']} to {new_qty}")
 
         except Exception as e:
             import traceback
@@ -1493,6 +1700,7 @@ class DashboardView(QMainWindow):
                 self, "Error", f"Failed to update quantity: {str(e)}", QMessageBox.Ok
             )
 
+    @tracer.traced("totals")
     def update_totals(self):
         try:
             subtotal = 0.0
@@ -1525,6 +1733,8 @@ class DashboardView(QMainWindow):
         if row < self.table.rowCount():
             self.table.removeRow(row)
             self.update_totals()
+            if not self.table.rowCount():
+                tracer.end_trace()
 
     def open_payment_card(self):
         total = float(self.total_label.text())
@@ -1536,7 +1746,7 @@ class DashboardView(QMainWindow):
             self.payment_card.discount = 0.0
             self.payment_card.tip_input.setText("0")
             self.payment_card.discount_input.setText("0")
-            order_number = f"ORD-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            order_number = db.peek_order_numbers()[0]
             self.payment_card.order_no_label.setText(f"Order No: {order_number}")
             self.payment_card.date_label.setText(
                 f"Date: {datetime.now().strftime('%d/%m/%Y')}"
@@ -1550,27 +1760,27 @@ class DashboardView(QMainWindow):
         self.table.setRowCount(0)
         self.subtotal_label.setText("0.00")
         self.total_label.setText("0.00")
+        tracer.end_trace()
 
     def open_printer_settings(self):
         settings_window = PrinterSettingsWindow(self, db=db)
-        settings_window.exec_()
+        if settings_window.exec_() == QDialog.Accepted:
+            print_router.load()
 
     def handle_barcode_input(self, text):
         barcode_text = text.strip()
-        print(f"Received input: {barcode_text}")
         if barcode_text:
-            print("Processing barcode...")
+            scheduler.note_activity()
             self.pending_barcode = barcode_text
             self.barcode_timer.stop()
             self.barcode_timer.start(700)
 
     def process_pending_barcode(self):
         if not hasattr(self, "pending_barcode") or not self.pending_barcode:
-            print("No barcode to process")
             return
 
         barcode = self.pending_barcode
-        print(f"Processing barcode: {barcode}")
+        logger.debug("Processing barcode %s", barcode)
 
         try:
             self.product_barcode_search.textChanged.disconnect(
@@ -1580,12 +1790,10 @@ class DashboardView(QMainWindow):
             pass
 
         try:
-            print(f"Calling db.get_item_by_barcode with barcode: '{barcode}'")
-            item = db.get_item_by_barcode(barcode)
-            print(f"Returned item from database: {item}")
+            with tracer.span("catalog_lookup"):
+                item = db.get_item_by_barcode(barcode)
 
             if item is None or not isinstance(item, dict):
-                print(f"Invalid item data for barcode '{barcode}': {item}")
                 QMessageBox.warning(
                     self,
                     "Item Not Found",
@@ -1607,7 +1815,7 @@ class DashboardView(QMainWindow):
                 if field not in item or item[field] is None
             ]
             if missing_fields:
-                print(f"Missing fields: {missing_fields}")
+                logger.warning("Barcode %s: missing fields %s", barcode, missing_fields)
                 QMessageBox.warning(
                     self,
                     "Data Error",
@@ -1626,14 +1834,10 @@ class DashboardView(QMainWindow):
                 )
                 return
 
-            print(f"Adding item to checkout: {item}")
             self.add_item_to_checkout(item)
 
         except Exception as e:
-            print(f"Error processing barcode: {str(e)}")
-            import traceback
-
-            traceback.print_exc()
+            logger.exception("Error processing barcode %s: %s", barcode, e)
             QMessageBox.critical(
                 self,
                 "Error",
@@ -0,0 +1,22 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class PrintStatusRelay(QObject):
+    """Forwards print job status changes from spooler threads to the GUI.
+
+    `source` is a PrintSpooler or the PrintRouter of all printers. Emits
+    (device, job_id, status, error); error is "" unless the job failed.
+    """
+
+    job_status = pyqtSignal(str, int, str, str)
+
+    def __init__(self, source, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self._token = source.subscribe(self._forward)
+
+    def _forward(self, device, job_id, status, error):
+        self.job_status.emit(device, job_id, status, error or "")
+
+    def close(self):
+        self.source.unsubscribe(self._token)
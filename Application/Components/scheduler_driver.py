@@ -0,0 +1,38 @@
+from PyQt5.QtCore import QObject, QTimer
+
+from Helper.scheduler import scheduler as default_scheduler
+
+
+class SchedulerDriver(QObject):
+    """Ticks a Scheduler from the GUI event loop.
+
+    One single-shot timer is re-armed for the next due job, capped at
+    `max_wait_ms` so deferred heavy jobs and async completions are picked
+    up soon after the till goes idle. Jobs therefore run on the GUI thread
+    and must hand long work to a worker (see the "sync" job).
+    """
+
+    def __init__(self, scheduler=None, parent=None, max_wait_ms=1000):
+        super().__init__(parent)
+        self.scheduler = scheduler or default_scheduler
+        self.max_wait_ms = max_wait_ms
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._tick)
+
+    def start(self):
+        self._timer.start(0)
+
+    def stop(self):
+        self._timer.stop()
+
+    def _tick(self):
+        self.scheduler.tick()
+        wait = self.scheduler.seconds_until_next()
+        if not wait:
+            # Nothing scheduled, or due jobs are waiting on idle or their
+            # group; poll instead of spinning.
+            wait_ms = self.max_wait_ms
+        else:
+            wait_ms = min(int(wait * 1000), self.max_wait_ms)
+        self._timer.start(wait_ms)
@@ -0,0 +1,198 @@
+"""pytest-benchmark suite for the data-layer hot paths.
+
+Not collected by a plain `pytest` run; run it explicitly:
+
+    python -m pytest Benchmarks/data_layer/bench_data_layer.py \\
+        --benchmark-autosave --benchmark-compare
+"""
+
+import itertools
+import random
+from datetime import timedelta
+
+import pytest
+
+_sequence = itertools.count(1)
+_rng = random.Random(11)
+
+
+def _random_item_id():
+    from Benchmarks.data_layer.conftest import BENCH_ITEMS
+
+    return _rng.randint(1, BENCH_ITEMS)
+
+
+def _order_payload(db):
+    number = next(_sequence)
+    items = []
+    for _ in range(4):
+        item_id = _random_item_id()
+        item = db.get_item_by_id(item_id)
+        items.append({"item_id": item_id, "quantity": 1, "price": item["item_price"]})
+    total = sum(item["price"] for item in items)
+    order_data = {
+        "order_number": f"BENCH-ORD-{number}",
+        "receipt_number": f"BENCH-REC-{number}",
+        "date": "2025-01-01 12:00:00",
+        "customer_type_id": 1,
+        "total_amount": total,
+        "tip": 0.0,
+        "discount": 0.0,
+        "ground_total": total,
+    }
+    return (order_data, items, 1, None), {}
+
+
+def _cart_payload():
+    number = next(_sequence)
+    items = [
+        {
+            "item_id": _random_item_id(),
+            "name": "Bench item",
+            "unit": "Pcs",
+            "quantity": 1,
+            "amount": 100.0,
+        }
+        for _ in range(5)
+    ]
+    return {
+        "order_number": f"BENCH-CART-{number}",
+        "customer_type_id": 1,
+        "customer_id": None,
+        "total_amount": 500.0,
+        "date": "2025-01-01 12:00:00",
+        "items": items,
+        "status": "in-cart",
+    }
+
+
+def test_save_order(benchmark, db):
+    result = benchmark.pedantic(
+        db.save_order, setup=lambda: _order_payload(db), rounds=200
+    )
+    assert result is not None
+
+
+def test_get_item_by_barcode(benchmark, db):
+    benchmark(lambda: db.get_item_by_barcode(f"{600000000000 + _random_item_id()}"))
+
+
+def test_get_local_items_for_category(benchmark, db):
+    items = benchmark(db.get_local_items_for_category, 7)
+    assert items
+
+
+def test_get_all_local_items(benchmark, db):
+    items = benchmark(db.get_all_local_items)
+    assert items
+
+
+def test_get_orders_by_status(benchmark, db, today):
+    benchmark(db.get_orders_by_status, "completed", today.strftime("%Y-%m-%d"))
+
+
+@pytest.mark.parametrize(
+    "criteria",
+    [
+        {"number": "ORD-00001"},
+        {"min_total": 1000, "max_total": 5000},
+        {"item_id": 7},
+    ],
+    ids=["number", "amount", "item"],
+)
+def test_search_orders(benchmark, db, criteria):
+    benchmark(db.search_orders, **criteria)
+
+
+@pytest.fixture(scope="module")
+def cart_model(db):
+    from Application.Components.OrderSummary.Carts.modal import CartModel
+
+    return CartModel()
+
+
+def test_create_cart(benchmark, cart_model):
+    result = benchmark.pedantic(
+        cart_model.create_cart, setup=lambda: ((_cart_payload(),), {}), rounds=200
+    )
+    assert result["success"]
+
+
+def test_update_cart(benchmark, cart_model):
+    cart_id = cart_model.create_cart(_cart_payload())["cart_id"]
+
+    def payload():
+        data = _cart_payload()
+        return (cart_id, data), {}
+
+    benchmark.pedantic(cart_model.update_cart, setup=payload, rounds=200)
+
+
+def test_get_sales_summary_data(benchmark, db, today):
+    from Application.Components.Reports.modal import ReportManager
+
+    manager = ReportManager()
+    start = (today - timedelta(days=30)).strftime("%Y-%m-%d")
+    benchmark(manager.get_sales_summary_data, start, today.strftime("%Y-%m-%d"))
+
+
+@pytest.mark.parametrize("metric", ["quantity", "revenue"])
+def test_get_top_selling_items(benchmark, db, today, metric):
+    start = (today - timedelta(days=90)).strftime("%Y-%m-%d")
+    benchmark(db.get_top_selling_items, start, today.strftime("%Y-%m-%d"), metric)
+
+
+def test_get_stock_velocity(benchmark, db):
+    benchmark(db.get_stock_velocity, 30)
+
+
+@pytest.fixture(scope="module")
+def stock_snapshots(db, today):
+    """Snapshots of every day of the dataset, as day close writes them."""
+    for days_ago in range(90, 0, -1):
+        db.write_stock_snapshot(today - timedelta(days=days_ago))
+
+
+@pytest.mark.parametrize("days_ago", [0, 30])
+def test_get_stock_at(benchmark, db, stock_snapshots, today, days_ago):
+    stock = benchmark(db.get_stock_at, today - timedelta(days=days_ago))
+    assert stock
+
+
+@pytest.fixture(scope="module")
+def day_close_manager(db):
+    from Application.Components.DayClose.modal import DayCloseManager
+
+    return DayCloseManager()
+
+
+def test_day_close_orders_status(benchmark, day_close_manager, today):
+    benchmark(day_close_manager.get_orders_status, today - timedelta(days=1))
+
+
+def test_day_close_exists(benchmark, day_close_manager, today):
+    benchmark(day_close_manager.check_day_close_exists, 1, today - timedelta(days=1))
+
+
+@pytest.fixture(scope="module")
+def sales_cube(db):
+    pytest.importorskip("numpy")
+    from Helper.sales_cube import SalesCube
+
+    cube = SalesCube()
+    cube.refresh()
+    return cube
+
+
+def test_sales_cube_refresh(benchmark, sales_cube):
+    benchmark(sales_cube.refresh)
+
+
+@pytest.mark.parametrize("rows, columns", [("category", None), ("weekday", "hour")])
+def test_sales_cube_pivot(benchmark, sales_cube, rows, columns):
+    def pivot():
+        # Bypass the result cache so the aggregation itself is measured
+        sales_cube._cache.clear()
+        return sales_cube.pivot(rows, columns, "revenue")
+
+    benchmark(pivot)
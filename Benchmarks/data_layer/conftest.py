@@ -0,0 +1,31 @@
+import os
+from datetime import date
+
+import pytest
+
+from Benchmarks.dataset import generate
+
+# Dataset size can be raised for a full run, e.g. AMALI_BENCH_ITEMS=100000
+BENCH_ITEMS = int(os.environ.get("AMALI_BENCH_ITEMS", "10000"))
+BENCH_ORDERS = int(os.environ.get("AMALI_BENCH_ORDERS", "20000"))
+
+
+@pytest.fixture(scope="session")
+def dataset(tmp_path_factory):
+    """Path of a generated database; also exported as AMALI_DB_PATH."""
+    path = tmp_path_factory.mktemp("amali") / "main_amali.db"
+    generate(path, items=BENCH_ITEMS, orders=BENCH_ORDERS)
+    return path
+
+
+@pytest.fixture(scope="session")
+def db(dataset):
+    from Helper.db_conn import db
+
+    assert db.db_path == dataset
+    return db
+
+
+@pytest.fixture(scope="session")
+def today():
+    return date.today()
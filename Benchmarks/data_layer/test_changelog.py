@@ -0,0 +1,42 @@
+"""Checks change journaling against the generated benchmark database:
+
+    python -m pytest Benchmarks/data_layer/test_changelog.py
+"""
+
+import sqlite3
+import threading
+
+
+def _journaled_payments(db):
+    with sqlite3.connect(db.db_path) as conn:
+        return {
+            row[0]
+            for row in conn.execute(
+                "SELECT row_id FROM changelog WHERE table_name = 'payments'"
+            )
+        }
+
+
+def test_changelog_muted_only_on_syncing_thread(db):
+    applied = threading.Event()
+    edited = threading.Event()
+
+    def sync():
+        with db.changelog_muted():
+            db.insert_payment(9001, "SRV1", "Server payment", 1)
+            applied.set()
+            edited.wait(5)
+            db.insert_payment(9002, "SRV2", "Server payment", 1)
+
+    thread = threading.Thread(target=sync)
+    thread.start()
+    assert applied.wait(5)
+    # A cashier edit while the sync is still applying server data
+    db.insert_payment(9003, "LOCAL", "Local payment", 1)
+    edited.set()
+    thread.join()
+    db.insert_payment(9004, "AFTER", "Local payment", 1)
+
+    journaled = _journaled_payments(db)
+    assert {9003, 9004} <= journaled
+    assert not {9001, 9002} & journaled
@@ -0,0 +1,37 @@
+"""Checks ItemImportManager writes against the generated benchmark database:
+
+    python -m pytest Benchmarks/data_layer/test_item_import.py
+"""
+
+import csv
+
+
+def _write_csv(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def test_repeated_new_item_in_one_chunk(db, tmp_path):
+    from Application.Components.Inventory.Items.model import ItemImportManager
+
+    path = tmp_path / "items.csv"
+    _write_csv(
+        path,
+        [
+            {"name": "New A", "barcode": "990000000001", "unit": "Box",
+             "price": "10", "category": "Category 1"},
+            {"name": "New A again", "barcode": "990000000001", "unit": "Crate",
+             "price": "12", "category": "Category 1"},
+        ],
+    )
+
+    summary = ItemImportManager(chunk_size=2).import_file(path)
+
+    assert summary["rejected"] == 0
+    assert summary["created"] == 1
+    item = db.get_item_by_barcode("990000000001")
+    assert item["item_name"] == "New A again"
+    assert item["item_price"] == 12
+    assert item["item_unit"] == "Crate"
@@ -0,0 +1,107 @@
+"""Drives Helper.scheduler with a fake clock:
+
+    python -m pytest Benchmarks/data_layer/test_scheduler.py
+"""
+
+import pytest
+
+from Helper.scheduler import Scheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def scheduler(clock):
+    return Scheduler(idle_after=5.0, clock=clock)
+
+
+def test_runs_on_interval(scheduler, clock):
+    runs = []
+    scheduler.register("pull", lambda: runs.append(clock()), 60, jitter=0)
+
+    assert scheduler.tick() == []
+    assert scheduler.seconds_until_next() == 60
+    clock.advance(60)
+    assert scheduler.tick() == ["pull"]
+    clock.advance(59)
+    assert scheduler.tick() == []
+    clock.advance(1)
+    assert scheduler.tick() == ["pull"]
+    assert runs == [1060.0, 1120.0]
+
+
+def test_failures_back_off_up_to_max(scheduler, clock):
+    scheduler.register("push", lambda: False, 10, jitter=0, max_backoff=30, run_now=True)
+
+    waits = []
+    for _ in range(4):
+        assert scheduler.tick() == ["push"]
+        waits.append(scheduler.seconds_until_next())
+        clock.advance(waits[-1])
+
+    assert waits == [20, 30, 30, 30]
+    assert scheduler.stats()["push"]["failures"] == 4
+    assert scheduler.stats()["push"]["consecutive_failures"] == 4
+
+
+def test_heavy_job_waits_for_idle_till(scheduler, clock):
+    scheduler.register("backup", lambda: None, 60, jitter=0, heavy=True, run_now=True)
+
+    scheduler.note_activity()
+    assert scheduler.tick() == []
+    clock.advance(4.9)
+    assert scheduler.tick() == []
+    clock.advance(0.1)
+    assert scheduler.tick() == ["backup"]
+    assert scheduler.stats()["backup"]["deferrals"] == 2
+
+
+def test_heavy_job_deferred_during_sale_until_max_defer(scheduler, clock):
+    scheduler.is_busy = lambda: True
+    scheduler.register(
+        "maintenance", lambda: None, 60, jitter=0, heavy=True, max_defer=30, run_now=True
+    )
+
+    assert scheduler.tick() == []
+    clock.advance(29)
+    assert scheduler.tick() == []
+    clock.advance(1)
+    assert scheduler.tick() == ["maintenance"]
+
+
+def test_light_job_runs_while_busy(scheduler, clock):
+    scheduler.is_busy = lambda: True
+    scheduler.note_activity()
+    scheduler.register("push", lambda: None, 30, jitter=0, run_now=True)
+
+    assert scheduler.tick() == ["push"]
+
+
+def test_group_runs_one_job_at_a_time(scheduler, clock):
+    pending = []
+    scheduler.register(
+        "pull", pending.append, 60, jitter=0, group="sync", asynchronous=True, run_now=True
+    )
+    scheduler.register("push", lambda: None, 60, jitter=0, group="sync", run_now=True)
+
+    assert scheduler.tick() == ["pull"]
+    assert scheduler.tick() == []
+    assert scheduler.stats()["push"]["blocked_by_group"] == 2
+
+    pending.pop()(True)
+    assert scheduler.tick() == ["push"]
+    assert not scheduler.stats()["pull"]["running"]
@@ -0,0 +1,59 @@
+"""Checks that the stock ledger and item_stocks agree after writes.
+
+Runs against the generated benchmark database:
+
+    python -m pytest Benchmarks/data_layer/test_stock_ledger.py
+"""
+
+import sqlite3
+
+import pytest
+
+LEDGER_VS_BALANCE = """
+    SELECT sk.store_id,
+           (SELECT COALESCE(SUM(m.quantity), 0) FROM stock_movements m
+            WHERE m.item_id = :item_id AND m.store_id = sk.store_id),
+           s.stock_quantity
+    FROM item_stocks s JOIN stocks sk ON sk.id = s.stock_id
+    WHERE s.item_id = :item_id
+    ORDER BY sk.store_id
+"""
+
+
+@pytest.fixture(scope="module")
+def second_store(db):
+    with sqlite3.connect(db.db_path) as conn:
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO stores (id, name, location, manager_id, created_at, updated_at)
+            VALUES (2, 'Store 2', 'Location 2', 1, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+            """
+        )
+    return 2
+
+
+def _ledger_vs_balance(db, item_id):
+    with sqlite3.connect(db.db_path) as conn:
+        return conn.execute(LEDGER_VS_BALANCE, {"item_id": item_id}).fetchall()
+
+
+def test_stock_count_in_other_store(db, second_store):
+    from Application.Components.Inventory.CostStock.model import BulkAdjustmentManager
+
+    item_id = 3
+    before = dict((store, balance) for store, _, balance in _ledger_vs_balance(db, item_id))
+    assert db.record_stock_movements([(item_id, 40, "receipt")], store_id=second_store)
+
+    result = BulkAdjustmentManager(store_id=second_store).apply_stock_counts(
+        [(item_id, None, 25), (999999999, None, 1)]
+    )
+
+    assert result["changed"] == 1
+    assert result["unknown"] == [(999999999, None)]
+    rows = _ledger_vs_balance(db, item_id)
+    assert [store for store, _, _ in rows] == [1, second_store]
+    for store, ledger, balance in rows:
+        assert ledger == pytest.approx(balance)
+    balances = dict((store, balance) for store, _, balance in rows)
+    assert balances[second_store] == pytest.approx(25)
+    assert balances[1] == pytest.approx(before[1])
@@ -0,0 +1,281 @@
+"""Generates a synthetic main_amali.db for benchmarks.
+
+The schema comes from the real DatabaseManager; the data is generated in
+bulk with executemany and a fixed seed, so the same arguments always give
+the same database.
+
+    python -m Benchmarks.dataset --output /tmp/bench.db --items 20000 --orders 50000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+UNITS = ["Pcs", "Kg", "Box", "Ltr", "Pkt", "Dozen"]
+PRODUCT_WORDS = [
+    "Rice", "Sugar", "Soap", "Milk", "Bread", "Oil", "Tea", "Salt", "Flour",
+    "Juice", "Water", "Biscuit", "Candle", "Match", "Pen", "Book", "Battery",
+]
+
+DEFAULTS = {
+    "item_groups": 12,
+    "categories": 120,
+    "items": 10000,
+    "barcodes_per_item": 1,
+    "stores": 1,
+    "customers": 500,
+    "orders": 20000,
+    "items_per_order": 4,
+    "days": 90,
+    "adjustments": 2000,
+    "expenses": 1000,
+    "carts": 200,
+}
+
+
+def _chunks(rows, size=5000):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def generate(output, seed=7, **counts):
+    """Builds the database at `output` and returns the row counts written."""
+    counts = {**DEFAULTS, **{k: v for k, v in counts.items() if v is not None}}
+    rng = random.Random(seed)
+    output = Path(output)
+    if output.exists():
+        output.unlink()
+
+    # Create the schema exactly as the application does. The module-level
+    # Helper.db_conn.db must point at the same file, not the default one.
+    os.environ["AMALI_DB_PATH"] = str(output)
+    from Helper.db_conn import DatabaseManager, mute_changelog
+
+    DatabaseManager(db_path=output)
+
+    conn = sqlite3.connect(output)
+    cursor = conn.cursor()
+    # Bulk generated data is not a local edit to push to the server
+    mute_changelog(conn)
+    now = datetime.now()
+    stamp = now.strftime("%Y-%m-%d %H:%M:%S")
+
+    stores = [
+        (s, f"Store {s}", f"Location {s}", 1, stamp, stamp)
+        for s in range(2, counts["stores"] + 1)
+    ]
+    cursor.executemany(
+        "INSERT INTO stores (id, name, location, manager_id, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+        stores,
+    )
+    store_ids = list(range(1, counts["stores"] + 1))
+
+    cursor.executemany(
+        "INSERT INTO item_groups (id, name, created_at) VALUES (?, ?, ?)",
+        [(g, f"Group {g}", stamp) for g in range(1, counts["item_groups"] + 1)],
+    )
+    cursor.executemany(
+        "INSERT INTO categories (id, name, item_group_id, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+        [
+            (c, f"Category {c}", (c - 1) % counts["item_groups"] + 1, stamp, stamp)
+            for c in range(1, counts["categories"] + 1)
+        ],
+    )
+    cursor.executemany(
+        "INSERT OR IGNORE INTO units (name, created_at) VALUES (?, ?)",
+        [(unit, stamp) for unit in UNITS],
+    )
+    cursor.execute("SELECT id FROM units")
+    unit_ids = [row[0] for row in cursor.fetchall()]
+
+    item_count = counts["items"]
+    items, item_units, prices, stocks, openings = [], [], [], [], []
+    # Stock enters through the ledger, which builds item_stocks
+    opened = (now - timedelta(days=counts["days"])).strftime("%Y-%m-%d %H:%M:%S")
+    barcodes, item_barcodes = [], []
+    item_price = {}
+    stock_id = 0
+    barcode_id = 0
+    for item_id in range(1, item_count + 1):
+        category_id = rng.randint(1, counts["categories"])
+        group_id = (category_id - 1) % counts["item_groups"] + 1
+        name = f"{rng.choice(PRODUCT_WORDS)} {rng.choice(UNITS)} {item_id}"
+        items.append((item_id, name, category_id, 1, group_id, "active", stamp, stamp))
+        unit_id = rng.choice(unit_ids)
+        item_units.append((item_id, unit_id, unit_id, stamp, stamp))
+        price = float(rng.randint(5, 500) * 100)
+        item_price[item_id] = price
+        for store_id in store_ids:
+            prices.append((item_id, store_id, unit_id, price, stamp, stamp))
+            stock_id += 1
+            stocks.append((stock_id, item_id, store_id, 0, 0, stamp, stamp))
+            openings.append((item_id, store_id, float(rng.randint(50, 5000)), opened))
+        for _ in range(counts["barcodes_per_item"]):
+            barcode_id += 1
+            barcodes.append((barcode_id, f"{600000000000 + barcode_id}", stamp, stamp))
+            item_barcodes.append((item_id, barcode_id, stamp, stamp))
+
+    statements = [
+        ("INSERT INTO items (id, name, category_id, item_type_id, item_group_id, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", items),
+        ("INSERT INTO item_units (item_id, buying_unit_id, selling_unit_id, created_at, updated_at) VALUES (?, ?, ?, ?, ?)", item_units),
+        ("INSERT INTO item_prices (item_id, store_id, unit_id, amount, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?)", prices),
+        ("INSERT INTO stocks (id, item_id, store_id, min_quantity, max_quantity, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)", stocks),
+        ("INSERT INTO stock_movements (item_id, store_id, movement_type, quantity, movement_date) VALUES (?, ?, 'opening', ?, ?)", openings),
+        ("INSERT INTO barcodes (id, code, created_at, updated_at) VALUES (?, ?, ?, ?)", barcodes),
+        ("INSERT INTO item_barcodes (item_id, barcode_id, created_at, updated_at) VALUES (?, ?, ?, ?)", item_barcodes),
+    ]
+    for sql, rows in statements:
+        for chunk in _chunks(rows):
+            cursor.executemany(sql, chunk)
+
+    cursor.executemany(
+        "INSERT OR IGNORE INTO customer_types (id, name, is_active, created_at) VALUES (?, ?, 1, ?)",
+        [(1, "Walk-in", stamp), (2, "Registered", stamp)],
+    )
+    cursor.executemany(
+        "INSERT INTO customers (id, customer_name, active, created_at) VALUES (?, ?, 1, ?)",
+        [(c, f"Customer {c}", stamp) for c in range(1, counts["customers"] + 1)],
+    )
+    cursor.execute(
+        "INSERT OR IGNORE INTO payments (id, short_code, payment_method, payment_type_id, created_at) VALUES (2, 'MPESA', 'Mobile money', 1, ?)",
+        (stamp,),
+    )
+
+    orders, order_items, order_payments, customer_orders, movements = [], [], [], [], []
+    order_item_count = 0
+    for order_id in range(1, counts["orders"] + 1):
+        when = now - timedelta(
+            days=rng.randint(0, counts["days"] - 1), seconds=rng.randint(0, 86399)
+        )
+        when_text = when.strftime("%Y-%m-%d %H:%M:%S")
+        status = rng.choices(["completed", "settled", "voided"], [80, 15, 5])[0]
+        total = 0.0
+        for _ in range(rng.randint(1, counts["items_per_order"] * 2 - 1)):
+            item_id = rng.randint(1, item_count)
+            quantity = rng.randint(1, 5)
+            price = item_price[item_id]
+            total += price * quantity
+            order_items.append((order_id, item_id, quantity, price, when_text))
+            movements.append((item_id, order_id, "sale", -quantity, when_text))
+            order_item_count += 1
+        customer_type_id = rng.choice([1, 1, 1, 2])
+        orders.append(
+            (
+                order_id,
+                f"ORD-{order_id:07d}",
+                f"REC-{order_id:07d}",
+                when_text,
+                customer_type_id,
+                total,
+                0.0,
+                0.0,
+                total,
+                when_text,
+                when_text,
+                status,
+            )
+        )
+        order_payments.append((order_id, rng.choice([1, 1, 2])))
+        if customer_type_id == 2:
+            customer_orders.append((rng.randint(1, counts["customers"]), order_id))
+
+    for _ in range(counts["adjustments"]):
+        when = now - timedelta(days=rng.randint(0, counts["days"] - 1))
+        movements.append(
+            (
+                rng.randint(1, item_count),
+                None,
+                "adjustment",
+                rng.randint(-10, 50),
+                when.strftime("%Y-%m-%d %H:%M:%S"),
+            )
+        )
+
+    statements = [
+        ("INSERT INTO orders (id, order_number, receipt_number, date, customer_type_id, total_amount, tip, discount, ground_total, created_at, updated_at, is_active, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, ?)", orders),
+        ("INSERT INTO order_items (order_id, item_id, quantity, price, created_at) VALUES (?, ?, ?, ?, ?)", order_items),
+        ("INSERT INTO order_payments (order_id, payment_id) VALUES (?, ?)", order_payments),
+        ("INSERT INTO customer_orders (customer_id, order_id) VALUES (?, ?)", customer_orders),
+        ("INSERT INTO stock_movements (item_id, order_id, movement_type, quantity, movement_date) VALUES (?, ?, ?, ?, ?)", movements),
+    ]
+    for sql, rows in statements:
+        for chunk in _chunks(rows):
+            cursor.executemany(sql, chunk)
+
+    expenses = []
+    for expense_id in range(1, counts["expenses"] + 1):
+        when = now - timedelta(days=rng.randint(0, counts["days"] - 1))
+        expenses.append(
+            (
+                expense_id,
+                rng.choice(["home", "shop"]),
+                1,
+                when.strftime("%Y-%m-%d"),
+                float(rng.randint(1, 500) * 100),
+                f"Expense {expense_id}",
+                stamp,
+                stamp,
+            )
+        )
+    cursor.executemany(
+        "INSERT INTO expenses (id, expense_type, user_id, expense_date, amount, description, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        expenses,
+    )
+
+    carts, cart_items = [], []
+    for cart_id in range(1, counts["carts"] + 1):
+        total = 0.0
+        for _ in range(rng.randint(1, 6)):
+            item_id = rng.randint(1, item_count)
+            quantity = rng.randint(1, 3)
+            amount = item_price[item_id] * quantity
+            total += amount
+            cart_items.append((cart_id, item_id, f"Item {item_id}", "Pcs", quantity, amount))
+        carts.append(
+            (cart_id, f"CART-{cart_id:07d}", 1, total, rng.choice(["in-cart", "settled"]), stamp)
+        )
+    cursor.executemany(
+        "INSERT INTO carts (id, order_number, customer_type_id, total_amount, status, date) VALUES (?, ?, ?, ?, ?, ?)",
+        carts,
+    )
+    cursor.executemany(
+        "INSERT INTO cart_items (cart_id, item_id, name, unit, quantity, amount) VALUES (?, ?, ?, ?, ?, ?)",
+        cart_items,
+    )
+
+    conn.commit()
+    cursor.execute("ANALYZE")
+    conn.close()
+
+    return {
+        "items": item_count,
+        "barcodes": len(barcodes),
+        "stores": len(store_ids),
+        "orders": len(orders),
+        "order_items": order_item_count,
+        "stock_movements": len(openings) + len(movements),
+        "expenses": len(expenses),
+        "carts": len(carts),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic main_amali.db")
+    parser.add_argument("--output", required=True, help="path of the database to create")
+    parser.add_argument("--seed", type=int, default=7)
+    for name, default in DEFAULTS.items():
+        parser.add_argument(f"--{name.replace('_', '-')}", type=int, default=default)
+    args = parser.parse_args(argv)
+
+    counts = {name: getattr(args, name) for name in DEFAULTS}
+    written = generate(args.output, seed=args.seed, **counts)
+    for table, count in written.items():
+        print(f"{table:>16}: {count}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
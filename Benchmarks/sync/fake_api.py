@@ -0,0 +1,214 @@
+"""Local stand-in for the Amali backend used by Helper/api.py.
+
+Serves a generated catalog over the same endpoints the sync talks to, with
+configurable per-request latency and bandwidth, and counts the requests
+and bytes it handled.
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+API_PREFIX = "/api/v1"
+
+
+class FakeCatalog:
+    """Deterministic catalog of item groups, categories and items."""
+
+    def __init__(self, item_count, items_per_category=50, categories_per_group=20, seed=42):
+        rng = random.Random(seed)
+        self.rng = rng
+        category_count = max(1, -(-item_count // items_per_category))
+        group_count = max(1, -(-category_count // categories_per_group))
+
+        self.groups = [{"id": g, "name": f"Group {g}"} for g in range(1, group_count + 1)]
+        self.categories = [
+            {
+                "category_id": c,
+                "category_name": f"Category {c}",
+                "item_group_name": f"Group {(c - 1) // categories_per_group + 1}",
+            }
+            for c in range(1, category_count + 1)
+        ]
+        self.items_by_category = {c["category_id"]: [] for c in self.categories}
+        for item_id in range(1, item_count + 1):
+            category_id = (item_id - 1) // items_per_category + 1
+            self.items_by_category[category_id].append(
+                {
+                    "id": item_id,
+                    "item_name": f"Item {item_id}",
+                    "barcode": f"{600000000000 + item_id}",
+                    "item_unit": rng.choice(["Pcs", "Kg", "Box", "Ltr"]),
+                    "item_price": float(rng.randint(5, 500) * 100),
+                    "stock_quantity": float(rng.randint(0, 200)),
+                    "image_url": "",
+                }
+            )
+        self.payments = [
+            {"id": 1, "short_code": "Cash", "payment_method": "Cash payment", "payment_type_id": 1},
+            {"id": 2, "short_code": "MPESA", "payment_method": "Mobile money", "payment_type_id": 1},
+        ]
+        self.customers = [
+            {"id": c, "customer_name": f"Customer {c}", "active": 1} for c in range(1, 101)
+        ]
+        self.customer_types = [
+            {"id": 1, "name": "Walk-in", "is_active": 1},
+            {"id": 2, "name": "Registered", "is_active": 1},
+        ]
+        self.companies = [
+            {
+                "id": 1,
+                "company_name": "Benchmark Shop",
+                "address": "Forest",
+                "state": "Dar es Salaam",
+                "phone": "0700000000",
+                "tin_no": "100-000-000",
+                "vrn_no": "40-000000-A",
+                "country_id": 1,
+                "email": "bench@example.com",
+                "website": "",
+                "post_code": "00000",
+                "company_logo": "",
+                "is_active": 1,
+            }
+        ]
+
+    @property
+    def item_count(self):
+        return sum(len(items) for items in self.items_by_category.values())
+
+    def mutate(self, fraction):
+        """Changes price and stock of a fraction of the items; returns the count."""
+        all_items = [item for items in self.items_by_category.values() for item in items]
+        changed = self.rng.sample(all_items, max(1, int(len(all_items) * fraction)))
+        for item in changed:
+            item["item_price"] += 100.0
+            item["stock_quantity"] = float(self.rng.randint(0, 200))
+        return len(changed)
+
+    def route(self, method, path, query):
+        if method == "GET":
+            if path == "/items/item_group":
+                return {"data": self.groups}
+            if path == "/items/item_category":
+                return {"data": self.categories}
+            if path == "/items/sale_items":
+                category_id = int(query.get("item_category_id", ["0"])[0])
+                return self.items_by_category.get(category_id, [])
+            if path == "/payments/list":
+                return {"data": self.payments}
+            if path == "/customers/list":
+                return {"data": self.customers}
+            if path == "/customers/customer_type":
+                return {"data": self.customer_types}
+            if path == "/companies/company_details":
+                return {"data": self.companies}
+        return None
+
+
+class FakeApiServer:
+    """Threaded HTTP server exposing a FakeCatalog under /api/v1."""
+
+    def __init__(self, catalog, latency_ms=0.0, bandwidth_kbps=None, host="127.0.0.1", port=0):
+        self.catalog = catalog
+        self.latency = latency_ms / 1000.0
+        self.bandwidth = bandwidth_kbps * 1024 if bandwidth_kbps else None
+        self.stats_lock = threading.Lock()
+        self.reset_stats()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    def reset_stats(self):
+        with self.stats_lock:
+            self.stats = {"requests": 0, "bytes_in": 0, "bytes_out": 0}
+
+    def snapshot_stats(self):
+        with self.stats_lock:
+            return dict(self.stats)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _record(self, bytes_in, bytes_out):
+        with self.stats_lock:
+            self.stats["requests"] += 1
+            self.stats["bytes_in"] += bytes_in
+            self.stats["bytes_out"] += bytes_out
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _respond(self, method):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                parsed = urlparse(self.path)
+                path = parsed.path[len(API_PREFIX):] if parsed.path.startswith(API_PREFIX) else parsed.path
+
+                if method == "POST":
+                    payload = self._post(path, body)
+                else:
+                    payload = server.catalog.route(method, path, parse_qs(parsed.query))
+
+                if server.latency:
+                    time.sleep(server.latency)
+
+                status = 200 if payload is not None else 404
+                data = json.dumps(payload if payload is not None else {"error": "not found"}).encode()
+                # Recorded before the reply goes out so the stats are complete
+                # by the time the client has read the response.
+                server._record(len(self.requestline) + length, len(data))
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self._write_throttled(data)
+
+            def _post(self, path, body):
+                try:
+                    request = json.loads(body or b"{}")
+                except ValueError:
+                    request = {}
+                if path == "/sync/changes":
+                    return {"acknowledged": [c["id"] for c in request.get("changes", [])]}
+                if path in ("/orders/store_local_sale", "/stocks/update"):
+                    return {"success": True}
+                return None
+
+            def _write_throttled(self, data):
+                if not server.bandwidth:
+                    self.wfile.write(data)
+                    return
+                chunk = max(1024, int(server.bandwidth / 20))
+                for start in range(0, len(data), chunk):
+                    piece = data[start:start + chunk]
+                    time.sleep(len(piece) / server.bandwidth)
+                    self.wfile.write(piece)
+
+            def do_GET(self):
+                self._respond("GET")
+
+            def do_POST(self):
+                self._respond("POST")
+
+        return Handler
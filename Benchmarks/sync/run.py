@@ -0,0 +1,197 @@
+"""Sync benchmark: full and incremental `sync_data_with_server` runs.
+
+Starts a FakeApiServer seeded with a generated catalog, runs the sync in a
+fresh child process against an empty database (full sync), changes a
+fraction of the catalog and syncs again (incremental sync). Each run
+reports wall time, HTTP requests, bytes transferred, time spent inside
+SQLite connections and the child's peak RSS.
+
+    python -m Benchmarks.sync.run --sizes 1000 10000 --latency-ms 40 \\
+        --bandwidth-kbps 256 --output Benchmarks/baselines/sync.json
+    python -m Benchmarks.sync.run --sizes 1000 --compare Benchmarks/baselines/sync.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from Benchmarks.sync.fake_api import FakeApiServer, FakeCatalog
+
+RESULT_MARKER = "BENCH_RESULT "
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def peak_rss_kb():
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset // 1024
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def run_child():
+    """Runs one sync inside this process and prints the measurements."""
+    from Helper.db_conn import db
+    from Helper.api import sync_data_with_server
+
+    sqlite_time = [0.0]
+    original_get_connection = db.get_connection
+
+    @contextmanager
+    def timed_connection():
+        start = time.perf_counter()
+        try:
+            with original_get_connection() as conn:
+                yield conn
+        finally:
+            sqlite_time[0] += time.perf_counter() - start
+
+    db.get_connection = timed_connection
+
+    start = time.perf_counter()
+    success = sync_data_with_server()
+    wall = time.perf_counter() - start
+
+    result = {
+        "success": bool(success),
+        "wall_s": round(wall, 4),
+        "sqlite_s": round(sqlite_time[0], 4),
+        "peak_rss_kb": peak_rss_kb(),
+    }
+    sys.stdout.flush()
+    print(RESULT_MARKER + json.dumps(result))
+
+
+def run_sync(server, db_path):
+    env = dict(
+        os.environ,
+        AMALI_API_BASE_URL=server.base_url,
+        AMALI_DB_PATH=str(db_path),
+        QT_QPA_PLATFORM="offscreen",
+    )
+    server.reset_stats()
+    completed = subprocess.run(
+        [sys.executable, "-m", "Benchmarks.sync.run", "--child"],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    lines = [l for l in completed.stdout.splitlines() if l.startswith(RESULT_MARKER)]
+    if completed.returncode != 0 or not lines:
+        raise RuntimeError(f"Sync child failed:\n{completed.stderr[-4000:]}")
+    result = json.loads(lines[-1][len(RESULT_MARKER):])
+    stats = server.snapshot_stats()
+    result.update(
+        http_requests=stats["requests"],
+        bytes_sent=stats["bytes_in"],
+        bytes_received=stats["bytes_out"],
+    )
+    return result
+
+
+def benchmark_size(item_count, args):
+    catalog = FakeCatalog(item_count, items_per_category=args.items_per_category)
+    server = FakeApiServer(
+        catalog, latency_ms=args.latency_ms, bandwidth_kbps=args.bandwidth_kbps
+    ).start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = Path(tmp) / "main_amali.db"
+            full = run_sync(server, db_path)
+            changed = catalog.mutate(args.change_fraction)
+            incremental = run_sync(server, db_path)
+            incremental["changed_items"] = changed
+    finally:
+        server.stop()
+    return {"items": item_count, "full": full, "incremental": incremental}
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    baseline = json.loads(Path(baseline_path).read_text())
+    previous = {entry["items"]: entry for entry in baseline["results"]}
+    for entry in results:
+        old = previous.get(entry["items"])
+        if not old:
+            continue
+        for phase in ("full", "incremental"):
+            for metric in ("wall_s", "sqlite_s", "http_requests", "bytes_received", "peak_rss_kb"):
+                new_value, old_value = entry[phase].get(metric), old[phase].get(metric)
+                if not new_value or not old_value:
+                    continue
+                delta = (new_value - old_value) / old_value * 100
+                print(
+                    f"{entry['items']:>7} {phase:<11} {metric:<15} "
+                    f"{old_value:>12} -> {new_value:>12} ({delta:+.1f}%)"
+                )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--items-per-category", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--bandwidth-kbps", type=float, default=None)
+    parser.add_argument("--change-fraction", type=float, default=0.01)
+    parser.add_argument("--output", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child()
+        return
+
+    results = []
+    for size in args.sizes:
+        print(f"Benchmarking sync with {size} items...")
+        entry = benchmark_size(size, args)
+        print(json.dumps(entry, indent=2))
+        results.append(entry)
+
+    report = {
+        "benchmark": "sync",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "items_per_category": args.items_per_category,
+            "latency_ms": args.latency_ms,
+            "bandwidth_kbps": args.bandwidth_kbps,
+            "change_fraction": args.change_fraction,
+        },
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"Baseline written to {args.output}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""Headless latency harness for the cashier workflow.
+
+Drives DashboardView under QT_QPA_PLATFORM=offscreen against a generated
+catalog and replays a scripted session: switching groups and categories,
+scanning barcodes, editing quantities, opening the payment card,
+confirming payments, parking and recalling carts and opening the order
+summary. For every action it records the wall-clock time until the event
+queue is drained. An event-loop watchdog records every GUI-thread stall
+above a threshold, with the Python frame that was running when the stall
+was detected.
+
+    python -m Benchmarks.ui.latency --items 50000 --iterations 30 \\
+        --output Benchmarks/baselines/ui-latency.json
+
+Modal dialogs are answered automatically (payment confirmations are
+confirmed, message boxes dismissed), so their handling time is part of
+the measured latency.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import traceback
+from datetime import datetime
+from pathlib import Path
+
+from Benchmarks.dataset import generate
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of `values` (0 < pct <= 100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples_ms):
+    return {
+        "count": len(samples_ms),
+        "p50_ms": percentile(samples_ms, 50),
+        "p95_ms": percentile(samples_ms, 95),
+        "p99_ms": percentile(samples_ms, 99),
+        "max_ms": max(samples_ms) if samples_ms else None,
+    }
+
+
+class EventLoopWatchdog:
+    """Measures GUI-thread stalls.
+
+    A QTimer on the GUI thread beats every `interval_ms`; any gap between
+    beats longer than `stall_ms` is a stall. A background thread notices
+    stalls while they happen and samples the GUI thread's stack, so the
+    report says what was blocking.
+    """
+
+    def __init__(self, interval_ms=5, stall_ms=50):
+        from PyQt5.QtCore import QTimer
+
+        self.interval = interval_ms / 1000.0
+        self.stall = stall_ms / 1000.0
+        self.gui_thread_id = threading.get_ident()
+        self.last_beat = time.perf_counter()
+        self.stalls = []
+        self._culprit = None
+        self._running = False
+        self.timer = QTimer()
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self._beat)
+        self.thread = threading.Thread(target=self._watch, daemon=True)
+
+    def start(self):
+        self._running = True
+        self.last_beat = time.perf_counter()
+        self.timer.start()
+        self.thread.start()
+
+    def stop(self):
+        self._running = False
+        self.timer.stop()
+
+    def _beat(self):
+        now = time.perf_counter()
+        gap = now - self.last_beat - self.interval
+        if gap > self.stall:
+            self.stalls.append(
+                {"duration_ms": round(gap * 1000, 2), "culprit": self._culprit}
+            )
+        self._culprit = None
+        self.last_beat = now
+
+    def _watch(self):
+        while self._running:
+            time.sleep(self.interval)
+            if self._culprit is None and time.perf_counter() - self.last_beat > self.stall:
+                frame = sys._current_frames().get(self.gui_thread_id)
+                if frame is not None:
+                    stack = traceback.extract_stack(frame)
+                    own = [f for f in stack if "Benchmarks" not in f.filename] or stack
+                    top = own[-1]
+                    self._culprit = f"{Path(top.filename).name}:{top.lineno} {top.name}"
+
+
+class ModalAutopilot:
+    """Answers modal dialogs so the scripted session never blocks."""
+
+    def __init__(self):
+        from PyQt5.QtCore import QTimer
+
+        self.confirmed = set()
+        self.timer = QTimer()
+        self.timer.setInterval(1)
+        self.timer.timeout.connect(self._answer)
+
+    def start(self):
+        self.timer.start()
+
+    def _answer(self):
+        from PyQt5.QtCore import QTimer
+        from PyQt5.QtWidgets import QApplication
+        from Application.Components.components import PaymentConfirmationDialog
+
+        widget = QApplication.activeModalWidget()
+        if widget is None:
+            return
+        if isinstance(widget, PaymentConfirmationDialog) and id(widget) not in self.confirmed:
+            self.confirmed.add(id(widget))
+            # Confirm from the event loop, not this slot, so a message box
+            # the confirmation opens is answered by the next tick
+            QTimer.singleShot(0, widget.confirm_payment)
+            return
+        widget.reject()
+
+
+class CashierSession:
+    """Scripted cashier actions against a DashboardView."""
+
+    def __init__(self, app, dashboard, db, rng):
+        self.app = app
+        self.dashboard = dashboard
+        self.db = db
+        self.rng = rng
+        self.samples = {}
+        self.parked = []
+        self.recall_views = []
+
+        with db.get_connection() as conn:
+            self.groups = [row[0] for row in conn.execute("SELECT name FROM item_groups")]
+            self.categories = [row[0] for row in conn.execute("SELECT id FROM categories")]
+            self.barcodes = [row[0] for row in conn.execute("SELECT code FROM barcodes")]
+
+    def measure(self, name, action):
+        start = time.perf_counter()
+        action()
+        self.app.processEvents()
+        elapsed = (time.perf_counter() - start) * 1000
+        self.samples.setdefault(name, []).append(round(elapsed, 3))
+
+    def scan(self):
+        def action():
+            self.dashboard.pending_barcode = self.rng.choice(self.barcodes)
+            self.dashboard.process_pending_barcode()
+
+        self.measure("scan_barcode", action)
+
+    def steps(self):
+        """Yields one cashier action at a time."""
+        dashboard = self.dashboard
+        yield lambda: self.measure(
+            "switch_group", lambda: dashboard.update_category_cards(self.rng.choice(self.groups))
+        )
+        yield lambda: self.measure(
+            "switch_category", lambda: dashboard.update_product_grid(self.rng.choice(self.categories))
+        )
+        for _ in range(4):
+            yield self.scan
+
+        def edit_quantity():
+            if dashboard.table.rowCount():
+                dashboard.table.item(0, 2).setText("2")
+
+        yield lambda: self.measure("edit_quantity", edit_quantity)
+        yield lambda: self.measure("open_payment_card", dashboard.open_payment_card)
+        yield lambda: self.measure("confirm_payment", dashboard.payment_card.confirm_payment)
+        yield lambda: self.measure("clear_checkout", dashboard.clear_checkout)
+
+        for _ in range(2):
+            yield self.scan
+
+        def park():
+            before = dashboard.table.rowCount()
+            dashboard.add_to_cart()
+            if before and not dashboard.table.rowCount():
+                with self.db.get_connection() as conn:
+                    row = conn.execute(
+                        "SELECT order_number FROM carts ORDER BY id DESC LIMIT 1"
+                    ).fetchone()
+                if row:
+                    self.parked.append(row[0])
+
+        yield lambda: self.measure("park_cart", park)
+
+        def recall():
+            from Application.Components.OrderSummary.Recall.view import RecallView
+
+            if self.parked:
+                view = RecallView(dashboard, self.parked.pop())
+                view.show()
+                self.recall_views.append(view)
+
+        yield lambda: self.measure("recall_cart", recall)
+
+        def close_recall():
+            while self.recall_views:
+                self.recall_views.pop().close()
+
+        yield close_recall
+
+        def open_order_summary():
+            dashboard.show_page("order_summary")
+            dashboard.order_summary_view.load_orders()
+
+        yield lambda: self.measure("open_order_summary", open_order_summary)
+        yield lambda: self.measure("back_to_sales", dashboard.open_sales_view)
+
+
+def run(args):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    # Nothing listens on the discard port, so the till stays offline and no
+    # background sync interferes with the measurements.
+    os.environ["AMALI_API_BASE_URL"] = "http://127.0.0.1:9/api/v1"
+
+    workdir = tempfile.mkdtemp(prefix="amali-ui-")
+    db_path = Path(workdir) / "main_amali.db"
+    print(f"Generating catalog with {args.items} items in {db_path}...")
+    generate(db_path, items=args.items, orders=args.orders)
+
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication(sys.argv[:1])
+    watchdog = EventLoopWatchdog(args.heartbeat_ms, args.stall_ms)
+    autopilot = ModalAutopilot()
+    watchdog.start()
+    autopilot.start()
+
+    startup = time.perf_counter()
+    from Application.Components.main import DashboardView
+    from Helper.db_conn import db
+
+    dashboard = DashboardView()
+    dashboard.show()
+    app.processEvents()
+    startup_ms = (time.perf_counter() - startup) * 1000
+
+    session = CashierSession(app, dashboard, db, random.Random(args.seed))
+    steps = (step for _ in range(args.iterations) for step in session.steps())
+
+    def next_step():
+        try:
+            step = next(steps)
+        except StopIteration:
+            app.quit()
+            return
+        step()
+        QTimer.singleShot(args.pause_ms, next_step)
+
+    QTimer.singleShot(args.pause_ms, next_step)
+    app.exec_()
+    watchdog.stop()
+
+    stall_durations = [stall["duration_ms"] for stall in watchdog.stalls]
+    culprits = {}
+    for stall in watchdog.stalls:
+        if stall["culprit"]:
+            culprits[stall["culprit"]] = culprits.get(stall["culprit"], 0) + 1
+
+    return {
+        "benchmark": "ui_latency",
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "items": args.items,
+            "orders": args.orders,
+            "iterations": args.iterations,
+            "stall_ms": args.stall_ms,
+        },
+        "startup_ms": round(startup_ms, 2),
+        "actions": {name: summarize(values) for name, values in session.samples.items()},
+        "stalls": {
+            **summarize(stall_durations),
+            "top_culprits": sorted(culprits.items(), key=lambda kv: -kv[1])[:10],
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless UI latency harness")
+    parser.add_argument("--items", type=int, default=20000)
+    parser.add_argument("--orders", type=int, default=20000)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--pause-ms", type=int, default=20, help="idle time between actions")
+    parser.add_argument("--heartbeat-ms", type=int, default=5)
+    parser.add_argument("--stall-ms", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--output", help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    print(f"Startup: {report['startup_ms']} ms")
+    print(f"{'action':<20}{'n':>5}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for name, stats in report["actions"].items():
+        print(
+            f"{name:<20}{stats['count']:>5}{stats['p50_ms']:>10.1f}"
+            f"{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}{stats['max_ms']:>10.1f}"
+        )
+    stalls = report["stalls"]
+    print(f"GUI stalls > {args.stall_ms} ms: {stalls['count']} (p95 {stalls['p95_ms']} ms)")
+    for culprit, count in stalls["top_culprits"]:
+        print(f"  {count:>4}x {culprit}")
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,12 @@
 import json
 import requests
 from Helper.modal import db
-from PyQt5.QtGui import QIcon, QPixmap, QImage
-from PyQt5.QtCore import Qt
-
-
-def load_icon(icon_path):
-    """Loads an icon from the given path."""
-    return QIcon(QPixmap(icon_path))
-
-
-def load_image(image_url):
-    """Loads a QPixmap image from a file path or URL."""
-    pixmap = QPixmap()
-    if image_url.startswith(("http://", "https://")):
-        try:
-            response = requests.get(image_url, stream=True, timeout=10)
-            response.raise_for_status()
-            image = QImage()
-            image.loadFromData(response.content)
-            if not image.isNull():
-                pixmap = QPixmap.fromImage(image)
-            else:
-                print(
-                    f"Failed to load image from URL: {image_url} - Invalid image data"
-                )
-        except requests.exceptions.RequestException as e:
-            print(f"Error loading image from URL {image_url}: {e}")
-            return QPixmap()
-    else:
-        if not pixmap.load(image_url):
-            print(f"Failed to load image from local path: {image_url}")
-            return QPixmap()
-    return pixmap
+from Helper.change_bus import change_bus
+from Helper.network import API_BASE_URL
 
 
 def get_item_groups_from_api():
-    url = "https://c1.amali.japango.co.tz/api/v1/items/item_group"
+    url = f"{API_BASE_URL}/items/item_group"
     try:
         response = requests.get(url)
         response.raise_for_status()
@@ -55,7 +25,7 @@ def get_item_groups_from_api():
 
 
 def get_categories_for_group(group_name):
-    url = "https://c1.amali.japango.co.tz/api/v1/items/item_category"
+    url = f"{API_BASE_URL}/items/item_category"
     try:
         response = requests.get(url)
         response.raise_for_status()
@@ -79,7 +49,7 @@ def get_categories_for_group(group_name):
 
 def get_items_by_category_from_api(category_id):
     """Fetch items for a specific category from the server."""
-    url = f"https://c1.amali.japango.co.tz/api/v1/items/sale_items?item_category_id={category_id}"
+    url = f"{API_BASE_URL}/items/sale_items?item_category_id={category_id}"
     try:
         response = requests.get(url)
         response.raise_for_status()
@@ -111,7 +81,7 @@ def get_items_by_category_from_api(category_id):
 
 
 def get_payments_from_api():
-    url = "https://c1.amali.japango.co.tz/api/v1/payments/list"
+    url = f"{API_BASE_URL}/payments/list"
     try:
         response = requests.get(url)
         response.raise_for_status()
@@ -138,7 +108,7 @@ def get_payments_from_api():
 
 
 def get_customers_from_api():
-    url = "https://c1.amali.japango.co.tz/api/v1/customers/list"
+    url = f"{API_BASE_URL}/customers/list"
     try:
         response = requests.get(url)
         response.raise_for_status()
@@ -163,7 +133,7 @@ def get_customers_from_api():
 
 
 def get_customer_types_from_api():
-    url = "https://c1.amali.japango.co.tz/api/v1/customers/customer_type"
+    url = f"{API_BASE_URL}/customers/customer_type"
     try:
         response = requests.get(url)
         response.raise_for_status()
@@ -302,7 +272,7 @@ def sync_items_by_category(category_id):
 
 
 def get_company_details_from_api():
-    url = "https://c1.amali.japango.co.tz/api/v1/companies/company_details"
+    url = f"{API_BASE_URL}/companies/company_details"
     try:
         response = requests.get(url)
         response.raise_for_status()
@@ -342,7 +312,7 @@ def get_company_details_from_api():
 
 def post_order_to_server(order_data):
     """Post order data to the server API."""
-    url = "https://c1.amali.japango.co.tz/api/v1/orders/store_local_sale"
+    url = f"{API_BASE_URL}/orders/store_local_sale"
     headers = {"Content-Type": "application/json"}
 
     # Prepare payload matching server expectations
@@ -378,7 +348,7 @@ def post_order_to_server(order_data):
 
 def update_server_stock(stock_changes):
     """Update server-side item_stocks to match the local stock quantity."""
-    url = "https://c1.amali.japango.co.tz/api/v1/stocks/update"  # Replace with actual endpoint
+    url = f"{API_BASE_URL}/stocks/update"  # Replace with actual endpoint
     headers = {"Content-Type": "application/json"}
 
     # Prepare payload to set the exact stock quantity on the server
@@ -453,7 +423,20 @@ def save_and_sync_order(order_data, items, payment_id, customer_id):
 
 
 def sync_data_with_server():
-    """Synchronize local database with server data, treating server as source of truth."""
+    """Synchronize local database with server data, treating server as source of truth.
+
+    Change events raised while applying server data are batched, so
+    subscribers receive one event per entity and operation once the sync
+    has finished, and nothing at all when the server had no changes. Writes
+    made by this thread meanwhile are not journaled, so server data is not
+    pushed back by push_local_changes(); edits made elsewhere during the
+    sync still are.
+    """
+    with change_bus.batch(), db.changelog_muted():
+        return _apply_server_data()
+
+
+def _apply_server_data():
     try:
         server_groups = get_item_groups_from_api()
         if not server_groups:
@@ -538,6 +521,7 @@ def sync_data_with_server():
                 )
                 # ... (delete related records as in original code)
                 conn.commit()
+                change_bus.publish("items", items_to_delete, "delete")
 
         items_synced = 0
         for item in all_server_items:
@@ -602,6 +586,7 @@ def sync_data_with_server():
                     tuple(payments_to_delete),
                 )
                 conn.commit()
+                change_bus.publish("payments", payments_to_delete, "delete")
                 print(f"Deleted {len(payments_to_delete)} local payments not on server")
 
         for payment in server_payments:
@@ -644,6 +629,7 @@ def sync_data_with_server():
                     tuple(customers_to_delete),
                 )
                 conn.commit()
+                change_bus.publish("customers", customers_to_delete, "delete")
                 print(
                     f"Deleted {len(customers_to_delete)} local customers not on server"
                 )
@@ -687,6 +673,7 @@ def sync_data_with_server():
                     tuple(customer_types_to_delete),
                 )
                 conn.commit()
+                change_bus.publish("customer_types", customer_types_to_delete, "delete")
                 print(
                     f"Deleted {len(customer_types_to_delete)} local customer types not on server"
                 )
@@ -732,6 +719,7 @@ def sync_data_with_server():
                     tuple(companies_to_delete),
                 )
                 conn.commit()
+                change_bus.publish("companies", companies_to_delete, "delete")
                 print(
                     f"Deleted {len(companies_to_delete)} local companies not on server"
                 )
@@ -772,8 +760,42 @@ def sync_data_with_server():
         return False
 
 
+def push_local_changes(batch_size=200):
+    """Push journaled master-data edits to the server in ordered batches.
+
+    Entries are compacted first, then sent oldest first. Entries the server
+    acknowledges are removed from the journal; anything else stays queued
+    for the next run. Returns the number of acknowledged entries.
+    """
+    db.compact_changelog()
+    url = f"{API_BASE_URL}/sync/changes"
+    pushed = 0
+    while True:
+        changes = db.get_pending_changes(batch_size)
+        if not changes:
+            break
+        try:
+            response = requests.post(url, json={"changes": changes}, timeout=30)
+            response.raise_for_status()
+            result = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"Failed to push {len(changes)} local changes: {e}")
+            break
+
+        acknowledged = result.get("acknowledged", [c["id"] for c in changes])
+        db.acknowledge_changes(acknowledged)
+        pushed += len(acknowledged)
+        if len(acknowledged) < len(changes):
+            # The server stopped part-way; retry the rest on the next run
+            break
+
+    if pushed:
+        print(f"Pushed {pushed} local changes to server")
+    return pushed
+
+
 def post_new_item_to_api(item_data):
-    url = "https://c1.amali.japango.co.tz/api/v1/items/sale_items"
+    url = f"{API_BASE_URL}/items/sale_items"
     headers = {"Content-Type": "application/json"}
     try:
         response = requests.post(url, data=json.dumps(item_data), headers=headers)
@@ -0,0 +1,78 @@
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+
+# A single change notification: `entity` is the table-level name (e.g.
+# "items", "customers"), `ids` a frozenset of affected primary keys and `op`
+# one of "insert", "update" or "delete".
+ChangeEvent = namedtuple("ChangeEvent", ["entity", "ids", "op"])
+
+
+class ChangeBus:
+    """Publishes data changes to subscribed views.
+
+    Publishers (the sync apply phase and the local write paths) report what
+    they touched; subscribers patch only the widgets that show those rows.
+    Inside `batch()` events are buffered and merged per (entity, op), so a
+    sync run delivers at most one event per entity and operation, and none
+    at all when nothing changed.
+
+    Callbacks run on the publishing thread. GUI subscribers must hop to the
+    GUI thread themselves (e.g. by emitting a queued Qt signal).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._local = threading.local()
+
+    def subscribe(self, callback, entities=None):
+        """Registers callback(event); `entities` optionally limits delivery."""
+        entry = (callback, frozenset(entities) if entities else None)
+        with self._lock:
+            self._subscribers.append(entry)
+        return entry
+
+    def unsubscribe(self, token):
+        with self._lock:
+            if token in self._subscribers:
+                self._subscribers.remove(token)
+
+    def publish(self, entity, ids, op):
+        ids = frozenset(i for i in ids if i is not None)
+        if not ids:
+            return
+        pending = getattr(self._local, "pending", None)
+        if pending is not None:
+            pending.setdefault((entity, op), set()).update(ids)
+            return
+        self._dispatch(ChangeEvent(entity, ids, op))
+
+    @contextmanager
+    def batch(self):
+        """Buffers events published on this thread until the block exits."""
+        if getattr(self._local, "pending", None) is not None:
+            # Nested batch: the outermost one flushes.
+            yield
+            return
+        self._local.pending = {}
+        try:
+            yield
+        finally:
+            pending, self._local.pending = self._local.pending, None
+            for (entity, op), ids in pending.items():
+                self._dispatch(ChangeEvent(entity, frozenset(ids), op))
+
+    def _dispatch(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback, entities in subscribers:
+            if entities is not None and event.entity not in entities:
+                continue
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"ChangeBus: subscriber failed for {event.entity}: {e}")
+
+
+change_bus = ChangeBus()
@@ -0,0 +1,63 @@
+import threading
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from Helper.network import probe
+
+
+class ConnectivityMonitor(QThread):
+    """Probes the API host off the GUI thread and reports state changes.
+
+    While online the host is probed every `interval` seconds. Once a probe
+    fails the delay doubles on every further failure, up to `max_backoff`,
+    so an offline till does not keep hammering the network. `online` and
+    `offline` are only emitted when the state changes (and once for the
+    first probe), so subscribers can react without tracking state.
+    """
+
+    online = pyqtSignal()
+    offline = pyqtSignal()
+
+    def __init__(self, host, port, interval=10, max_backoff=120, timeout=3.0, parent=None):
+        super().__init__(parent)
+        self.host = host
+        self.port = port
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self._is_online = None
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+
+    @property
+    def is_online(self):
+        return bool(self._is_online)
+
+    def check_now(self):
+        """Skips the current wait and probes immediately."""
+        self._wake_event.set()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake_event.set()
+        self.wait()
+
+    def run(self):
+        delay = self.interval
+        while not self._stop_event.is_set():
+            reachable = probe(self.host, self.port, self.timeout)
+            if reachable != self._is_online:
+                self._is_online = reachable
+                print(
+                    f"ConnectivityMonitor: {self.host}:{self.port} is "
+                    f"{'reachable' if reachable else 'unreachable'}"
+                )
+                (self.online if reachable else self.offline).emit()
+
+            if reachable:
+                wait_for, delay = self.interval, self.interval
+            else:
+                wait_for, delay = delay, min(delay * 2, self.max_backoff)
+
+            self._wake_event.wait(wait_for)
+            self._wake_event.clear()
@@ -1,30 +1,223 @@
+import datetime
 import hashlib
+import json
 import logging
+import os
 import sqlite3
 from pathlib import Path
 from contextlib import contextmanager
 import threading
 import time
 
+from Helper.change_bus import change_bus
+from Helper.slow_query import connection_factory
+
+logger = logging.getLogger(__name__)
+
+
+# Master-data tables whose local edits are journaled into `changelog` so they
+# can be pushed to the server incrementally.
+CHANGELOG_TABLES = ("items", "categories", "units", "stores", "payments", "expenses")
+
+# Bookkeeping columns that do not count as a change on their own.
+CHANGELOG_IGNORED_COLUMNS = {"id", "created_at", "updated_at"}
+
+# Store this till sells from; catalog reads are scoped to it.
+STORE_ID = int(os.environ.get("AMALI_STORE_ID", "1"))
+
+# Till within the store. Order and receipt numbers carry the store and
+# till, so numbers allocated on different tills never collide.
+TERMINAL_ID = int(os.environ.get("AMALI_TERMINAL_ID", "1"))
+
+# Sequences of number_sequences and the numbers they format to
+NUMBER_FORMATS = {
+    "order": f"ORD-{STORE_ID}-{TERMINAL_ID:02d}-{{:07d}}",
+    "receipt": f"REC-{STORE_ID}-{TERMINAL_ID:02d}-{{:07d}}",
+}
+
+# Columns of catalog_view derived from the item tables for one item and
+# store. {item} and {store} are SQL expressions for the two ids.
+CATALOG_DERIVED_COLUMNS = {
+    "unit": """(SELECT u.name FROM item_units iu
+                JOIN units u ON u.id = iu.selling_unit_id
+                WHERE iu.item_id = {item} ORDER BY iu.id LIMIT 1)""",
+    "price": """COALESCE((SELECT ip.amount FROM item_prices ip
+                WHERE ip.item_id = {item} AND ip.store_id = {store}
+                ORDER BY ip.id LIMIT 1), 0)""",
+    "stock_quantity": """COALESCE((SELECT SUM(s.stock_quantity) FROM item_stocks s
+                JOIN stocks sk ON sk.id = s.stock_id
+                WHERE s.item_id = {item} AND sk.store_id = {store}), 0)""",
+    "barcode": """(SELECT b.code FROM item_barcodes ib
+                JOIN barcodes b ON b.id = ib.barcode_id
+                WHERE ib.item_id = {item} ORDER BY ib.id LIMIT 1)""",
+    "thumbnail": """(SELECT im.file_path FROM item_images ii
+                JOIN images im ON im.id = ii.image_id
+                WHERE ii.item_id = {item} ORDER BY ii.id LIMIT 1)""",
+}
+CATALOG_COLUMNS = ("item_id", "store_id", "category_id", "name", "status") + tuple(
+    CATALOG_DERIVED_COLUMNS
+)
+
+# Kinds of stock_movements rows. The ledger is authoritative: every stock
+# change is a movement, applied to item_stocks by a trigger. Quantities
+# are signed (a sale or transfer out is negative). movement_date is local
+# time, like orders.date, so movements fall on the same working day as the
+# sales that day close and item_daily_sales count.
+STOCK_MOVEMENT_TYPES = (
+    "opening",
+    "sale",
+    "void",
+    "adjustment",
+    "receipt",
+    "transfer_in",
+    "transfer_out",
+    "count",
+    "import",
+    "sync",
+)
+# On-hand stock of :item_id in :store_id, as kept in item_stocks
+ON_HAND_SQL = CATALOG_DERIVED_COLUMNS["stock_quantity"].format(
+    item=":item_id", store=":store_id"
+)
+# Stock of every item of :store_id at the close of :day is the item's
+# latest snapshot on or before :day plus the movements it does not count:
+# those dated after the snapshot day, or on that day but recorded after it
+# was taken. That is one index seek and a few rows per item, not a scan
+# of the ledger.
+STOCK_SNAPSHOT_FROM = """
+    FROM stocks sk
+    LEFT JOIN stock_snapshots sn
+        ON sn.store_id = sk.store_id AND sn.item_id = sk.item_id
+        AND sn.day = (
+            SELECT MAX(day) FROM stock_snapshots
+            WHERE store_id = sk.store_id AND item_id = sk.item_id AND day <= :day
+        )
+    WHERE sk.store_id = :store_id
+"""
+STOCK_SINCE_SNAPSHOT = """
+    stock_movements m
+    WHERE m.store_id = sk.store_id AND m.item_id = sk.item_id
+      AND m.movement_date >= COALESCE(sn.day, '')
+      AND m.movement_date < date(:day, '+1 day')
+      AND (sn.day IS NULL OR m.movement_date >= date(sn.day, '+1 day')
+           OR m.id > sn.movement_id)
+"""
+STOCK_AT_SQL = f"""
+    SELECT sk.item_id,
+           COALESCE(sn.quantity, 0)
+           + COALESCE((SELECT SUM(m.quantity) FROM {STOCK_SINCE_SNAPSHOT}), 0) AS quantity
+    {STOCK_SNAPSHOT_FROM}
+"""
+
+# Rankings offered by get_top_selling_items, as item_daily_sales expressions
+TOP_ITEM_METRICS = {
+    "quantity": "SUM(f.quantity)",
+    "revenue": "SUM(f.revenue)",
+    "margin": "SUM(f.revenue - f.cost)",
+}
+
+# Threads applying server data (see DatabaseManager.changelog_muted)
+_changelog_mute = threading.local()
+
+# Drops the journal rows created by writes on the connection it is
+# installed on. TEMP triggers live only on their own connection, so writes
+# made meanwhile on other connections and by other processes are still
+# journaled.
+CHANGELOG_MUTE_TRIGGER = """
+    CREATE TEMP TRIGGER IF NOT EXISTS changelog_mute AFTER INSERT ON main.changelog
+    BEGIN
+        DELETE FROM changelog WHERE id = NEW.id;
+    END
+"""
+
+
+def mute_changelog(conn):
+    """Stops writes made on `conn` from being journaled, for its lifetime."""
+    conn.execute(CHANGELOG_MUTE_TRIGGER)
+
+
+# Databases whose schema has been set up by this process. Every manager
+# creates its own DatabaseManager, so the schema work is done only once.
+_initialized_paths = set()
+_initialized_lock = threading.Lock()
+
+
+def _prefix_end(prefix):
+    """Smallest string after every string starting with `prefix`.
+
+    `col >= prefix AND col < _prefix_end(prefix)` is a prefix match that,
+    unlike LIKE, can use an index on col.
+    """
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1) if prefix else "\U0010ffff"
+
 
 class DatabaseManager:
-    def __init__(self):
-        self.db_path = Path("Helper/main_amali.db")
+    def __init__(self, db_path=None):
+        # AMALI_DB_PATH lets benchmarks and tools run against another database
+        self.db_path = Path(
+            db_path or os.environ.get("AMALI_DB_PATH", "Helper/main_amali.db")
+        )
         self.db_path.parent.mkdir(exist_ok=True)
         self.lock = threading.Lock()
+        self._local = threading.local()
         self.sync_in_progress = False
-        self.init_database()
+        key = self.db_path.resolve()
+        with _initialized_lock:
+            # A missing file means it was removed since, so set it up again
+            if key not in _initialized_paths or not self.db_path.exists():
+                self.init_database()
+                _initialized_paths.add(key)
+
+    def connect(self):
+        """Opens a raw connection; the caller is responsible for closing it.
+
+        With AMALI_SLOW_QUERY_MS set, connections are timed so slow
+        statements end up in the slow-query log.
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30, factory=connection_factory())
+        if getattr(_changelog_mute, "depth", 0):
+            try:
+                mute_changelog(conn)
+            except sqlite3.OperationalError:
+                pass  # No journal yet, so there is nothing to mute
+        return conn
+
+    def open_connection(self):
+        """Opens a connection set up like get_connection's, for callers that
+        keep it across several steps; the caller closes it.
+
+        Unlike get_connection it does not hold the manager's lock, so
+        concurrent writers rely on SQLite's own locking (busy timeout).
+        """
+        conn = self.connect()
+        conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign key constraints
+        return conn
 
     @contextmanager
     def get_connection(self):
         with self.lock:
-            conn = sqlite3.connect(self.db_path, timeout=30)
-            conn.execute("PRAGMA foreign_keys = ON")  # Enable foreign key constraints
+            conn = self.open_connection()
             try:
                 yield conn
             finally:
                 conn.close()
 
+    @contextmanager
+    def read_connection(self):
+        """A connection kept open per thread for hot read-only lookups.
+
+        A new connection makes SQLite parse the whole schema (several ms
+        with the triggers of this database) on its first statement, which
+        dwarfs an indexed lookup. The connection is query_only and, with
+        no open statement, holds no lock between calls.
+        """
+        conn = getattr(self._local, "reader", None)
+        if conn is None:
+            conn = self.connect()
+            conn.execute("PRAGMA query_only = ON")
+            self._local.reader = conn
+        yield conn
+
     def init_database(self):
         try:
             with self.get_connection() as conn:
@@ -539,42 +732,1166 @@ class DatabaseManager:
                     """
                 )
 
+                # Rolling per-day checkout latency histograms (Helper/tracing.py);
+                # `bucket` indexes LATENCY_BUCKETS_MS.
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS latency_histograms (
+                        day TEXT NOT NULL,
+                        stage TEXT NOT NULL,
+                        bucket INTEGER NOT NULL,
+                        count INTEGER NOT NULL DEFAULT 0,
+                        PRIMARY KEY (day, stage, bucket)
+                    )
+                    """
+                )
+
+                # Written by the sync daemon (Helper/sync), read by the GUI:
+                # one row per job plus a "daemon" row carrying its heartbeat.
+                # Times are Unix timestamps.
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS sync_status (
+                        job TEXT PRIMARY KEY,
+                        state TEXT NOT NULL DEFAULT 'idle',
+                        pid INTEGER,
+                        heartbeat_at REAL,
+                        last_started_at REAL,
+                        last_finished_at REAL,
+                        last_success_at REAL,
+                        last_error TEXT,
+                        last_result TEXT,
+                        runs INTEGER NOT NULL DEFAULT 0,
+                        failures INTEGER NOT NULL DEFAULT 0
+                    )
+                    """
+                )
+                # Change-bus events raised in the daemon process, replayed by
+                # the GUI so its views are patched as if the sync ran in-process.
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS change_events (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        entity TEXT NOT NULL,
+                        op TEXT NOT NULL,
+                        ids TEXT NOT NULL,
+                        created_at REAL NOT NULL
+                    )
+                    """
+                )
+                # Print queue of Helper.print_spooler; jobs outlive a restart
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS print_jobs (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        device TEXT NOT NULL,
+                        document TEXT NOT NULL,
+                        payload TEXT NOT NULL,
+                        open_drawer INTEGER NOT NULL DEFAULT 0,
+                        drawer_opened INTEGER NOT NULL DEFAULT 0,
+                        status TEXT NOT NULL DEFAULT 'pending'
+                            CHECK (status IN ('pending', 'printing', 'done', 'failed')),
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        last_error TEXT,
+                        next_attempt_at REAL NOT NULL DEFAULT 0,
+                        created_at REAL NOT NULL,
+                        updated_at REAL NOT NULL
+                    )
+                    """
+                )
+                cursor.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_print_jobs_queue
+                    ON print_jobs (device, status, next_attempt_at)
+                    """
+                )
+                # Which configured printers get which document (receipt,
+                # reprint, day_close); see Helper.print_devices
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS print_routes (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        document TEXT NOT NULL,
+                        printer_name TEXT NOT NULL,
+                        UNIQUE (document, printer_name)
+                    )
+                    """
+                )
+                # Date ranges and order lines scanned by exports (Helper.export)
+                for table, columns in (
+                    ("orders", "date"),
+                    ("order_items", "order_id"),
+                    ("order_payments", "order_id"),
+                    ("stock_movements", "movement_date"),
+                    ("expenses", "expense_date"),
+                ):
+                    cursor.execute(
+                        f"CREATE INDEX IF NOT EXISTS idx_{table}_{columns} "
+                        f"ON {table} ({columns})"
+                    )
+
+                # Order Summary lists and counts carts of one day
+                cursor.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_carts_date ON carts (date)"
+                )
+                # Lines and charges of one cart, read on recall and diffed on save
+                cursor.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_cart_items_cart_id
+                    ON cart_items (cart_id, item_id)
+                    """
+                )
+                cursor.execute(
+                    """
+                    CREATE INDEX IF NOT EXISTS idx_cart_extra_charges_cart_id
+                    ON cart_extra_charges (cart_id)
+                    """
+                )
+
+                self._create_changelog(cursor)
+                self._create_catalog_view(cursor)
+                self._create_item_daily_sales(cursor)
+                self._create_order_numbers(cursor)
+                self._create_stock_ledger(cursor)
+
                 conn.commit()
                 # Verify insertions
                 cursor.execute("SELECT id FROM users WHERE username = 'admin'")
                 admin_user = cursor.fetchone()
                 if admin_user:
-                    print(f"Admin user created with ID: {admin_user[0]}")
+                    logger.debug("Admin user present with ID %s", admin_user[0])
                 else:
-                    print("Failed to create admin user!")
+                    logger.error("Failed to create admin user!")
 
                 cursor.execute("SELECT id FROM stores WHERE name = 'Mohalal Shop'")
                 store = cursor.fetchone()
                 if store:
-                    print(f"Store created with ID: {store[0]}")
+                    logger.debug("Default store present with ID %s", store[0])
                 else:
-                    print("Failed to create default store!")
+                    logger.error("Failed to create default store!")
 
                 cursor.execute("SELECT id FROM payment_types WHERE name = 'Cash'")
                 payment_type = cursor.fetchone()
                 if payment_type:
-                    print(f"Payment type created with ID: {payment_type[0]}")
+                    logger.debug("Default payment type present with ID %s", payment_type[0])
                 else:
-                    print("Failed to create default payment type!")
+                    logger.error("Failed to create default payment type!")
 
                 cursor.execute("SELECT id FROM payments WHERE short_code = 'Cash'")
                 payment = cursor.fetchone()
                 if payment:
-                    print(f"Payment created with ID: {payment[0]}")
+                    logger.debug("Default payment present with ID %s", payment[0])
                 else:
-                    print("Failed to create default payment!")
+                    logger.error("Failed to create default payment!")
 
         except sqlite3.Error as e:
-            print(f"Error initializing database: {e}")
+            logger.error("Error initializing database: %s", e)
             if "conn" in locals():
                 conn.rollback()
             raise
 
+    def _create_changelog(self, cursor):
+        """Creates the change journal and its triggers.
+
+        Trigger bodies are generated from the live column list and replaced
+        whenever they differ, so columns added by later migrations are
+        journaled too.
+        """
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS changelog (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                op TEXT CHECK(op IN ('insert', 'update', 'delete')) NOT NULL,
+                changed_columns TEXT,
+                changed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+            """
+        )
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_changelog_row
+            ON changelog (table_name, row_id)
+            """
+        )
+        # Replaced by per-connection muting (changelog_muted)
+        cursor.execute("DROP TABLE IF EXISTS changelog_state")
+
+        for table in CHANGELOG_TABLES:
+            cursor.execute(f"PRAGMA table_info({table})")
+            columns = [
+                row[1]
+                for row in cursor.fetchall()
+                if row[1] not in CHANGELOG_IGNORED_COLUMNS
+            ]
+            column_diff = " || ".join(
+                f"CASE WHEN OLD.{col} IS NOT NEW.{col} THEN '{col},' ELSE '' END"
+                for col in columns
+            )
+            any_changed = " OR ".join(f"OLD.{col} IS NOT NEW.{col}" for col in columns)
+
+            triggers = {
+                f"changelog_{table}_insert": f"""CREATE TRIGGER changelog_{table}_insert AFTER INSERT ON {table}
+                BEGIN
+                    INSERT INTO changelog (table_name, row_id, op)
+                    VALUES ('{table}', NEW.id, 'insert');
+                END""",
+                f"changelog_{table}_update": f"""CREATE TRIGGER changelog_{table}_update AFTER UPDATE ON {table}
+                WHEN {any_changed}
+                BEGIN
+                    INSERT INTO changelog (table_name, row_id, op, changed_columns)
+                    VALUES ('{table}', NEW.id, 'update', rtrim({column_diff}, ','));
+                END""",
+                f"changelog_{table}_delete": f"""CREATE TRIGGER changelog_{table}_delete AFTER DELETE ON {table}
+                BEGIN
+                    INSERT INTO changelog (table_name, row_id, op)
+                    VALUES ('{table}', OLD.id, 'delete');
+                END""",
+            }
+            self._replace_triggers(cursor, triggers)
+
+    def _replace_triggers(self, cursor, triggers):
+        """Creates the {name: sql} triggers, replacing any whose SQL differs.
+
+        Returns True if any trigger was (re)created.
+        """
+        replaced = False
+        for name, sql in triggers.items():
+            cursor.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?",
+                (name,),
+            )
+            existing = cursor.fetchone()
+            if existing and existing[0] == sql:
+                continue
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute(sql)
+            replaced = True
+        return replaced
+
+    def _catalog_select(self, where):
+        """SELECT producing catalog_view rows for the item x store pairs in `where`."""
+        derived = ",\n                ".join(
+            sql.format(item="i.id", store="st.id")
+            for sql in CATALOG_DERIVED_COLUMNS.values()
+        )
+        return f"""SELECT i.id, st.id, i.category_id, i.name, i.status,
+                {derived}
+                FROM items i CROSS JOIN stores st
+                WHERE {where}"""
+
+    def _create_catalog_view(self, cursor):
+        """Creates catalog_view, the store-scoped read model of the catalog.
+
+        It holds exactly one row per item and store with the selling unit,
+        price, on-hand stock, primary barcode and thumbnail, so the sales
+        grid, search and barcode lookup read a single indexed table instead
+        of joining six. Triggers on the source tables keep it current for
+        every writer, including the sync pull and the sync daemon; price
+        and stock changes only touch the affected column. If a trigger
+        definition changed the table is rebuilt, which also fills it on
+        the first run.
+        """
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS catalog_view (
+                item_id INTEGER NOT NULL,
+                store_id INTEGER NOT NULL,
+                category_id INTEGER,
+                name TEXT NOT NULL,
+                status TEXT,
+                unit TEXT,
+                price REAL NOT NULL DEFAULT 0,
+                stock_quantity REAL NOT NULL DEFAULT 0,
+                barcode TEXT,
+                thumbnail TEXT,
+                PRIMARY KEY (item_id, store_id)
+            ) WITHOUT ROWID
+            """
+        )
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_catalog_view_category
+            ON catalog_view (store_id, category_id)
+            """
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_catalog_view_barcode ON catalog_view (barcode)"
+        )
+        # Lookups the triggers below run for every changed row
+        for table, columns in (
+            ("item_prices", "item_id, store_id"),
+            ("item_stocks", "item_id"),
+            ("item_units", "item_id"),
+            ("item_barcodes", "item_id"),
+            ("item_images", "item_id"),
+            ("barcodes", "code"),
+        ):
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table}_{columns.split(',')[0]} "
+                f"ON {table} ({columns})"
+            )
+
+        columns = ", ".join(CATALOG_COLUMNS)
+
+        def refresh(where):
+            return (
+                f"INSERT OR REPLACE INTO catalog_view ({columns})\n"
+                f"                {self._catalog_select(where)};"
+            )
+
+        def set_column(column, item, store):
+            expression = CATALOG_DERIVED_COLUMNS[column].format(item=item, store=store)
+            return (
+                f"UPDATE catalog_view SET {column} = {expression}\n"
+                f"                WHERE item_id = {item} AND store_id = {store};"
+            )
+
+        stock_store = "(SELECT store_id FROM stocks WHERE id = {row}.stock_id)"
+        bodies = {
+            ("items", "insert"): refresh("i.id = NEW.id"),
+            ("items", "update"): "DELETE FROM catalog_view WHERE item_id = OLD.id;\n"
+            + refresh("i.id = NEW.id"),
+            ("items", "delete"): "DELETE FROM catalog_view WHERE item_id = OLD.id;",
+            ("stores", "insert"): refresh("st.id = NEW.id"),
+            ("stores", "delete"): "DELETE FROM catalog_view WHERE store_id = OLD.id;",
+            ("units", "update"): refresh(
+                "i.id IN (SELECT item_id FROM item_units WHERE selling_unit_id = NEW.id)"
+            ),
+            ("barcodes", "update"): refresh(
+                "i.id IN (SELECT item_id FROM item_barcodes WHERE barcode_id = NEW.id)"
+            ),
+            ("images", "update"): refresh(
+                "i.id IN (SELECT item_id FROM item_images WHERE image_id = NEW.id)"
+            ),
+        }
+        for table in ("item_units", "item_barcodes", "item_images"):
+            bodies[(table, "insert")] = refresh("i.id = NEW.item_id")
+            bodies[(table, "update")] = refresh("i.id IN (OLD.item_id, NEW.item_id)")
+            bodies[(table, "delete")] = refresh("i.id = OLD.item_id")
+        for op, rows in (("insert", ["NEW"]), ("update", ["OLD", "NEW"]), ("delete", ["OLD"])):
+            bodies[("item_prices", op)] = "\n".join(
+                set_column("price", f"{row}.item_id", f"{row}.store_id") for row in rows
+            )
+            bodies[("item_stocks", op)] = "\n".join(
+                set_column(
+                    "stock_quantity", f"{row}.item_id", stock_store.format(row=row)
+                )
+                for row in rows
+            )
+
+        triggers = {}
+        for (table, op), body in bodies.items():
+            name = f"catalog_{table}_{op}"
+            triggers[name] = f"""CREATE TRIGGER {name} AFTER {op.upper()} ON {table}
+                BEGIN
+                {body}
+                END"""
+        if self._replace_triggers(cursor, triggers):
+            self._rebuild_catalog_view(cursor)
+
+    def _rebuild_catalog_view(self, cursor):
+        cursor.execute("DELETE FROM catalog_view")
+        cursor.execute(
+            f"INSERT INTO catalog_view ({', '.join(CATALOG_COLUMNS)}) "
+            f"{self._catalog_select('1')}"
+        )
+        logger.info("Rebuilt catalog_view with %d rows", cursor.rowcount)
+        return cursor.rowcount
+
+    def rebuild_catalog_view(self):
+        """Recomputes catalog_view from the item tables.
+
+        The triggers keep it current; this is the periodic safety net run by
+        the maintenance job.
+        """
+        try:
+            with self.get_connection() as conn:
+                rows = self._rebuild_catalog_view(conn.cursor())
+                conn.commit()
+                return rows
+        except sqlite3.Error as e:
+            print(f"Error rebuilding catalog view: {e}")
+            return 0
+
+    def _create_order_numbers(self, cursor):
+        """Creates number_sequences and the unique order/receipt number indexes.
+
+        Numbers used to be random (ORD-1234) or the time of day, so older
+        databases can hold duplicates; all but the first of each get the
+        row id appended before the unique indexes are created. Sequences
+        start after the highest number this till has already issued.
+        """
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS number_sequences (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL DEFAULT 0
+            ) WITHOUT ROWID
+            """
+        )
+        for column in ("order_number", "receipt_number"):
+            index = f"idx_orders_{column}"
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (index,)
+            )
+            if cursor.fetchone():
+                continue
+            renamed = 0
+            while True:
+                cursor.execute(
+                    f"""
+                    UPDATE orders SET {column} = {column} || '-' || id
+                    WHERE {column} IN (
+                        SELECT {column} FROM orders GROUP BY {column} HAVING COUNT(*) > 1
+                    )
+                    AND id NOT IN (SELECT MIN(id) FROM orders GROUP BY {column})
+                    """
+                )
+                if cursor.rowcount <= 0:
+                    break
+                renamed += cursor.rowcount
+            if renamed:
+                logger.warning("Renamed %d duplicate order %s(s)", renamed, column)
+            cursor.execute(f"CREATE UNIQUE INDEX {index} ON orders ({column})")
+
+        # Amount searches and "orders containing item" in search_orders
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_orders_ground_total ON orders (ground_total)"
+        )
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_order_items_item_id
+            ON order_items (item_id, order_id)
+            """
+        )
+
+        for name, column in (("order", "order_number"), ("receipt", "receipt_number")):
+            prefix = NUMBER_FORMATS[name].split("{")[0]
+            cursor.execute(
+                f"""
+                INSERT OR IGNORE INTO number_sequences (name, value)
+                SELECT ?, COALESCE(MAX(CAST(substr({column}, ?) AS INTEGER)), 0)
+                FROM orders WHERE {column} >= ? AND {column} < ?
+                """,
+                (name, len(prefix) + 1, prefix, _prefix_end(prefix)),
+            )
+
+    def _create_stock_ledger(self, cursor):
+        """Makes stock_movements the stock ledger and creates stock_snapshots.
+
+        Movements used to be written for sales only, next to direct
+        item_stocks updates. The first run adds store_id to the movements
+        and, per item, an 'opening' movement dated before its first one, so
+        the ledger adds up to the balance in item_stocks. From then on the
+        stock_movements_apply trigger keeps item_stocks as the running
+        balance of the ledger; nothing writes item_stocks directly.
+
+        stock_snapshots holds the on-hand stock at the close of a day,
+        written at day close for the items that moved (see
+        write_stock_snapshot and STOCK_AT_SQL).
+        """
+        cursor.execute("PRAGMA table_info(stock_movements)")
+        if "store_id" not in {row[1] for row in cursor.fetchall()}:
+            cursor.execute(
+                "ALTER TABLE stock_movements "
+                f"ADD COLUMN store_id INTEGER NOT NULL DEFAULT {STORE_ID}"
+            )
+            cursor.execute(
+                """
+                INSERT INTO stock_movements
+                    (item_id, store_id, movement_type, quantity, movement_date)
+                SELECT b.item_id, b.store_id, 'opening', b.quantity - COALESCE(m.quantity, 0),
+                       COALESCE(m.first, datetime('now', 'localtime'))
+                FROM (
+                    SELECT s.item_id, sk.store_id, SUM(s.stock_quantity) AS quantity
+                    FROM item_stocks s JOIN stocks sk ON sk.id = s.stock_id
+                    GROUP BY s.item_id, sk.store_id
+                ) b
+                LEFT JOIN (
+                    SELECT item_id, store_id, SUM(quantity) AS quantity,
+                           MIN(movement_date) AS first
+                    FROM stock_movements GROUP BY item_id, store_id
+                ) m ON m.item_id = b.item_id AND m.store_id = b.store_id
+                WHERE b.quantity IS NOT COALESCE(m.quantity, 0)
+                """
+            )
+            if cursor.rowcount:
+                logger.info("Opened the stock ledger for %d item(s)", cursor.rowcount)
+
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS stock_snapshots (
+                store_id INTEGER NOT NULL,
+                item_id INTEGER NOT NULL,
+                day TEXT NOT NULL,
+                quantity REAL NOT NULL,
+                -- Last movement when taken; later ones of the day are not counted
+                movement_id INTEGER NOT NULL,
+                PRIMARY KEY (store_id, item_id, day)
+            ) WITHOUT ROWID
+            """
+        )
+        # Movements of one item after its snapshot (STOCK_AT_SQL)
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS idx_stock_movements_ledger
+            ON stock_movements (store_id, item_id, movement_date, quantity)
+            """
+        )
+        # The first movement of an item in a store creates its stock rows
+        cursor.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS stock_movements_apply
+            AFTER INSERT ON stock_movements
+            WHEN NEW.item_id IS NOT NULL AND NEW.quantity != 0
+            BEGIN
+                INSERT OR IGNORE INTO stocks
+                    (item_id, store_id, min_quantity, max_quantity, created_at, updated_at)
+                VALUES (NEW.item_id, NEW.store_id, 0, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);
+                INSERT INTO item_stocks (item_id, stock_id, stock_quantity, created_at, updated_at)
+                SELECT NEW.item_id, sk.id, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+                FROM stocks sk
+                WHERE sk.item_id = NEW.item_id AND sk.store_id = NEW.store_id
+                  AND NOT EXISTS (
+                      SELECT 1 FROM item_stocks s
+                      WHERE s.item_id = NEW.item_id AND s.stock_id = sk.id
+                  );
+                UPDATE item_stocks
+                SET stock_quantity = stock_quantity + NEW.quantity,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = (
+                    SELECT s.id FROM item_stocks s JOIN stocks sk ON sk.id = s.stock_id
+                    WHERE s.item_id = NEW.item_id AND sk.store_id = NEW.store_id
+                    ORDER BY s.id LIMIT 1
+                );
+            END
+            """
+        )
+
+    def _next_number(self, cursor, name):
+        """Allocates the next `name` number; call inside the transaction that uses it."""
+        cursor.execute(
+            "UPDATE number_sequences SET value = value + 1 WHERE name = ?", (name,)
+        )
+        if cursor.rowcount == 0:
+            cursor.execute(
+                "INSERT INTO number_sequences (name, value) VALUES (?, 1)", (name,)
+            )
+        cursor.execute("SELECT value FROM number_sequences WHERE name = ?", (name,))
+        return NUMBER_FORMATS[name].format(cursor.fetchone()[0])
+
+    def peek_order_numbers(self):
+        """(order_number, receipt_number) the next checkout on this till will get.
+
+        Only for display; save_order allocates the numbers.
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT name, value FROM number_sequences")
+                values = dict(cursor.fetchall())
+        except sqlite3.Error as e:
+            print(f"Database error reading number sequences: {e}")
+            values = {}
+        return tuple(
+            NUMBER_FORMATS[name].format(values.get(name, 0) + 1)
+            for name in ("order", "receipt")
+        )
+
+    def _create_item_daily_sales(self, cursor):
+        """Creates item_daily_sales, the per item, store and day sales facts.
+
+        Only completed orders count. Triggers on orders and order_items
+        apply each checkout, void, edit and synced order as a delta, so
+        top-selling and stock reports sum a few rows per item and day
+        instead of every line item. Orders carry no store, so rows are
+        recorded for this till's STORE_ID. cost stays 0 until items carry a
+        cost price; margin is revenue - cost.
+        """
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS item_daily_sales (
+                store_id INTEGER NOT NULL,
+                day TEXT NOT NULL,
+                item_id INTEGER NOT NULL,
+                quantity REAL NOT NULL DEFAULT 0,
+                revenue REAL NOT NULL DEFAULT 0,
+                cost REAL NOT NULL DEFAULT 0,
+                order_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (store_id, day, item_id)
+            ) WITHOUT ROWID
+            """
+        )
+        upsert = """ON CONFLICT (store_id, day, item_id) DO UPDATE SET
+                    quantity = quantity + excluded.quantity,
+                    revenue = revenue + excluded.revenue,
+                    order_count = order_count + excluded.order_count;"""
+        insert = (
+            "INSERT INTO item_daily_sales "
+            "(item_id, store_id, day, quantity, revenue, order_count)"
+        )
+
+        def line(row, sign):
+            # One order line; the order counts once per item, so it only
+            # changes when this is the item's first or last line in it.
+            return f"""{insert}
+                SELECT {row}.item_id, {STORE_ID}, DATE(o.date),
+                    {sign} * {row}.quantity, {sign} * {row}.quantity * {row}.price,
+                    {sign} * NOT EXISTS (
+                        SELECT 1 FROM order_items x
+                        WHERE x.order_id = {row}.order_id
+                          AND x.item_id = {row}.item_id AND x.id <> {row}.id
+                    )
+                FROM orders o
+                WHERE o.id = {row}.order_id AND o.status = 'completed'
+                  AND {row}.item_id IS NOT NULL
+                {upsert}
+                DELETE FROM item_daily_sales
+                WHERE store_id = {STORE_ID} AND item_id = {row}.item_id
+                  AND day = (SELECT DATE(date) FROM orders WHERE id = {row}.order_id)
+                  AND order_count <= 0;"""
+
+        def order(row, sign):
+            # Every line of an order that starts or stops counting
+            return f"""{insert}
+                SELECT oi.item_id, {STORE_ID}, DATE({row}.date),
+                    {sign} * SUM(oi.quantity), {sign} * SUM(oi.quantity * oi.price),
+                    {sign}
+                FROM order_items oi
+                WHERE oi.order_id = {row}.id AND {row}.status = 'completed'
+                  AND oi.item_id IS NOT NULL
+                GROUP BY oi.item_id
+                {upsert}
+                DELETE FROM item_daily_sales
+                WHERE store_id = {STORE_ID} AND day = DATE({row}.date)
+                  AND order_count <= 0;"""
+
+        triggers = {
+            "fact_order_items_insert": f"""CREATE TRIGGER fact_order_items_insert
+                AFTER INSERT ON order_items
+                BEGIN
+                {line("NEW", 1)}
+                END""",
+            "fact_order_items_update": f"""CREATE TRIGGER fact_order_items_update
+                AFTER UPDATE OF order_id, item_id, quantity, price ON order_items
+                BEGIN
+                {line("OLD", -1)}
+                {line("NEW", 1)}
+                END""",
+            "fact_order_items_delete": f"""CREATE TRIGGER fact_order_items_delete
+                AFTER DELETE ON order_items
+                BEGIN
+                {line("OLD", -1)}
+                END""",
+            # Lines synced before their order are counted when it arrives
+            "fact_orders_insert": f"""CREATE TRIGGER fact_orders_insert
+                AFTER INSERT ON orders
+                BEGIN
+                {order("NEW", 1)}
+                END""",
+            "fact_orders_update": f"""CREATE TRIGGER fact_orders_update
+                AFTER UPDATE OF status, date ON orders
+                WHEN OLD.status IS NOT NEW.status OR DATE(OLD.date) IS NOT DATE(NEW.date)
+                BEGIN
+                {order("OLD", -1)}
+                {order("NEW", 1)}
+                END""",
+            "fact_orders_delete": f"""CREATE TRIGGER fact_orders_delete
+                AFTER DELETE ON orders
+                BEGIN
+                {order("OLD", -1)}
+                END""",
+        }
+        if self._replace_triggers(cursor, triggers):
+            self._rebuild_item_daily_sales(cursor)
+
+    def _rebuild_item_daily_sales(self, cursor):
+        cursor.execute("DELETE FROM item_daily_sales")
+        cursor.execute(
+            f"""
+            INSERT INTO item_daily_sales
+                (item_id, store_id, day, quantity, revenue, order_count)
+            SELECT oi.item_id, {STORE_ID}, DATE(o.date), SUM(oi.quantity),
+                   SUM(oi.quantity * oi.price), COUNT(DISTINCT oi.order_id)
+            FROM orders o
+            JOIN order_items oi ON oi.order_id = o.id
+            WHERE o.status = 'completed' AND oi.item_id IS NOT NULL
+            GROUP BY oi.item_id, DATE(o.date)
+            """
+        )
+        logger.info("Rebuilt item_daily_sales with %d rows", cursor.rowcount)
+        return cursor.rowcount
+
+    def rebuild_item_daily_sales(self):
+        """Recomputes item_daily_sales from the orders; the maintenance job's safety net."""
+        try:
+            with self.get_connection() as conn:
+                rows = self._rebuild_item_daily_sales(conn.cursor())
+                conn.commit()
+                return rows
+        except sqlite3.Error as e:
+            print(f"Error rebuilding item daily sales: {e}")
+            return 0
+
+    def get_top_selling_items(
+        self, start_date, end_date, metric="quantity", limit=20, store_id=None
+    ):
+        """Items ranked by quantity, revenue or margin over an inclusive date range.
+
+        Each row has the item's rank, totals, its share of the range's
+        total for the metric and the cumulative share down to it (for ABC
+        analysis).
+        """
+        if metric not in TOP_ITEM_METRICS:
+            raise ValueError(f"Unknown metric {metric!r}")
+        query = f"""
+            WITH totals AS (
+                SELECT f.item_id,
+                       SUM(f.quantity) AS quantity,
+                       SUM(f.revenue) AS revenue,
+                       SUM(f.revenue - f.cost) AS margin,
+                       SUM(f.order_count) AS orders,
+                       {TOP_ITEM_METRICS[metric]} AS metric
+                FROM item_daily_sales f
+                WHERE f.store_id = ? AND f.day BETWEEN ? AND ?
+                GROUP BY f.item_id
+            ),
+            ranked AS (
+                SELECT t.*,
+                       RANK() OVER (ORDER BY metric DESC) AS rank,
+                       metric * 100.0 / NULLIF(SUM(metric) OVER (), 0) AS share,
+                       SUM(metric) OVER (
+                           ORDER BY metric DESC, item_id ROWS UNBOUNDED PRECEDING
+                       ) * 100.0 / NULLIF(SUM(metric) OVER (), 0) AS cumulative_share
+                FROM totals t
+            )
+            SELECT r.rank, r.item_id, COALESCE(i.name, ''), r.quantity, r.revenue,
+                   r.margin, r.orders, r.share, r.cumulative_share
+            FROM ranked r
+            LEFT JOIN items i ON i.id = r.item_id
+            WHERE r.rank <= ?
+            ORDER BY r.rank, r.item_id
+        """
+        try:
+            with self.get_connection() as conn:
+                rows = conn.execute(
+                    query, (store_id or STORE_ID, start_date, end_date, limit)
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error fetching top selling items: {e}")
+            return []
+        return [
+            {
+                "rank": row[0],
+                "item_id": row[1],
+                "name": row[2],
+                "quantity": row[3] or 0,
+                "revenue": row[4] or 0,
+                "margin": row[5] or 0,
+                "orders": row[6] or 0,
+                "share": row[7] or 0,
+                "cumulative_share": row[8] or 0,
+            }
+            for row in rows
+        ]
+
+    def get_stock_velocity(self, days=30, store_id=None, as_of=None):
+        """On-hand stock with average daily sales over the last `days` days.
+
+        days_of_cover is stock / daily velocity (None for items that did not
+        sell). Items that sold come first, those running out soonest on top.
+        With `as_of` before today, stock is as it was at the close of that
+        day, from the stock ledger.
+        """
+        store_id = store_id or STORE_ID
+        end_day = as_of or datetime.date.today()
+        start_day = end_day - datetime.timedelta(days=days - 1)
+        if end_day < datetime.date.today():
+            stock = "COALESCE(h.quantity, 0)"
+            history = f"LEFT JOIN ({STOCK_AT_SQL}) h ON h.item_id = c.item_id"
+        else:
+            stock = "c.stock_quantity"
+            history = ""
+        query = f"""
+            SELECT c.item_id, c.name, c.category_id, {stock} AS stock,
+                   COALESCE(s.quantity, 0), COALESCE(s.quantity, 0) / :days AS velocity,
+                   s.last_sold
+            FROM catalog_view c
+            LEFT JOIN (
+                SELECT item_id, SUM(quantity) AS quantity, MAX(day) AS last_sold
+                FROM item_daily_sales
+                WHERE store_id = :store_id AND day BETWEEN :start AND :day
+                GROUP BY item_id
+            ) s ON s.item_id = c.item_id
+            {history}
+            WHERE c.store_id = :store_id AND c.status = 'active'
+            ORDER BY velocity = 0, stock / NULLIF(velocity, 0), c.name
+        """
+        try:
+            with self.get_connection() as conn:
+                rows = conn.execute(
+                    query,
+                    {
+                        "days": float(days),
+                        "store_id": store_id,
+                        "start": start_day.isoformat(),
+                        "day": end_day.isoformat(),
+                    },
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Error fetching stock velocity: {e}")
+            return []
+        return [
+            {
+                "item_id": row[0],
+                "name": row[1],
+                "category_id": row[2],
+                "stock_quantity": row[3],
+                "sold": row[4],
+                "velocity": row[5],
+                "days_of_cover": row[3] / row[5] if row[5] else None,
+                "last_sold": row[6],
+            }
+            for row in rows
+        ]
+
+    @contextmanager
+    def changelog_muted(self):
+        """Stops journaling the writes of this thread while the block runs.
+
+        Used while applying server data, so it is not echoed back to the
+        server. Only connections this thread opens inside the block are
+        muted; edits made meanwhile by other threads or processes are
+        journaled.
+        """
+        _changelog_mute.depth = getattr(_changelog_mute, "depth", 0) + 1
+        try:
+            yield
+        finally:
+            _changelog_mute.depth -= 1
+
+    def compact_changelog(self):
+        """Folds pending journal entries down to one per row.
+
+        insert + update(s) stays an insert, update + update merges the
+        changed columns, anything followed by a delete becomes a delete, and
+        a row inserted and deleted before it was ever pushed is dropped.
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT id, table_name, row_id, op, changed_columns
+                    FROM changelog
+                    WHERE (table_name, row_id) IN (
+                        SELECT table_name, row_id FROM changelog
+                        GROUP BY table_name, row_id HAVING COUNT(*) > 1
+                    )
+                    ORDER BY id
+                    """
+                )
+                entries = {}
+                for entry_id, table, row_id, op, columns in cursor.fetchall():
+                    entries.setdefault((table, row_id), []).append(
+                        (entry_id, op, columns)
+                    )
+
+                obsolete_ids = []
+                for history in entries.values():
+                    first_op = history[0][1]
+                    last_id, last_op, _ = history[-1]
+                    if first_op == "insert" and last_op == "delete":
+                        obsolete_ids.extend(entry[0] for entry in history)
+                        continue
+
+                    if last_op == "delete":
+                        op, columns = "delete", None
+                    elif first_op == "insert":
+                        op, columns = "insert", None
+                    else:
+                        merged = []
+                        for _, _, entry_columns in history:
+                            for col in (entry_columns or "").split(","):
+                                if col and col not in merged:
+                                    merged.append(col)
+                        op, columns = "update", ",".join(merged)
+
+                    cursor.execute(
+                        "UPDATE changelog SET op = ?, changed_columns = ? WHERE id = ?",
+                        (op, columns, last_id),
+                    )
+                    obsolete_ids.extend(entry[0] for entry in history[:-1])
+
+                if obsolete_ids:
+                    cursor.executemany(
+                        "DELETE FROM changelog WHERE id = ?",
+                        [(entry_id,) for entry_id in obsolete_ids],
+                    )
+                conn.commit()
+                return len(obsolete_ids)
+        except sqlite3.Error as e:
+            print(f"Error compacting changelog: {e}")
+            return 0
+
+    def get_pending_changes(self, limit=200):
+        """Returns the oldest journal entries with the current state of each row."""
+        try:
+            with self.get_connection() as conn:
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT id, table_name, row_id, op, changed_columns, changed_at
+                    FROM changelog ORDER BY id LIMIT ?
+                    """,
+                    (limit,),
+                )
+                changes = []
+                for entry in cursor.fetchall():
+                    change = {
+                        "id": entry["id"],
+                        "table": entry["table_name"],
+                        "row_id": entry["row_id"],
+                        "op": entry["op"],
+                        "changed_columns": (
+                            entry["changed_columns"].split(",")
+                            if entry["changed_columns"]
+                            else []
+                        ),
+                        "changed_at": entry["changed_at"],
+                        "data": None,
+                    }
+                    if change["op"] != "delete":
+                        cursor.execute(
+                            f"SELECT * FROM {entry['table_name']} WHERE id = ?",
+                            (entry["row_id"],),
+                        )
+                        row = cursor.fetchone()
+                        if row is None:
+                            # The row is gone but its delete was not journaled
+                            # (e.g. removed by a sync pull); report it as deleted.
+                            change["op"] = "delete"
+                        else:
+                            change["data"] = dict(row)
+                    changes.append(change)
+                return changes
+        except sqlite3.Error as e:
+            print(f"Error reading pending changes: {e}")
+            return []
+
+    def acknowledge_changes(self, change_ids):
+        """Removes journal entries the server has confirmed."""
+        if not change_ids:
+            return
+        try:
+            with self.get_connection() as conn:
+                conn.executemany(
+                    "DELETE FROM changelog WHERE id = ?",
+                    [(change_id,) for change_id in change_ids],
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Error acknowledging changes: {e}")
+
+    def start_sync_job(self, job):
+        with self.get_connection() as conn:
+            conn.execute(
+                """
+                INSERT INTO sync_status (job, state, pid, last_started_at)
+                VALUES (?, 'running', ?, ?)
+                ON CONFLICT (job) DO UPDATE SET
+                    state = 'running',
+                    pid = excluded.pid,
+                    last_started_at = excluded.last_started_at
+                """,
+                (job, os.getpid(), time.time()),
+            )
+            conn.commit()
+
+    def finish_sync_job(self, job, success, result=None, error=None):
+        now = time.time()
+        with self.get_connection() as conn:
+            conn.execute(
+                """
+                UPDATE sync_status SET
+                    state = 'idle',
+                    last_finished_at = ?,
+                    last_success_at = CASE WHEN ? THEN ? ELSE last_success_at END,
+                    last_error = ?,
+                    last_result = ?,
+                    runs = runs + 1,
+                    failures = failures + CASE WHEN ? THEN 0 ELSE 1 END
+                WHERE job = ?
+                """,
+                (
+                    now,
+                    bool(success),
+                    now,
+                    error,
+                    json.dumps(result) if result is not None else None,
+                    bool(success),
+                    job,
+                ),
+            )
+            conn.commit()
+
+    def touch_sync_heartbeat(self):
+        """Marks the sync daemon of this process as alive."""
+        with self.get_connection() as conn:
+            conn.execute(
+                """
+                INSERT INTO sync_status (job, state, pid, heartbeat_at)
+                VALUES ('daemon', 'running', ?, ?)
+                ON CONFLICT (job) DO UPDATE SET
+                    state = 'running',
+                    pid = excluded.pid,
+                    heartbeat_at = excluded.heartbeat_at
+                """,
+                (os.getpid(), time.time()),
+            )
+            conn.commit()
+
+    def clear_sync_heartbeat(self):
+        with self.get_connection() as conn:
+            conn.execute(
+                """
+                UPDATE sync_status SET state = 'idle', heartbeat_at = NULL
+                WHERE job = 'daemon' AND pid = ?
+                """,
+                (os.getpid(),),
+            )
+            conn.commit()
+
+    def sync_daemon_alive(self, max_age=60):
+        """True when a sync daemon has reported in during the last `max_age` s."""
+        try:
+            with self.get_connection() as conn:
+                row = conn.execute(
+                    "SELECT heartbeat_at FROM sync_status WHERE job = 'daemon'"
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Database error reading sync status: {e}")
+            return False
+        return bool(row and row[0] and time.time() - row[0] <= max_age)
+
+    def get_sync_status(self):
+        """Returns {job: status dict} for the daemon and each of its jobs."""
+        try:
+            with self.get_connection() as conn:
+                conn.row_factory = sqlite3.Row
+                rows = conn.execute("SELECT * FROM sync_status").fetchall()
+        except sqlite3.Error as e:
+            print(f"Database error reading sync status: {e}")
+            return {}
+        status = {}
+        for row in rows:
+            entry = dict(row)
+            if entry["last_result"]:
+                entry["last_result"] = json.loads(entry["last_result"])
+            status[entry["job"]] = entry
+        return status
+
+    def record_change_events(self, events):
+        """Stores ChangeEvents for other processes to replay."""
+        now = time.time()
+        with self.get_connection() as conn:
+            conn.executemany(
+                "INSERT INTO change_events (entity, op, ids, created_at) VALUES (?, ?, ?, ?)",
+                [
+                    (event.entity, event.op, json.dumps(sorted(event.ids)), now)
+                    for event in events
+                ],
+            )
+            conn.commit()
+
+    def get_change_events(self, after_id, limit=500):
+        """Returns (id, entity, op, ids) tuples recorded after `after_id`."""
+        try:
+            with self.get_connection() as conn:
+                rows = conn.execute(
+                    """
+                    SELECT id, entity, op, ids FROM change_events
+                    WHERE id > ? ORDER BY id LIMIT ?
+                    """,
+                    (after_id, limit),
+                ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Database error reading change events: {e}")
+            return []
+        return [(row[0], row[1], row[2], json.loads(row[3])) for row in rows]
+
+    def get_last_change_event_id(self):
+        try:
+            with self.get_connection() as conn:
+                row = conn.execute("SELECT MAX(id) FROM change_events").fetchone()
+        except sqlite3.Error as e:
+            print(f"Database error reading change events: {e}")
+            return 0
+        return row[0] or 0
+
+    def prune_change_events(self, max_age=3600):
+        with self.get_connection() as conn:
+            conn.execute(
+                "DELETE FROM change_events WHERE created_at < ?",
+                (time.time() - max_age,),
+            )
+            conn.commit()
+
+    def record_latency_histograms(self, day, histograms, keep_days=30):
+        """Adds {stage: bucket counts} to the histograms of `day`.
+
+        Days older than `keep_days` are dropped so the table stays small.
+        """
+        rows = [
+            (day, stage, bucket, count)
+            for stage, counts in histograms.items()
+            for bucket, count in enumerate(counts)
+            if count
+        ]
+        with self.get_connection() as conn:
+            conn.executemany(
+                """
+                INSERT INTO latency_histograms (day, stage, bucket, count)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (day, stage, bucket)
+                DO UPDATE SET count = count + excluded.count
+                """,
+                rows,
+            )
+            conn.execute(
+                "DELETE FROM latency_histograms WHERE day < date(?, ?)",
+                (day, f"-{int(keep_days)} days"),
+            )
+            conn.commit()
+
+    def get_latency_histograms(self, since_day):
+        """Returns {stage: bucket counts} summed over the days since `since_day`."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    """
+                    SELECT stage, bucket, SUM(count)
+                    FROM latency_histograms
+                    WHERE day >= ?
+                    GROUP BY stage, bucket
+                    """,
+                    (since_day,),
+                )
+                histograms = {}
+                for stage, bucket, count in cursor.fetchall():
+                    counts = histograms.setdefault(stage, [])
+                    if len(counts) <= bucket:
+                        counts.extend([0] * (bucket + 1 - len(counts)))
+                    counts[bucket] = count
+                return histograms
+        except sqlite3.Error as e:
+            print(f"Database error getting latency histograms: {e}")
+            return {}
+
     def get_local_item_groups(self):
         try:
             with self.get_connection() as conn:
@@ -605,47 +1922,64 @@ class DatabaseManager:
             print(f"Database error getting categories for group: {e}")
             return []
 
-    def get_local_items_for_category(self, category_id):
+    CATALOG_ITEM_SELECT = """
+        SELECT item_id, name, unit, price, stock_quantity, thumbnail
+        FROM catalog_view
+    """
+
+    @staticmethod
+    def _catalog_item(row):
+        """Maps a CATALOG_ITEM_SELECT row to the item dict the sales screen uses."""
+        return {
+            "item_id": row[0],
+            "item_name": row[1],
+            "item_unit": row[2] or "pcs",
+            "item_price": float(row[3]),
+            "stock_quantity": float(row[4]),
+            "image_url": f"/uploads/item_images/{row[5] or 'default.jpg'}",
+        }
+
+    def get_local_items_for_category(self, category_id, store_id=None):
+        """Active items of a category with this store's price and stock."""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute(
-                    """
-                    SELECT
-                        i.id,
-                        i.name as item_name,
-                        u.name as item_unit,
-                        ip.amount as item_price,
-                        s.stock_quantity as stock_quantity,
-                        COALESCE(im.file_path, 'default.jpg') as image_url
-                    FROM items i
-                    LEFT JOIN item_units iu ON i.id = iu.item_id
-                    LEFT JOIN units u ON iu.selling_unit_id = u.id
-                    LEFT JOIN item_prices ip ON i.id = ip.item_id
-                    LEFT JOIN item_stocks s ON i.id = s.item_id
-                    LEFT JOIN item_images ii ON i.id = ii.item_id
-                    LEFT JOIN images im ON ii.image_id = im.id
-                    WHERE i.category_id = ?
+                    self.CATALOG_ITEM_SELECT
+                    + """
+                    WHERE store_id = ? AND category_id = ? AND status = 'active'
+                    ORDER BY item_id
                     """,
-                    (category_id,),
+                    (store_id or STORE_ID, category_id),
                 )
-                results = cursor.fetchall()
-                items = [
-                    {
-                        "item_id": row[0],
-                        "item_name": row[1],
-                        "item_unit": row[2],
-                        "item_price": float(row[3]) if row[3] is not None else 0.0,
-                        "stock_quantity": float(row[4]) if row[4] is not None else 0.0,
-                        "image_url": f"/uploads/item_images/{row[5]}",
-                    }
-                    for row in results
-                ]
-                return items
+                return [self._catalog_item(row) for row in cursor.fetchall()]
         except sqlite3.Error as e:
             print(f"Database error getting items for category {category_id}: {e}")
             return []
 
+    def search_catalog(self, text, store_id=None, limit=None):
+        """Active items whose name contains `text` (case-insensitive)."""
+        pattern = "%{}%".format(
+            text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        )
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    self.CATALOG_ITEM_SELECT
+                    + """
+                    WHERE store_id = ? AND status = 'active'
+                      AND name LIKE ? ESCAPE '\\'
+                    ORDER BY item_id
+                    LIMIT ?
+                    """,
+                    (store_id or STORE_ID, pattern, -1 if limit is None else limit),
+                )
+                return [self._catalog_item(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Database error searching catalog for {text!r}: {e}")
+            return []
+
     def insert_item_group(self, name):
         try:
             with self.get_connection() as conn:
@@ -658,6 +1992,8 @@ class DatabaseManager:
                     (name,),
                 )
                 conn.commit()
+                if cursor.rowcount > 0:
+                    change_bus.publish("item_groups", [cursor.lastrowid], "insert")
         except sqlite3.Error as e:
             print(f"Database error inserting item group: {e}")
 
@@ -673,6 +2009,8 @@ class DatabaseManager:
                     (category_id, category_name, item_group_id),
                 )
                 conn.commit()
+                if cursor.rowcount > 0:
+                    change_bus.publish("categories", [category_id], "insert")
         except sqlite3.Error as e:
             print(f"Database error inserting category: {e}")
 
@@ -683,11 +2021,19 @@ class DatabaseManager:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
 
-                # Insert or update item (this part is fine as is)
+                # Insert or update item. An upsert, not INSERT OR REPLACE: the
+                # delete of a replace cascades to item_stocks behind the ledger.
                 cursor.execute(
                     """
-                    INSERT OR REPLACE INTO items (id, name, category_id, item_type_id, item_group_id, status, created_at, updated_at)
+                    INSERT INTO items (id, name, category_id, item_type_id, item_group_id, status, created_at, updated_at)
                     VALUES (?, ?, ?, 1, NULL, 'active', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                    ON CONFLICT (id) DO UPDATE SET
+                        name = excluded.name,
+                        category_id = excluded.category_id,
+                        item_type_id = 1,
+                        item_group_id = NULL,
+                        status = 'active',
+                        updated_at = CURRENT_TIMESTAMP
                     """,
                     (item_id, name, category_id),
                 )
@@ -771,51 +2117,13 @@ class DatabaseManager:
                         (item_id, unit_id, price),
                     )
 
-                # Insert or update stocks: Check if stock exists for this item and store
-                cursor.execute(
-                    "SELECT id FROM stocks WHERE item_id = ? AND store_id = 1",
-                    (item_id,),
-                )
-                stock_row = cursor.fetchone()
-                if stock_row:
-                    stock_id = stock_row[0]
-                else:
-                    cursor.execute(
-                        """
-                        INSERT INTO stocks (item_id, store_id, min_quantity, max_quantity, created_at, updated_at)
-                        VALUES (?, 1, 0, 0, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                        """,
-                        (item_id,),
-                    )
-                    stock_id = cursor.lastrowid
-
-                # Insert or update item_stocks: Check if item_stocks exists for this item
+                # The stock comes from the server; record the difference in the ledger
                 stock_qty = float(stock_quantity) if stock_quantity is not None else 0.0
-                cursor.execute(
-                    "SELECT id FROM item_stocks WHERE item_id = ? AND stock_id = ?",
-                    (item_id, stock_id),
-                )
-                item_stock_row = cursor.fetchone()
-                if item_stock_row:
-                    cursor.execute(
-                        """
-                        UPDATE item_stocks 
-                        SET stock_quantity = ?, updated_at = CURRENT_TIMESTAMP 
-                        WHERE id = ?
-                        """,
-                        (stock_qty, item_stock_row[0]),
-                    )
-                else:
-                    cursor.execute(
-                        """
-                        INSERT INTO item_stocks (item_id, stock_id, stock_quantity, created_at, updated_at)
-                        VALUES (?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                        """,
-                        (item_id, stock_id, stock_qty),
-                    )
+                self._set_stock(cursor, item_id, stock_qty, "sync", store_id=1)
 
                 conn.commit()
-                print(f"Inserted/Updated item {item_id} ({name}) into local database")
+                logger.debug("Inserted/updated item %s (%s)", item_id, name)
+                change_bus.publish("items", [item_id], "insert")
         except sqlite3.Error as e:
             print(f"Error inserting item {item_id} ({name}): {e}")
             if "conn" in locals():
@@ -877,22 +2185,14 @@ class DatabaseManager:
             return []
 
     def save_order(self, order_data, items, payment_id, customer_id):
-        print(f"Type of items in save_order: {type(items)}")
-        if items and isinstance(items, list):
-            print(
-                f"Type of first element in items: {type(items[0]) if items else None}"
-            )
-        else:
-            print("Items is not a list or is empty!")
+        if not items or not isinstance(items, list):
+            logger.error("save_order: items is not a list or is empty")
             return None
 
-        print(f"Debugging save_order - order_data: {order_data}")
-        print(f"Items: {items}")
+        logger.debug("save_order: order_data=%s items=%s", order_data, items)
 
-        if not isinstance(items, list) or not all(
-            isinstance(item, dict) for item in items
-        ):
-            print("Error: items must be a list of dictionaries")
+        if not all(isinstance(item, dict) for item in items):
+            logger.error("save_order: items must be a list of dictionaries")
             return None
 
         stock_changes = []  # To track stock updates for server sync
@@ -900,15 +2200,24 @@ class DatabaseManager:
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                print("Executing INSERT INTO orders query...")
+                # Numbers are allocated in the checkout transaction, so a
+                # failed checkout does not use one up. They are returned
+                # rather than written into order_data, which a failed
+                # checkout would otherwise leave holding unused numbers.
+                order_number = order_data.get("order_number") or self._next_number(
+                    cursor, "order"
+                )
+                receipt_number = order_data.get("receipt_number") or self._next_number(
+                    cursor, "receipt"
+                )
                 cursor.execute(
                     """
                     INSERT INTO orders (order_number, receipt_number, date, customer_type_id, total_amount, tip, discount, ground_total, created_at, updated_at, is_active)
                     VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, 1)
                     """,
                     (
-                        str(order_data["order_number"]),
-                        str(order_data["receipt_number"]),
+                        str(order_number),
+                        str(receipt_number),
                         str(order_data["date"]),
                         (
                             int(order_data["customer_type_id"])
@@ -922,24 +2231,22 @@ class DatabaseManager:
                     ),
                 )
                 order_id = cursor.lastrowid
-                print(f"Order inserted with ID: {order_id}")
+                logger.debug("save_order: order inserted with ID %s", order_id)
 
                 if customer_id is not None:
                     cursor.execute(
                         "INSERT INTO customer_orders (customer_id, order_id) VALUES (?, ?)",
                         (int(customer_id), order_id),
                     )
-                    print("Customer order inserted")
 
                 cursor.execute(
                     "INSERT INTO order_payments (order_id, payment_id) VALUES (?, ?)",
                     (order_id, int(payment_id)),
                 )
-                print("Order payment inserted")
 
                 for item in items:
                     if not all(key in item for key in ["item_id", "quantity", "price"]):
-                        print(f"Error: Missing required keys in item: {item}")
+                        logger.error("save_order: missing required keys in item %s", item)
                         raise ValueError("Missing required keys in item")
                     cursor.execute(
                         """
@@ -953,13 +2260,15 @@ class DatabaseManager:
                             float(item["price"]),
                         ),
                     )
-                    print(f"Order item inserted for item_id: {item['item_id']}")
 
-                    # Update local stock and track changes
-                    cursor.execute(
-                        "SELECT stock_id, stock_quantity FROM item_stocks WHERE item_id = ?",
-                        (int(item["item_id"]),),
-                    )
+                    # Check and deduct this store's stock, tracking the change
+                    stock_sql = """
+                        SELECT s.stock_id, s.stock_quantity
+                        FROM item_stocks s JOIN stocks sk ON sk.id = s.stock_id
+                        WHERE s.item_id = ? AND sk.store_id = ?
+                        ORDER BY s.id LIMIT 1
+                    """
+                    cursor.execute(stock_sql, (int(item["item_id"]), STORE_ID))
                     stock_row = cursor.fetchone()
                     if not stock_row:
                         raise ValueError(
@@ -971,18 +2280,24 @@ class DatabaseManager:
                             f"Insufficient stock for item_id: {item['item_id']}"
                         )
 
-                    # Deduct the quantity
+                    # The sale movement deducts the quantity (stock_movements_apply)
                     cursor.execute(
-                        "UPDATE item_stocks SET stock_quantity = stock_quantity - ?, updated_at = CURRENT_TIMESTAMP WHERE item_id = ?",
-                        (int(item["quantity"]), int(item["item_id"])),
+                        """
+                        INSERT INTO stock_movements (item_id, store_id, order_id, movement_type, quantity, movement_date)
+                        VALUES (?, ?, ?, ?, ?, datetime('now', 'localtime'))
+                        """,
+                        (
+                            int(item["item_id"]),
+                            STORE_ID,
+                            order_id,
+                            "sale",
+                            -int(item["quantity"]),
+                        ),
                     )
 
                     # Fetch the updated stock quantity
-                    cursor.execute(
-                        "SELECT stock_quantity FROM item_stocks WHERE item_id = ?",
-                        (int(item["item_id"]),),
-                    )
-                    updated_quantity = cursor.fetchone()[0]
+                    cursor.execute(stock_sql, (int(item["item_id"]), STORE_ID))
+                    updated_quantity = cursor.fetchone()[1]
 
                     stock_changes.append(
                         {
@@ -997,40 +2312,110 @@ class DatabaseManager:
                         }
                     )
 
-                    cursor.execute(
-                        """
-                        INSERT INTO stock_movements (item_id, order_id, movement_type, quantity, movement_date)
-                        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
-                        """,
-                        (
-                            int(item["item_id"]),
-                            order_id,
-                            "sale",
-                            -int(item["quantity"]),
-                        ),
-                    )
-                    print(f"Stock movement inserted for item_id: {item['item_id']}")
-
                 conn.commit()
-                print("Order saved successfully!")
+                logger.info(
+                    "Order %s saved with %d item(s)", order_id, len(stock_changes)
+                )
+                change_bus.publish("orders", [order_id], "insert")
+                change_bus.publish(
+                    "items", [change["item_id"] for change in stock_changes], "update"
+                )
 
                 # Return order data and stock changes for syncing
                 return {
                     "order_id": order_id,
+                    "order_number": order_number,
+                    "receipt_number": receipt_number,
                     "stock_changes": stock_changes,
                 }
         except sqlite3.OperationalError as e:
-            print(f"Database operational error: {e}")
+            logger.error("save_order: database operational error: %s", e)
             return None
         except ValueError as e:
-            print(f"Value error: {e}")
+            logger.error("save_order: %s", e)
             return None
         except Exception as e:
-            print(f"Unexpected error: {e}")
+            logger.exception("save_order: unexpected error: %s", e)
             return None
 
+    def search_orders(
+        self,
+        number=None,
+        start=None,
+        end=None,
+        min_total=None,
+        max_total=None,
+        item_id=None,
+        status=None,
+        limit=100,
+    ):
+        """Finds orders across all history, newest first.
+
+        `number` matches the start of an order or receipt number; `start`
+        and `end` are inclusive dates (YYYY-MM-DD); the totals bound
+        ground_total; `item_id` keeps orders containing that item. Every
+        criterion is served by an index.
+        """
+        conditions = []
+        params = []
+        if number:
+            number = number.strip().upper()
+            conditions.append(
+                """((o.order_number >= ? AND o.order_number < ?)
+                   OR (o.receipt_number >= ? AND o.receipt_number < ?))"""
+            )
+            params += [number, _prefix_end(number)] * 2
+        if start:
+            conditions.append("o.date >= ?")
+            params.append(start)
+        if end:
+            conditions.append("o.date < date(?, '+1 day')")
+            params.append(end)
+        if min_total is not None:
+            conditions.append("o.ground_total >= ?")
+            params.append(min_total)
+        if max_total is not None:
+            conditions.append("o.ground_total <= ?")
+            params.append(max_total)
+        if item_id is not None:
+            conditions.append(
+                "o.id IN (SELECT oi.order_id FROM order_items oi WHERE oi.item_id = ?)"
+            )
+            params.append(item_id)
+        if status:
+            conditions.append("o.status = ?")
+            params.append(status)
+        where = " AND ".join(conditions) or "1"
+        try:
+            with self.read_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    f"""
+                    SELECT o.id, o.order_number, o.receipt_number, o.date, o.status,
+                           o.total_amount, o.ground_total
+                    FROM orders o
+                    WHERE {where}
+                    ORDER BY o.date DESC, o.id DESC
+                    LIMIT ?
+                    """,
+                    params + [limit],
+                )
+                keys = (
+                    "id",
+                    "order_number",
+                    "receipt_number",
+                    "date",
+                    "status",
+                    "total_amount",
+                    "ground_total",
+                )
+                return [dict(zip(keys, row)) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            logger.error("Database error searching orders: %s", e)
+            return []
+
     def get_orders_by_status(self, status=None, date=None):
-        logging.debug(f"Fetching orders with status: {status}, date: {date}")
+        logger.debug("Fetching orders with status=%s date=%s", status, date)
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
@@ -1043,18 +2428,14 @@ class DatabaseManager:
                 if date:
                     query += " AND DATE(date) = ?"  # Use DATE function to compare only the date part
                     params.append(date)
-                    logging.debug(f"Added date filter: {date}")
                 if status:  # Apply status filter for all non-None statuses
                     query += " AND status = ?"
                     params.append(status)
-                    logging.debug(f"Added status filter: {status}")
-                logging.debug(f"Executing query: {query} with params: {params}")
                 cursor.execute(query, params)
                 rows = cursor.fetchall()
-                logging.debug(f"Retrieved {len(rows)} rows from database")
+                logger.debug("Retrieved %d orders", len(rows))
                 orders = []
                 for row in rows:
-                    logging.debug(f"Raw row data: {row}")
                     orders.append(
                         {
                             "order_no": row[0],
@@ -1066,10 +2447,9 @@ class DatabaseManager:
                             "total_amount": float(row[4]) if row[4] else 0.0,
                         }
                     )
-                logging.debug(f"Processed orders: {orders}")
                 return orders
         except sqlite3.Error as e:
-            logging.error(f"Database error getting orders: {e}")
+            logger.error("Database error getting orders: %s", e)
             return []
 
     def get_order_for_order_summary(self, order_date):
@@ -1158,21 +2538,176 @@ class DatabaseManager:
             return None
 
     def update_item_stock(self, item_id, new_quantity):
-        """Update the stock quantity of an item in the stocks table."""
+        """Set the on-hand stock of an item, recorded as an 'adjustment' movement."""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute(
-                    "UPDATE item_stocks SET stock_quantity = ? WHERE item_id = ?",
-                    (new_quantity, item_id),
-                )
+                self._set_stock(cursor, item_id, new_quantity, "adjustment")
                 conn.commit()
-                print(f"Database updated: Item {item_id} stock set to {new_quantity}")
+                logger.debug("Item %s stock set to %s", item_id, new_quantity)
+                change_bus.publish("items", [item_id], "update")
                 return True
         except sqlite3.Error as e:
             print(f"Failed to update stock for item {item_id}: {e}")
             return False
 
+    def _set_stock(self, cursor, item_id, quantity, movement_type, store_id=None):
+        """Records the movement that brings an item's stock to `quantity`."""
+        cursor.execute(
+            f"""
+            INSERT INTO stock_movements (item_id, store_id, movement_type, quantity, movement_date)
+            SELECT :item_id, :store_id, :movement_type, :quantity - {ON_HAND_SQL}, datetime('now', 'localtime')
+            WHERE :quantity IS NOT {ON_HAND_SQL}
+            """,
+            {
+                "item_id": item_id,
+                "store_id": store_id or STORE_ID,
+                "movement_type": movement_type,
+                "quantity": float(quantity),
+            },
+        )
+
+    def record_stock_movements(self, movements, store_id=None):
+        """Appends movements to the stock ledger in one transaction.
+
+        `movements` are (item_id, quantity, movement_type) with a signed
+        quantity, e.g. (12, 24, "receipt") for goods received. Returns True
+        on success.
+        """
+        store_id = store_id or STORE_ID
+        rows = []
+        for item_id, quantity, movement_type in movements:
+            if movement_type not in STOCK_MOVEMENT_TYPES:
+                raise ValueError(f"Unknown stock movement type {movement_type!r}")
+            rows.append((item_id, store_id, movement_type, quantity))
+        try:
+            with self.get_connection() as conn:
+                conn.executemany(
+                    """
+                    INSERT INTO stock_movements (item_id, store_id, movement_type, quantity, movement_date)
+                    VALUES (?, ?, ?, ?, datetime('now', 'localtime'))
+                    """,
+                    rows,
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error("Failed to record stock movements: %s", e)
+            return False
+        change_bus.publish("items", sorted({row[0] for row in rows}), "update")
+        return True
+
+    def transfer_stock(self, item_id, quantity, from_store_id, to_store_id):
+        """Moves stock between stores as a transfer_out/transfer_in pair."""
+        try:
+            with self.get_connection() as conn:
+                conn.executemany(
+                    """
+                    INSERT INTO stock_movements (item_id, store_id, movement_type, quantity, movement_date)
+                    VALUES (?, ?, ?, ?, datetime('now', 'localtime'))
+                    """,
+                    [
+                        (item_id, from_store_id, "transfer_out", -float(quantity)),
+                        (item_id, to_store_id, "transfer_in", float(quantity)),
+                    ],
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error("Failed to transfer stock of item %s: %s", item_id, e)
+            return False
+        change_bus.publish("items", [item_id], "update")
+        return True
+
+    def void_order(self, order_number):
+        """Marks a completed order voided and returns its items to stock.
+
+        Every sale movement of the order is reversed by a 'void' movement,
+        so the ledger keeps both. Returns False if there is no completed
+        order with that number.
+        """
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "UPDATE orders SET status = 'voided', updated_at = CURRENT_TIMESTAMP "
+                    "WHERE order_number = ? AND status = 'completed'",
+                    (order_number,),
+                )
+                if cursor.rowcount != 1:
+                    return False
+                cursor.execute(
+                    """
+                    INSERT INTO stock_movements
+                        (item_id, store_id, order_id, movement_type, quantity, movement_date)
+                    SELECT m.item_id, m.store_id, m.order_id, 'void', -m.quantity, datetime('now', 'localtime')
+                    FROM stock_movements m
+                    JOIN orders o ON o.id = m.order_id
+                    WHERE o.order_number = ? AND m.movement_type = 'sale'
+                    """,
+                    (order_number,),
+                )
+                cursor.execute(
+                    "SELECT id FROM orders WHERE order_number = ?", (order_number,)
+                )
+                order_id = cursor.fetchone()[0]
+                cursor.execute(
+                    "SELECT DISTINCT item_id FROM order_items WHERE order_id = ?",
+                    (order_id,),
+                )
+                item_ids = [row[0] for row in cursor.fetchall()]
+                conn.commit()
+        except sqlite3.Error as e:
+            logger.error("Failed to void order %s: %s", order_number, e)
+            return False
+        logger.info("Order %s voided", order_number)
+        change_bus.publish("orders", [order_id], "update")
+        change_bus.publish("items", item_ids, "update")
+        return True
+
+    def get_stock_at(self, day, store_id=None):
+        """On-hand stock per item of a store at the close of `day`.
+
+        `day` is a date or "yyyy-MM-dd". Returns {item_id: quantity}, read
+        from the latest snapshot of each item and the movements since.
+        """
+        params = {"day": str(day), "store_id": store_id or STORE_ID}
+        try:
+            with self.read_connection() as conn:
+                rows = conn.execute(STOCK_AT_SQL, params).fetchall()
+        except sqlite3.Error as e:
+            logger.error("Error reading stock at %s: %s", day, e)
+            return {}
+        return dict(rows)
+
+    def write_stock_snapshot(self, day, store_id=None):
+        """Stores the stock at the close of `day` for the items that moved
+        since their last snapshot; called at day close. Returns the number
+        of items written.
+        """
+        params = {"day": str(day), "store_id": store_id or STORE_ID}
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute(
+                    f"""
+                    INSERT OR REPLACE INTO stock_snapshots
+                        (store_id, item_id, day, quantity, movement_id)
+                    SELECT :store_id, sk.item_id, :day,
+                           COALESCE(sn.quantity, 0) + COALESCE(
+                               (SELECT SUM(m.quantity) FROM {STOCK_SINCE_SNAPSHOT}), 0),
+                           (SELECT COALESCE(MAX(id), 0) FROM stock_movements)
+                    {STOCK_SNAPSHOT_FROM}
+                      AND (sn.day IS NULL
+                           OR EXISTS (SELECT 1 FROM {STOCK_SINCE_SNAPSHOT}))
+                    """,
+                    params,
+                )
+                conn.commit()
+                written = cursor.rowcount
+        except sqlite3.Error as e:
+            logger.error("Error writing stock snapshot for %s: %s", day, e)
+            return 0
+        logger.info("Stock snapshot of %s: %d item(s)", day, written)
+        return written
+
     def save_cart(self, cart_data):
         """
         Save cart data to the database.
@@ -1399,82 +2934,133 @@ class DatabaseManager:
             print(f"Database error inserting printer settings: {e}")
             raise
 
-    def get_item_by_barcode(self, barcode):
+    def get_print_devices(self):
+        """Active printers and cash drawers from printer_settings, oldest first."""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
-                # First try barcode lookup
                 cursor.execute(
                     """
-                    SELECT 
-                        i.id,
-                        i.name AS item_name,
-                        u.name AS item_unit,
-                        ip.amount AS item_price,
-                        s.stock_quantity
-                    FROM items i
-                    JOIN item_barcodes ib ON i.id = ib.item_id
-                    JOIN barcodes b ON ib.barcode_id = b.id
-                    LEFT JOIN item_units iu ON i.id = iu.item_id
-                    LEFT JOIN units u ON iu.selling_unit_id = u.id
-                    LEFT JOIN item_prices ip ON i.id = ip.item_id
-                    LEFT JOIN item_stocks s ON i.id = s.item_id
-                    WHERE b.code = ?
+                    SELECT ps.id, vd.name, ps.printer_name, ps.printer_type,
+                           ps.printer_ip, ps.paper_size, ps.bluetooth_address,
+                           ps.associated_printer, ps.drawer_code
+                    FROM printer_settings ps
+                    JOIN virtual_devices vd ON vd.id = ps.virtual_device_id
+                    WHERE vd.is_active = 1
+                    ORDER BY ps.id
+                    """
+                )
+                keys = (
+                    "id",
+                    "virtual_device",
+                    "printer_name",
+                    "printer_type",
+                    "printer_ip",
+                    "paper_size",
+                    "bluetooth_address",
+                    "associated_printer",
+                    "drawer_code",
+                )
+                return [dict(zip(keys, row)) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            print(f"Database error getting print devices: {e}")
+            return []
+
+    def get_print_routes(self):
+        """{document: [printer_name, ...]} from print_routes."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(
+                    "SELECT document, printer_name FROM print_routes ORDER BY id"
+                )
+                routes = {}
+                for document, printer_name in cursor.fetchall():
+                    routes.setdefault(document, []).append(printer_name)
+                return routes
+        except sqlite3.Error as e:
+            print(f"Database error getting print routes: {e}")
+            return {}
+
+    def set_print_route(self, document, printer_names):
+        """Sends `document` to `printer_names` (an empty list restores the default).
+
+        Edited in Printer Settings under Print Routing.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM print_routes WHERE document = ?", (document,))
+            cursor.executemany(
+                "INSERT INTO print_routes (document, printer_name) VALUES (?, ?)",
+                [(document, name) for name in printer_names],
+            )
+            conn.commit()
+
+    def move_orphaned_print_jobs(self, devices, targets):
+        """Moves queued jobs of printers not in `devices` (removed, renamed,
+        or the old default "receipt" device) to `targets[document]`.
+
+        Jobs that were printing are queued again. Returns the number moved.
+        """
+        marks = ", ".join("?" * len(devices))
+        moved = 0
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            for document, device in targets.items():
+                cursor.execute(
+                    f"""
+                    UPDATE print_jobs
+                    SET device = ?, status = 'pending', updated_at = ?
+                    WHERE document = ? AND status IN ('pending', 'printing')
+                      AND device NOT IN ({marks})
                     """,
-                    (barcode,),
-                )
-                item = cursor.fetchone()
-                if item:
-                    item_dict = {
-                        "item_id": item[0],  # Changed from "id" to "item_id"
-                        "item_name": item[1],
-                        "item_unit": item[2],
-                        "item_price": item[3],
-                        "stock_quantity": item[4],
-                    }
-                    print(f"get_item_by_barcode result (barcode): {item_dict}")
-                    return item_dict
+                    (device, time.time(), document, *devices),
+                )
+                moved += cursor.rowcount
+            conn.commit()
+        return moved
 
-                # Fallback to item_id if barcode is numeric and no barcode match
-                if barcode and barcode.isdigit():
-                    cursor.execute(
+    def get_item_by_barcode(self, barcode, store_id=None):
+        """Looks an item up by barcode, falling back to a numeric item id.
+
+        The primary barcode is matched on catalog_view directly; other
+        barcodes of an item go through item_barcodes.
+        """
+        store_id = store_id or STORE_ID
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                lookups = [
+                    ("WHERE store_id = ? AND barcode = ?", (store_id, barcode)),
+                    (
                         """
-                        SELECT 
-                            i.id,
-                            i.name AS item_name,
-                            u.name AS item_unit,
-                            ip.amount AS item_price,
-                            s.stock_quantity
-                        FROM items i
-                        LEFT JOIN item_units iu ON i.id = iu.item_id
-                        LEFT JOIN units u ON iu.selling_unit_id = u.id
-                        LEFT JOIN item_prices ip ON i.id = ip.item_id
-                        LEFT JOIN item_stocks s ON i.id = s.item_id
-                        WHERE i.id = ?
+                        WHERE store_id = ? AND item_id IN (
+                            SELECT ib.item_id FROM barcodes b
+                            JOIN item_barcodes ib ON ib.barcode_id = b.id
+                            WHERE b.code = ?
+                        )
                         """,
-                        (int(barcode),),
+                        (store_id, barcode),
+                    ),
+                ]
+                if barcode and barcode.isdigit():
+                    lookups.append(
+                        ("WHERE store_id = ? AND item_id = ?", (store_id, int(barcode)))
                     )
-                    item = cursor.fetchone()
-                    if item:
-                        item_dict = {
-                            "item_id": item[0],  # Changed from "id" to "item_id"
-                            "item_name": item[1],
-                            "item_unit": item[2],
-                            "item_price": item[3],
-                            "stock_quantity": item[4],
-                        }
-                        print(
-                            f"get_item_by_barcode result (item_id fallback): {item_dict}"
-                        )
-                        return item_dict
+                for where, params in lookups:
+                    cursor.execute(
+                        f"{self.CATALOG_ITEM_SELECT} {where} LIMIT 1", params
+                    )
+                    row = cursor.fetchone()
+                    if row:
+                        item = self._catalog_item(row)
+                        logger.debug("get_item_by_barcode(%s): %s", barcode, item)
+                        return item
 
-                print(f"No item found for barcode or ID: {barcode}")
+                logger.info("No item found for barcode or ID: %s", barcode)
                 return None
         except sqlite3.Error as e:
-            print(f"CRITICAL DATABASE ERROR in get_item_by_barcode: {str(e)}")
-            import traceback
-
-            traceback.print_exc()
+            logger.exception("Database error in get_item_by_barcode: %s", e)
             return None
 
     def get_company_details(self):
@@ -1537,6 +3123,7 @@ class DatabaseManager:
                 )
                 conn.commit()
                 print(f"Updated company details for {company_data.get('company_name')}")
+                change_bus.publish("companies", [company_data.get("id")], "update")
                 return True
         except sqlite3.Error as e:
             print(f"Error updating company details: {e}")
@@ -1807,22 +3394,12 @@ class DatabaseManager:
                             stock["max_quantity"],
                         ),
                     )
-                    cursor.execute(
-                        "SELECT id FROM stocks WHERE item_id = ? AND store_id = ?",
-                        (item_id, store_id),
-                    )
-                    stock_id = cursor.fetchone()[0]
-
-                    # Insert or update item_stocks
-                    cursor.execute(
-                        """
-                        INSERT OR REPLACE INTO item_stocks (item_id, stock_id, stock_quantity, created_at, updated_at)
-                        VALUES (?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                        """,
-                        (item_id, stock_id, stock["stock_quantity"]),
+                    self._set_stock(
+                        cursor, item_id, stock["stock_quantity"], "sync", store_id=store_id
                     )
 
                 conn.commit()
+                change_bus.publish("items", [item_id], "update")
                 return True
         except sqlite3.Error as e:
             print(f"Error updating item {item_id}: {e}")
@@ -1840,7 +3417,8 @@ class DatabaseManager:
                     (payment_id, short_code, payment_method, payment_type_id),
                 )
                 conn.commit()
-                print(f"Inserted payment {payment_id} ({short_code})")
+                logger.debug("Inserted payment %s (%s)", payment_id, short_code)
+                change_bus.publish("payments", [payment_id], "insert")
         except sqlite3.Error as e:
             print(f"Error inserting payment {payment_id}: {e}")
 
@@ -1857,7 +3435,8 @@ class DatabaseManager:
                     (short_code, payment_method, payment_type_id, payment_id),
                 )
                 conn.commit()
-                print(f"Updated payment {payment_id} ({short_code})")
+                logger.debug("Updated payment %s (%s)", payment_id, short_code)
+                change_bus.publish("payments", [payment_id], "update")
         except sqlite3.Error as e:
             print(f"Error updating payment {payment_id}: {e}")
 
@@ -1874,7 +3453,8 @@ class DatabaseManager:
                     (customer_id, customer_name, active),
                 )
                 conn.commit()
-                print(f"Inserted customer {customer_id} ({customer_name})")
+                logger.debug("Inserted customer %s (%s)", customer_id, customer_name)
+                change_bus.publish("customers", [customer_id], "insert")
         except sqlite3.Error as e:
             print(f"Error inserting customer {customer_id}: {e}")
 
@@ -1891,7 +3471,8 @@ class DatabaseManager:
                     (customer_name, active, customer_id),
                 )
                 conn.commit()
-                print(f"Updated customer {customer_id} ({customer_name})")
+                logger.debug("Updated customer %s (%s)", customer_id, customer_name)
+                change_bus.publish("customers", [customer_id], "update")
         except sqlite3.Error as e:
             print(f"Error updating customer {customer_id}: {e}")
 
@@ -1908,7 +3489,8 @@ class DatabaseManager:
                     (type_id, name, is_active),
                 )
                 conn.commit()
-                print(f"Inserted customer type {type_id} ({name})")
+                logger.debug("Inserted customer type %s (%s)", type_id, name)
+                change_bus.publish("customer_types", [type_id], "insert")
         except sqlite3.Error as e:
             print(f"Error inserting customer type {type_id}: {e}")
 
@@ -1925,7 +3507,8 @@ class DatabaseManager:
                     (name, is_active, type_id),
                 )
                 conn.commit()
-                print(f"Updated customer type {type_id} ({name})")
+                logger.debug("Updated customer type %s (%s)", type_id, name)
+                change_bus.publish("customer_types", [type_id], "update")
         except sqlite3.Error as e:
             print(f"Error updating customer type {type_id}: {e}")
 
@@ -1977,32 +3560,55 @@ class DatabaseManager:
             return []
 
 
-db = DatabaseManager()
+class _LazyDatabaseManager:
+    """Stands in for the shared DatabaseManager until it is first used.
 
-try:
-    with db.get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute("SELECT sqlite_version();")
-        version = cursor.fetchone()
-        print(f"Database connected successfully! SQLite version: {version[0]}")
+    Importing this module therefore has no side effects: the database file
+    is only created or migrated when something actually touches `db`.
+    """
 
-        # Verify key tables
-        tables_to_check = ["users", "stores", "payment_types", "payments"]
-        for table in tables_to_check:
-            cursor.execute(
-                "SELECT name FROM sqlite_master WHERE type='table' AND name=?;",
-                (table,),
-            )
-            if cursor.fetchone():
-                print(f"Table '{table}' exists.")
-            else:
-                print(f"Table '{table}' does NOT exist.")
-except sqlite3.Error as e:
-    print(f"Database connection failed: {e}")
-except Exception as e:
-    print(f"An unexpected error occurred: {e}")
-
-if db.db_path.exists():
-    print(f"Database file created at: {db.db_path}")
-else:
-    print(f"Database file was NOT created at: {db.db_path}")
+    def __init__(self):
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def _get(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    self._instance = DatabaseManager()
+        return self._instance
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def __setattr__(self, name, value):
+        if name in ("_instance", "_lock"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._get(), name, value)
+
+
+db = _LazyDatabaseManager()
+
+
+def log_database_diagnostics(manager=db):
+    """Logs the SQLite version and whether the core tables exist."""
+    try:
+        with manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT sqlite_version();")
+            version = cursor.fetchone()
+            logger.info("Database connected successfully! SQLite version: %s", version[0])
+
+            # Verify key tables
+            tables_to_check = ["users", "stores", "payment_types", "payments"]
+            for table in tables_to_check:
+                cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE type='table' AND name=?;",
+                    (table,),
+                )
+                if not cursor.fetchone():
+                    logger.error("Table '%s' does NOT exist.", table)
+    except sqlite3.Error as e:
+        logger.error("Database connection failed: %s", e)
+    logger.info("Using database at %s", manager.db_path)
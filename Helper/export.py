@@ -0,0 +1,433 @@
+"""Streaming export of sales, stock and expense data.
+
+    python -m Helper.export 2026-01-01 2026-12-31 --format csv --compression gzip
+    python -m Helper.export 2026-01-01 2026-12-31 --format parquet --tables order_items
+
+Each table is written to its own file, <table>_<start>_<end>.<ext>. Rows are
+read in keyset pages of `chunk_size` and written as they arrive, so memory
+use does not grow with the range. XLSX needs openpyxl and Parquet needs
+pyarrow; both are imported only when that format is used.
+"""
+
+import argparse
+import csv
+import gzip
+import logging
+import os
+import time
+from datetime import date, timedelta
+
+from Helper.db_conn import STORE_ID, DatabaseManager
+from Helper.logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("csv", "xlsx", "parquet")
+EXPORT_CHUNK_SIZE = 5000
+
+# Data rows per worksheet; the header takes Excel's last row
+XLSX_MAX_ROWS = 1048575
+
+# Each export: output columns as (name, type), the positions of the key
+# columns it pages on, and a query taking :start, :end, :limit and one :kN
+# per key. Keys follow the date index order, so every page is an index range
+# scan without a sort. Pages are separate statements: the read lock is
+# released between them and a checkout is never held up behind an export.
+EXPORTS = {
+    "orders": {
+        "columns": [
+            ("order_id", "int"),
+            ("order_number", "text"),
+            ("receipt_number", "text"),
+            ("date", "text"),
+            ("status", "text"),
+            ("customer_type_id", "int"),
+            ("total_amount", "float"),
+            ("discount", "float"),
+            ("tip", "float"),
+            ("ground_total", "float"),
+        ],
+        "keys": (3, 0),
+        "query": """
+            SELECT o.id, o.order_number, o.receipt_number, o.date, o.status,
+                   o.customer_type_id, o.total_amount, o.discount, o.tip,
+                   o.ground_total
+            FROM orders o
+            WHERE o.date >= :start AND o.date < :end
+              AND (o.date, o.id) > (:k0, :k1)
+            ORDER BY o.date, o.id
+            LIMIT :limit
+        """,
+    },
+    "order_items": {
+        "columns": [
+            ("order_id", "int"),
+            ("line_id", "int"),
+            ("order_number", "text"),
+            ("date", "text"),
+            ("status", "text"),
+            ("item_id", "int"),
+            ("item_name", "text"),
+            ("quantity", "float"),
+            ("price", "float"),
+            ("line_total", "float"),
+        ],
+        "keys": (3, 0, 1),
+        "query": """
+            SELECT o.id, oi.id, o.order_number, o.date, o.status, oi.item_id,
+                   i.name, oi.quantity, oi.price, oi.quantity * oi.price
+            FROM orders o
+            JOIN order_items oi ON oi.order_id = o.id
+            LEFT JOIN items i ON i.id = oi.item_id
+            WHERE o.date >= :start AND o.date < :end
+              AND (o.date, o.id, oi.id) > (:k0, :k1, :k2)
+            ORDER BY o.date, o.id, oi.id
+            LIMIT :limit
+        """,
+    },
+    "order_payments": {
+        "columns": [
+            ("order_id", "int"),
+            ("order_payment_id", "int"),
+            ("order_number", "text"),
+            ("date", "text"),
+            ("status", "text"),
+            ("payment_id", "int"),
+            ("short_code", "text"),
+            ("payment_method", "text"),
+            ("payment_type_id", "int"),
+        ],
+        "keys": (3, 0, 1),
+        "query": """
+            SELECT o.id, op.id, o.order_number, o.date, o.status, op.payment_id,
+                   p.short_code, p.payment_method, p.payment_type_id
+            FROM orders o
+            JOIN order_payments op ON op.order_id = o.id
+            LEFT JOIN payments p ON p.id = op.payment_id
+            WHERE o.date >= :start AND o.date < :end
+              AND (o.date, o.id, op.id) > (:k0, :k1, :k2)
+            ORDER BY o.date, o.id, op.id
+            LIMIT :limit
+        """,
+    },
+    "stock_movements": {
+        "columns": [
+            ("movement_id", "int"),
+            ("movement_date", "text"),
+            ("movement_type", "text"),
+            ("item_id", "int"),
+            ("item_name", "text"),
+            ("order_id", "int"),
+            ("quantity", "float"),
+        ],
+        "keys": (1, 0),
+        "query": """
+            SELECT sm.id, sm.movement_date, sm.movement_type, sm.item_id, i.name,
+                   sm.order_id, sm.quantity
+            FROM stock_movements sm
+            LEFT JOIN items i ON i.id = sm.item_id
+            WHERE sm.movement_date >= :start AND sm.movement_date < :end
+              AND (sm.movement_date, sm.id) > (:k0, :k1)
+            ORDER BY sm.movement_date, sm.id
+            LIMIT :limit
+        """,
+    },
+    "expenses": {
+        "columns": [
+            ("expense_id", "int"),
+            ("expense_date", "text"),
+            ("expense_type", "text"),
+            ("user_id", "int"),
+            ("amount", "float"),
+            ("description", "text"),
+            ("reference_number", "text"),
+            ("linked_shop_item_id", "int"),
+        ],
+        "keys": (1, 0),
+        "query": """
+            SELECT e.id, e.expense_date, e.expense_type, e.user_id, e.amount,
+                   e.description, e.reference_number, e.linked_shop_item_id
+            FROM expenses e
+            WHERE e.expense_date >= :start AND e.expense_date < :end
+              AND (e.expense_date, e.id) > (:k0, :k1)
+            ORDER BY e.expense_date, e.id
+            LIMIT :limit
+        """,
+    },
+}
+
+
+class ExportCancelled(Exception):
+    """Raised when `cancelled()` turns true in the middle of an export."""
+
+
+class CsvExportWriter:
+    extension = "csv"
+
+    def __init__(self, path, columns, compression=None):
+        if compression not in (None, "gzip"):
+            raise ValueError(f"CSV exports support gzip compression, not {compression!r}")
+        if compression == "gzip":
+            self.file = gzip.open(path, "wt", newline="", encoding="utf-8")
+        else:
+            self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([name for name, _ in columns])
+
+    def write_rows(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class XlsxExportWriter:
+    """Writes through openpyxl's write-only mode, which streams rows to disk.
+
+    Ranges over Excel's row limit continue on "<table> (2)", "<table> (3)"...
+    """
+
+    extension = "xlsx"
+
+    def __init__(self, path, columns, compression=None, title="Sheet"):
+        if compression is not None:
+            raise ValueError("XLSX files are always zip compressed")
+        try:
+            import openpyxl
+        except ImportError as e:
+            raise ImportError("openpyxl is required to export XLSX files") from e
+
+        self.path = path
+        self.title = title
+        self.header = [name for name, _ in columns]
+        self.workbook = openpyxl.Workbook(write_only=True)
+        self.sheets = 0
+        self._new_sheet()
+
+    def _new_sheet(self):
+        self.sheets += 1
+        title = self.title if self.sheets == 1 else f"{self.title} ({self.sheets})"
+        self.sheet = self.workbook.create_sheet(title[:31])
+        self.sheet.append(self.header)
+        self.sheet_rows = 0
+
+    def write_rows(self, rows):
+        for row in rows:
+            if self.sheet_rows == XLSX_MAX_ROWS:
+                self._new_sheet()
+            self.sheet.append(row)
+            self.sheet_rows += 1
+
+    def close(self):
+        self.workbook.save(self.path)
+        self.workbook.close()
+
+
+class ParquetExportWriter:
+    """Writes each chunk as a row group with pyarrow's ParquetWriter."""
+
+    extension = "parquet"
+
+    def __init__(self, path, columns, compression=None):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("pyarrow is required to export Parquet files") from e
+
+        types = {"int": pa.int64(), "float": pa.float64(), "text": pa.string()}
+        self.pa = pa
+        self.schema = pa.schema([(name, types[kind]) for name, kind in columns])
+        self.writer = pq.ParquetWriter(
+            path, self.schema, compression=compression or "snappy"
+        )
+
+    def write_rows(self, rows):
+        columns = list(zip(*rows))
+        arrays = [
+            self.pa.array(values, type=field.type)
+            for values, field in zip(columns, self.schema)
+        ]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+EXPORT_WRITERS = {
+    "csv": CsvExportWriter,
+    "xlsx": XlsxExportWriter,
+    "parquet": ParquetExportWriter,
+}
+
+
+def export_path(directory, table, start_date, end_date, fmt, compression=None):
+    name = f"{table}_{start_date}_{end_date}.{EXPORT_WRITERS[fmt].extension}"
+    if fmt == "csv" and compression == "gzip":
+        name += ".gz"
+    return os.path.join(directory, name)
+
+
+class DataExporter:
+    """Exports EXPORTS tables for a date range of this till's store.
+
+    Orders carry no store of their own: a till's database only holds the
+    orders of its store (STORE_ID), so exporting another store is refused
+    rather than silently producing empty files.
+    """
+
+    def __init__(self, store_id=None, chunk_size=EXPORT_CHUNK_SIZE):
+        self.db_manager = DatabaseManager()
+        self.store_id = store_id or STORE_ID
+        self.chunk_size = chunk_size
+        if self.store_id != STORE_ID:
+            raise ValueError(
+                f"This till holds the data of store {STORE_ID}, not store {self.store_id}"
+            )
+
+    def export(
+        self,
+        directory,
+        start_date,
+        end_date,
+        fmt="csv",
+        tables=None,
+        compression=None,
+        progress=None,
+        cancelled=None,
+    ):
+        """Writes one file per table for the inclusive date range.
+
+        `progress(table, rows_written)` is called after every chunk. Returns
+        {table: {"path": ..., "rows": n}} plus "duration_s". A cancelled
+        export raises ExportCancelled and removes the file it was writing.
+        """
+        if fmt not in EXPORT_WRITERS:
+            raise ValueError(f"Unknown export format {fmt!r}")
+        tables = list(tables or EXPORTS)
+        unknown = [table for table in tables if table not in EXPORTS]
+        if unknown:
+            raise ValueError(f"Unknown export tables: {', '.join(unknown)}")
+
+        started = time.perf_counter()
+        os.makedirs(directory, exist_ok=True)
+        summary = {}
+        for table in tables:
+            path = export_path(directory, table, start_date, end_date, fmt, compression)
+            rows = self.export_table(
+                table,
+                path,
+                start_date,
+                end_date,
+                fmt,
+                compression,
+                progress=progress,
+                cancelled=cancelled,
+            )
+            summary[table] = {"path": path, "rows": rows}
+        summary["duration_s"] = round(time.perf_counter() - started, 2)
+        logger.info(
+            "Exported %s to %s (%s) in %s s",
+            ", ".join(f"{t}={summary[t]['rows']}" for t in tables),
+            directory,
+            fmt,
+            summary["duration_s"],
+        )
+        return summary
+
+    def export_table(
+        self,
+        table,
+        path,
+        start_date,
+        end_date,
+        fmt="csv",
+        compression=None,
+        progress=None,
+        cancelled=None,
+    ):
+        """Streams one table to `path`; returns the number of rows written."""
+        spec = EXPORTS[table]
+        writer_class = EXPORT_WRITERS[fmt]
+        if writer_class is XlsxExportWriter:
+            writer = writer_class(path, spec["columns"], compression, title=table)
+        else:
+            writer = writer_class(path, spec["columns"], compression)
+
+        params = {
+            "start": start_date,
+            # Dates are stored as text, so "< next day" keeps the end date
+            # inclusive and lets the date indexes bound the scan.
+            "end": (date.fromisoformat(end_date) + timedelta(days=1)).isoformat(),
+            "limit": self.chunk_size,
+        }
+        # Start below every key: "" sorts before any date, 0 before any id
+        params.update(
+            {
+                f"k{n}": "" if spec["columns"][position][1] == "text" else 0
+                for n, position in enumerate(spec["keys"])
+            }
+        )
+        written = 0
+        conn = self.db_manager.open_connection()
+        try:
+            while True:
+                if cancelled is not None and cancelled():
+                    raise ExportCancelled(f"Export of {table} cancelled")
+                rows = conn.execute(spec["query"], params).fetchall()
+                if not rows:
+                    break
+                writer.write_rows(rows)
+                written += len(rows)
+                params.update(
+                    {f"k{n}": rows[-1][position] for n, position in enumerate(spec["keys"])}
+                )
+                if progress is not None:
+                    progress(table, written)
+                if len(rows) < self.chunk_size:
+                    break
+        except BaseException:
+            conn.close()
+            try:
+                writer.close()
+            finally:
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+        conn.close()
+        writer.close()
+        return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m Helper.export", description=__doc__)
+    parser.add_argument("start_date", help="first day, YYYY-MM-DD")
+    parser.add_argument("end_date", help="last day, YYYY-MM-DD (inclusive)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument(
+        "--compression",
+        help="gzip for CSV; snappy, gzip, zstd, ... for Parquet",
+    )
+    parser.add_argument("--tables", nargs="+", choices=list(EXPORTS))
+    parser.add_argument("--output", default="exports", help="output directory")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    summary = DataExporter(chunk_size=args.chunk_size).export(
+        args.output,
+        args.start_date,
+        args.end_date,
+        fmt=args.format,
+        tables=args.tables,
+        compression=args.compression,
+    )
+    for table, result in summary.items():
+        if table != "duration_s":
+            print(f"{table}: {result['rows']} rows -> {result['path']}")
+    print(f"Done in {summary['duration_s']} s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
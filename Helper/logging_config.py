@@ -0,0 +1,79 @@
+import logging
+import logging.handlers
+import os
+from pathlib import Path
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
+
+# Default level per subsystem. Anything not listed inherits the root level.
+# Override at runtime with AMALI_LOG_LEVELS, e.g.
+#   AMALI_LOG_LEVELS="Helper.api=DEBUG,Application.Components.OrderSummary=DEBUG"
+DEFAULT_LOG_LEVELS = {
+    "": "INFO",
+    "Helper.db_conn": "INFO",
+    "Helper.api": "INFO",
+    "Application.Components.main": "INFO",
+    "Application.Components.components": "INFO",
+    "Application.Components.OrderSummary": "INFO",
+    "Application.Components.Inventory": "INFO",
+    "Application.Components.Reports": "INFO",
+    "urllib3": "WARNING",
+    "PIL": "WARNING",
+}
+
+SLOW_QUERY_LOGGER = "amali.slow_query"
+
+_configured = False
+
+
+def parse_levels(spec):
+    """Parses "name=LEVEL,name=LEVEL" into a dict; bad entries are ignored."""
+    levels = {}
+    for entry in (spec or "").split(","):
+        name, sep, level = entry.partition("=")
+        if sep and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(levels=None, log_dir=None, max_bytes=5 * 1024 * 1024, backups=5):
+    """Sets up application-wide logging once.
+
+    Records go to the console and to a rotating `amali.log`. Slow SQL
+    statements (see Helper.slow_query, enabled with AMALI_SLOW_QUERY_MS) go
+    to their own rotating `slow_queries.log` and are not repeated in the
+    main log.
+    """
+    global _configured
+    if _configured:
+        return
+    _configured = True
+
+    log_dir = Path(log_dir or os.environ.get("AMALI_LOG_DIR", "Logs"))
+    log_dir.mkdir(parents=True, exist_ok=True)
+    formatter = logging.Formatter(LOG_FORMAT)
+
+    root = logging.getLogger()
+    console = logging.StreamHandler()
+    console.setFormatter(formatter)
+    root.addHandler(console)
+    app_file = logging.handlers.RotatingFileHandler(
+        log_dir / "amali.log", maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+    )
+    app_file.setFormatter(formatter)
+    root.addHandler(app_file)
+
+    merged = dict(DEFAULT_LOG_LEVELS)
+    merged.update(levels or {})
+    merged.update(parse_levels(os.environ.get("AMALI_LOG_LEVELS")))
+    for name, level in merged.items():
+        logging.getLogger(name or None).setLevel(level)
+
+    slow_logger = logging.getLogger(SLOW_QUERY_LOGGER)
+    slow_logger.propagate = False
+    slow_logger.setLevel(logging.WARNING)
+    slow_file = logging.handlers.RotatingFileHandler(
+        log_dir / "slow_queries.log", maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+    )
+    slow_file.setFormatter(logging.Formatter("%(asctime)s - %(message)s"))
+    slow_logger.addHandler(slow_file)
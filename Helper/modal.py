@@ -37,43 +37,7 @@ def get_local_categories_for_group(group_name):
 
 
 def get_local_items_for_category(category_id):
-    try:
-        with db.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """
-                SELECT
-                    i.id,
-                    i.name as item_name,
-                    u.name as item_unit,
-                    ip.amount as item_price,
-                    s.min_quantity as stock_quantity,
-                    COALESCE(im.file_path, 'default.jpg') as image_url
-                FROM items i
-                LEFT JOIN item_units iu ON i.id = iu.item_id
-                LEFT JOIN units u ON iu.selling_unit_id = u.id
-                LEFT JOIN item_prices ip ON i.id = ip.item_id
-                LEFT JOIN stocks s ON i.id = s.item_id
-                LEFT JOIN item_images ii ON i.id = ii.item_id
-                LEFT JOIN images im ON ii.image_id = im.id
-                WHERE i.category_id = ? AND i.status = 'active'
-                """,
-                (category_id,),
-            )
-            return [
-                {
-                    "item_id": row[0],
-                    "item_name": row[1],
-                    "item_unit": row[2] if row[2] else "pcs",
-                    "item_price": float(row[3]) if row[3] is not None else 0.0,
-                    "stock_quantity": float(row[4]) if row[4] is not None else 0.0,
-                    "image_url": f"/uploads/item_images/{row[5]}",
-                }
-                for row in cursor.fetchall()
-            ]
-    except sqlite3.Error as e:
-        print(f"Database error getting items for category: {e}")
-        return []
+    return db.get_local_items_for_category(category_id)
 
 
 def insert_item_group(name):
@@ -152,13 +116,24 @@ def insert_item(item_id, item_name, item_unit, item_price, stock_quantity, categ
                 (item_id, unit_id, item_price),
             )
 
-            # Insert stock
+            # Insert stock: the quantity on hand is an opening movement in the
+            # ledger (min_quantity is the reorder level, not the stock)
             cursor.execute(
                 """
                 INSERT OR IGNORE INTO stocks (item_id, store_id, min_quantity, max_quantity, created_at)
-                VALUES (?, 1, ?, ?, CURRENT_TIMESTAMP)
+                VALUES (?, 1, 0, 0, CURRENT_TIMESTAMP)
+                """,
+                (item_id,),
+            )
+            cursor.execute(
+                """
+                INSERT INTO stock_movements (item_id, store_id, movement_type, quantity, movement_date)
+                SELECT ?, 1, 'opening', ?, datetime('now', 'localtime')
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM stock_movements WHERE store_id = 1 AND item_id = ?
+                )
                 """,
-                (item_id, stock_quantity, stock_quantity * 2),
+                (item_id, stock_quantity, item_id),
             )
 
     except sqlite3.Error as e:
@@ -304,7 +279,7 @@ def save_order(order_data, items, payment_id, customer_id):
                     cursor.execute(
                         """
                         INSERT INTO stock_movements (item_id, order_id, movement_type, quantity, movement_date)
-                        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                        VALUES (?, ?, ?, ?, datetime('now', 'localtime'))
                         """,
                         (
                             int(item["item_id"]),
@@ -0,0 +1,25 @@
+import os
+import socket
+from urllib.parse import urlparse
+
+# Base URL of the Amali backend. Can be overridden (e.g. to point at a local
+# stand-in server) through the AMALI_API_BASE_URL environment variable.
+API_BASE_URL = os.environ.get(
+    "AMALI_API_BASE_URL", "https://c1.amali.japango.co.tz/api/v1"
+).rstrip("/")
+
+
+def host_and_port(url):
+    """Returns the (host, port) pair a base URL such as API_BASE_URL points at."""
+    parsed = urlparse(url)
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    return parsed.hostname, port
+
+
+def probe(host, port, timeout=3.0):
+    """Returns True when a TCP connection to host:port can be opened."""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
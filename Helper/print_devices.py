@@ -0,0 +1,276 @@
+"""Printers configured in Printer Settings and routing of print jobs to them.
+
+The device registry is read from printer_settings (joined to
+virtual_devices): network, Bluetooth and USB printers, and cash drawers
+attached to one of them. Every printer gets its own PrintSpooler, so each
+has its own queue and thread and two printers print at the same time.
+
+print_routes decides which printers get which document (receipt,
+reprint, day_close). A document routed to several printers goes to the
+one with the shortest queue; without a route it goes to the first
+configured printer. With no printer configured the USB receipt printer
+is used, as before. Routes are edited in Printer Settings (Print
+Routing). Jobs still queued for a printer that is no longer configured
+are moved to the printer that would get them now whenever the printers
+are (re)loaded.
+
+Network and Bluetooth printers are driven over a plain socket that the
+spooler keeps open between jobs and reopens after an error.
+"""
+
+import logging
+import socket
+
+from Helper.db_conn import db
+from Helper.print_spooler import DRAWER_KICK, PrintSpooler, usb_receipt_printer
+
+logger = logging.getLogger(__name__)
+
+DOCUMENTS = ("receipt", "reprint", "day_close")
+# Raw (JetDirect) port of network receipt printers
+NETWORK_PORT = 9100
+BLUETOOTH_CHANNEL = 1
+CONNECT_TIMEOUT = 5.0
+WRITE_TIMEOUT = 20.0
+# printer_type values written by PrinterSettingsWindow
+NETWORK, BLUETOOTH, USB, CASH_DRAWER = (
+    "Network Printer",
+    "Bluetooth Printer",
+    "USB Printer",
+    "Cash Drawer",
+)
+
+
+class SocketPrinter:
+    """ESC/POS printer on a TCP or RFCOMM socket, opened once and kept open."""
+
+    def __init__(self, family, address, protocol=0):
+        self.address = address
+        self.sock = socket.socket(family, socket.SOCK_STREAM, protocol)
+        try:
+            self.sock.settimeout(CONNECT_TIMEOUT)
+            self.sock.connect(address)
+            self.sock.settimeout(WRITE_TIMEOUT)
+            if family == socket.AF_INET:
+                # Notice a printer that was switched off between jobs
+                self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+                self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:
+            self.sock.close()
+            raise
+
+    def _raw(self, data):
+        self.sock.sendall(data)
+
+    def close(self):
+        self.sock.close()
+
+
+def network_printer(address):
+    """Factory for a printer at "host" or "host:port"."""
+    host, _, port = address.partition(":")
+    port = int(port) if port else NETWORK_PORT
+    return lambda: SocketPrinter(socket.AF_INET, (host, port))
+
+
+def bluetooth_printer(address):
+    """Factory for a Bluetooth printer (RFCOMM, Linux only)."""
+    if not hasattr(socket, "AF_BLUETOOTH"):
+        raise OSError("Bluetooth sockets are not supported on this system")
+    return lambda: SocketPrinter(
+        socket.AF_BLUETOOTH, (address, BLUETOOTH_CHANNEL), socket.BTPROTO_RFCOMM
+    )
+
+
+def usb_printer(ids=None):
+    """Factory for a USB printer; `ids` is "vendor:product" in hex."""
+    if not ids:
+        return usb_receipt_printer
+
+    vendor, product = (int(part, 16) for part in ids.split(":"))
+
+    def connect():
+        from escpos.printer import Usb
+
+        return Usb(vendor, product)
+
+    return connect
+
+
+def paper_width(paper_size):
+    """Receipt paper for a Printer Settings size such as "3x2" (inches)."""
+    try:
+        inches = float((paper_size or "").lower().split("x")[0])
+    except ValueError:
+        return "80mm"
+    return "58mm" if inches < 3 else "80mm"
+
+
+def drawer_kick(drawer_code):
+    """Bytes of a drawer code such as "27,112,0,25,250"."""
+    if not drawer_code:
+        return DRAWER_KICK
+    return bytes(int(part) for part in drawer_code.replace(" ", "").split(",") if part)
+
+
+def load_devices(rows):
+    """Printer definitions from db.get_print_devices() rows.
+
+    Returns [{name, type, connect, paper, drawer_kick}]; drawer_kick is
+    None for printers without a cash drawer. Rows that cannot be used are
+    logged and skipped.
+    """
+    printers = []
+    drawers = []
+    for row in rows:
+        kind = row["printer_type"]
+        try:
+            if kind == CASH_DRAWER:
+                drawers.append(row)
+                continue
+            if kind == NETWORK:
+                connect = network_printer(row["printer_ip"])
+            elif kind == BLUETOOTH:
+                connect = bluetooth_printer(row["bluetooth_address"])
+            elif kind == USB:
+                connect = usb_printer(row["printer_ip"])
+            else:
+                raise ValueError(f"unknown printer type {kind!r}")
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning("Printer %s cannot be used: %s", row["printer_name"], e)
+            continue
+        printers.append(
+            {
+                "name": row["printer_name"],
+                "virtual_device": row["virtual_device"],
+                "type": kind,
+                "connect": connect,
+                "paper": paper_width(row["paper_size"]),
+                "drawer_kick": None,
+            }
+        )
+    for drawer in drawers:
+        # A drawer names the printer (or its device type) it is plugged into
+        target = drawer["associated_printer"]
+        printer = next(
+            (p for p in printers if target in (p["name"], p["virtual_device"])), None
+        )
+        if printer is None:
+            logger.warning("Cash drawer is attached to unknown printer %r", target)
+            continue
+        try:
+            printer["drawer_kick"] = drawer_kick(drawer["drawer_code"])
+        except ValueError:
+            logger.warning("Invalid drawer code %r", drawer["drawer_code"])
+            printer["drawer_kick"] = DRAWER_KICK
+    if not printers:
+        printers.append(
+            {
+                "name": "receipt",
+                "virtual_device": USB,
+                "type": USB,
+                "connect": usb_receipt_printer,
+                "paper": "80mm",
+                "drawer_kick": DRAWER_KICK,
+            }
+        )
+    return printers
+
+
+class PrintRouter:
+    """One spooler per configured printer and the routes between them."""
+
+    def __init__(self):
+        self.spoolers = {}
+        self.drawers = []
+        self.routes = {}
+        self._listeners = {}
+        self._tokens = 0
+        self._started = False
+
+    def load(self):
+        """(Re)reads printers and routes and restarts the spoolers."""
+        devices = load_devices(db.get_print_devices())
+        routes = db.get_print_routes()
+        for spooler in self.spoolers.values():
+            spooler.stop()
+        spoolers = {}
+        for device in devices:
+            spooler = PrintSpooler(
+                device["name"],
+                device["connect"],
+                paper=device["paper"],
+                drawer_kick=device["drawer_kick"] or DRAWER_KICK,
+            )
+            spooler.subscribe(self._notify)
+            spoolers[device["name"]] = spooler
+        self.spoolers = spoolers
+        self.drawers = [d["name"] for d in devices if d["drawer_kick"]]
+        self.routes = {
+            document: [name for name in names if name in spoolers]
+            for document, names in routes.items()
+        }
+        # Jobs queued for a printer that is gone would stay pending forever
+        targets = {document: self.printers_for(document)[0] for document in DOCUMENTS}
+        targets["drawer"] = (self.drawers or list(spoolers))[0]
+        moved = db.move_orphaned_print_jobs(list(spoolers), targets)
+        if moved:
+            logger.info("Moved %d queued print job(s) of removed printers", moved)
+        if self._started:
+            for spooler in spoolers.values():
+                spooler.start()
+        logger.info(
+            "Printers: %s; routes: %s", ", ".join(spoolers), self.routes or "default"
+        )
+
+    def start(self):
+        if not self.spoolers:
+            self.load()
+        self._started = True
+        for spooler in self.spoolers.values():
+            spooler.start()
+
+    def stop(self):
+        self._started = False
+        for spooler in self.spoolers.values():
+            spooler.stop()
+
+    def subscribe(self, callback):
+        """Calls `callback(device, job_id, status, error)` for jobs of every printer."""
+        self._tokens += 1
+        self._listeners[self._tokens] = callback
+        return self._tokens
+
+    def unsubscribe(self, token):
+        self._listeners.pop(token, None)
+
+    def _notify(self, device, job_id, status, error):
+        for callback in list(self._listeners.values()):
+            callback(device, job_id, status, error)
+
+    def printers_for(self, document):
+        names = self.routes.get(document)
+        return names or list(self.spoolers)[:1]
+
+    def submit(self, document, payload, open_drawer=False):
+        """Queues `document` on its least busy printer; returns the job id.
+
+        When that printer has no cash drawer the kick goes to a printer
+        that has one, as a separate job.
+        """
+        if not self.spoolers:
+            self.load()
+        names = self.printers_for(document)
+        if len(names) > 1:
+            name = min(names, key=lambda n: self.spoolers[n].backlog())
+        else:
+            name = names[0]
+        kick_here = open_drawer and (name in self.drawers or not self.drawers)
+        job_id = self.spoolers[name].submit(document, payload, open_drawer=kick_here)
+        if open_drawer and not kick_here:
+            self.spoolers[self.drawers[0]].submit("drawer", {}, open_drawer=True)
+        return job_id
+
+
+# Printers of this till; started by the dashboard
+print_router = PrintRouter()
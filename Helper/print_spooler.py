@@ -0,0 +1,350 @@
+"""Background print spooler with a persistent job queue.
+
+Jobs are rows of the print_jobs table, so a receipt queued just before a
+crash or while the printer is unplugged is printed after the restart. One
+thread per device owns a long-lived printer connection: it connects on the
+first job, keeps the connection between jobs and reconnects after an
+error. Failed jobs are retried with exponential backoff until
+`max_attempts`, then marked failed.
+
+Each document is rendered to one ESC/POS buffer and sent with a single
+write. The cash drawer kick of a job is sent as its own write before the
+document and is recorded, so the drawer opens as soon as the sale is
+queued (even behind a backlog of receipts) and never twice on a retry.
+
+Listeners receive (device, job_id, status, error) on the spooler thread;
+the GUI uses Application.Components.print_relay to get them as a Qt
+signal. Helper.print_devices runs one spooler per configured printer.
+"""
+
+import itertools
+import json
+import logging
+import threading
+import time
+
+from Helper.db_conn import DatabaseManager
+from Helper.receipts import DEFAULT_PAPER, render_day_close, render_receipt
+
+logger = logging.getLogger(__name__)
+
+# USB receipt printer used when no device is configured
+RECEIPT_PRINTER_USB = {
+    "idVendor": 0x1D90,
+    "idProduct": 0x2060,
+    "in_ep": 0x81,
+    "out_ep": 0x02,
+}
+# ESC p: pulse cash drawer connector pin 2 for 50 ms on, 500 ms off
+DRAWER_KICK = bytes((27, 112, 0, 25, 250))
+# Documents a spooler knows how to print: name -> render(payload, paper) -> bytes.
+# A "drawer" job only opens the drawer.
+RENDERERS = {
+    "receipt": render_receipt,
+    "reprint": render_receipt,
+    "day_close": render_day_close,
+    "drawer": lambda payload, paper: b"",
+}
+
+
+def usb_receipt_printer():
+    """Connects to the default USB receipt printer with python-escpos."""
+    from escpos.printer import Usb
+
+    return Usb(**RECEIPT_PRINTER_USB)
+
+
+class PrintSpooler:
+    def __init__(
+        self,
+        device="receipt",
+        connect=usb_receipt_printer,
+        paper=DEFAULT_PAPER,
+        drawer_kick=DRAWER_KICK,
+        renderers=None,
+        max_attempts=5,
+        retry_delay=2.0,
+        max_retry_delay=60.0,
+        keep_done=24 * 3600,
+    ):
+        self.device = device
+        self.connect = connect
+        self.paper = paper
+        self.drawer_kick = drawer_kick
+        self.renderers = dict(RENDERERS if renderers is None else renderers)
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.keep_done = keep_done
+        self.db_manager = DatabaseManager()
+        self._printer = None
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._listeners = {}
+        self._tokens = itertools.count(1)
+
+    def subscribe(self, callback):
+        """Calls `callback(device, job_id, status, error)` on every status change."""
+        token = next(self._tokens)
+        self._listeners[token] = callback
+        return token
+
+    def unsubscribe(self, token):
+        self._listeners.pop(token, None)
+
+    def _notify(self, job_id, status, error=None):
+        for callback in list(self._listeners.values()):
+            try:
+                callback(self.device, job_id, status, error)
+            except Exception as e:
+                logger.error("Print status listener failed: %s", e)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        now = time.time()
+        conn = self.db_manager.open_connection()
+        try:
+            # A job that was printing when the till stopped is printed again
+            conn.execute(
+                """
+                UPDATE print_jobs SET status = 'pending', updated_at = ?
+                WHERE device = ? AND status = 'printing'
+                """,
+                (now, self.device),
+            )
+            conn.execute(
+                "DELETE FROM print_jobs WHERE device = ? AND status = 'done' AND updated_at < ?",
+                (self.device, now - self.keep_done),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"print-{self.device}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._disconnect()
+
+    def submit(self, document, payload, open_drawer=False):
+        """Queues a document and returns the job id; never blocks on the printer."""
+        if document not in self.renderers:
+            raise ValueError(f"Device {self.device} cannot print {document!r}")
+        now = time.time()
+        conn = self.db_manager.open_connection()
+        try:
+            cursor = conn.execute(
+                """
+                INSERT INTO print_jobs
+                    (device, document, payload, open_drawer, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (self.device, document, json.dumps(payload), int(open_drawer), now, now),
+            )
+            conn.commit()
+            job_id = cursor.lastrowid
+        finally:
+            conn.close()
+        self._notify(job_id, "pending")
+        self._wake.set()
+        return job_id
+
+    def retry_failed(self):
+        """Puts failed jobs back in the queue, e.g. after the paper was changed."""
+        conn = self.db_manager.open_connection()
+        try:
+            cursor = conn.execute(
+                """
+                UPDATE print_jobs
+                SET status = 'pending', attempts = 0, next_attempt_at = 0, updated_at = ?
+                WHERE device = ? AND status = 'failed'
+                """,
+                (time.time(), self.device),
+            )
+            conn.commit()
+            retried = cursor.rowcount
+        finally:
+            conn.close()
+        self._wake.set()
+        return retried
+
+    def backlog(self):
+        """Number of documents waiting for or being printed (drawer kicks excluded)."""
+        conn = self.db_manager.open_connection()
+        try:
+            return conn.execute(
+                """
+                SELECT COUNT(*) FROM print_jobs
+                WHERE device = ? AND status IN ('pending', 'printing')
+                  AND document != 'drawer'
+                """,
+                (self.device,),
+            ).fetchone()[0]
+        finally:
+            conn.close()
+
+    def jobs(self, statuses=("pending", "printing", "failed")):
+        marks = ", ".join("?" * len(statuses))
+        conn = self.db_manager.open_connection()
+        try:
+            rows = conn.execute(
+                f"""
+                SELECT id, document, status, attempts, last_error, created_at
+                FROM print_jobs
+                WHERE device = ? AND status IN ({marks})
+                ORDER BY id
+                """,
+                (self.device, *statuses),
+            ).fetchall()
+        finally:
+            conn.close()
+        keys = ("id", "document", "status", "attempts", "last_error", "created_at")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            try:
+                job, wait = self._next_job()
+                if job is not None:
+                    self._print(job)
+                    continue
+            except Exception as e:
+                # Keep the spooler alive through database hiccups
+                logger.error("Print spooler %s: %s", self.device, e)
+                wait = self.retry_delay
+            self._wake.wait(wait)
+
+    def _next_job(self):
+        """Returns (job, None) for the step to run now, or (None, seconds to wait).
+
+        Documents print strictly in queue order. A drawer kick that has not
+        been sent jumps the queue as a step of its own (job["kick_only"]),
+        so the drawer of a new sale opens without its receipt overtaking
+        older ones.
+        """
+        now = time.time()
+        keys = ("id", "document", "payload", "open_drawer", "drawer_opened", "attempts")
+        conn = self.db_manager.open_connection()
+        try:
+            row = conn.execute(
+                """
+                SELECT id, document, payload, open_drawer, drawer_opened, attempts
+                FROM print_jobs
+                WHERE device = ? AND status = 'pending' AND next_attempt_at <= ?
+                ORDER BY id
+                LIMIT 1
+                """,
+                (self.device, now),
+            ).fetchone()
+            if row is not None:
+                kick = conn.execute(
+                    """
+                    SELECT id, document, payload, open_drawer, drawer_opened, attempts
+                    FROM print_jobs
+                    WHERE device = ? AND status = 'pending' AND next_attempt_at <= ?
+                      AND open_drawer > drawer_opened AND id > ?
+                    ORDER BY id
+                    LIMIT 1
+                    """,
+                    (self.device, now, row[0]),
+                ).fetchone()
+                if kick is not None:
+                    return dict(zip(keys, kick), kick_only=True), None
+                conn.execute(
+                    "UPDATE print_jobs SET status = 'printing', updated_at = ? WHERE id = ?",
+                    (now, row[0]),
+                )
+                conn.commit()
+                return dict(zip(keys, row), kick_only=False), None
+            due = conn.execute(
+                """
+                SELECT MIN(next_attempt_at) FROM print_jobs
+                WHERE device = ? AND status = 'pending'
+                """,
+                (self.device,),
+            ).fetchone()[0]
+        finally:
+            conn.close()
+        return None, None if due is None else max(due - now, 0.05)
+
+    def _print(self, job):
+        if not job["kick_only"]:
+            self._notify(job["id"], "printing")
+        try:
+            printer = self._connected_printer()
+            if job["open_drawer"] and not job["drawer_opened"]:
+                printer._raw(self.drawer_kick)
+                self._update(job["id"], drawer_opened=1)
+            if job["kick_only"]:
+                return
+            render = self.renderers[job["document"]]
+            data = render(json.loads(job["payload"]), self.paper)
+            if data:
+                printer._raw(data)
+        except Exception as e:
+            # The connection is suspect after any error; reopen it next time
+            self._disconnect()
+            attempts = job["attempts"] + 1
+            if attempts >= self.max_attempts:
+                status = "failed"
+                delay = 0
+            else:
+                status = "pending"
+                delay = min(self.retry_delay * 2 ** (attempts - 1), self.max_retry_delay)
+            logger.warning(
+                "Print job %s on %s failed (attempt %d): %s",
+                job["id"],
+                self.device,
+                attempts,
+                e,
+            )
+            self._update(
+                job["id"],
+                status=status,
+                attempts=attempts,
+                last_error=str(e),
+                next_attempt_at=time.time() + delay,
+            )
+            self._notify(job["id"], status, str(e))
+            return
+        self._update(job["id"], status="done", last_error=None)
+        logger.info("Printed %s job %s on %s", job["document"], job["id"], self.device)
+        self._notify(job["id"], "done")
+
+    def _connected_printer(self):
+        if self._printer is None:
+            self._printer = self.connect()
+            logger.info("Connected to printer %s", self.device)
+        return self._printer
+
+    def _disconnect(self):
+        printer, self._printer = self._printer, None
+        if printer is not None:
+            try:
+                printer.close()
+            except Exception as e:
+                logger.debug("Closing printer %s: %s", self.device, e)
+
+    def _update(self, job_id, **columns):
+        columns["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in columns)
+        conn = self.db_manager.open_connection()
+        try:
+            conn.execute(
+                f"UPDATE print_jobs SET {assignments} WHERE id = ?",
+                (*columns.values(), job_id),
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
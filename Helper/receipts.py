@@ -0,0 +1,282 @@
+"""Receipt records and the receipt template.
+
+A receipt is built once from the saved order into a plain, JSON-friendly
+record, so it can wait in the print queue (and survive a restart) without
+reading anything back from the checkout widgets.
+
+ReceiptTemplate holds the one receipt layout. It is compiled per paper
+width: fixed text, ESC/POS commands and the logo raster are encoded once,
+and rendering a record joins them with the order lines into a single
+bytes buffer that goes to the printer in one write. The same layout
+renders the plain text shown in the receipt preview.
+
+Pillow is optional and only needed to print a logo.
+"""
+
+import functools
+import logging
+import os
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    PIL_INSTALLED = False
+else:
+    PIL_INSTALLED = True
+
+logger = logging.getLogger(__name__)
+
+# Characters per line in font A and printable dots per line, per paper width
+PAPER_LAYOUTS = {
+    "80mm": {"columns": 42, "dots": 576, "quantity": 3, "price": 9, "total": 9},
+    "58mm": {"columns": 32, "dots": 384, "quantity": 3, "price": 7, "total": 8},
+}
+# Width of the right-aligned totals block
+TOTALS_WIDTH = 24
+DEFAULT_PAPER = os.getenv("AMALI_RECEIPT_PAPER", "80mm")
+# Image printed above the company name; none unless configured
+DEFAULT_LOGO = os.getenv("AMALI_RECEIPT_LOGO") or None
+
+# ESC/POS commands
+ESC_INIT = b"\x1b@"
+ESC_ALIGN = {"left": b"\x1ba\x00", "center": b"\x1ba\x01", "right": b"\x1ba\x02"}
+ESC_FEED_AND_CUT = b"\n\n\n\x1bd\x03\x1dV\x00"
+GS_RASTER = b"\x1dv0\x00"
+# Printers start in code page 437
+TEXT_ENCODING = "cp437"
+
+DEFAULT_COMPANY = {
+    "company_name": "Unknown Company",
+    "address": "N/A",
+    "state": "N/A",
+    "phone": "N/A",
+    "tin_no": "N/A",
+    "vrn_no": "N/A",
+}
+
+
+def build_receipt(order_data, items, payment_method, company=None, copy=False):
+    """Receipt record for a saved order.
+
+    `items` are the order lines ({"item_id", "quantity", "price"} and
+    optionally "name"); `company` is a row of db.get_company_details().
+    A reprint is marked as a copy.
+    """
+    company = dict(company or DEFAULT_COMPANY)
+    lines = []
+    for item in items:
+        quantity = item["quantity"]
+        price = float(item["price"])
+        lines.append(
+            {
+                "name": str(item.get("name") or item["item_id"]),
+                "quantity": quantity,
+                "price": price,
+                "total": quantity * price,
+            }
+        )
+    return {
+        "company": {
+            "name": (company.get("company_name") or "").replace("22", "").strip(),
+            "address": company.get("address") or "",
+            "state": company.get("state") or "",
+            "phone": company.get("phone") or "",
+            "tin_no": company.get("tin_no") or "",
+            "vrn_no": company.get("vrn_no") or "",
+        },
+        "title": "RECEIPT (COPY)" if copy else "RECEIPT",
+        "order_number": order_data["order_number"],
+        "receipt_number": order_data.get("receipt_number", ""),
+        "date": order_data["date"],
+        "payment": payment_method,
+        "lines": lines,
+        "subtotal": float(order_data.get("total_amount") or 0),
+        "tip": float(order_data.get("tip") or 0),
+        "discount": float(order_data.get("discount") or 0),
+        "total": float(order_data.get("ground_total") or 0),
+    }
+
+
+class ReceiptTemplate:
+    """The receipt layout compiled for one paper width (and logo)."""
+
+    def __init__(self, paper=DEFAULT_PAPER, logo_path=DEFAULT_LOGO):
+        if paper not in PAPER_LAYOUTS:
+            raise ValueError(f"Unknown paper width {paper!r}")
+        layout = PAPER_LAYOUTS[paper]
+        self.paper = paper
+        self.columns = columns = layout["columns"]
+        name_width = columns - layout["quantity"] - layout["price"] - layout["total"] - 3
+        self._item_line = (
+            f"{{name:<{name_width}.{name_width}}} {{quantity:>{layout['quantity']}}}"
+            f" {{price:>{layout['price']}}} {{total:>{layout['total']}}}"
+        )
+        self._rule = "-" * columns
+        self._item_header = self._item_line.format(
+            name="Item", quantity="Qty", price="Price", total="Total"
+        )
+        self._footer = [
+            ("center", ""),
+            ("center", "Thank you for your purchase!"),
+            ("center", "Visit us again!"),
+        ]
+        self._logo = logo_raster(logo_path, layout["dots"]) if logo_path else b""
+        self._prefix = ESC_INIT + (ESC_ALIGN["center"] + self._logo if self._logo else b"")
+        self._suffix = self._encode(self._footer) + ESC_FEED_AND_CUT
+        # Encoded header per company; there is normally only one
+        self._headers = {}
+
+    def _header(self, company):
+        lines = [("center", company["name"]), ("center", company["address"])]
+        if company["state"]:
+            lines.append(("center", company["state"]))
+        lines += [
+            ("center", f"Tel: {company['phone']}"),
+            ("center", f"TIN: {company['tin_no']} VRN: {company['vrn_no']}"),
+            ("center", ""),
+        ]
+        return lines
+
+    def _body(self, receipt):
+        lines = [
+            ("center", receipt.get("title", "RECEIPT")),
+            ("center", ""),
+            ("left", f"Order: {receipt['order_number']}"),
+            ("left", f"Date: {receipt['date']}"),
+            ("left", f"Payment: {receipt['payment']}"),
+            ("left", self._rule),
+            ("left", self._item_header),
+            ("left", self._rule),
+        ]
+        for line in receipt["lines"]:
+            lines.append(
+                (
+                    "left",
+                    self._item_line.format(
+                        name=line["name"],
+                        quantity=f"{line['quantity']:g}",
+                        price=f"{line['price']:.2f}",
+                        total=f"{line['total']:.2f}",
+                    ),
+                )
+            )
+        lines += [
+            ("left", self._rule),
+            ("right", self._total_line("Subtotal:", receipt["subtotal"])),
+            ("right", self._total_line("Tip:", receipt["tip"])),
+            ("right", self._total_line("Discount:", receipt["discount"])),
+            ("right", "-" * TOTALS_WIDTH),
+            ("right", self._total_line("TOTAL:", receipt["total"])),
+        ]
+        return lines
+
+    @staticmethod
+    def _total_line(label, amount):
+        return f"{label:<10}{amount:>{TOTALS_WIDTH - 10}.2f}"
+
+    def lines(self, receipt):
+        """[(align, text)] of the whole receipt, logo excluded."""
+        return self._header(receipt["company"]) + self._body(receipt) + self._footer
+
+    def day_close_lines(self, report):
+        """[(align, text)] of a day close slip."""
+        lines = [
+            ("center", "DAY CLOSE"),
+            ("center", report["store"]),
+            ("center", ""),
+            ("left", f"Working date: {report['working_date']}"),
+            ("left", f"Next date:    {report['next_working_date']}"),
+            ("left", self._rule),
+        ]
+        for label, value in report["rows"]:
+            value = f"{value:,.2f}" if isinstance(value, float) else str(value)
+            lines.append(("left", f"{label}:".ljust(self.columns - len(value)) + value))
+        lines += [("left", self._rule), ("center", f"Printed {report['printed_at']}")]
+        return lines
+
+    def text(self, receipt):
+        """The receipt as plain text, as it comes out of the printer."""
+        return self.text_of(self.lines(receipt))
+
+    def text_of(self, lines):
+        rendered = []
+        for align, text in lines:
+            text = text[: self.columns]
+            if align == "center":
+                text = text.center(self.columns).rstrip()
+            elif align == "right":
+                text = text.rjust(self.columns)
+            rendered.append(text)
+        return "\n".join(rendered)
+
+    def render(self, receipt):
+        """The receipt as one ESC/POS buffer, ending with a paper cut."""
+        company = receipt["company"]
+        key = tuple(sorted(company.items()))
+        header = self._headers.get(key)
+        if header is None:
+            header = self._headers[key] = self._encode(self._header(company))
+        return b"".join(
+            (self._prefix, header, self._encode(self._body(receipt)), self._suffix)
+        )
+
+    def render_day_close(self, report):
+        """A day close slip as one ESC/POS buffer."""
+        return ESC_INIT + self._encode(self.day_close_lines(report)) + ESC_FEED_AND_CUT
+
+    def _encode(self, lines):
+        """Encodes lines, sending an alignment command only when it changes."""
+        parts = []
+        current = None
+        for align, text in lines:
+            if align != current:
+                parts.append(ESC_ALIGN[align])
+                current = align
+            parts.append(text.encode(TEXT_ENCODING, "replace") + b"\n")
+        return b"".join(parts)
+
+
+@functools.lru_cache(maxsize=8)
+def _logo_raster(path, mtime, max_dots):
+    image = Image.open(path).convert("L")
+    if image.width > max_dots:
+        height = max(1, image.height * max_dots // image.width)
+        image = image.resize((max_dots, height))
+    # In mode "1" a set bit is white; the printer burns set bits
+    image = ImageOps.invert(image).convert("1")
+    width_bytes = (image.width + 7) // 8
+    header = GS_RASTER + bytes(
+        (width_bytes & 0xFF, width_bytes >> 8, image.height & 0xFF, image.height >> 8)
+    )
+    return header + image.tobytes() + b"\n"
+
+
+def logo_raster(path, max_dots):
+    """ESC/POS raster bytes of the image at `path`, cached until it changes.
+
+    Returns b"" (and logs why) when the image cannot be printed.
+    """
+    if not PIL_INSTALLED:
+        logger.warning("Pillow is not installed; receipts are printed without a logo")
+        return b""
+    try:
+        return _logo_raster(path, os.path.getmtime(path), max_dots)
+    except OSError as e:
+        logger.warning("Receipt logo %s cannot be used: %s", path, e)
+        return b""
+
+
+@functools.lru_cache(maxsize=None)
+def receipt_template(paper=DEFAULT_PAPER, logo_path=DEFAULT_LOGO):
+    """The compiled template for a paper width, shared by all callers."""
+    return ReceiptTemplate(paper, logo_path)
+
+
+def render_receipt(receipt, paper=DEFAULT_PAPER):
+    """ESC/POS bytes of a receipt record, for the print spooler."""
+    return receipt_template(paper).render(receipt)
+
+
+def render_day_close(report, paper=DEFAULT_PAPER):
+    """ESC/POS bytes of a day close report, for the print spooler."""
+    return receipt_template(paper).render_day_close(report)
@@ -0,0 +1,307 @@
+"""In-memory sales cube for interactive slicing in Reports.
+
+Every line of a completed order is loaded once into column-oriented NumPy
+arrays: measures as floats, dimensions dictionary-encoded as small integer
+codes with a label list each. A pivot is then a boolean mask plus one
+np.bincount over the combined row/column codes, instead of a GROUP BY per
+cell, and results are cached per pivot and filter until the data changes.
+`refresh()` appends lines of orders added since the last load and only
+reloads everything when already loaded orders changed (e.g. a void).
+
+NumPy is optional; without it NUMPY_INSTALLED is False and SalesCube
+cannot be created.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from Helper.db_conn import STORE_ID, DatabaseManager
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+    NUMPY_INSTALLED = False
+else:
+    NUMPY_INSTALLED = True
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+
+# Dimensions with a fixed set of values: codes come straight from SQL
+FIXED_DIMENSIONS = {
+    "hour": [f"{hour:02d}:00" for hour in range(24)],
+    "weekday": WEEKDAYS,
+}
+# Dimensions whose labels are collected while loading
+ENCODED_DIMENSIONS = ("date", "month", "payment_method", "customer_type", "category", "item")
+DIMENSIONS = tuple(FIXED_DIMENSIONS) + ENCODED_DIMENSIONS + ("store",)
+
+# "orders" counts distinct orders per cell, "lines" counts order lines
+MEASURES = ("revenue", "quantity", "orders", "lines")
+
+LOAD_CHUNK_SIZE = 20000
+CACHE_SIZE = 64
+
+LINES_QUERY = """
+    SELECT oi.id, o.id,
+           COALESCE(CAST(strftime('%H', o.date) AS INTEGER), 0),
+           COALESCE(CAST(strftime('%w', o.date) AS INTEGER), 0),
+           COALESCE(DATE(o.date), 'Unknown'),
+           COALESCE(strftime('%Y-%m', o.date), 'Unknown'),
+           COALESCE((
+               SELECT COALESCE(p.short_code, p.payment_method)
+               FROM order_payments op JOIN payments p ON p.id = op.payment_id
+               WHERE op.order_id = o.id ORDER BY op.id LIMIT 1
+           ), 'Unknown'),
+           COALESCE(ct.name, 'Unknown'),
+           COALESCE(c.name, 'Unknown'),
+           COALESCE(i.name, 'Item ' || oi.item_id),
+           COALESCE(oi.quantity, 0), COALESCE(oi.quantity * oi.price, 0)
+    FROM order_items oi
+    JOIN orders o ON o.id = oi.order_id
+    LEFT JOIN customer_types ct ON ct.id = o.customer_type_id
+    LEFT JOIN items i ON i.id = oi.item_id
+    LEFT JOIN categories c ON c.id = i.category_id
+    WHERE o.status = 'completed' AND oi.id > ?
+    ORDER BY oi.id
+    LIMIT ?
+"""
+
+# Changes to orders the cube has already loaded; compared on refresh
+FINGERPRINT_QUERY = """
+    SELECT COUNT(*), TOTAL(ground_total), MAX(updated_at)
+    FROM orders
+    WHERE id <= ? AND status = 'completed'
+"""
+
+
+class SalesCube:
+    def __init__(self, store_id=None):
+        if not NUMPY_INSTALLED:
+            raise ImportError("numpy is required for the sales cube")
+        self.db_manager = DatabaseManager()
+        self.store_id = store_id or STORE_ID
+        self._lock = threading.RLock()
+        self._cache = OrderedDict()
+        self._reset()
+
+    def _reset(self):
+        self.line_ids = np.empty(0, dtype=np.int64)
+        self.order_ids = np.empty(0, dtype=np.int64)
+        self.quantity = np.empty(0, dtype=np.float64)
+        self.revenue = np.empty(0, dtype=np.float64)
+        self.codes = {dim: np.empty(0, dtype=np.int32) for dim in DIMENSIONS}
+        self.labels = {dim: list(labels) for dim, labels in FIXED_DIMENSIONS.items()}
+        self.labels.update({dim: [] for dim in ENCODED_DIMENSIONS})
+        self.labels["store"] = [self._store_name()]
+        self._label_codes = {dim: {} for dim in ENCODED_DIMENSIONS}
+        self.last_line_id = 0
+        self.last_order_id = 0
+        self.fingerprint = None
+        self._cache.clear()
+
+    def _store_name(self):
+        conn = self.db_manager.open_connection()
+        try:
+            row = conn.execute(
+                "SELECT name FROM stores WHERE id = ?", (self.store_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else f"Store {self.store_id}"
+
+    def __len__(self):
+        return len(self.line_ids)
+
+    def refresh(self, full=False):
+        """Loads lines added since the last call; returns the number added.
+
+        Reloads everything on the first call, with full=True, or when
+        orders already in the cube were voided, edited or synced in.
+        """
+        with self._lock:
+            started = time.perf_counter()
+            if full or self.fingerprint is None or self._fingerprint() != self.fingerprint:
+                self._reset()
+            added = self._load()
+            if added:
+                self._cache.clear()
+            self.fingerprint = self._fingerprint()
+            logger.info(
+                "Sales cube: %d lines added, %d total in %.1f ms",
+                added,
+                len(self),
+                (time.perf_counter() - started) * 1000,
+            )
+            return added
+
+    def _fingerprint(self):
+        conn = self.db_manager.open_connection()
+        try:
+            return tuple(conn.execute(FINGERPRINT_QUERY, (self.last_order_id,)).fetchone())
+        finally:
+            conn.close()
+
+    def _encode(self, dim, values):
+        codes = self._label_codes[dim]
+        labels = self.labels[dim]
+        result = []
+        for value in values:
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(labels)
+                labels.append(value)
+            result.append(code)
+        return np.array(result, dtype=np.int32)
+
+    def _load(self):
+        """Appends every completed line after last_line_id.
+
+        Lines are read in pages of separate statements so the read lock is
+        released between them and checkouts are not held up by a load.
+        """
+        conn = self.db_manager.open_connection()
+        parts = []
+        last_line_id = self.last_line_id
+        try:
+            while True:
+                rows = conn.execute(LINES_QUERY, (last_line_id, LOAD_CHUNK_SIZE)).fetchall()
+                if not rows:
+                    break
+                last_line_id = rows[-1][0]
+                columns = list(zip(*rows))
+                part = {
+                    "line_ids": np.array(columns[0], dtype=np.int64),
+                    "order_ids": np.array(columns[1], dtype=np.int64),
+                    "hour": np.array(columns[2], dtype=np.int32),
+                    "weekday": np.array(columns[3], dtype=np.int32),
+                    "quantity": np.array(columns[10], dtype=np.float64),
+                    "revenue": np.array(columns[11], dtype=np.float64),
+                    "store": np.zeros(len(rows), dtype=np.int32),
+                }
+                for offset, dim in enumerate(ENCODED_DIMENSIONS, start=4):
+                    part[dim] = self._encode(dim, columns[offset])
+                parts.append(part)
+                if len(rows) < LOAD_CHUNK_SIZE:
+                    break
+        finally:
+            conn.close()
+        if not parts:
+            return 0
+
+        def joined(name, current):
+            return np.concatenate([current] + [part[name] for part in parts])
+
+        self.line_ids = joined("line_ids", self.line_ids)
+        self.order_ids = joined("order_ids", self.order_ids)
+        self.quantity = joined("quantity", self.quantity)
+        self.revenue = joined("revenue", self.revenue)
+        for dim in DIMENSIONS:
+            self.codes[dim] = joined(dim, self.codes[dim])
+        self.last_line_id = int(self.line_ids[-1])
+        self.last_order_id = max(self.last_order_id, int(self.order_ids.max()))
+        return sum(len(part["line_ids"]) for part in parts)
+
+    def _mask(self, filters, start_date, end_date):
+        mask = np.ones(len(self), dtype=bool)
+        for dim, values in (filters or {}).items():
+            lookup = {label: code for code, label in enumerate(self.labels[dim])}
+            codes = [lookup[value] for value in values if value in lookup]
+            mask &= np.isin(self.codes[dim], codes)
+        if start_date or end_date:
+            dates = np.array(self.labels["date"], dtype=str)
+            in_range = np.ones(len(dates), dtype=bool)
+            if start_date:
+                in_range &= dates >= start_date
+            if end_date:
+                in_range &= dates <= end_date
+            if len(dates):
+                mask &= in_range[self.codes["date"]]
+        return mask
+
+    def pivot(
+        self, rows, columns=None, measure="revenue", filters=None, start_date=None, end_date=None
+    ):
+        """Aggregates `measure` by the `rows` (and optional `columns`) dimension.
+
+        `filters` maps dimensions to the labels to keep; dates are
+        inclusive ISO strings. Returns (row_labels, column_labels, matrix)
+        with only the rows and columns that have sales; matrix is a 2-D
+        array (one column named "Total" without `columns`).
+        """
+        if measure not in MEASURES:
+            raise ValueError(f"Unknown measure {measure!r}")
+        for dim in (rows, columns):
+            if dim is not None and dim not in DIMENSIONS:
+                raise ValueError(f"Unknown dimension {dim!r}")
+        key = (
+            rows,
+            columns,
+            measure,
+            tuple(sorted((dim, tuple(sorted(v))) for dim, v in (filters or {}).items())),
+            start_date,
+            end_date,
+        )
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+            result = self._pivot(rows, columns, measure, filters, start_date, end_date)
+            self._cache[key] = result
+            if len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+            return result
+
+    def _pivot(self, rows, columns, measure, filters, start_date, end_date):
+        mask = self._mask(filters, start_date, end_date)
+        row_count = len(self.labels[rows])
+        column_count = len(self.labels[columns]) if columns else 1
+        cells = row_count * column_count
+
+        cell = self.codes[rows][mask].astype(np.int64) * column_count
+        if columns:
+            cell += self.codes[columns][mask]
+
+        lines = np.bincount(cell, minlength=cells)
+        if measure == "lines":
+            values = lines.astype(np.float64)
+        elif measure == "orders":
+            # Count each (cell, order) pair once
+            pairs = np.unique(cell * (self.last_order_id + 1) + self.order_ids[mask])
+            values = np.bincount(
+                pairs // (self.last_order_id + 1), minlength=cells
+            ).astype(np.float64)
+        else:
+            weights = self.revenue if measure == "revenue" else self.quantity
+            values = np.bincount(cell, weights=weights[mask], minlength=cells)
+
+        matrix = values.reshape(row_count, column_count)
+        present = lines.reshape(row_count, column_count)
+        keep_rows = self._ordered(rows, np.flatnonzero(present.sum(axis=1)))
+        if columns:
+            keep_columns = self._ordered(columns, np.flatnonzero(present.sum(axis=0)))
+            column_labels = [self.labels[columns][c] for c in keep_columns]
+        else:
+            keep_columns = np.zeros(1, dtype=np.int64)
+            column_labels = ["Total"]
+        row_labels = [self.labels[rows][r] for r in keep_rows]
+        return row_labels, column_labels, matrix[np.ix_(keep_rows, keep_columns)]
+
+    def _ordered(self, dim, codes):
+        """Codes of fixed dimensions keep their natural order, others sort by label."""
+        if dim in FIXED_DIMENSIONS:
+            return codes
+        labels = self.labels[dim]
+        return np.array(sorted(codes, key=lambda code: labels[code]), dtype=np.int64)
+
+    def group_by(self, dim, measure="revenue", **options):
+        """[(label, value)] for one dimension, largest first."""
+        labels, _, matrix = self.pivot(dim, None, measure, **options)
+        totals = matrix[:, 0]
+        order = np.argsort(-totals, kind="stable")
+        return [(labels[i], float(totals[i])) for i in order]
@@ -0,0 +1,231 @@
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """A periodic job registered with the Scheduler.
+
+    `func()` runs the job; returning False or raising counts as a failure.
+    With `asynchronous=True` it is called as `func(done)` instead and must
+    call `done(success)` once the work it started has finished; until then
+    the job counts as running.
+    """
+
+    def __init__(
+        self,
+        name,
+        func,
+        interval,
+        jitter=0.1,
+        group=None,
+        heavy=False,
+        max_backoff=None,
+        max_defer=None,
+        asynchronous=False,
+    ):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.group = group
+        self.heavy = heavy
+        self.max_backoff = max_backoff or interval * 16
+        self.max_defer = max_defer
+        self.asynchronous = asynchronous
+
+        self.paused = False
+        self.running = False
+        self.next_due = 0.0
+        self.due_since = None
+        self.consecutive_failures = 0
+        self.stats = {
+            "runs": 0,
+            "failures": 0,
+            "deferrals": 0,
+            "blocked_by_group": 0,
+            "last_run": None,
+            "last_duration_s": None,
+            "total_duration_s": 0.0,
+            "last_error": None,
+        }
+
+
+class Scheduler:
+    """Runs registered jobs on their intervals without competing with sales.
+
+    Intervals get +/- `jitter` randomisation so jobs do not line up. After a
+    failure the wait doubles per consecutive failure up to `max_backoff`.
+    Only one job of a mutual-exclusion `group` runs at a time. `heavy` jobs
+    are deferred while `is_busy()` says a sale is in progress or there was
+    cashier activity (`note_activity()`) in the last `idle_after` seconds,
+    but never for longer than their `max_defer`.
+
+    The scheduler is clock-driven and owns no thread or timer: a driver
+    calls `tick()` (the GUI uses SchedulerDriver) and can sleep for
+    `seconds_until_next()` in between.
+    """
+
+    def __init__(self, idle_after=5.0, clock=time.monotonic):
+        self.idle_after = idle_after
+        self.clock = clock
+        self.is_busy = lambda: False
+        self._jobs = {}
+        self._lock = threading.RLock()
+        self._last_activity = None
+
+    def register(self, name, func, interval, run_now=False, **options):
+        job = Job(name, func, interval, **options)
+        job.next_due = self.clock() if run_now else self._next_due(job, self.clock())
+        with self._lock:
+            self._jobs[name] = job
+        return job
+
+    def unregister(self, name):
+        with self._lock:
+            self._jobs.pop(name, None)
+
+    def pause(self, name):
+        with self._lock:
+            if name in self._jobs:
+                self._jobs[name].paused = True
+
+    def resume(self, name, run_now=False):
+        with self._lock:
+            job = self._jobs.get(name)
+            if job:
+                job.paused = False
+                if run_now:
+                    job.next_due = self.clock()
+
+    def run_soon(self, name):
+        with self._lock:
+            job = self._jobs.get(name)
+            if job:
+                job.next_due = self.clock()
+
+    def note_activity(self):
+        """Called on cashier input; heavy jobs wait until the till is idle."""
+        self._last_activity = self.clock()
+
+    def idle(self):
+        if self.is_busy():
+            return False
+        return (
+            self._last_activity is None
+            or self.clock() - self._last_activity >= self.idle_after
+        )
+
+    def seconds_until_next(self):
+        """Seconds until the next job is due (0 if one is due or deferred now)."""
+        now = self.clock()
+        with self._lock:
+            due = [
+                job.next_due for job in self._jobs.values()
+                if not job.paused and not job.running
+            ]
+        return max(0.0, min(due) - now) if due else None
+
+    def tick(self):
+        """Starts every job that is due and allowed to run; returns their names."""
+        now = self.clock()
+        started = []
+        with self._lock:
+            jobs = sorted(self._jobs.values(), key=lambda job: job.next_due)
+        idle = None
+        for job in jobs:
+            if job.paused or job.running or job.next_due > now:
+                continue
+            if job.due_since is None:
+                job.due_since = job.next_due
+            if job.group and any(
+                other.running and other.group == job.group for other in jobs
+            ):
+                job.stats["blocked_by_group"] += 1
+                continue
+            if job.heavy:
+                if idle is None:
+                    idle = self.idle()
+                overdue = (
+                    job.max_defer is not None and now - job.due_since >= job.max_defer
+                )
+                if not idle and not overdue:
+                    job.stats["deferrals"] += 1
+                    continue
+            self._start(job)
+            started.append(job.name)
+        return started
+
+    def stats(self):
+        """Returns {job name: run statistics} for all registered jobs."""
+        now = self.clock()
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return {
+            job.name: dict(
+                job.stats,
+                interval=job.interval,
+                paused=job.paused,
+                running=job.running,
+                consecutive_failures=job.consecutive_failures,
+                next_due_in_s=round(job.next_due - now, 1),
+            )
+            for job in jobs
+        }
+
+    def _start(self, job):
+        job.running = True
+        job.due_since = None
+        started = self.clock()
+        if not job.asynchronous:
+            try:
+                success = job.func() is not False
+                error = None
+            except Exception as e:
+                logger.exception("Scheduled job %s failed: %s", job.name, e)
+                success, error = False, str(e)
+            self._finish(job, started, success, error)
+            return
+
+        finished = []
+
+        def done(success=True, error=None):
+            if not finished:
+                finished.append(True)
+                self._finish(job, started, success, error)
+
+        try:
+            job.func(done)
+        except Exception as e:
+            logger.exception("Scheduled job %s failed to start: %s", job.name, e)
+            done(False, str(e))
+
+    def _finish(self, job, started, success, error=None):
+        now = self.clock()
+        stats = job.stats
+        stats["runs"] += 1
+        stats["last_run"] = time.time()
+        stats["last_duration_s"] = round(now - started, 4)
+        stats["total_duration_s"] += now - started
+        if success:
+            job.consecutive_failures = 0
+        else:
+            job.consecutive_failures += 1
+            stats["failures"] += 1
+            stats["last_error"] = error
+        job.running = False
+        job.next_due = self._next_due(job, now)
+
+    def _next_due(self, job, now):
+        wait = job.interval
+        if job.consecutive_failures:
+            wait = min(job.interval * 2 ** job.consecutive_failures, job.max_backoff)
+        if job.jitter:
+            wait *= 1 + random.uniform(-job.jitter, job.jitter)
+        return now + wait
+
+
+scheduler = Scheduler()
@@ -0,0 +1,174 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from Helper.logging_config import SLOW_QUERY_LOGGER
+
+logger = logging.getLogger(SLOW_QUERY_LOGGER)
+
+# Statements running longer than this many ms (execution plus fetching)
+# are logged. Timing costs time on every statement and row, so it is only
+# switched on when AMALI_SLOW_QUERY_MS is set.
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("AMALI_SLOW_QUERY_MS") or 100)
+
+_THIS_FILE = os.path.normcase(os.path.abspath(__file__))
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _caller():
+    """Returns "file:line function" of the first frame outside this module."""
+    frame = sys._getframe(2)
+    while frame is not None and os.path.normcase(frame.f_code.co_filename) == _THIS_FILE:
+        frame = frame.f_back
+    if frame is None:
+        return "unknown"
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno} {frame.f_code.co_name}"
+
+
+def connection_factory():
+    """Connection class for new connections: timed only while enabled."""
+    if os.environ.get("AMALI_SLOW_QUERY_MS") and logger.isEnabledFor(logging.WARNING):
+        return TimedConnection
+    return sqlite3.Connection
+
+
+def _parameter_shape(parameters, many=False):
+    """Describes bound parameters by type only, never by value."""
+    if many:
+        rows = parameters if isinstance(parameters, (list, tuple)) else None
+        if rows is None:
+            return "iterator"
+        first = _parameter_shape(rows[0]) if rows else "()"
+        return f"{len(rows)} x {first}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items()) + "}"
+    return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that times each statement, including the time spent fetching.
+
+    SQLite produces rows lazily, so a SELECT is only finished once its rows
+    are fetched; the measurement is closed when the cursor runs its next
+    statement, is exhausted, or is closed. The caller is looked up when a
+    statement crosses the threshold and the parameter shape when it is
+    logged, so fast statements pay for the clock only.
+    """
+
+    _statement = None
+
+    def _begin(self, sql, parameters, many=False):
+        self._finish()
+        self._statement = [sql, parameters, many, None, 0.0]
+        self.connection._traced = 0
+
+    def _timed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(*args)
+        finally:
+            statement = self._statement
+            if statement is not None:
+                statement[4] += time.perf_counter() - start
+                if statement[3] is None and statement[4] * 1000 >= SLOW_QUERY_THRESHOLD_MS:
+                    statement[3] = _caller()
+
+    def _finish(self):
+        statement, self._statement = self._statement, None
+        if statement is None:
+            return
+        sql, parameters, many, caller, elapsed = statement
+        duration_ms = elapsed * 1000
+        if duration_ms >= SLOW_QUERY_THRESHOLD_MS:
+            logger.warning(
+                "%s",
+                json.dumps(
+                    {
+                        "duration_ms": round(duration_ms, 2),
+                        "sql": _WHITESPACE.sub(" ", sql).strip()[:2000],
+                        "params": _parameter_shape(parameters, many),
+                        "statements": getattr(self.connection, "_traced", 0),
+                        "caller": caller,
+                    }
+                ),
+            )
+
+    def execute(self, sql, parameters=()):
+        self._begin(sql, parameters)
+        return self._timed(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        if not isinstance(seq_of_parameters, (list, tuple)):
+            seq_of_parameters = list(seq_of_parameters)
+        self._begin(sql, seq_of_parameters, many=True)
+        result = self._timed(super().executemany, sql, seq_of_parameters)
+        self._finish()
+        return result
+
+    def fetchone(self):
+        row = self._timed(super().fetchone)
+        if row is None:
+            self._finish()
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed(super().fetchmany, size or self.arraysize)
+        if not rows:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(super().fetchall)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        try:
+            return self._timed(super().__next__)
+        except StopIteration:
+            self._finish()
+            raise
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        # Cursors are often dropped after a single fetchone()
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+
+class TimedConnection(sqlite3.Connection):
+    """Connection class of DatabaseManager while the slow-query log is on.
+
+    The trace callback counts the statements SQLite actually runs for each
+    timed statement, which shows trigger bodies fired by a write.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._traced = 0
+        self.set_trace_callback(self._trace)
+
+    def _trace(self, statement):
+        self._traced += 1
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def close(self):
+        self.set_trace_callback(None)
+        super().close()
@@ -0,0 +1,65 @@
+import json
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfiler:
+    """Measures how long each phase of application startup takes.
+
+    Call `mark(name)` when a phase finishes; its duration is the time since
+    the previous mark (or since this module was imported, which amali.py does
+    first). Phases that wait for the user, such as the login dialog, are
+    marked with `waiting=True` and left out of the total. `report()` logs a
+    table and, when AMALI_STARTUP_PROFILE names a file, writes it as JSON.
+    """
+
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self._last = self._origin
+        self.phases = []
+        self.reported = False
+
+    def mark(self, name, waiting=False):
+        now = time.perf_counter()
+        self.phases.append(
+            {
+                "phase": name,
+                "duration_ms": round((now - self._last) * 1000, 1),
+                "waiting": waiting,
+            }
+        )
+        self._last = now
+
+    def total_ms(self):
+        return round(
+            sum(phase["duration_ms"] for phase in self.phases if not phase["waiting"]),
+            1,
+        )
+
+    def report(self):
+        if self.reported:
+            return
+        self.reported = True
+        lines = [f"Startup took {self.total_ms()} ms:"]
+        for phase in self.phases:
+            suffix = " (waiting for user, not counted)" if phase["waiting"] else ""
+            lines.append(
+                f"  {phase['phase']:<28} {phase['duration_ms']:>9.1f} ms{suffix}"
+            )
+        logger.info("\n".join(lines))
+
+        output = os.environ.get("AMALI_STARTUP_PROFILE")
+        if output:
+            try:
+                with open(output, "w") as f:
+                    json.dump(
+                        {"total_ms": self.total_ms(), "phases": self.phases}, f, indent=2
+                    )
+            except OSError as e:
+                logger.error("Could not write startup profile to %s: %s", output, e)
+
+
+startup_profiler = StartupProfiler()
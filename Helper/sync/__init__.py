@@ -0,0 +1,9 @@
+"""Qt-free sync, outbox, backup and maintenance jobs.
+
+The jobs can run inside the GUI (SyncWorker) or in a separate process:
+
+    python -m Helper.sync --daemon
+
+Either way their outcome is written to the `sync_status` table, which is
+what the GUI reads.
+"""
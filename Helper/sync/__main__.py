@@ -0,0 +1,68 @@
+"""Command-line entry point for the sync jobs.
+
+    python -m Helper.sync --daemon             # run every job on its schedule
+    python -m Helper.sync --run pull push      # run jobs once and exit
+    python -m Helper.sync --status             # print sync_status as JSON
+"""
+
+import argparse
+import json
+import sys
+
+from Helper.logging_config import configure_logging
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m Helper.sync", description=__doc__)
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--daemon", action="store_true", help="run until stopped")
+    mode.add_argument(
+        "--run",
+        nargs="+",
+        metavar="JOB",
+        choices=["pull", "push", "backup", "maintenance"],
+        help="run these jobs once",
+    )
+    mode.add_argument("--status", action="store_true", help="print job status")
+    for job in ("pull", "push", "backup", "maintenance"):
+        parser.add_argument(
+            f"--{job}-interval",
+            type=float,
+            metavar="SECONDS",
+            help=f"seconds between {job} runs in daemon mode",
+        )
+    parser.add_argument("--backup-dir", help="directory for database backups")
+    parser.add_argument(
+        "--keep-backups", type=int, default=7, help="number of backups to keep"
+    )
+    args = parser.parse_args(argv)
+
+    configure_logging()
+
+    from Helper.db_conn import db, log_database_diagnostics
+
+    if args.status:
+        print(json.dumps(db.get_sync_status(), indent=2))
+        return 0
+
+    log_database_diagnostics()
+    job_options = {"backup": {"backup_dir": args.backup_dir, "keep": args.keep_backups}}
+
+    if args.run:
+        from Helper.sync.jobs import run_job
+
+        results = [run_job(job, **job_options.get(job, {})) for job in args.run]
+        return 0 if all(result.get("success", True) for result in results) else 1
+
+    from Helper.sync.daemon import SyncDaemon
+
+    intervals = {
+        job: getattr(args, f"{job}_interval")
+        for job in ("pull", "push", "backup", "maintenance")
+        if getattr(args, f"{job}_interval")
+    }
+    return SyncDaemon(intervals=intervals, job_options=job_options).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+import logging
+import signal
+import sqlite3
+import threading
+import time
+
+from Helper.change_bus import change_bus
+from Helper.db_conn import db
+from Helper.network import API_BASE_URL, host_and_port, probe
+from Helper.sync.jobs import NETWORK_JOBS, run_job
+
+logger = logging.getLogger(__name__)
+
+# Seconds between runs of each job
+DEFAULT_INTERVALS = {
+    "pull": 60,
+    "push": 30,
+    "backup": 6 * 60 * 60,
+    "maintenance": 24 * 60 * 60,
+}
+
+
+class SyncDaemon:
+    """Runs the sync jobs on their own schedule, outside the GUI process.
+
+    Network jobs are skipped while the API host is unreachable, retrying
+    with a doubling delay up to `max_backoff`. A heartbeat in sync_status
+    tells the GUI that a daemon is running, so it stops syncing itself, and
+    change events raised here are stored in change_events for the GUI to
+    replay. The heartbeat is written from its own thread so it stays fresh
+    while a long job runs.
+    """
+
+    def __init__(self, intervals=None, heartbeat=15, max_backoff=300, job_options=None):
+        self.intervals = dict(DEFAULT_INTERVALS, **(intervals or {}))
+        self.heartbeat = heartbeat
+        self.max_backoff = max_backoff
+        self.job_options = job_options or {}
+        self._stop_event = threading.Event()
+        self._offline_delay = None
+
+    def stop(self, *args):
+        self._stop_event.set()
+
+    def _is_online(self):
+        return probe(*host_and_port(API_BASE_URL))
+
+    def run(self):
+        if db.sync_daemon_alive(max_age=self.heartbeat * 3):
+            logger.error("Another sync daemon is already running; exiting")
+            return 1
+
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        token = change_bus.subscribe(lambda event: db.record_change_events([event]))
+        logger.info("Sync daemon started with intervals %s", self.intervals)
+
+        db.touch_sync_heartbeat()
+        beating = threading.Event()
+        beater = threading.Thread(
+            target=self._beat, args=(beating,), name="sync-heartbeat", daemon=True
+        )
+        beater.start()
+
+        now = time.monotonic()
+        next_run = {job: now for job in self.intervals}
+        try:
+            while not self._stop_event.is_set():
+                now = time.monotonic()
+                due = [job for job, at in next_run.items() if at <= now]
+                online = None
+                for job in due:
+                    if self._stop_event.is_set():
+                        break
+                    interval = self.intervals[job]
+                    if job in NETWORK_JOBS:
+                        if online is None:
+                            online = self._is_online()
+                        if not online:
+                            interval = self._backoff()
+                            logger.info("API host unreachable, skipping %s", job)
+                            next_run[job] = time.monotonic() + interval
+                            continue
+                        self._offline_delay = None
+                    run_job(job, **self.job_options.get(job, {}))
+                    next_run[job] = time.monotonic() + interval
+
+                wait = min(next_run.values()) - time.monotonic()
+                self._stop_event.wait(max(0.0, wait))
+        finally:
+            beating.set()
+            beater.join()
+            change_bus.unsubscribe(token)
+            db.clear_sync_heartbeat()
+            logger.info("Sync daemon stopped")
+        return 0
+
+    def _beat(self, stopped):
+        while not stopped.wait(self.heartbeat):
+            try:
+                db.touch_sync_heartbeat()
+            except sqlite3.Error as e:
+                logger.warning("Could not write sync heartbeat: %s", e)
+
+    def _backoff(self):
+        if self._offline_delay is None:
+            self._offline_delay = min(self.intervals["push"], self.intervals["pull"])
+        else:
+            self._offline_delay = min(self._offline_delay * 2, self.max_backoff)
+        return self._offline_delay
@@ -0,0 +1,98 @@
+import logging
+import os
+import sqlite3
+import time
+import traceback
+from datetime import datetime
+from pathlib import Path
+
+from Helper.db_conn import db
+
+logger = logging.getLogger(__name__)
+
+BACKUP_DIR = os.environ.get("AMALI_BACKUP_DIR", "Backups")
+
+
+def pull():
+    """Applies server data to the local database."""
+    # Imported here: Helper.api pulls in requests
+    from Helper.api import sync_data_with_server
+
+    return {"success": bool(sync_data_with_server())}
+
+
+def push():
+    """Sends journaled local edits (the outbox) to the server."""
+    from Helper.api import push_local_changes
+
+    return {"pushed": push_local_changes()}
+
+
+def backup(backup_dir=None, keep=7):
+    """Copies the database with SQLite's online backup and keeps the newest `keep`.
+
+    The backup API copies a consistent snapshot while the till keeps
+    writing, so no lock has to be held for the duration.
+    """
+    backup_dir = Path(backup_dir or BACKUP_DIR)
+    backup_dir.mkdir(parents=True, exist_ok=True)
+    target = backup_dir / f"amali-{datetime.now().strftime('%Y%m%d-%H%M%S')}.db"
+
+    source = db.connect()
+    destination = sqlite3.connect(target)
+    try:
+        source.backup(destination)
+    finally:
+        destination.close()
+        source.close()
+
+    backups = sorted(backup_dir.glob("amali-*.db"))
+    for old in backups[:-keep] if keep else []:
+        old.unlink()
+    return {"path": str(target), "bytes": target.stat().st_size}
+
+
+def maintenance():
+    """Housekeeping that keeps the database small and the planner informed."""
+    db.compact_changelog()
+    db.prune_change_events()
+    db.rebuild_catalog_view()
+    db.rebuild_item_daily_sales()
+    with db.get_connection() as conn:
+        integrity = conn.execute("PRAGMA quick_check").fetchone()[0]
+        conn.execute("PRAGMA optimize")
+    return {"success": integrity == "ok", "quick_check": integrity}
+
+
+JOBS = {
+    "pull": pull,
+    "push": push,
+    "backup": backup,
+    "maintenance": maintenance,
+}
+
+# Jobs that talk to the server and are skipped while it is unreachable
+NETWORK_JOBS = {"pull", "push"}
+
+
+def run_job(name, **kwargs):
+    """Runs job `name` and records its outcome in sync_status.
+
+    Returns the job's result dict; a job that raises is recorded as failed
+    and reported as {"success": False, "error": ...}.
+    """
+    db.start_sync_job(name)
+    started = time.perf_counter()
+    try:
+        result = JOBS[name](**kwargs)
+    except Exception as e:
+        logger.error("Sync job %s failed: %s\n%s", name, e, traceback.format_exc())
+        result = {"success": False, "error": str(e)}
+        db.finish_sync_job(name, False, result, error=str(e))
+        return result
+
+    result["duration_s"] = round(time.perf_counter() - started, 3)
+    success = result.get("success", True)
+    db.finish_sync_job(name, success, result)
+    logger.info("Sync job %s finished: %s", name, result)
+    return result
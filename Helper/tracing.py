@@ -0,0 +1,166 @@
+import functools
+import itertools
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import deque, namedtuple
+from contextlib import contextmanager
+from datetime import date
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency histogram buckets; anything slower lands in
+# a final overflow bucket. Persisted histograms store bucket indexes, so only
+# ever append to this tuple.
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+# Checkout stages in the order a sale goes through them.
+CHECKOUT_STAGES = (
+    "catalog_lookup",
+    "cart_insert",
+    "totals",
+    "payment_card",
+    "payment_dialog",
+    "db_commit",
+    "print_receipt",
+    "cash_drawer",
+)
+
+# A finished span: `start` is wall-clock (for display), `duration_ms` is
+# measured with perf_counter.
+Span = namedtuple("Span", ["trace_id", "stage", "start", "duration_ms", "ok"])
+
+
+def bucket_index(duration_ms):
+    return bisect_left(LATENCY_BUCKETS_MS, duration_ms)
+
+
+def percentile(counts, q):
+    """Estimates the q-th percentile (0-100) from histogram bucket counts.
+
+    Interpolates linearly inside the bucket holding the percentile; returns
+    None for an empty histogram and the last bound for the overflow bucket.
+    """
+    total = sum(counts)
+    if not total:
+        return None
+    rank = total * q / 100.0
+    seen = 0
+    for index, count in enumerate(counts):
+        if count and seen + count >= rank:
+            if index >= len(LATENCY_BUCKETS_MS):
+                return float(LATENCY_BUCKETS_MS[-1])
+            lower = LATENCY_BUCKETS_MS[index - 1] if index else 0.0
+            upper = LATENCY_BUCKETS_MS[index]
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+    return float(LATENCY_BUCKETS_MS[-1])
+
+
+class Tracer:
+    """Times the stages of a sale and keeps per-stage latency histograms.
+
+    A trace starts with the first scan or card click of a basket and ends
+    when the checkout is cleared; every span recorded in between carries its
+    id. Finished spans go into a ring buffer of the last `capacity` spans
+    (for the "recent" view) and into per-stage bucket counts, which are
+    handed to `sink(day, {stage: counts})` by `flush()`, at most every
+    `flush_interval` seconds when a trace ends and on shutdown.
+    """
+
+    def __init__(self, capacity=2000, flush_interval=60.0, sink=None):
+        self._lock = threading.Lock()
+        self._spans = deque(maxlen=capacity)
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._trace_id = None
+        self.flush_interval = flush_interval
+        self.sink = sink
+        self._last_flush = time.monotonic()
+
+    @property
+    def trace_id(self):
+        return self._trace_id
+
+    def begin_trace(self):
+        """Starts a trace unless one is already active; returns its id."""
+        if self._trace_id is None:
+            self._trace_id = f"{int(time.time()):x}-{next(self._ids)}"
+        return self._trace_id
+
+    def end_trace(self):
+        self._trace_id = None
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    @contextmanager
+    def span(self, stage):
+        """Times the block as `stage` of the active trace (starting one if needed)."""
+        trace_id = self.begin_trace()
+        started_at = time.time()
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.record(
+                stage, (time.perf_counter() - started) * 1000, trace_id, started_at, ok
+            )
+
+    def traced(self, stage):
+        """Decorator form of `span()`."""
+
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def record(self, stage, duration_ms, trace_id=None, start=None, ok=True):
+        span = Span(trace_id, stage, start or time.time(), duration_ms, ok)
+        with self._lock:
+            self._spans.append(span)
+            counts = self._pending.get(stage)
+            if counts is None:
+                counts = self._pending[stage] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            counts[bucket_index(duration_ms)] += 1
+
+    def recent_spans(self, limit=None):
+        """Returns finished spans, newest first."""
+        with self._lock:
+            spans = list(self._spans)
+        spans.reverse()
+        return spans[:limit] if limit else spans
+
+    def pending_histograms(self):
+        """Returns a copy of the bucket counts not yet flushed."""
+        with self._lock:
+            return {stage: list(counts) for stage, counts in self._pending.items()}
+
+    def flush(self):
+        """Hands the pending bucket counts to the sink and clears them."""
+        if self.sink is None:
+            return
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        try:
+            self.sink(date.today().isoformat(), pending)
+        except Exception as e:
+            logger.error("Failed to persist latency histograms: %s", e)
+            with self._lock:
+                for stage, counts in pending.items():
+                    merged = self._pending.setdefault(stage, [0] * len(counts))
+                    for index, count in enumerate(counts):
+                        merged[index] += count
+
+
+tracer = Tracer()
@@ -1,3 +1,5 @@
+from Helper.startup_profile import startup_profiler
+
 import hashlib
 import sqlite3
 from PyQt5.QtWidgets import *
@@ -5,10 +7,17 @@ from PyQt5.QtGui import *
 from PyQt5.QtCore import *
 import sys
 import os
-from Helper.db_conn import db
-from Application.Components.main import DashboardView
+
+from Helper.logging_config import configure_logging
+
+# Before the imports below: importing the database layer already logs.
+configure_logging()
+
+from Helper.db_conn import db, log_database_diagnostics
 import bcrypt
 
+startup_profiler.mark("imports")
+
 
 def get_resource_path(relative_path):
     """Get the absolute path to a resource, works for dev and PyInstaller."""
@@ -174,10 +183,22 @@ class Boot(QDialog):
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     app.setStyle("fusion")
+    startup_profiler.mark("qt application")
+    log_database_diagnostics()
+    startup_profiler.mark("database")
     bootUI = Boot()
-    if bootUI.exec_() == QDialog.Accepted:
+    startup_profiler.mark("login dialog")
+    accepted = bootUI.exec_() == QDialog.Accepted
+    startup_profiler.mark("login", waiting=True)
+    if accepted:
         print("Boot: Opening DashboardView...")
+        # Imported only now so the login dialog does not wait for the
+        # dashboard's modules to load.
+        from Application.Components.main import DashboardView
+
+        startup_profiler.mark("import dashboard")
         main_window = DashboardView()
+        startup_profiler.mark("build dashboard")
         main_window.showMaximized()
     else:
         print("Boot: Login dialog was rejected or closed.")